@@ -1,7 +1,7 @@
 # agents/smart_coaching_agent.py
 import asyncio
 from mcp_direct_client import direct_client
-from utils.ollama_client import generate_with_ollama
+from utils.ollama_client import agenerate_with_ollama
 
 class SmartCoachingAgent:
     def __init__(self):
@@ -46,7 +46,7 @@ Génère un rapport post-match professionnel en français avec :
 Sois direct, précis, et 100 % basé sur ces données.
 """
 
-            report = generate_with_ollama(prompt, model="llama3.1:8b")
+            report = await agenerate_with_ollama(prompt, model="llama3.1:8b")
             return report
 
         except Exception as e:
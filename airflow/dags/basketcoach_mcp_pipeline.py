@@ -48,6 +48,14 @@ def step4_check_quality(**context):
         return "fail"
     return "success"
 
+def step5_pregenerate_reports(**context):
+    logger.info("Étape 5 : Pré-génération des rapports de coaching")
+    # matchs récents absents du cache, reprise depuis le checkpoint si le passage précédent a été interrompu
+    exit_code = os.system("python scripts/pregenerate_reports.py")
+    if exit_code != 0:
+        raise RuntimeError(f"Pré-génération des rapports en échec (code {exit_code})")
+    return "OK"
+
 with DAG(
     dag_id="basketcoach_mcp_pipeline",
     default_args=default_args,
@@ -64,6 +72,12 @@ with DAG(
 
     success = EmptyOperator(task_id="success")
     fail = EmptyOperator(task_id="fail")
+    pregenerate = PythonOperator(
+        task_id="pregenerate_reports",
+        python_callable=step5_pregenerate_reports,
+        execution_timeout=timedelta(hours=6),
+    )
 
     process >> train >> nba_test >> quality
     quality >> [success, fail]
+    success >> pregenerate
@@ -1383,60 +1383,70 @@ elif app_mode == "📝 Rapport Coaching":
         match_id = st.selectbox("Sélectionner un match à analyser", match_list, key="coaching_report_match")
     with col2:
         report_depth = st.selectbox("Profondeur d'analyse", ["Standard", "Détaillé", "Expert"])
+    regenerate = st.checkbox("Régénérer (ignorer le rapport en cache)", value=False, key="coaching_report_regenerate")
     
     if st.button("🤖 Générer le rapport de coaching", use_container_width=True):
-        with st.spinner("Génération du rapport IA en cours..."):
-            try:
-                report_result = direct_client.generate_coaching_report(match_id)
-                
-                if "error" not in report_result:
+        try:
+            st.subheader(f"📋 Rapport pour le Match {match_id}")
+            st.subheader("📊 Analyse Complète")
+            
+            # Rapport affiché au fil de la génération
+            report_stream = direct_client.generate_coaching_report_stream(match_id, regenerate=regenerate)
+            with st.spinner("Génération du rapport IA en cours..."):
+                st.write_stream(report_stream)
+            report_result = report_stream.result or {"error": "Aucune réponse du serveur"}
+            
+            if "error" not in report_result:
+                cache_info = report_result.get("cache", {})
+                if cache_info.get("hit"):
+                    st.info(f"⚡ Rapport en cache (généré le {cache_info.get('cached_at', '')[:16].replace('T', ' ')}, "
+                            f"données inchangées) — cochez « Régénérer » pour une nouvelle analyse")
+                else:
                     st.success("✅ Rapport généré avec succès!")
-                    
-                    # Affichage du rapport
-                    st.subheader(f"📋 Rapport pour le Match {match_id}")
-                    
-                    # Métriques rapides
-                    if "player_impacts" in report_result:
-                        impacts = report_result["player_impacts"]
-                        if impacts:
-                            col1, col2, col3 = st.columns(3)
-                            top_players = sorted(impacts.items(), key=lambda x: x[1], reverse=True)[:3]
-                            
-                            for i, (player, impact) in enumerate(top_players):
-                                with [col1, col2, col3][i]:
-                                    st.metric(f"🎯 {player}", f"{impact}/50")
-                    
-                    # Rapport détaillé
-                    st.subheader("📊 Analyse Complète")
-                    st.markdown(report_result["report"])
-                    
-                    # Informations techniques
-                    with st.expander("🔧 Informations Techniques"):
-                        st.write(f"**Match ID:** {report_result.get('match_id')}")
-                        st.write(f"**Équipes:** {', '.join(report_result.get('teams', []))}")
-                        st.write(f"**Score:** {report_result.get('score', {})}")
-                        st.write(f"**Généré le:** {report_result.get('generated_at')}")
-                        st.write(f"**Source:** {report_result.get('source')}")
-                    
-                    # Boutons d'action
-                    col1, col2 = st.columns(2)
-                    with col1:
-                        st.download_button(
-                            "💾 Télécharger le rapport",
-                            report_result["report"],
-                            file_name=f"rapport_coaching_{match_id}.txt",
-                            mime="text/plain",
-                            use_container_width=True
-                        )
-                    with col2:
-                        if st.button("🔄 Régénérer le rapport", use_container_width=True):
-                            st.rerun()
                 
-                else:
-                    st.error(f"❌ Erreur: {report_result['error']}")
-                    
-            except Exception as e:
-                st.error(f"❌ Erreur lors de la génération: {e}")
+                # Métriques rapides
+                if "player_impacts" in report_result:
+                    impacts = report_result["player_impacts"]
+                    if impacts:
+                        col1, col2, col3 = st.columns(3)
+                        top_players = sorted(impacts.items(), key=lambda x: x[1], reverse=True)[:3]
+                        
+                        for i, (player, impact) in enumerate(top_players):
+                            with [col1, col2, col3][i]:
+                                st.metric(f"🎯 {player}", f"{impact}/50")
+                
+                # Informations techniques
+                with st.expander("🔧 Informations Techniques"):
+                    st.write(f"**Match ID:** {report_result.get('match_id')}")
+                    st.write(f"**Équipes:** {', '.join(report_result.get('teams', []))}")
+                    st.write(f"**Score:** {report_result.get('score', {})}")
+                    st.write(f"**Généré le:** {report_result.get('generated_at')}")
+                    st.write(f"**Source:** {report_result.get('source')}")
+                    generation = report_result.get("generation", {})
+                    if generation.get("streamed"):
+                        st.write(f"**Premier token:** {generation.get('ttft_ms')} ms — "
+                                 f"**Total:** {generation.get('total_ms')} ms "
+                                 f"({generation.get('tokens')} tokens, {generation.get('tokens_per_s')} tokens/s)")
+                
+                # Boutons d'action
+                col1, col2 = st.columns(2)
+                with col1:
+                    st.download_button(
+                        "💾 Télécharger le rapport",
+                        report_result["report"],
+                        file_name=f"rapport_coaching_{match_id}.txt",
+                        mime="text/plain",
+                        use_container_width=True
+                    )
+                with col2:
+                    if st.button("🔄 Régénérer le rapport", use_container_width=True):
+                        st.rerun()
+            
+            else:
+                st.error(f"❌ Erreur: {report_result['error']}")
+                
+        except Exception as e:
+            st.error(f"❌ Erreur lors de la génération: {e}")
     
     # Section d'analyse historique
     st.subheader("📈 Historique des Analyses")
@@ -1754,24 +1764,29 @@ elif app_mode == "🛠️ Outil MCP":
         
         question = st.text_area("Question pour l'IA Coach", 
                               "Comment défendre contre une équipe qui joue très rapide en transition?")
+        bypass_cache = st.checkbox("Ignorer le cache (nouvelle génération)", value=False)
         
         if st.button("🤖 Tester ask_coach_ai", use_container_width=True):
-            with st.spinner("L'IA Coach réfléchit..."):
-                try:
-                    result = direct_client.ask_coach_ai(question)
-                    
-                    if isinstance(result, str):
-                        result_data = json.loads(result)
-                    else:
-                        result_data = result
-                    
-                    st.json(result_data)
+            try:
+                # Réponse affichée au fil de la génération
+                answer_stream = direct_client.ask_coach_ai_stream(question, bypass_cache=bypass_cache)
+                with st.spinner("L'IA Coach réfléchit..."):
+                    st.write_stream(answer_stream)
+                result_data = answer_stream.result or {"error": "Aucune réponse du serveur"}
+                
+                if "answer" in result_data and result_data.get("cache", {}).get("hit"):
+                    cache_info = result_data["cache"]
+                    st.info(f"⚡ Réponse en cache (similarité {cache_info['similarity']}, "
+                            f"il y a {int(cache_info['age_seconds'] // 60)} min)")
+                elif "answer" in result_data:
+                    generation = result_data.get("generation", {})
+                    st.success(f"✅ Réponse générée par l'IA Coach (premier token {generation.get('ttft_ms')} ms, "
+                               f"total {generation.get('total_ms')} ms)")
+                
+                st.json(result_data)
                     
-                    if "answer" in result_data:
-                        st.success("✅ Réponse générée par l'IA Coach")
-                        
-                except Exception as e:
-                    st.error(f"❌ Erreur: {e}")
+            except Exception as e:
+                st.error(f"❌ Erreur: {e}")
     
     elif tool_choice == "get_team_form":
         st.subheader("📈 Forme récente d'une équipe")
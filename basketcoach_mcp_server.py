@@ -1,18 +1,20 @@
 # basketcoach-mcp/basketcoach_mcp_server.py
 #!/usr/bin/env python3
-from mcp.server.fastmcp import FastMCP
-import requests
-from bs4 import BeautifulSoup
+from mcp.server.fastmcp import FastMCP, Context
 from datetime import datetime, timedelta
 import logging
 import pandas as pd
 from pathlib import Path
-from typing import Dict, Any, List
+from typing import Dict, Any, List, Optional, Tuple
 import uvicorn
 import asyncio
+import inspect
+import time
 from fastapi import FastAPI
+from fastapi.responses import StreamingResponse
 import sys
 import json
+from contextlib import asynccontextmanager
 
 # Configuration du logging
 logging.basicConfig(
@@ -21,8 +23,18 @@ logging.basicConfig(
 )
 logger = logging.getLogger("BasketCoach-MCP")
 
+@asynccontextmanager
+async def _refresh_lifespan(_server=None):
+    """Rafraîchissement en arrière-plan des données externes pendant la durée de vie du serveur (MCP ou HTTP)"""
+    scheduler = _setup_refresh_scheduler()
+    if scheduler is None:
+        yield {}
+        return
+    async with scheduler.serving():
+        yield {}
+
 # Initialisation MCP
-mcp = FastMCP("BasketCoach")
+mcp = FastMCP("BasketCoach", lifespan=_refresh_lifespan)
 
 # Données LFB locales
 try:
@@ -76,36 +88,59 @@ async def get_player_impact(match_id: str, player_name: str) -> str:
         logger.error(f"❌ Erreur get_player_impact: {e}")
         return json.dumps({"error": str(e)})
 
+NBA_STANDINGS_URL = "https://www.basketball-reference.com/leagues/NBA_2026_standings.html"
+
+async def _fetch_nba_ranking() -> Dict[str, Any]:
+    """Scraping du classement sur basketball-reference.com (exception si la source est indisponible)"""
+    from utils.web_fetcher import get_web_fetcher
+    from utils.html_parsers import parse_nba_standings
+
+    result = await get_web_fetcher().fetch(NBA_STANDINGS_URL)
+    if not result.ok:
+        raise ConnectionError(result.error)
+    ranking = await asyncio.to_thread(parse_nba_standings, result.content)
+    return {"ranking": ranking, "updated": datetime.now().isoformat()}
+
+async def _read_snapshot(key: str, fetch) -> Tuple[Any, Dict[str, Any]]:
+    """
+    Donnée externe : instantané du planificateur de rafraîchissement s'il tient la clé à jour,
+    sinon cache web (frais / périmé / dernière version connue), sinon récupération directe
+    """
+    from utils.refresh_scheduler import get_refresh_scheduler
+    from utils.scrape_cache import get_scrape_cache
+
+    scheduler = get_refresh_scheduler()
+    if scheduler is not None:
+        return await scheduler.read(key, fetch)
+    scrape_cache = get_scrape_cache()
+    if scrape_cache is not None:
+        return await scrape_cache.get_or_fetch(key, fetch)
+    return await fetch(), {"status": "disabled", "age_seconds": 0.0}
+
+def _nba_ranking_key() -> str:
+    return f"nba_ranking:{NBA_STANDINGS_URL}"
+
+def _news_key(url: str) -> str:
+    return f"news:{url}"
+
 @mcp.tool()
 async def get_nba_live_ranking() -> str:
     """Récupère le classement NBA live par scraping"""
     logger.info("🛠️ get_nba_live_ranking")
     try:
-        url = "https://www.basketball-reference.com/leagues/NBA_2026_standings.html"
-        headers = {"User-Agent": "Mozilla/5.0 (BasketCoach MCP v1.0)"}
-        r = requests.get(url, headers=headers, timeout=15)
-        soup = BeautifulSoup(r.text, 'html.parser')
-        
-        table = soup.find('table', id='confs_standings_E') or soup.find('table', id='divs_standings_E')
-        if not table:
-            return json.dumps({"error": "Structure page changée", "ranking": []})
-
-        ranking = []
-        for row in table.find_all('tr')[1:31]:
-            cells = row.find_all(['th', 'td'])
-            if len(cells) > 3:
-                team = cells[0].get_text(strip=True)
-                wins = cells[1].get_text(strip=True)
-                losses = cells[2].get_text(strip=True)
-                ranking.append({"team": team, "wins": wins, "losses": losses})
-        
-        logger.info(f"✅ Classement NBA récupéré: {len(ranking)} équipes")
+        data, snapshot = await _read_snapshot(_nba_ranking_key(), _fetch_nba_ranking)
+
+        logger.info(f"✅ Classement NBA récupéré: {len(data['ranking'])} équipes "
+                    f"({snapshot['status']}, {snapshot['age_seconds']:.0f}s)")
         return json.dumps({
-            "ranking": ranking, 
-            "source": "basketball-reference.com", 
-            "updated": datetime.now().isoformat()
+            "ranking": data["ranking"],
+            "source": "basketball-reference.com",
+            "updated": data["updated"],
+            "snapshot": snapshot
         })
-        
+
+    except ValueError as e:
+        return json.dumps({"error": str(e), "ranking": []})
     except Exception as e:
         logger.error(f"❌ Erreur get_nba_live_ranking: {e}")
         return json.dumps({"ranking": [], "error": f"NBA live temporairement indisponible: {e}"})
@@ -119,7 +154,7 @@ async def get_player_news(player_name: str) -> str:
     logger.info(f"🛠️ get_player_news: {player_name}")
     try:
         # Tentative de scraping d'actualités réelles
-        actual_news = await _scrape_real_news(player_name)
+        actual_news, snapshots = await _scrape_real_news(player_name)
         player_stats = await _scrape_player_stats(player_name)
         
         news_data = {
@@ -144,7 +179,11 @@ async def get_player_news(player_name: str) -> str:
                     "url": "https://basketlfb.com/category/actualites/"
                 }
             ],
-            "source": "scraping_réel" if actual_news else "fallback_amélioré"
+            "source": "scraping_réel" if actual_news else "fallback_amélioré",
+            "snapshot": {
+                "age_seconds": max((snap["age_seconds"] for snap in snapshots.values()), default=None),
+                "sources": snapshots
+            }
         }
         
         logger.info(f"✅ News récupérées: {len(news_data['news'])} articles, stats: {'oui' if player_stats else 'non'}")
@@ -165,86 +204,102 @@ async def get_player_news(player_name: str) -> str:
             "error": f"Sources temporairement indisponibles: {str(e)}"
         })
 
-async def _scrape_real_news(player_name: str) -> List[Dict]:
-    """Tente de scraper des actualités réelles - version améliorée"""
+def _news_search_urls(player_name: str) -> List[str]:
+    """Pages de recherche des sites fiables pour le basket français"""
+    return [
+        f"https://basketlfb.com/?s={player_name.replace(' ', '+')}",
+        f"https://www.ffbb.com/search?search={player_name.replace(' ', '+')}",
+        f"https://www.eurosport.fr/search/{player_name.replace(' ', '%20')}/",
+    ]
+
+async def _fetch_news_page(url: str, player_name: str) -> List[Dict]:
+    """Articles d'une source (exception si la source est indisponible)"""
+    from utils.web_fetcher import get_web_fetcher
+    from utils.html_parsers import parse_news_articles
+
+    result = await get_web_fetcher().fetch(url)
+    if not result.ok:
+        raise ConnectionError(result.error)
+    # Analyse HTML ciblée (lxml) hors de la boucle d'événements
+    return await asyncio.to_thread(parse_news_articles, result.content, url, player_name)
+
+async def _scrape_real_news(player_name: str) -> Tuple[List[Dict], Dict[str, Any]]:
+    """
+    Actualités réelles des sites de basket français, lues en parallèle sous une échéance globale
+    (web_sources.fetch.deadline) : les articles des sources qui ont répondu à temps sont rendus.
+    Chaque source est un instantané (planificateur de rafraîchissement ou cache web).
+
+    Returns:
+        (articles, instantanés par source {domaine: {status, age_seconds, ...}})
+    """
     try:
-        # Sites fiables pour le basket français
-        search_urls = [
-            f"https://basketlfb.com/?s={player_name.replace(' ', '+')}",
-            f"https://www.ffbb.com/search?search={player_name.replace(' ', '+')}",
-            f"https://www.eurosport.fr/search/{player_name.replace(' ', '%20')}/",
-        ]
-        
-        news_items = []
-        
-        for url in search_urls:
-            try:
-                headers = {
-                    "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36",
-                    "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8",
-                    "Accept-Language": "fr-FR,fr;q=0.8,en-US;q=0.5,en;q=0.3",
-                    "Accept-Encoding": "gzip, deflate, br",
-                    "DNT": "1",
-                    "Connection": "keep-alive",
-                    "Upgrade-Insecure-Requests": "1",
-                }
-                
-                response = requests.get(url, headers=headers, timeout=15)
-                response.raise_for_status()
-                soup = BeautifulSoup(response.content, 'html.parser')
-                
-                # Recherche d'articles selon différents patterns
-                articles = []
-                articles.extend(soup.find_all('article'))
-                articles.extend(soup.find_all('div', class_=['article', 'news-item', 'post', 'actualite']))
-                articles.extend(soup.find_all('a', class_=['news-link', 'article-link']))
-                
-                for article in articles[:5]:  # Limiter à 5 articles par site
-                    title = None
-                    link = None
-                    description = None
-                    
-                    # Extraire le titre
-                    title_elem = article.find(['h1', 'h2', 'h3', 'h4', 'h5'])
-                    if title_elem:
-                        title = title_elem.get_text(strip=True)
-                    
-                    # Extraire le lien
-                    link_elem = article.find('a', href=True) if article.name != 'a' else article
-                    if link_elem and link_elem.get('href'):
-                        link = link_elem['href']
-                        if link and not link.startswith(('http', '//')):
-                            if link.startswith('/'):
-                                base_url = '/'.join(url.split('/')[:3])
-                                link = base_url + link
-                            else:
-                                link = url + link
-                    
-                    # Extraire la description
-                    desc_elem = article.find(['p', 'div'], class_=['excerpt', 'description', 'summary'])
-                    if desc_elem:
-                        description = desc_elem.get_text(strip=True)[:200] + "..."  # Limiter la longueur
-                    
-                    # Vérifier que nous avons au moins un titre et un lien
-                    if title and link and any(keyword.lower() in title.lower() for keyword in [player_name.split()[0], 'basket', 'LFB']):
-                        news_items.append({
-                            "title": title,
-                            "link": link,
-                            "source": url.split('/')[2],  # Nom de domaine
-                            "date": datetime.now().strftime("%Y-%m-%d"),
-                            "description": description or f"Article concernant {player_name} trouvé sur {url.split('/')[2]}",
-                            "scraped": True
-                        })
-                        
-            except Exception as e:
-                logger.debug(f"⚠️ Scraping échoué pour {url}: {e}")
+        from utils.web_fetcher import get_web_fetcher, run_within_deadline
+        from utils.scrape_cache import get_scrape_cache
+
+        urls = _news_search_urls(player_name)
+        calls = {
+            url: _read_snapshot(_news_key(url), lambda url=url: _fetch_news_page(url, player_name))
+            for url in urls
+        }
+        results, late = await run_within_deadline(calls, get_web_fetcher().deadline)
+
+        scrape_cache = get_scrape_cache()
+        news_items, snapshots = [], {}
+        for url in urls:
+            domain = url.split('/')[2]
+            outcome = results.get(url)
+            if outcome is None:
+                # Source trop lente : dernière version connue s'il y en a une
+                entry = scrape_cache.lookup(_news_key(url)) if scrape_cache is not None else None
+                if entry is not None:
+                    news_items.extend(entry.value)
+                    snapshots[domain] = {"status": "last_known_good", "age_seconds": round(entry.age, 1)}
                 continue
-        
-        return news_items[:8]  # Retourner max 8 articles
-        
+            if isinstance(outcome, Exception):
+                logger.debug(f"⚠️ Scraping échoué pour {url}: {outcome}")
+                continue
+            items, snapshots[domain] = outcome
+            news_items.extend(items)
+
+        logger.info(f"📰 Actualités {player_name}: {len(news_items)} articles, {len(snapshots)}/{len(urls)} sources")
+        return news_items[:8], snapshots  # Retourner max 8 articles
+
     except Exception as e:
         logger.warning(f"❌ Scraping échoué: {e}")
-        return []
+        return [], {}
+
+def _tracked_players() -> List[str]:
+    """Joueuses dont les actualités sont tenues à jour : web_sources.refresh.tracked_players, sinon les meilleures marqueuses des données LFB"""
+    from utils.config import get_config
+
+    config = get_config()
+    players = config.get("web_sources.refresh.tracked_players") or []
+    if players or df.empty:
+        return list(players)
+    top = int(config.get("web_sources.refresh.top_players", 5))
+    scorers = df[~df['is_team']].groupby('player_name')['points'].sum()
+    return scorers.sort_values(ascending=False).head(top).index.tolist()
+
+def _setup_refresh_scheduler():
+    """Planificateur de rafraîchissement avec ses tâches (classement NBA, actualités des joueuses suivies)"""
+    from utils.config import get_config
+    from utils.refresh_scheduler import get_refresh_scheduler
+
+    scheduler = get_refresh_scheduler()
+    if scheduler is None or scheduler.jobs:
+        return scheduler
+    config = get_config()
+    jitter = float(config.get("web_sources.refresh.jitter", 0.1))
+    scheduler.add("nba_standings", {_nba_ranking_key(): _fetch_nba_ranking},
+                  interval=config.get("web_sources.refresh.intervals.nba_standings", 900), jitter=jitter)
+    for player_name in _tracked_players():
+        scheduler.add(
+            f"news:{player_name}",
+            {_news_key(url): (lambda url=url, player_name=player_name: _fetch_news_page(url, player_name))
+             for url in _news_search_urls(player_name)},
+            interval=config.get("web_sources.refresh.intervals.player_news", 1800), jitter=jitter
+        )
+    return scheduler
 
 async def _scrape_player_stats(player_name: str) -> Dict[str, Any]:
     """Scrape les statistiques du joueur depuis les données LFB disponibles - VERSION CORRIGÉE"""
@@ -393,90 +448,70 @@ async def _get_fallback_news(player_name: str) -> List[Dict]:
         }
     ]
 
-@mcp.tool()
-async def generate_coaching_report(match_id: str) -> str:
-    """Génère un rapport de coaching détaillé avec analyse IA - VERSION CORRIGÉE"""
-    logger.info(f"📊 Génération rapport coaching pour match {match_id}")
-    try:
-        from utils.ollama_client import generate_with_ollama
-        
-        # 1. Récupère les données du match via l'outil existant
-        match_analysis_result = await get_match_analysis(match_id)
-        
-        # CORRECTION: Convertir la chaîne JSON en dictionnaire
-        if isinstance(match_analysis_result, str):
-            try:
-                match_analysis_result = json.loads(match_analysis_result)
-            except json.JSONDecodeError as e:
-                return json.dumps({"error": f"Erreur décodage JSON: {e}"})
-        
-        # Vérifier les erreurs
-        if "error" in match_analysis_result:
-            return json.dumps({"error": f"Erreur analyse match: {match_analysis_result['error']}"})
-        
-        # 2. Extraction des données
-        teams = match_analysis_result.get("teams", [])
-        score = match_analysis_result.get("score", {})
-        top_players = match_analysis_result.get("top_players", [])
-        
-        # 3. Récupère l'impact des joueurs clés
-        impact_data = {}
-        for player in top_players[:5]:  # Top 5 joueurs
-            player_name = player.get("player_name") or player.get("name", "Inconnu")
-            if player_name and player_name != "Inconnu":
-                try:
-                    impact_result = await get_player_impact(match_id, player_name)
-                    
-                    # CORRECTION: Convertir impact_result si c'est une chaîne
-                    if isinstance(impact_result, str):
-                        impact_result = json.loads(impact_result)
-                    
-                    if "predicted_impact" in impact_result:
-                        impact_data[player_name] = round(impact_result["predicted_impact"], 1)
-                except Exception as e:
-                    logger.warning(f"⚠️ Erreur impact {player_name}: {e}")
-        
-        # ---------------------------------------------------------------------
-        # 🚀 ÉTAPE RAG : Récupération des guidelines pertinentes
-        # ---------------------------------------------------------------------
-        
-        # 1. Définir une requête RAG intelligente basée sur les données du match
-        rag_query = (
-            f"Conseils de récupération, nutrition ou prévention blessures pour les joueurs "
-            f"clés du match {match_id} : {', '.join(impact_data.keys())}."
-        )
-        
-        # 2. Appeler l'outil RAG (qui utilise la fonction search_guidelines optimisée)
-        rag_results_json = await search_guidelines(rag_query)
-        rag_results = json.loads(rag_results_json)
-        
-        # 3. Formater le contexte pour le LLM
-        guidelines_context = ""
-        if rag_results.get("results"):
-            guidelines_context = "\n\n--- CONTEXTE GUIDELINES RAG ---\n"
-            for i, result in enumerate(rag_results["results"]):
-                # L'outil search_guidelines doit retourner la source/catégorie
-                source = result.get('source', 'N/A')
-                category = result.get('category', 'N/A')
-                # Utiliser le rerank_score s'il a été ajouté (voir point 2)
-                score = result.get('rerank_score', result.get('similarity_score', 'N/A'))
-                
-                guidelines_context += (
-                    f"Guideline {i+1} (Source: {source}, Catégorie: {category}, Pertinence: {score:.2f}):\n"
-                    f"{result['content']}\n---\n"
-                )
-
-        # 4. Génère le rapport avec Ollama
-        prompt = f"""
+class _ProgressForwarder:
+    """
+    Relaie les tokens générés au client MCP en notifications de progression
+    (texte regroupé toutes les `interval` secondes dans le champ message)
+    """
+
+    def __init__(self, ctx: Optional[Context], total: Optional[float] = None, interval: float = 0.1):
+        self.ctx = ctx
+        self.total = total
+        self.interval = interval
+        self.tokens = 0
+        self.buffer: List[str] = []
+        self.last_sent = 0.0
+
+    async def __call__(self, text: str):
+        self.tokens += 1
+        self.buffer.append(text)
+        if time.perf_counter() - self.last_sent >= self.interval:
+            await self.flush()
+
+    async def flush(self):
+        if self.ctx is None or not self.buffer:
+            return
+        message = "".join(self.buffer)
+        self.buffer.clear()
+        self.last_sent = time.perf_counter()
+        try:
+            await self.ctx.report_progress(self.tokens, self.total, message)
+        except Exception as e:
+            logger.debug(f"Notification de progression impossible: {e}")
+
+async def _emit_cached(text: str, ctx: Optional[Context]):
+    """Transmet une réponse servie depuis un cache aux consommateurs du flux, d'un seul bloc"""
+    from utils.ollama_client import token_sink
+    sink = token_sink.get()
+    if sink is not None:
+        result = sink(text)
+        if inspect.isawaitable(result):
+            await result
+    if ctx is not None:
+        forwarder = _ProgressForwarder(ctx, total=1)
+        await forwarder(text)
+        await forwarder.flush()
+
+async def _generate_streamed(prompt: str, ctx: Optional[Context], model: Optional[str] = None):
+    """Génération Ollama en flux, relayée en progression MCP si le client en a fait la demande"""
+    from utils.ollama_client import astream_with_ollama, DEFAULT_OPTIONS
+    forwarder = _ProgressForwarder(ctx, total=DEFAULT_OPTIONS["num_predict"]) if ctx is not None else None
+    text, stats = await astream_with_ollama(prompt, model=model, on_token=forwarder)
+    if forwarder is not None:
+        await forwarder.flush()
+    return text, stats
+
+COACHING_REPORT_MODEL = "llama3.1:8b"
+COACHING_REPORT_PROMPT = """
 Tu es un coach LFB expert avec 25 ans d'expérience. Analyse ce match et génère un rapport professionnel en français.
 
 **CONTEXTE DU MATCH:**
 - Match ID: {match_id}
-- Équipes: {teams[0]} vs {teams[1]}
-- Score: {score.get(teams[0], '?')} - {score.get(teams[1], '?')}
+- Équipes: {team_1} vs {team_2}
+- Score: {score_1} - {score_2}
 
 **TOP JOUEURS PAR IMPACT:**
-{chr(10).join([f"- {name}: {impact}/50" for name, impact in impact_data.items()]) if impact_data else "Aucune donnée d'impact disponible"}
+{impacts}
 {guidelines_context}
 **STRUCTURE DU RAPPORT:**
 1. **Résumé Exécutif** (1-2 phrases maximum)
@@ -488,17 +523,131 @@ Tu es un coach LFB expert avec 25 ans d'expérience. Analyse ce match et génèr
 Sois direct, technique et actionable. Pas de blabla.
 """
 
-        report = generate_with_ollama(prompt, model="llama3.1:8b")
+def coaching_report_versions(match_id: str) -> Dict[str, str]:
+    """
+    Versions dont dépend le rapport d'un match : seules les lignes de ce match comptent pour les données,
+    un nouveau match ou une correction n'invalide pas les rapports des autres matchs
+    """
+    from utils.report_cache import report_versions, match_fingerprint
+    from utils.prompt_builder import get_prompt_builder
+    rows = df[df['match_id'] == str(match_id)] if not df.empty else None
+    # les paramètres du budget de prompt changent le texte envoyé au LLM au même titre que le gabarit
+    prompt_version = f"{COACHING_REPORT_PROMPT}\n{get_prompt_builder().signature()}"
+    return report_versions(prompt_version, COACHING_REPORT_MODEL, data=match_fingerprint(rows))
+
+async def build_coaching_report_prompt(match_id: str, builder: Optional["PromptBuilder"] = None) -> Dict[str, Any]:
+    """
+    Prompt du rapport de coaching : données du match, impact des joueurs clés, guidelines RAG
+    dédupliquées et limitées au budget de tokens du constructeur de prompts
+
+    Returns:
+        {prompt, prompt_info, teams, score, player_impacts} ou {error}
+    """
+    from utils.prompt_builder import get_prompt_builder
+    builder = builder or get_prompt_builder()
+    
+    # 1. Récupère les données du match via l'outil existant
+    match_analysis_result = json.loads(await get_match_analysis(match_id))
+    if "error" in match_analysis_result:
+        return {"error": f"Erreur analyse match: {match_analysis_result['error']}"}
+    
+    teams = match_analysis_result.get("teams", [])
+    score = match_analysis_result.get("score", {})
+    top_players = match_analysis_result.get("top_players", [])
+    
+    # 2. Impact des joueurs clés
+    impact_data = {}
+    for player in top_players[:5]:  # Top 5 joueurs
+        player_name = player.get("player_name") or player.get("name", "Inconnu")
+        if player_name and player_name != "Inconnu":
+            try:
+                impact_result = json.loads(await get_player_impact(match_id, player_name))
+                if "predicted_impact" in impact_result:
+                    impact_data[player_name] = round(impact_result["predicted_impact"], 1)
+            except Exception as e:
+                logger.warning(f"⚠️ Erreur impact {player_name}: {e}")
+    
+    # 3. Guidelines pertinentes (triées par score de reranking)
+    rag_query = (
+        f"Conseils de récupération, nutrition ou prévention blessures pour les joueurs "
+        f"clés du match {match_id} : {', '.join(impact_data.keys())}."
+    )
+    rag_results = json.loads(await search_guidelines(rag_query))
+    
+    # 4. Prompt sous budget : contexte dédupliqué, tronqué ou résumé selon la pertinence
+    prompt, prompt_info = builder.build(
+        COACHING_REPORT_PROMPT,
+        {
+            "match_id": match_id,
+            "team_1": teams[0],
+            "team_2": teams[1],
+            "score_1": score.get(teams[0], '?'),
+            "score_2": score.get(teams[1], '?'),
+            "impacts": chr(10).join([f"- {name}: {impact}/50" for name, impact in impact_data.items()]) if impact_data else "Aucune donnée d'impact disponible",
+        },
+        rag_results=rag_results.get("search_results", []),
+        query=rag_query,
+    )
+    return {"prompt": prompt, "prompt_info": prompt_info, "teams": teams, "score": score, "player_impacts": impact_data}
+
+@mcp.tool()
+async def generate_coaching_report(match_id: str, regenerate: bool = False, ctx: Optional[Context] = None) -> str:
+    """
+    Génère un rapport de coaching détaillé avec analyse IA - VERSION CORRIGÉE
+    
+    Le rapport est servi depuis le cache tant que le match, les données, le modèle d'impact, les guidelines,
+    le prompt et le modèle LLM sont inchangés (regenerate=True force une nouvelle génération).
+    """
+    logger.info(f"📊 Génération rapport coaching pour match {match_id}")
+    try:
+        from utils.report_cache import get_report_cache
+        from utils.prompt_builder import get_prompt_builder
+        
+        # 0. Rapport en cache pour ces versions
+        report_cache = get_report_cache()
+        versions = coaching_report_versions(match_id)
+        cached = report_cache.get(match_id, versions) if report_cache is not None and not regenerate else None
+        if cached:
+            logger.info(f"⚡ Rapport {match_id} servi depuis le cache ({cached['age_seconds']}s)")
+            await _emit_cached(cached["payload"]["report"], ctx)
+            return json.dumps({
+                **cached["payload"],
+                "cache": {
+                    "hit": True,
+                    "cached_at": datetime.fromtimestamp(cached["cached_at"]).isoformat(),
+                    "age_seconds": cached["age_seconds"],
+                    "versions": versions,
+                }
+            })
         
-        return json.dumps({
+        # 1-4. Données du match, impacts, guidelines RAG, prompt sous budget de tokens
+        built = await build_coaching_report_prompt(match_id)
+        if "error" in built:
+            return json.dumps({"error": built["error"]})
+        prompt, teams, score, impact_data = built["prompt"], built["teams"], built["score"], built["player_impacts"]
+        
+        report, generation = await _generate_streamed(prompt, ctx, model=COACHING_REPORT_MODEL)
+        get_prompt_builder().counter.calibrate(prompt, generation.get("prompt_tokens"))
+        logger.info(f"✅ Rapport généré (prompt ~{built['prompt_info']['prompt_tokens']} tokens, "
+                    f"prefill {generation.get('prompt_eval_ms')} ms, 1er token {generation.get('ttft_ms')} ms, "
+                    f"total {generation.get('total_ms')} ms)")
+        
+        payload = {
             "report": report,
+            "generation": generation,
+            "prompt": built["prompt_info"],
             "match_id": match_id,
             "teams": teams,
             "score": score,
             "player_impacts": impact_data,
             "generated_at": datetime.now().isoformat(),
             "source": "Ollama + Analyse MCP + RAG (BGE + Reranker)"
-        })
+        }
+        # Ni les indisponibilités d'Ollama ni les flux interrompus ne sont mis en cache
+        if report_cache is not None and not report.startswith("[IA locale") and not generation.get("interrupted"):
+            await asyncio.to_thread(report_cache.put, match_id, versions, payload)
+        
+        return json.dumps({**payload, "cache": {"hit": False, "regenerated": regenerate}})
         
     except Exception as e:
         logger.error(f"❌ Erreur generate_coaching_report: {e}")
@@ -517,7 +666,7 @@ async def get_nba_player_stats(player_name: str, season: str = "2024-25") -> str
             return json.dumps({"error": f"Joueur NBA {player_name} non trouvé"})
 
         player_id = nba_players[0]['id']
-        career_stats = playercareerstats.PlayerCareerStats(player_id=player_id)
+        career_stats = await asyncio.to_thread(playercareerstats.PlayerCareerStats, player_id=player_id)
         stats_df = career_stats.get_data_frames()[0]
         
         season_data = stats_df[stats_df['SEASON_ID'] == season]
@@ -547,14 +696,7 @@ async def get_nba_player_stats(player_name: str, season: str = "2024-25") -> str
         logger.error(f"❌ Erreur get_nba_player_stats: {e}")
         return json.dumps({"error": f"Impossible de récupérer les stats NBA: {str(e)}"})
 
-@mcp.tool()
-async def ask_coach_ai(question: str) -> str:
-    """Pose une question tactique à l'IA Coach"""
-    logger.info(f"🛠️ ask_coach_ai: {question}")
-    try:
-        from utils.ollama_client import generate_with_ollama
-        
-        prompt = f"""
+ASK_COACH_PROMPT = """
 Tu es un coach LFB avec 25 ans d'expérience. Réponds en français, de façon directe, professionnelle et actionable.
 Pas de blabla, que du concret.
 
@@ -562,13 +704,68 @@ Question : {question}
 
 Réponse :
 """
-        response = generate_with_ollama(prompt)
-        logger.info("✅ Réponse Coach IA générée")
+
+@mcp.tool()
+async def ask_coach_ai(question: str, bypass_cache: bool = False, ctx: Optional[Context] = None) -> str:
+    """
+    Pose une question tactique à l'IA Coach.
+    Une question identique ou proche d'une question déjà posée au même modèle, avec le même prompt, est servie
+    depuis le cache sémantique (bypass_cache=True force une nouvelle génération).
+    La réponse est diffusée au fil de la génération.
+    """
+    logger.info(f"🛠️ ask_coach_ai: {question}")
+    try:
+        from utils.semantic_cache import get_answer_cache
+        from utils.report_cache import prompt_hash
+        from utils.config import get_config
+        from utils.ollama_client import DEFAULT_MODEL
+        
+        model = get_config().get("llm.ollama.model", DEFAULT_MODEL)
+        version = {"model": model, "prompt_hash": prompt_hash(ASK_COACH_PROMPT)}
+        cache = None
+        try:
+            cache = get_answer_cache()
+            # Embedding de la question hors boucle d'événements
+            cached = await asyncio.to_thread(cache.lookup, question, **version) \
+                if cache is not None and not bypass_cache else None
+        except Exception as cache_error:
+            logger.warning(f"⚠️ Cache sémantique indisponible: {cache_error}")
+            cached = None
+        
+        if cached:
+            logger.info(f"⚡ Réponse Coach IA servie depuis le cache (similarité {cached['similarity']})")
+            await _emit_cached(cached["answer"], ctx)
+            return json.dumps({
+                "answer": cached["answer"],
+                "source": cached["metadata"].get("source", f"Ollama {model} local"),
+                "model": model,
+                "cache": {
+                    "hit": True,
+                    "similarity": cached["similarity"],
+                    "cached_question": cached["question"],
+                    "age_seconds": cached["age_seconds"],
+                    "created_at": datetime.fromtimestamp(cached["created_at"]).isoformat(),
+                }
+            })
+        
+        prompt = ASK_COACH_PROMPT.format(question=question)
+        response, generation = await _generate_streamed(prompt, ctx, model=model)
+        logger.info(f"✅ Réponse Coach IA générée (1er token {generation.get('ttft_ms')} ms, total {generation.get('total_ms')} ms)")
+        
+        metadata = {"source": f"Ollama {model} local", "model": model}
+        # Ni les messages d'indisponibilité d'Ollama ("[IA locale ...]") ni les réponses d'un flux coupé
+        # (texte partiel) ne sont mis en cache
+        if cache is not None and not response.startswith("[IA locale") and not generation.get("interrupted"):
+            try:
+                await asyncio.to_thread(cache.store, question, response, metadata, **version)
+            except Exception as cache_error:
+                logger.warning(f"⚠️ Mise en cache impossible: {cache_error}")
         
         return json.dumps({
             "answer": response,
-            "source": "Ollama llama3.1:8b local",
-            "model": "llama3.1:8b"
+            **metadata,
+            "generation": generation,
+            "cache": {"hit": False, "bypassed": bypass_cache}
         })
         
     except Exception as e:
@@ -659,12 +856,15 @@ async def get_training_recommendations(player_name: str) -> str:
         return json.dumps({"error": str(e)})
     
 @mcp.tool()
-async def search_guidelines(query: str) -> str:
-    """Recherche dans les guidelines basketball"""
+async def search_guidelines(query: str, categories: List[str] = None, sources: List[str] = None) -> str:
+    """Recherche dans les guidelines basketball (filtrage optionnel par catégories et sources)"""
     logger.info(f"🛠️ search_guidelines: {query}")
     try:
         from rag.search import search_guidelines as rag_search
-        results = rag_search(query, max_results=3)
+        # Encodage, recherche et reranking hors boucle d'événements
+        results = await asyncio.to_thread(
+            rag_search, query, max_results=3, categories=categories, sources=sources
+        )
         return json.dumps(results)
     except Exception as e:
         logger.error(f"❌ Erreur search_guidelines: {e}")
@@ -674,7 +874,7 @@ async def search_guidelines(query: str) -> str:
 # =============================================================================
 # SERVEUR HTTP POUR COMPATIBILITÉ
 # =============================================================================
-http_app = FastAPI(title="BasketCoach HTTP API")
+http_app = FastAPI(title="BasketCoach HTTP API", lifespan=_refresh_lifespan)
 
 @http_app.post("/tools/get_player_impact")
 async def http_get_player_impact(match_id: str, player_name: str):
@@ -692,13 +892,68 @@ async def http_get_player_news(player_name: str):
     return json.loads(result)
 
 @http_app.post("/tools/ask_coach_ai")
-async def http_ask_coach_ai(question: str):
-    result = await ask_coach_ai(question)
+async def http_ask_coach_ai(question: str, bypass_cache: bool = False):
+    result = await ask_coach_ai(question, bypass_cache)
     return json.loads(result)
 
+async def _sse_tool_stream(tool, *args):
+    """
+    Exécute un outil en diffusant les tokens générés en Server-Sent Events :
+    événements "token" ({"text": ...}) puis un événement "result" avec la réponse JSON complète de l'outil.
+    La génération est annulée si le client se déconnecte.
+    """
+    from utils.ollama_client import token_sink
+    queue: asyncio.Queue = asyncio.Queue()
+    reset_token = token_sink.set(queue.put_nowait)
+    try:
+        task = asyncio.create_task(tool(*args))  # la tâche hérite du token_sink
+    finally:
+        token_sink.reset(reset_token)
+    
+    try:
+        while True:
+            getter = asyncio.ensure_future(queue.get())
+            done, _ = await asyncio.wait({getter, task}, return_when=asyncio.FIRST_COMPLETED)
+            if getter in done:
+                yield f"event: token\ndata: {json.dumps({'text': getter.result()})}\n\n"
+                continue
+            getter.cancel()
+            while not queue.empty():
+                yield f"event: token\ndata: {json.dumps({'text': queue.get_nowait()})}\n\n"
+            yield f"event: result\ndata: {task.result()}\n\n"
+            break
+    finally:
+        if not task.done():
+            task.cancel()
+
+@http_app.post("/tools/ask_coach_ai/stream")
+async def http_ask_coach_ai_stream(question: str, bypass_cache: bool = False):
+    return StreamingResponse(_sse_tool_stream(ask_coach_ai, question, bypass_cache), media_type="text/event-stream")
+
+@http_app.post("/tools/generate_coaching_report/stream")
+async def http_generate_coaching_report_stream(match_id: str, regenerate: bool = False):
+    return StreamingResponse(_sse_tool_stream(generate_coaching_report, match_id, regenerate),
+                             media_type="text/event-stream")
+
 @http_app.get("/health")
 async def health_check():
-    return {"status": "healthy", "service": "BasketCoach MCP", "tools": 7}
+    from utils.ollama_client import ollama_status
+    from utils.scrape_cache import get_scrape_cache
+    from utils.http_cache import get_http_cache
+    from utils.refresh_scheduler import get_refresh_scheduler
+    ollama = ollama_status()
+    scrape_cache, http_cache, scheduler = get_scrape_cache(), get_http_cache(), get_refresh_scheduler()
+    return {
+        "status": "healthy" if ollama["circuit"]["state"] == "closed" else "degraded",
+        "service": "BasketCoach MCP",
+        "tools": 7,
+        "ollama": ollama,
+        "web": {
+            "scrape_cache": scrape_cache.info() if scrape_cache else None,
+            "http_cache": http_cache.info() if http_cache else None,
+            "refresh": scheduler.status() if scheduler else None,
+        }
+    }
 
 @http_app.get("/")
 async def root():
@@ -8,16 +8,55 @@ import subprocess
 import sys
 import json
 import logging
-from typing import Dict, Any, Optional
+from typing import Dict, Any, List, Optional
 import concurrent.futures
 import asyncio
+import threading
+import queue
 
 logger = logging.getLogger("MCP.Direct")
 
+_STREAM_END = object()
+
+class ToolStream:
+    """
+    Itérateur des fragments de texte générés par un outil (compatible st.write_stream).
+    Une fois épuisé, `result` contient la réponse complète de l'outil (dict).
+    Interrompre l'itération (close) annule l'appel.
+    """
+
+    def __init__(self, future: concurrent.futures.Future, fragments: "queue.Queue", timeout: float):
+        self.future = future
+        self.fragments = fragments
+        self.timeout = timeout
+        self.result: Optional[Dict[str, Any]] = None
+
+    def __iter__(self):
+        try:
+            while True:
+                fragment = self.fragments.get(timeout=self.timeout)
+                if fragment is _STREAM_END:
+                    break
+                yield fragment
+            result = self.future.result()
+            self.result = json.loads(result) if isinstance(result, str) else result
+        except queue.Empty:
+            self.result = {"error": f"Délai dépassé ({self.timeout}s sans nouveau fragment)"}
+        except Exception as e:
+            self.result = {"error": str(e)}
+        finally:
+            if not self.future.done():
+                self.future.cancel()
+
 class MCPDirectClient:
     def __init__(self):
         self.server_process = None
         self.connected = False
+        # Boucle d'événements persistante (thread dédié) : les outils y partagent le pool de connexions
+        # du client Ollama asynchrone, au lieu d'une nouvelle boucle par appel
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._loop_thread: Optional[threading.Thread] = None
+        self._loop_lock = threading.Lock()
         logger.info("Initialisation MCPDirectClient")
     
     def start_server(self):
@@ -49,21 +88,63 @@ class MCPDirectClient:
                 elif tool_name == "analyze_match_strategy":
                     return analyze_match_strategy_sync(kwargs.get('match_id'))
             
-            # Pour les autres outils, utiliser asyncio.run() seulement si pas de boucle en cours
+            # Pour les autres outils : exécution sur la boucle persistante, annulée au-delà du délai
+            loop = self._ensure_loop()
+            if threading.current_thread() is self._loop_thread:
+                return {"error": f"Appel synchrone de {tool_name} depuis la boucle MCP (utiliser _call_tool_async)"}
+            
+            future = asyncio.run_coroutine_threadsafe(self._call_tool_async(tool_name, **kwargs), loop)
+            timeout = self._tool_timeout(tool_name)
             try:
-                loop = asyncio.get_running_loop()
-                # Boucle déjà en cours - utiliser un ThreadPoolExecutor
-                with concurrent.futures.ThreadPoolExecutor() as executor:
-                    future = executor.submit(lambda: asyncio.run(self._call_tool_async(tool_name, **kwargs)))
-                    return future.result(timeout=30)
-            except RuntimeError:
-                # Pas de boucle en cours - utiliser asyncio.run()
-                return asyncio.run(self._call_tool_async(tool_name, **kwargs))
+                return future.result(timeout=timeout)
+            except concurrent.futures.TimeoutError:
+                future.cancel()  # annule la tâche : la requête Ollama en cours est abandonnée
+                logger.error(f"❌ Délai dépassé pour {tool_name} ({timeout}s), appel annulé")
+                return {"error": f"Délai dépassé pour {tool_name} ({timeout}s)"}
                 
         except Exception as e:
             logger.error(f"❌ Erreur appel outil {tool_name}: {e}")
             return {"error": str(e)}
     
+    def stream_tool(self, tool_name: str, **kwargs) -> ToolStream:
+        """
+        Appel d'un outil LLM avec diffusion des tokens au fil de la génération
+        (ask_coach_ai, generate_coaching_report)
+        """
+        fragments: "queue.Queue" = queue.Queue()
+        future = asyncio.run_coroutine_threadsafe(
+            self._call_tool_streaming(fragments.put, tool_name, **kwargs), self._ensure_loop()
+        )
+        future.add_done_callback(lambda _: fragments.put(_STREAM_END))
+        return ToolStream(future, fragments, self._tool_timeout(tool_name))
+    
+    async def _call_tool_streaming(self, on_token, tool_name: str, **kwargs):
+        from utils.ollama_client import token_sink
+        reset_token = token_sink.set(on_token)
+        try:
+            return await self._call_tool_async(tool_name, **kwargs)
+        finally:
+            token_sink.reset(reset_token)
+    
+    def _ensure_loop(self) -> asyncio.AbstractEventLoop:
+        """Démarre (une fois) la boucle d'événements d'arrière-plan"""
+        with self._loop_lock:
+            if self._loop_thread is None or not self._loop_thread.is_alive():
+                self._loop = asyncio.new_event_loop()
+                self._loop_thread = threading.Thread(
+                    target=self._loop.run_forever, name="mcp-direct-loop", daemon=True
+                )
+                self._loop_thread.start()
+            return self._loop
+    
+    @staticmethod
+    def _tool_timeout(tool_name: str) -> float:
+        from utils.config import get_config
+        config = get_config()
+        if tool_name in ("ask_coach_ai", "generate_coaching_report"):
+            return float(config.get("llm.ollama.tool_timeout", 900))
+        return float(config.get("mcp.client.tool_timeout", 300))
+    
     async def _call_tool_async(self, tool_name: str, **kwargs):
         """Version asynchrone interne pour tous les outils"""
         try:
@@ -192,9 +273,9 @@ class MCPDirectClient:
             logger.error(f"❌ Erreur get_nba_player_stats: {e}")
             return {"error": str(e)}
     
-    def ask_coach_ai(self, question: str) -> Dict[str, Any]:
+    def ask_coach_ai(self, question: str, bypass_cache: bool = False) -> Dict[str, Any]:
         try:
-            result = self.call_tool("ask_coach_ai", question=question)
+            result = self.call_tool("ask_coach_ai", question=question, bypass_cache=bypass_cache)
             if isinstance(result, str):
                 return json.loads(result)
             return result
@@ -202,9 +283,17 @@ class MCPDirectClient:
             logger.error(f"❌ Erreur ask_coach_ai: {e}")
             return {"error": str(e)}
     
-    def generate_coaching_report(self, match_id: str) -> Dict[str, Any]:
+    def ask_coach_ai_stream(self, question: str, bypass_cache: bool = False) -> ToolStream:
+        """Réponse de l'IA Coach diffusée token par token (ToolStream.result : réponse complète)"""
+        return self.stream_tool("ask_coach_ai", question=question, bypass_cache=bypass_cache)
+    
+    def generate_coaching_report_stream(self, match_id: str, regenerate: bool = False) -> ToolStream:
+        """Rapport de coaching diffusé token par token (ToolStream.result : réponse complète)"""
+        return self.stream_tool("generate_coaching_report", match_id=match_id, regenerate=regenerate)
+    
+    def generate_coaching_report(self, match_id: str, regenerate: bool = False) -> Dict[str, Any]:
         try:
-            result = self.call_tool("generate_coaching_report", match_id=match_id)
+            result = self.call_tool("generate_coaching_report", match_id=match_id, regenerate=regenerate)
             if isinstance(result, str):
                 return json.loads(result)
             return result
@@ -254,9 +343,9 @@ class MCPDirectClient:
             logger.error(f"❌ Erreur get_training_recommendations: {e}")
             return {"error": str(e)}
     
-    def search_guidelines(self, query: str) -> Dict[str, Any]:
+    def search_guidelines(self, query: str, categories: List[str] = None, sources: List[str] = None) -> Dict[str, Any]:
         try:
-            result = self.call_tool("search_guidelines", query=query)
+            result = self.call_tool("search_guidelines", query=query, categories=categories, sources=sources)
             if isinstance(result, str):
                 return json.loads(result)
             return result
@@ -0,0 +1,163 @@
+# basketcoach-mcp/rag/chunking.py
+#!/usr/bin/env python3
+"""
+Découpage des pages PDF en extraits respectant les phrases
+et élimination des quasi-doublons (SimHash) à l'ingestion
+"""
+
+import os
+import re
+import hashlib
+from typing import Dict, List, Any, Optional, Tuple
+
+import sys
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from utils.logger import get_logger
+from rag.lexical import tokenize
+
+logger = get_logger("rag.chunking")
+
+# Fin de phrase : ponctuation forte suivie d'un espace puis d'une majuscule, d'un chiffre ou d'une puce
+_SENTENCE_BOUNDARY = re.compile(r"(?<=[.!?…;:])\s+(?=[«\"(\[A-ZÀ-ÖØ-Þ0-9•\-–])")
+_BULLET = re.compile(r"\s+(?=[•▪●◦]\s)")
+
+SIMHASH_BITS = 64
+SIMHASH_BANDS = 4
+
+
+def split_sentences(text: str) -> List[str]:
+    """Découpe un texte de page en phrases (espaces et retours à la ligne du PDF normalisés)"""
+    text = " ".join(text.split())
+    if not text:
+        return []
+    sentences = []
+    for part in _BULLET.split(text):
+        sentences.extend(s.strip() for s in _SENTENCE_BOUNDARY.split(part) if s.strip())
+    return sentences
+
+
+def chunk_sentences(sentences: List[str], chunk_size: int = 500, overlap: int = 50) -> List[str]:
+    """
+    Regroupe des phrases entières en extraits d'au plus chunk_size mots.
+    Le recouvrement reprend les dernières phrases de l'extrait précédent (au plus overlap mots) ;
+    une phrase plus longue que chunk_size est découpée par fenêtres de mots.
+    """
+    units = []
+    for sentence in sentences:
+        words = sentence.split()
+        if len(words) <= chunk_size:
+            units.append(sentence)
+        else:
+            step = max(1, chunk_size - overlap)
+            units.extend(" ".join(words[i:i + chunk_size]) for i in range(0, len(words) - overlap, step))
+
+    chunks = []
+    current: List[str] = []
+    current_words = 0
+    for unit in units:
+        n_words = len(unit.split())
+        if current and current_words + n_words > chunk_size:
+            chunks.append(" ".join(current))
+
+            # Recouvrement : phrases de fin tenant dans `overlap` mots
+            carried: List[str] = []
+            carried_words = 0
+            for previous in reversed(current):
+                previous_words = len(previous.split())
+                if carried_words + previous_words > overlap:
+                    break
+                carried.insert(0, previous)
+                carried_words += previous_words
+            if carried_words + n_words > chunk_size:
+                carried, carried_words = [], 0
+            current, current_words = carried, carried_words
+
+        current.append(unit)
+        current_words += n_words
+
+    if current:
+        chunks.append(" ".join(current))
+    return chunks
+
+
+def simhash(text: str, shingle_size: int = 3) -> int:
+    """Empreinte SimHash 64 bits sur les n-grammes de mots normalisés (accents, mots vides, pluriels)"""
+    tokens = tokenize(text)
+    if len(tokens) < shingle_size:
+        shingles = [" ".join(tokens)]
+    else:
+        shingles = [" ".join(tokens[i:i + shingle_size]) for i in range(len(tokens) - shingle_size + 1)]
+
+    weights = [0] * SIMHASH_BITS
+    for shingle in shingles:
+        value = int.from_bytes(hashlib.blake2b(shingle.encode("utf-8"), digest_size=8).digest(), "big")
+        for bit in range(SIMHASH_BITS):
+            weights[bit] += 1 if value >> bit & 1 else -1
+    return sum(1 << bit for bit, weight in enumerate(weights) if weight > 0)
+
+
+class NearDuplicateIndex:
+    """
+    Index SimHash des extraits conservés.
+    Deux extraits à distance de Hamming <= max_distance (< SIMHASH_BANDS) partagent au moins une bande
+    de 16 bits : seuls les extraits d'une même bande sont comparés.
+    """
+
+    def __init__(self, max_distance: int = 3):
+        self.max_distance = max_distance
+        self.fingerprints: List[int] = []
+        self.keys: List[Any] = []
+        self.bands: List[Dict[int, List[int]]] = [{} for _ in range(SIMHASH_BANDS)]
+
+    @staticmethod
+    def _band_values(fingerprint: int):
+        width = SIMHASH_BITS // SIMHASH_BANDS
+        return [(fingerprint >> (band * width)) & ((1 << width) - 1) for band in range(SIMHASH_BANDS)]
+
+    def find(self, fingerprint: int) -> Optional[Any]:
+        """Clé d'un extrait quasi identique déjà indexé, sinon None"""
+        for band, value in enumerate(self._band_values(fingerprint)):
+            for position in self.bands[band].get(value, ()):
+                if bin(self.fingerprints[position] ^ fingerprint).count("1") <= self.max_distance:
+                    return self.keys[position]
+        return None
+
+    def add(self, fingerprint: int, key: Any):
+        position = len(self.fingerprints)
+        self.fingerprints.append(fingerprint)
+        self.keys.append(key)
+        for band, value in enumerate(self._band_values(fingerprint)):
+            self.bands[band].setdefault(value, []).append(position)
+
+
+def deduplicate(kept: List[Dict[str, Any]], candidates: List[Dict[str, Any]],
+                max_distance: int = 3) -> Tuple[List[Dict[str, Any]], Dict[str, Any]]:
+    """
+    Retire des candidats les extraits PDF quasi identiques à un extrait déjà conservé
+    (ou à un candidat précédent). Les guidelines personnalisées ou par défaut ne sont jamais retirées.
+
+    Returns:
+        (candidats conservés, statistiques {candidates, duplicates, absorbed_by})
+        absorbed_by : {source retirée: [sources ayant conservé l'extrait équivalent]}
+    """
+    index = NearDuplicateIndex(max_distance)
+    for guideline in kept:
+        index.add(simhash(guideline["content"]), guideline["source"])
+
+    unique = []
+    absorbed_by: Dict[str, set] = {}
+    for guideline in candidates:
+        fingerprint = simhash(guideline["content"])
+        duplicate_of = index.find(fingerprint) if guideline.get("origin", "pdf") == "pdf" else None
+        if duplicate_of is not None:
+            absorbed_by.setdefault(guideline["source"], set()).add(duplicate_of)
+            continue
+        index.add(fingerprint, guideline["source"])
+        unique.append(guideline)
+
+    stats = {
+        "candidates": len(candidates),
+        "duplicates": len(candidates) - len(unique),
+        "absorbed_by": {source: sorted(sources) for source, sources in absorbed_by.items()},
+    }
+    return unique, stats
@@ -5,6 +5,7 @@ Système d'embedding et de recherche RAG pour les guidelines basketball
 """
 
 import os
+import time
 import numpy as np
 import pandas as pd
 from typing import List, Dict, Any, Optional
@@ -12,17 +13,73 @@ import pickle
 import logging
 from pathlib import Path
 
-from sentence_transformers import SentenceTransformer
 import faiss
-import PyPDF2
 from sklearn.metrics.pairwise import cosine_similarity
 import sys
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 from utils.logger import get_logger
 from utils.config import get_config
+from rag.ingest import scan_pdf_files, load_manifest, save_manifest, diff_manifest, extract_pdfs, _extract_page_range
+from rag.store import GuidelineStore, read_index_mmap, write_index_atomic, save_array_atomic
+from rag.indexing import get_index_params, select_index_type, build_index, describe_index, apply_search_params, quantized_search
+from rag.lexical import BM25Index, reciprocal_rank_fusion
+from rag.chunking import split_sentences, chunk_sentences, deduplicate
+from rag.service import service_mode, connect_service
 
 logger = get_logger("rag.embed")
 
+# Guidelines utilisées quand aucun PDF n'est disponible
+DEFAULT_GUIDELINES = [
+    {
+        "content": "ESC 2024: Limiter les séances intensives à 2 par semaine maximum pour prévenir le surentraînement",
+        "source": "European Society of Cardiology 2024",
+        "category": "entraînement",
+        "page": "12"
+    },
+    {
+        "content": "Recommandation EU: 48h de repos entre deux matches compétitifs pour une récupération optimale",
+        "source": "European Basketball Union 2023",
+        "category": "récupération",
+        "page": "8"
+    },
+    {
+        "content": "Protocole hydratation: 500ml 2h avant l'effort, 250ml toutes les 20min pendant l'activité",
+        "source": "International Journal of Sports Medicine",
+        "category": "nutrition",
+        "page": "15"
+    },
+    {
+        "content": "Cheville: Protocole RICE (Repos, Ice, Compression, Élévation) 48h pour entorses légères",
+        "source": "Journal of Orthopaedic Surgery 2024",
+        "category": "blessure",
+        "page": "22"
+    },
+    {
+        "content": "Genou: Consultation immédiate recommandée si gonflement > 2cm après traumatisme",
+        "source": "American Journal of Sports Medicine",
+        "category": "blessure",
+        "page": "18"
+    },
+    {
+        "content": "Apport protéique: 1.6-2.2g/kg/jour recommandé pour les sportives d'élite en basketball",
+        "source": "International Society of Sports Nutrition",
+        "category": "nutrition",
+        "page": "7"
+    },
+    {
+        "content": "Sommeil: 8-10h/nuit requis pour les sportives professionnelles pour une récupération optimale",
+        "source": "Sleep Medicine Journal",
+        "category": "récupération",
+        "page": "11"
+    },
+    {
+        "content": "Prévention blessures: Programme de renforcement musculaire 3x/semaine réduit les risques de 40%",
+        "source": "British Journal of Sports Medicine",
+        "category": "prévention",
+        "page": "9"
+    }
+]
+
 class RAGSystem:
     """Système RAG pour la recherche dans les guidelines basketball"""
     
@@ -31,6 +88,8 @@ class RAGSystem:
         self.model_name = model_name
         self.model = None
         self.index = None
+        self.lexical_index = None
+        self.vectors = None
         self.guidelines_data = []
         self.is_initialized = False
         
@@ -38,6 +97,33 @@ class RAGSystem:
         self.guidelines_path = Path(self.config.get("rag.guidelines_path", "rag/guidelines/"))
         self.embeddings_path = Path("rag/embeddings/")
         self.database_path = Path("rag/database/")
+        self.index_path = self.embeddings_path / "guidelines.index"
+        self.vectors_path = self.embeddings_path / "guidelines_vectors.npy"
+        self.store_path = self.database_path / "guidelines_store"
+        self.data_path = self.database_path / "guidelines_data.pkl"  # format hérité (pickle)
+        self.manifest_path = self.database_path / "manifest.json"
+        self.bm25_path = self.embeddings_path / "bm25"
+        
+        # Découpage et ingestion
+        self.chunk_size = int(self.config.get("rag.chunk_size", 500))
+        self.chunk_overlap = int(self.config.get("rag.chunk_overlap", 50))
+        self.ingestion_workers = self.config.get("rag.ingestion.workers")
+        self.pages_per_task = int(self.config.get("rag.ingestion.pages_per_task", 8))
+        self.chunking_strategy = self.config.get("rag.chunking.strategy", "sentences")
+        self.dedupe = bool(self.config.get("rag.chunking.dedupe", True))
+        self.dedupe_max_distance = int(self.config.get("rag.chunking.simhash_max_distance", 3))
+        
+        # Type d'index (plat / IVF / HNSW) et paramètres de recherche
+        self.index_params = get_index_params()
+        
+        # Recherche hybride BM25 + dense
+        self.retrieval_mode = self.config.get("rag.retrieval.mode", "hybrid")
+        self.retrieval_candidates = int(self.config.get("rag.retrieval.candidates", 20))
+        self.rrf_k = int(self.config.get("rag.retrieval.rrf_k", 60))
+        self.lexical_fast_path = bool(self.config.get("rag.retrieval.lexical_fast_path", True))
+        self.fast_path_max_terms = int(self.config.get("rag.retrieval.fast_path_max_terms", 4))
+        self.fast_path_min_coverage = float(self.config.get("rag.retrieval.fast_path_min_coverage", 1.0))
+        self.fast_path_min_margin = float(self.config.get("rag.retrieval.fast_path_min_margin", 0.15))
         
         # Création des répertoires
         self.embeddings_path.mkdir(parents=True, exist_ok=True)
@@ -48,16 +134,16 @@ class RAGSystem:
         try:
             logger.info("🚀 Initialisation du système RAG...")
             
-            # Chargement du modèle
-            self.model = SentenceTransformer(self.model_name)
+            # Chargement du modèle (local ou délégué au service partagé)
+            self.model = self._load_model()
             logger.info(f"✅ Modèle chargé: {self.model_name}")
             
-            # Chargement ou création des embeddings
-            if self._check_existing_embeddings():
+            # Chargement ou synchronisation incrémentale des embeddings
+            if self._check_existing_embeddings() and not self.manifest_path.exists():
+                # Artefacts hérités sans manifeste : chargés tels quels (voir sync_guidelines(force=True))
                 self._load_existing_embeddings()
             else:
-                self._process_guidelines()
-                self._create_embeddings()
+                self.sync_guidelines()
             
             self.is_initialized = True
             logger.info("✅ Système RAG initialisé avec succès")
@@ -66,49 +152,331 @@ class RAGSystem:
             logger.error(f"❌ Erreur initialisation RAG: {e}")
             raise
     
-    def search(self, query: str, top_k: int = 5, similarity_threshold: float = 0.0) -> List[Dict[str, Any]]:
+    def _load_model(self):
+        """
+        Modèle d'embedding : en mode client (rag.service.mode), encode() est délégué au service
+        partagé (rag/service.py) ; repli sur un modèle local s'il est injoignable et que fallback_local l'autorise
+        """
+        if service_mode() == "client":
+            remote = connect_service("embedder", self.model_name)
+            if remote is not None:
+                return remote
+            if not self.config.get("rag.service.fallback_local", True):
+                raise RuntimeError("Service d'embedding injoignable et repli local désactivé")
+        
+        from sentence_transformers import SentenceTransformer
+        return SentenceTransformer(self.model_name)
+    
+    def sync_guidelines(self, force: bool = False) -> Dict[str, Any]:
         """
-        Recherche sémantique dans les guidelines - seuil réduit
+        Synchronise l'index avec les PDF de rag/guidelines/.
+        Seuls les PDF nouveaux ou modifiés (empreinte SHA-256) sont ré-extraits et ré-embeddés,
+        les vecteurs des PDF modifiés ou supprimés sont retirés de l'index.
+        """
+        if self.model is None:
+            self.model = self._load_model()
+        
+        manifest = None if force else load_manifest(self.manifest_path)
+        if manifest and manifest.get("signature") != self._manifest_signature():
+            logger.info("ℹ️ Modèle ou découpage modifié, reconstruction complète")
+            manifest = None
+        
+        if manifest and self._check_existing_embeddings() and self.vectors_path.exists():
+            self._load_existing_embeddings()
+            vectors = self._load_vectors()
+        else:
+            # Reconstruction complète : les guidelines personnalisées existantes sont conservées (ré-encodées)
+            manifest = None
+            self.guidelines_data = [
+                guideline for guideline in (GuidelineStore(self.store_path) if GuidelineStore.exists(self.store_path) else [])
+                if guideline.get("origin") == "custom"
+            ]
+            vectors = None
+        
+        current_files = scan_pdf_files(self.guidelines_path, (manifest or {}).get("files"))
+        changed, removed = diff_manifest(manifest, current_files)
+        
+        # Un PDF dont des extraits ont été écartés comme doublons d'un PDF modifié/supprimé est ré-extrait
+        previous_files = (manifest or {}).get("files", {})
+        if changed or removed:
+            changed += sorted(
+                name for name, info in previous_files.items()
+                if name in current_files and name not in changed
+                and set(info.get("deduplicated_against", [])) & (set(changed) | set(removed))
+            )
+        logger.info(f"🔍 {len(current_files)} PDF trouvés: {len(changed)} nouveaux/modifiés, {len(removed)} supprimés")
+        
+        stats = {
+            "pdf_files": len(current_files),
+            "changed": changed,
+            "removed": removed,
+            "failed": [],
+            "added_chunks": 0,
+            "removed_chunks": 0,
+        }
+        
+        if manifest and not changed and not removed:
+            stats["total_chunks"] = len(self.guidelines_data)
+            logger.info("✅ Guidelines à jour, aucune ré-extraction nécessaire")
+            
+            # Changement de type d'index dans la configuration : reconstruction depuis les vecteurs
+            # (ou de quantification des codes)
+            expected = (select_index_type(len(vectors), self.index_params), self.index_params["quantization"])
+            current = (describe_index(self.index)["type"], describe_index(self.index)["quantization"])
+            if current != expected:
+                logger.info(f"🔁 Index {'/'.join(current)} → {'/'.join(expected)}")
+                self._create_embeddings(vectors)
+            stats["index"] = describe_index(self.index)
+            return stats
+        
+        # Retrait des extraits obsolètes (PDF modifiés/supprimés, guidelines par défaut remplacées)
+        stale_sources = set(changed) | set(removed)
+        keep = [
+            i for i, guideline in enumerate(self.guidelines_data)
+            if not self._is_stale(guideline, stale_sources, has_pdfs=bool(current_files))
+        ]
+        stats["removed_chunks"] = len(self.guidelines_data) - len(keep)
+        kept_guidelines = [self.guidelines_data[i] for i in keep]
+        
+        # Extraction parallèle des seuls PDF modifiés
+        new_guidelines, failed = self._process_guidelines([Path(current_files[name]["path"]) for name in changed])
+        stats["failed"] = sorted(failed)
+        
+        # Élimination des quasi-doublons (SimHash) parmi les nouveaux extraits
+        absorbed_by = {}
+        if self.dedupe and new_guidelines:
+            new_guidelines, dedupe_stats = deduplicate(kept_guidelines, new_guidelines, self.dedupe_max_distance)
+            absorbed_by = dedupe_stats["absorbed_by"]
+            stats["dedupe"] = {
+                "candidates": dedupe_stats["candidates"],
+                "duplicates": dedupe_stats["duplicates"],
+                "shrink_pct": round(100 * dedupe_stats["duplicates"] / dedupe_stats["candidates"], 1),
+            }
+            logger.info(
+                f"🧹 Quasi-doublons: {dedupe_stats['duplicates']}/{dedupe_stats['candidates']} extraits écartés "
+                f"(-{stats['dedupe']['shrink_pct']}%)"
+            )
+        
+        if not current_files and not any(g.get("origin") == "default" for g in kept_guidelines):
+            logger.warning("⚠️ Aucun PDF trouvé – recours aux guidelines par défaut")
+            new_guidelines.extend(dict(g, origin="default") for g in DEFAULT_GUIDELINES)
+        
+        all_guidelines = kept_guidelines + new_guidelines
+        if not all_guidelines:
+            logger.error("❌ Aucune guideline disponible !")
+            raise Exception("Aucune donnée guideline trouvée")
+        
+        # Embedding des seuls nouveaux extraits (et des guidelines conservées lors d'une reconstruction complète)
+        new_vectors = self._encode_guidelines(new_guidelines)
+        kept_vectors = vectors[keep] if vectors is not None else self._encode_guidelines(kept_guidelines)
+        self._create_embeddings(np.vstack([kept_vectors, new_vectors]))
+        self.guidelines_data = GuidelineStore.write(self.store_path, all_guidelines)
+        self._build_lexical_index()
+        
+        # Les PDF en échec sont exclus du manifeste pour être retentés à la prochaine synchronisation
+        chunk_counts = {}
+        for guideline in all_guidelines:
+            chunk_counts[guideline["source"]] = chunk_counts.get(guideline["source"], 0) + 1
+        save_manifest(self.manifest_path, {
+            "signature": self._manifest_signature(),
+            "files": {
+                name: {
+                    "sha256": info["sha256"],
+                    "size": info["size"],
+                    "mtime_ns": info["mtime_ns"],
+                    "chunks": chunk_counts.get(name, 0),
+                    "deduplicated_against": (
+                        absorbed_by.get(name, []) if name in changed
+                        else previous_files.get(name, {}).get("deduplicated_against", [])
+                    ),
+                }
+                for name, info in current_files.items() if name not in failed
+            },
+        })
+        
+        stats["added_chunks"] = len(new_guidelines)
+        stats["total_chunks"] = len(self.guidelines_data)
+        stats["index"] = describe_index(self.index)
+        logger.info(
+            f"📊 Synchronisation: +{stats['added_chunks']} / -{stats['removed_chunks']} extraits, "
+            f"total {stats['total_chunks']}"
+        )
+        return stats
+    
+    def search(self, query: str, top_k: int = 5, similarity_threshold: float = 0.0,
+               mode: Optional[str] = None, categories: Optional[List[str]] = None,
+               sources: Optional[List[str]] = None, timings: Optional[Dict[str, float]] = None) -> List[Dict[str, Any]]:
+        """
+        Recherche dans les guidelines - seuil réduit
+        
+        Args:
+            mode: "hybrid" (BM25 + dense fusionnés par RRF), "dense" ou "lexical" ; défaut rag.retrieval.mode.
+                  En mode hybride, une requête mots-clés dont le meilleur extrait BM25 est net
+                  est servie par l'index lexical seul, sans encoder la requête.
+            categories, sources: filtres appliqués dans les index (seuls les extraits retenus sont parcourus)
+            timings: dictionnaire optionnel complété avec encode_ms (embedding de la requête)
+                     et search_ms (index, fusion et lecture des extraits)
         """
         if not self.is_initialized:
             self.initialize()
         
         try:
-            # Embedding de la requête
-            query_embedding = self.model.encode([query])
+            start = time.perf_counter()
+            encode_ms = 0.0
+            mode = mode or self.retrieval_mode
+            n_candidates = max(top_k * 2, self.retrieval_candidates)
             
-            # Recherche étendue
-            distances, indices = self.index.search(query_embedding, top_k * 2)
+            # Filtrage catégorie / source : sous-ensemble d'ids poussé dans les index
+            subset, allowed = None, None
+            if categories or sources:
+                subset = self.filter_ids(categories, sources)
+                if len(subset) == 0:
+                    logger.info(f"🔍 Recherche '{query}': aucun extrait pour le filtre {categories or ''} {sources or ''}")
+                    return []
+                allowed = np.zeros(len(self.guidelines_data), dtype=bool)
+                allowed[subset] = True
+            
+            lexical_ids, lexical_scores, lexical_info = [], [], {}
+            if mode != "dense" and self.lexical_index is not None:
+                lexical_ids, lexical_scores, lexical_info = self.lexical_index.search(query, n_candidates, allowed)
+            bm25_scores = {int(idx): float(score) for idx, score in zip(lexical_ids, lexical_scores)}
+            
+            if mode == "lexical" or (mode == "hybrid" and self._lexical_is_confident(lexical_scores, lexical_info)):
+                # Chemin rapide lexical : score normalisé par le meilleur score BM25
+                retrieval = "lexical"
+                top_score = float(lexical_scores[0]) if len(lexical_scores) else 1.0
+                ranked = [(int(idx), float(score) / top_score, None) for idx, score in zip(lexical_ids, lexical_scores)]
+            
+            else:
+                # Embedding de la requête et recherche étendue
+                encode_start = time.perf_counter()
+                query_embedding = self.encode_query(query)
+                encode_ms = (time.perf_counter() - encode_start) * 1000
+                dense = self._dense_search(query_embedding, n_candidates, subset)
+                
+                if mode == "dense" or not bm25_scores:
+                    retrieval = "dense"
+                    ranked = [(idx, score, None) for idx, score in dense.items()]
+                else:
+                    retrieval = "hybrid"
+                    fused = reciprocal_rank_fusion([list(dense), list(bm25_scores)], k=self.rrf_k)
+                    
+                    # Similarité cosinus des candidats trouvés par BM25 seul
+                    missing = [idx for idx, _ in fused if idx not in dense]
+                    if missing:
+                        vectors = self._load_vectors()
+                        rows = np.sort(np.asarray(missing))
+                        for idx, score in zip(rows, np.asarray(vectors[rows]) @ query_embedding[0]):
+                            dense[int(idx)] = float(score)
+                    ranked = [(idx, dense[idx], fusion_score) for idx, fusion_score in fused]
             
             # Récupération des résultats avec seuil réduit
             results = []
-            for i, (distance, idx) in enumerate(zip(distances[0], indices[0])):
-                if idx < len(self.guidelines_data):
-                    guideline = self.guidelines_data[idx]
-                    # Score de similarité normalisé
-                    similarity_score = float(distance)
-                    
-                    if similarity_score >= similarity_threshold:
-                        results.append({
-                            "rank": len(results) + 1,
-                            "content": guideline["content"],
-                            "source": guideline["source"],
-                            "category": guideline["category"],
-                            "similarity_score": similarity_score,
-                            "page": guideline.get("page", "N/A")
-                        })
-                    
-                    # Arrêter quand on a assez de résultats
-                    if len(results) >= top_k:
-                        break
+            for idx, similarity_score, fusion_score in ranked:
+                if not 0 <= idx < len(self.guidelines_data) or similarity_score < similarity_threshold:
+                    continue
+                
+                guideline = self.guidelines_data[idx]
+                results.append({
+                    "rank": len(results) + 1,
+                    "content": guideline["content"],
+                    "source": guideline["source"],
+                    "category": guideline["category"],
+                    "similarity_score": similarity_score,
+                    "page": guideline.get("page", "N/A"),
+                    "retrieval": retrieval,
+                    "bm25_score": bm25_scores.get(idx),
+                    "fusion_score": fusion_score
+                })
+                
+                # Arrêter quand on a assez de résultats
+                if len(results) >= top_k:
+                    break
             
-            logger.info(f"🔍 Recherche '{query}': {len(results)} résultats (seuil: {similarity_threshold})")
+            if timings is not None:
+                timings["encode_ms"] = encode_ms
+                timings["search_ms"] = (time.perf_counter() - start) * 1000 - encode_ms
+            
+            logger.info(f"🔍 Recherche '{query}' ({retrieval}): {len(results)} résultats (seuil: {similarity_threshold})")
             return results
             
         except Exception as e:
             logger.error(f"❌ Erreur recherche RAG: {e}")
             return []
     
+    def filter_ids(self, categories: Optional[List[str]] = None,
+                   sources: Optional[List[str]] = None) -> np.ndarray:
+        """Ids (triés) des extraits des catégories / sources données"""
+        if isinstance(self.guidelines_data, GuidelineStore):
+            return self.guidelines_data.filter_ids(categories, sources)
+        return np.asarray([
+            i for i, guideline in enumerate(self.guidelines_data)
+            if (not categories or guideline["category"] in categories)
+            and (not sources or guideline["source"] in sources)
+        ], dtype=np.int64)
+    
+    def _dense_search(self, query_embedding: np.ndarray, n_candidates: int,
+                      subset: Optional[np.ndarray] = None) -> Dict[int, float]:
+        """
+        Plus proches voisins {id: similarité}, par ordre décroissant.
+        Avec un filtre, un sous-ensemble de taille "flat" est parcouru exactement sur ses seuls vecteurs ;
+        au-delà, l'index ANN est interrogé avec un sélecteur d'ids.
+        Un index de codes compressés (int8 / binaire) est suivi d'un re-scoring en pleine précision.
+        """
+        index_info = describe_index(self.index)
+        quantization = index_info["quantization"]
+        
+        # Les index binaires ne supportent pas les sélecteurs d'ids : parcours exact du sous-ensemble
+        if subset is not None and (len(subset) <= self.index_params["flat_max_vectors"] or quantization == "binary"):
+            scores = np.asarray(self._load_vectors()[subset]) @ query_embedding[0]
+            top = np.arange(len(scores))
+            if len(scores) > n_candidates:
+                top = np.argpartition(-scores, n_candidates - 1)[:n_candidates]
+            top = top[np.argsort(-scores[top], kind="stable")]
+            return {int(subset[i]): float(scores[i]) for i in top}
+        
+        params = None
+        if subset is not None:
+            selector = faiss.IDSelectorBatch(subset.astype(np.int64))
+            index_type = index_info["type"]
+            if index_type == "hnsw":
+                params = faiss.SearchParametersHNSW(sel=selector, efSearch=int(self.index_params["hnsw_ef_search"]))
+            elif index_type == "ivf":
+                params = faiss.SearchParametersIVF(sel=selector, nprobe=int(faiss.downcast_index(self.index).nprobe))
+            else:
+                params = faiss.SearchParameters(sel=selector)
+        
+        if quantization != "none":
+            distances, indices = quantized_search(
+                self.index, self._load_vectors(), query_embedding, n_candidates,
+                self.index_params["rescore_factor"], params
+            )
+        else:
+            distances, indices = self.index.search(query_embedding, n_candidates, params=params)
+        
+        return {int(idx): float(distance) for distance, idx in zip(distances[0], indices[0])
+                if 0 <= idx < len(self.guidelines_data)}
+    
+    def encode_query(self, query: str) -> np.ndarray:
+        """Embedding normalisé d'une requête (même espace que les vecteurs de l'index)"""
+        query_embedding = np.asarray(self.model.encode([query]), dtype=np.float32)
+        faiss.normalize_L2(query_embedding)
+        return query_embedding
+    
+    def _lexical_is_confident(self, scores: np.ndarray, info: Dict[str, Any]) -> bool:
+        """
+        Requête mots-clés courte dont tous les termes figurent dans le meilleur extrait,
+        nettement devant le suivant : le classement BM25 suffit
+        """
+        if not self.lexical_fast_path or not len(scores):
+            return False
+        if not 0 < info.get("query_terms", 0) <= self.fast_path_max_terms:
+            return False
+        if info.get("top_coverage", 0.0) < self.fast_path_min_coverage:
+            return False
+        margin = 1.0 if len(scores) == 1 else (float(scores[0]) - float(scores[1])) / float(scores[0])
+        return margin >= self.fast_path_min_margin
+    
     def add_guideline(self, content: str, source: str, category: str, metadata: Dict = None):
         """
         Ajoute une nouvelle guideline au système
@@ -121,13 +489,11 @@ class RAGSystem:
                 "content": content,
                 "source": source,
                 "category": category,
+                "origin": "custom",
                 "metadata": metadata or {}
             }
             
-            # Ajout aux données
-            self.guidelines_data.append(guideline)
-            
-            # Mise à jour des embeddings
+            # Mise à jour des embeddings et du store
             self._update_embeddings([guideline])
             
             logger.info(f"✅ Guideline ajoutée: {source} - {category}")
@@ -135,24 +501,45 @@ class RAGSystem:
         except Exception as e:
             logger.error(f"❌ Erreur ajout guideline: {e}")
     
+    def category_counts(self) -> Dict[str, int]:
+        """Nombre de guidelines par catégorie (lu dans les tableaux compacts du store)"""
+        if not self.is_initialized:
+            self.initialize()
+        
+        if isinstance(self.guidelines_data, GuidelineStore):
+            return self.guidelines_data.category_counts()
+        
+        counts = {}
+        for guideline in self.guidelines_data:
+            category = guideline.get("category", "non catégorisé")
+            counts[category] = counts.get(category, 0) + 1
+        return counts
+    
     def _check_existing_embeddings(self) -> bool:
         """Vérifie si des embeddings existent déjà"""
-        index_path = self.embeddings_path / "guidelines.index"
-        data_path = self.database_path / "guidelines_data.pkl"
-        
-        return index_path.exists() and data_path.exists()
+        has_data = GuidelineStore.exists(self.store_path) or self.data_path.exists()
+        return self.index_path.exists() and has_data
     
     def _load_existing_embeddings(self):
-        """Charge les embeddings existants"""
+        """Charge les embeddings existants (store et index ouverts en memory-map)"""
         try:
-            # Chargement des données
-            data_path = self.database_path / "guidelines_data.pkl"
-            with open(data_path, 'rb') as f:
-                self.guidelines_data = pickle.load(f)
+            # Chargement des données, migration du pickle hérité si nécessaire
+            if GuidelineStore.exists(self.store_path):
+                self.guidelines_data = GuidelineStore(self.store_path)
+            else:
+                logger.info("ℹ️ Migration de guidelines_data.pkl vers le store memory-mappé")
+                with open(self.data_path, 'rb') as f:
+                    self.guidelines_data = GuidelineStore.write(self.store_path, pickle.load(f))
             
             # Chargement de l'index FAISS
-            index_path = self.embeddings_path / "guidelines.index"
-            self.index = faiss.read_index(str(index_path))
+            self.index = apply_search_params(read_index_mmap(self.index_path), self.index_params)
+            self.vectors = None
+            
+            # Index BM25 (reconstruit s'il est absent ou désaligné du store)
+            if BM25Index.exists(self.bm25_path):
+                self.lexical_index = BM25Index.load(self.bm25_path)
+            if self.lexical_index is None or self.lexical_index.n_docs != len(self.guidelines_data):
+                self._build_lexical_index()
             
             logger.info(f"✅ Embeddings chargés: {len(self.guidelines_data)} guidelines")
             
@@ -160,117 +547,85 @@ class RAGSystem:
             logger.error(f"❌ Erreur chargement embeddings: {e}")
             raise
     
-    def _process_guidelines(self):
-        """Traite les fichiers PDF de guidelines – VERSION OPTIMISÉE"""
-        logger.info("📚 Traitement des guidelines...")
-
-        # Réinitialisation obligatoire pour éviter les doublons
-        self.guidelines_data = []
-        
-        # Liste des PDF trouvés
-        pdf_files = list(self.guidelines_path.glob("*.pdf"))
-        logger.info(f"🔍 {len(pdf_files)} fichiers PDF trouvés dans {self.guidelines_path}")
-
-        # ----- 1) PRIORITÉ AUX PDF -----
-        if pdf_files:
-            for pdf_file in pdf_files:
-                try:
-                    logger.info(f"📄 Extraction du PDF : {pdf_file.name}")
-                    pdf_guidelines = self._extract_text_from_pdf(pdf_file)
-                    self.guidelines_data.extend(pdf_guidelines)
-                    logger.info(f"   → {len(pdf_guidelines)} extraits ajoutés")
-                except Exception as e:
-                    logger.error(f"❌ Erreur traitement PDF {pdf_file}: {e}")
-        else:
-            logger.warning("⚠️ Aucun PDF trouvé – recours aux guidelines par défaut")
-
-            # ----- 2) GUIDELINES PAR DÉFAUT -----
-            self.guidelines_data = [
-                {
-                    "content": "ESC 2024: Limiter les séances intensives à 2 par semaine maximum pour prévenir le surentraînement",
-                    "source": "European Society of Cardiology 2024",
-                    "category": "entraînement",
-                    "page": "12"
-                },
-                {
-                    "content": "Recommandation EU: 48h de repos entre deux matches compétitifs pour une récupération optimale",
-                    "source": "European Basketball Union 2023",
-                    "category": "récupération",
-                    "page": "8"
-                },
-                {
-                    "content": "Protocole hydratation: 500ml 2h avant l'effort, 250ml toutes les 20min pendant l'activité",
-                    "source": "International Journal of Sports Medicine",
-                    "category": "nutrition",
-                    "page": "15"
-                },
-                {
-                    "content": "Cheville: Protocole RICE (Repos, Ice, Compression, Élévation) 48h pour entorses légères",
-                    "source": "Journal of Orthopaedic Surgery 2024",
-                    "category": "blessure",
-                    "page": "22"
-                },
-                {
-                    "content": "Genou: Consultation immédiate recommandée si gonflement > 2cm après traumatisme",
-                    "source": "American Journal of Sports Medicine",
-                    "category": "blessure",
-                    "page": "18"
-                },
-                {
-                    "content": "Apport protéique: 1.6-2.2g/kg/jour recommandé pour les sportives d'élite en basketball",
-                    "source": "International Society of Sports Nutrition",
-                    "category": "nutrition",
-                    "page": "7"
-                },
-                {
-                    "content": "Sommeil: 8-10h/nuit requis pour les sportives professionnelles pour une récupération optimale",
-                    "source": "Sleep Medicine Journal",
-                    "category": "récupération",
-                    "page": "11"
-                },
-                {
-                    "content": "Prévention blessures: Programme de renforcement musculaire 3x/semaine réduit les risques de 40%",
-                    "source": "British Journal of Sports Medicine",
-                    "category": "prévention",
-                    "page": "9"
-                }
-            ]
-
-        # ----- 3) Vérification finale -----
-        if not self.guidelines_data:
-            logger.error("❌ Aucune guideline disponible !")
-            raise Exception("Aucune donnée guideline trouvée")
-
-        logger.info(f"📊 Total guidelines chargées : {len(self.guidelines_data)}")
-
-        # ----- 4) Sauvegarde -----
-        with open(self.database_path / "guidelines_data.pkl", 'wb') as f:
-            pickle.dump(self.guidelines_data, f)
-
+    def _load_vectors(self) -> np.ndarray:
+        """Vecteurs normalisés (memory-map ; reconstruits depuis l'index plat pour les artefacts hérités)"""
+        if self.vectors is None:
+            if self.vectors_path.exists():
+                self.vectors = np.load(self.vectors_path, mmap_mode='r')
+            else:
+                self.vectors = self.index.reconstruct_n(0, self.index.ntotal)
+        return self.vectors
     
-    def _extract_text_from_pdf(self, pdf_path: Path) -> List[Dict[str, Any]]:
-        """Extrait le texte d'un fichier PDF"""
-        guidelines = []
+    def _build_lexical_index(self):
+        """Construit et sauvegarde l'index BM25 aligné sur les ids de l'index FAISS"""
+        self.lexical_index = BM25Index.build([guideline["content"] for guideline in self.guidelines_data])
+        self.lexical_index.save(self.bm25_path)
+        logger.info(f"✅ Index BM25 créé: {len(self.lexical_index.vocabulary)} termes")
+    
+    def _manifest_signature(self) -> Dict[str, Any]:
+        """Paramètres dont dépendent les extraits et vecteurs : tout changement impose une reconstruction"""
+        return {
+            "model": self.model_name,
+            "chunk_size": self.chunk_size,
+            "chunk_overlap": self.chunk_overlap,
+            "chunking": self.chunking_strategy,
+            "dedupe_max_distance": self.dedupe_max_distance if self.dedupe else None,
+        }
+    
+    @staticmethod
+    def _is_stale(guideline: Dict[str, Any], stale_sources: set, has_pdfs: bool) -> bool:
+        """Indique si un extrait doit être retiré lors d'une synchronisation"""
+        origin = guideline.get("origin") or ("pdf" if guideline["source"].lower().endswith(".pdf") else "custom")
+        if origin == "pdf":
+            return guideline["source"] in stale_sources
+        if origin == "default":
+            return has_pdfs
+        return False
+    
+    def _process_guidelines(self, pdf_files: List[Path]):
+        """
+        Extrait et segmente les PDF donnés (extraction parallèle par plages de pages)
         
-        with open(pdf_path, 'rb') as file:
-            pdf_reader = PyPDF2.PdfReader(file)
-            
-            for page_num, page in enumerate(pdf_reader.pages, 1):
-                text = page.extract_text()
-                if text.strip():
-                    # Segmentation en chunks (simplifié)
-                    chunks = self._split_text_into_chunks(text)
-                    
-                    for chunk in chunks:
-                        guidelines.append({
-                            "content": chunk,
-                            "source": pdf_path.name,
-                            "category": "général",
-                            "page": str(page_num)
-                        })
+        Returns:
+            (liste des extraits, noms des PDF en échec)
+        """
+        if not pdf_files:
+            return [], set()
+        
+        logger.info(f"📚 Extraction de {len(pdf_files)} PDF...")
+        extracted, failed = extract_pdfs(pdf_files, workers=self.ingestion_workers, pages_per_task=self.pages_per_task)
+        
+        guidelines = []
+        for name, pages in extracted.items():
+            pdf_guidelines = self._pages_to_guidelines(name, pages)
+            guidelines.extend(pdf_guidelines)
+            logger.info(f"   → {name}: {len(pdf_guidelines)} extraits")
         
+        return guidelines, failed
+    
+    def _pages_to_guidelines(self, source: str, pages) -> List[Dict[str, Any]]:
+        """Segmente les pages extraites d'un PDF en extraits"""
+        guidelines = []
+        for page_num, text in pages:
+            if self.chunking_strategy == "sentences":
+                chunks = chunk_sentences(split_sentences(text), self.chunk_size, self.chunk_overlap)
+            else:
+                chunks = self._split_text_into_chunks(text, self.chunk_size, self.chunk_overlap)
+            for chunk in chunks:
+                guidelines.append({
+                    "content": chunk,
+                    "source": source,
+                    "category": "général",
+                    "page": str(page_num),
+                    "origin": "pdf"
+                })
         return guidelines
     
+    def _extract_text_from_pdf(self, pdf_path: Path) -> List[Dict[str, Any]]:
+        """Extrait le texte d'un fichier PDF"""
+        _, pages = _extract_page_range(str(pdf_path), 0, sys.maxsize)
+        return self._pages_to_guidelines(pdf_path.name, pages)
+    
     def _split_text_into_chunks(self, text: str, chunk_size: int = 500, overlap: int = 50) -> List[str]:
         """Segmente le texte en chunks pour l'embedding"""
         words = text.split()
@@ -285,29 +640,34 @@ class RAGSystem:
         
         return chunks
     
-    def _create_embeddings(self):
-        """Crée les embeddings pour toutes les guidelines"""
-        logger.info("🔨 Création des embeddings...")
+    def _encode_guidelines(self, guidelines: List[Dict[str, Any]]) -> np.ndarray:
+        """Embeddings normalisés (similarité cosinus) des extraits donnés"""
+        if not guidelines:
+            dimension = self.model.get_sentence_embedding_dimension()
+            return np.empty((0, dimension), dtype=np.float32)
+        
+        contents = [guideline["content"] for guideline in guidelines]
+        embeddings = np.asarray(self.model.encode(contents, show_progress_bar=True), dtype=np.float32)
+        faiss.normalize_L2(embeddings)
+        return embeddings
+    
+    def _create_embeddings(self, embeddings: np.ndarray):
+        """Crée l'index FAISS (plat, IVF ou HNSW selon rag.index) à partir des vecteurs normalisés"""
+        logger.info("🔨 Création de l'index...")
         
         try:
-            # Extraction du contenu
-            contents = [guideline["content"] for guideline in self.guidelines_data]
-            
-            # Création des embeddings
-            embeddings = self.model.encode(contents, show_progress_bar=True)
-            
-            # Création de l'index FAISS
-            dimension = embeddings.shape[1]
-            self.index = faiss.IndexFlatIP(dimension)  # Produit scalaire pour similarité cosinus
+            embeddings = np.ascontiguousarray(embeddings, dtype=np.float32)
             
-            # Normalisation pour similarité cosinus
-            faiss.normalize_L2(embeddings)
-            self.index.add(embeddings)
+            # Création de l'index FAISS (produit scalaire pour similarité cosinus)
+            index_type = select_index_type(len(embeddings), self.index_params)
+            self.index = build_index(embeddings, index_type, self.index_params)
             
-            # Sauvegarde de l'index
-            faiss.write_index(self.index, str(self.embeddings_path / "guidelines.index"))
+            # Sauvegarde de l'index et des vecteurs
+            write_index_atomic(self.index, self.index_path)
+            save_array_atomic(self.vectors_path, embeddings)
+            self.vectors = embeddings
             
-            logger.info(f"✅ Embeddings créés: {len(self.guidelines_data)} guidelines")
+            logger.info(f"✅ Index créé: {describe_index(self.index)}")
             
         except Exception as e:
             logger.error(f"❌ Erreur création embeddings: {e}")
@@ -316,20 +676,19 @@ class RAGSystem:
     def _update_embeddings(self, new_guidelines: List[Dict]):
         """Met à jour les embeddings avec de nouvelles guidelines"""
         try:
+            vectors = self._load_vectors()
+            
             # Embeddings des nouvelles guidelines
             new_contents = [guideline["content"] for guideline in new_guidelines]
-            new_embeddings = self.model.encode(new_contents)
-            
-            # Ajout à l'index existant
+            new_embeddings = np.asarray(self.model.encode(new_contents), dtype=np.float32)
             faiss.normalize_L2(new_embeddings)
-            self.index.add(new_embeddings)
-            
-            # Sauvegarde de l'index mis à jour
-            faiss.write_index(self.index, str(self.embeddings_path / "guidelines.index"))
             
-            # Sauvegarde des données mises à jour
-            with open(self.database_path / "guidelines_data.pkl", 'wb') as f:
-                pickle.dump(self.guidelines_data, f)
+            # Reconstruction de l'index (l'index chargé est en lecture seule) et du store
+            self._create_embeddings(np.vstack([vectors, new_embeddings]))
+            self.guidelines_data = GuidelineStore.write(
+                self.store_path, list(self.guidelines_data) + list(new_guidelines)
+            )
+            self._build_lexical_index()
             
             logger.info(f"✅ Embeddings mis à jour: {len(new_guidelines)} nouvelles guidelines")
             
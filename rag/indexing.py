@@ -0,0 +1,226 @@
+# basketcoach-mcp/rag/indexing.py
+#!/usr/bin/env python3
+"""
+Construction des index FAISS (plat, IVF, HNSW) avec sélection automatique selon la taille du corpus
+Codes compressés optionnels (int8 / binaires) avec re-scoring en pleine précision
+"""
+
+import os
+import math
+from typing import Dict, Any, Optional
+
+import numpy as np
+import faiss
+import sys
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from utils.logger import get_logger
+from utils.config import get_config
+
+logger = get_logger("rag.indexing")
+
+INDEX_TYPES = ("flat", "ivf", "hnsw")
+QUANTIZATIONS = ("none", "int8", "binary")
+
+DEFAULT_INDEX_PARAMS = {
+    "type": "auto",
+    "flat_max_vectors": 20000,
+    "hnsw_max_vectors": 500000,
+    "ivf_nlist": None,
+    "ivf_nprobe": 16,
+    "hnsw_m": 32,
+    "hnsw_ef_construction": 200,
+    "hnsw_ef_search": 64,
+    "quantization": "none",
+    "rescore_factor": 4,
+}
+
+
+def get_index_params(overrides: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+    """Paramètres d'index : valeurs par défaut < config.yaml (rag.index) < surcharges"""
+    params = dict(DEFAULT_INDEX_PARAMS)
+    params.update({k: v for k, v in (get_config().get("rag.index", {}) or {}).items() if v is not None})
+    params.update({k: v for k, v in (overrides or {}).items() if v is not None})
+    return params
+
+
+def select_index_type(n_vectors: int, params: Optional[Dict[str, Any]] = None) -> str:
+    """
+    Type d'index à construire : imposé par rag.index.type, sinon choisi selon la taille du corpus
+    (recherche exacte pour les petits corpus, HNSW au-delà, IVF pour les très grands corpus).
+    """
+    params = params or get_index_params()
+    requested = params.get("type", "auto")
+    if requested in INDEX_TYPES:
+        return requested
+    if requested != "auto":
+        logger.warning(f"⚠️ Type d'index inconnu '{requested}', sélection automatique")
+
+    if n_vectors <= params["flat_max_vectors"]:
+        return "flat"
+    if n_vectors <= params["hnsw_max_vectors"]:
+        return "hnsw"
+    return "ivf"
+
+
+def default_nlist(n_vectors: int) -> int:
+    """Nombre de listes IVF : ~4·√n, borné pour garder au moins 39 points d'entraînement par liste"""
+    return max(1, min(int(4 * math.sqrt(n_vectors)), n_vectors // 39))
+
+
+def binary_codes(vectors: np.ndarray) -> np.ndarray:
+    """Codes binaires (1 bit par dimension : signe de la composante), 32x plus compacts que le float32"""
+    return np.packbits(np.asarray(vectors) > 0, axis=1)
+
+
+def _training_sample(vectors: np.ndarray, size: int) -> np.ndarray:
+    if size >= len(vectors):
+        return vectors
+    rng = np.random.default_rng(42)
+    return vectors[np.sort(rng.choice(len(vectors), size, replace=False))]
+
+
+def build_index(vectors: np.ndarray, index_type: str = "flat", params: Optional[Dict[str, Any]] = None):
+    """
+    Construit un index produit scalaire (vecteurs normalisés = similarité cosinus).
+    L'entraînement IVF est réalisé ici ; nprobe / efSearch sont enregistrés avec l'index.
+    Avec rag.index.quantization = int8 ou binary, l'index ne stocke que des codes compressés
+    (à interroger via quantized_search, qui re-score les candidats en pleine précision).
+    """
+    params = params or get_index_params()
+    vectors = np.ascontiguousarray(vectors, dtype=np.float32)
+    n_vectors, dimension = vectors.shape
+    quantization = params.get("quantization", "none")
+    if quantization not in QUANTIZATIONS:
+        raise ValueError(f"Quantification inconnue: {quantization}")
+
+    if index_type == "ivf" and n_vectors < 39:
+        logger.info("ℹ️ Corpus trop petit pour IVF, index plat utilisé")
+        index_type = "flat"
+
+    if quantization == "binary":
+        return _build_binary_index(vectors, index_type, params)
+
+    sq_type = faiss.ScalarQuantizer.QT_8bit
+    if index_type == "flat":
+        if quantization == "int8":
+            index = faiss.IndexScalarQuantizer(dimension, sq_type, faiss.METRIC_INNER_PRODUCT)
+        else:
+            index = faiss.IndexFlatIP(dimension)
+
+    elif index_type == "ivf":
+        nlist = int(params.get("ivf_nlist") or default_nlist(n_vectors))
+        quantizer = faiss.IndexFlatIP(dimension)
+        if quantization == "int8":
+            index = faiss.IndexIVFScalarQuantizer(quantizer, dimension, nlist, sq_type, faiss.METRIC_INNER_PRODUCT)
+        else:
+            index = faiss.IndexIVFFlat(quantizer, dimension, nlist, faiss.METRIC_INNER_PRODUCT)
+
+        # Entraînement sur un échantillon (au plus 256 points par liste)
+        sample = _training_sample(vectors, 256 * nlist)
+        logger.info(f"🏋️ Entraînement IVF: {nlist} listes sur {len(sample)} vecteurs")
+        index.train(sample)
+        index.nprobe = min(nlist, int(params["ivf_nprobe"]))
+
+    elif index_type == "hnsw":
+        if quantization == "int8":
+            index = faiss.IndexHNSWSQ(dimension, sq_type, int(params["hnsw_m"]), faiss.METRIC_INNER_PRODUCT)
+        else:
+            index = faiss.IndexHNSWFlat(dimension, int(params["hnsw_m"]), faiss.METRIC_INNER_PRODUCT)
+        index.hnsw.efConstruction = int(params["hnsw_ef_construction"])
+        index.hnsw.efSearch = int(params["hnsw_ef_search"])
+
+    else:
+        raise ValueError(f"Type d'index inconnu: {index_type}")
+
+    if not index.is_trained:
+        # Bornes min/max par dimension du quantificateur int8
+        index.train(_training_sample(vectors, 65536))
+    index.add(vectors)
+    return index
+
+
+def _build_binary_index(vectors: np.ndarray, index_type: str, params: Dict[str, Any]):
+    """Index de codes binaires (distance de Hamming)"""
+    dimension = vectors.shape[1]
+    if dimension % 8:
+        raise ValueError(f"Quantification binaire impossible: dimension {dimension} non multiple de 8")
+    codes = binary_codes(vectors)
+
+    if index_type == "flat":
+        index = faiss.IndexBinaryFlat(dimension)
+    elif index_type == "ivf":
+        nlist = int(params.get("ivf_nlist") or default_nlist(len(codes)))
+        index = faiss.IndexBinaryIVF(faiss.IndexBinaryFlat(dimension), dimension, nlist)
+        sample = _training_sample(codes, 256 * nlist)
+        logger.info(f"🏋️ Entraînement IVF binaire: {nlist} listes sur {len(sample)} codes")
+        index.train(sample)
+        index.nprobe = min(nlist, int(params["ivf_nprobe"]))
+    elif index_type == "hnsw":
+        index = faiss.IndexBinaryHNSW(dimension, int(params["hnsw_m"]))
+        index.hnsw.efConstruction = int(params["hnsw_ef_construction"])
+        index.hnsw.efSearch = int(params["hnsw_ef_search"])
+    else:
+        raise ValueError(f"Type d'index inconnu: {index_type}")
+
+    index.add(codes)
+    return index
+
+
+def is_binary_index(index) -> bool:
+    return isinstance(index, faiss.IndexBinary)
+
+
+def quantized_search(index, vectors: np.ndarray, query_embedding: np.ndarray, k: int,
+                     rescore_factor: int = 4, params=None):
+    """
+    Recherche en deux temps : k·rescore_factor candidats sur les codes compressés,
+    puis re-scoring exact (produit scalaire) sur les vecteurs pleine précision des seuls candidats.
+
+    Returns:
+        (similarités, ids) de forme (1, k), comme index.search
+    """
+    n_candidates = max(k, k * int(rescore_factor))
+    if is_binary_index(index):
+        _, candidates = index.search(binary_codes(query_embedding), n_candidates)
+    else:
+        _, candidates = index.search(query_embedding, n_candidates, params=params)
+
+    candidates = np.sort(candidates[0][candidates[0] >= 0])
+    scores = np.asarray(vectors[candidates]) @ query_embedding[0]
+    order = np.argsort(-scores, kind="stable")[:k]
+    return scores[order][None, :], candidates[order][None, :]
+
+
+def describe_index(index) -> Dict[str, Any]:
+    """Type, quantification et paramètres de recherche d'un index FAISS existant"""
+    if is_binary_index(index):
+        index = faiss.downcast_IndexBinary(index)
+        if isinstance(index, faiss.IndexBinaryHNSW):
+            return {"type": "hnsw", "quantization": "binary", "ef_search": int(index.hnsw.efSearch), "ntotal": int(index.ntotal)}
+        if isinstance(index, faiss.IndexBinaryIVF):
+            return {"type": "ivf", "quantization": "binary", "nlist": int(index.nlist), "nprobe": int(index.nprobe),
+                    "ntotal": int(index.ntotal)}
+        return {"type": "flat", "quantization": "binary", "ntotal": int(index.ntotal)}
+
+    index = faiss.downcast_index(index)
+    if isinstance(index, faiss.IndexHNSW):
+        storage = faiss.downcast_index(index.storage)
+        quantization = "int8" if isinstance(storage, faiss.IndexScalarQuantizer) else "none"
+        return {"type": "hnsw", "quantization": quantization, "ef_search": int(index.hnsw.efSearch), "ntotal": int(index.ntotal)}
+    if isinstance(index, faiss.IndexIVF):
+        quantization = "int8" if isinstance(index, faiss.IndexIVFScalarQuantizer) else "none"
+        return {"type": "ivf", "quantization": quantization, "nlist": int(index.nlist), "nprobe": int(index.nprobe),
+                "ntotal": int(index.ntotal)}
+    quantization = "int8" if isinstance(index, faiss.IndexScalarQuantizer) else "none"
+    return {"type": "flat", "quantization": quantization, "ntotal": int(index.ntotal)}
+
+
+def apply_search_params(index, params: Optional[Dict[str, Any]] = None):
+    """Applique nprobe / efSearch de la configuration à un index chargé"""
+    params = params or get_index_params()
+    downcast = faiss.downcast_IndexBinary(index) if is_binary_index(index) else faiss.downcast_index(index)
+    if isinstance(downcast, (faiss.IndexHNSW, faiss.IndexBinaryHNSW)):
+        downcast.hnsw.efSearch = int(params["hnsw_ef_search"])
+    elif isinstance(downcast, (faiss.IndexIVF, faiss.IndexBinaryIVF)):
+        downcast.nprobe = min(int(downcast.nlist), int(params["ivf_nprobe"]))
+    return index
@@ -0,0 +1,168 @@
+# basketcoach-mcp/rag/ingest.py
+#!/usr/bin/env python3
+"""
+Ingestion incrémentale des guidelines PDF
+Manifeste par fichier (empreinte SHA-256) et extraction parallèle par plages de pages
+"""
+
+import os
+import json
+import hashlib
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from pathlib import Path
+from typing import Dict, List, Any, Optional, Tuple, Set
+
+import PyPDF2
+import sys
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from utils.logger import get_logger
+
+logger = get_logger("rag.ingest")
+
+MANIFEST_VERSION = 1
+
+
+def file_sha256(path: Path, block_size: int = 1 << 20) -> str:
+    """Empreinte SHA-256 du contenu d'un fichier (lecture par blocs)"""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(block_size), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def scan_pdf_files(directory: Path, previous: Optional[Dict[str, Dict[str, Any]]] = None) -> Dict[str, Dict[str, Any]]:
+    """
+    Recense les PDF du répertoire avec leur empreinte.
+    Le hash n'est recalculé que si la taille ou la date de modification ont changé.
+    """
+    previous = previous or {}
+    files = {}
+
+    for pdf_path in sorted(directory.glob("*.pdf")):
+        stat = pdf_path.stat()
+        known = previous.get(pdf_path.name)
+
+        if known and known.get("size") == stat.st_size and known.get("mtime_ns") == stat.st_mtime_ns:
+            sha256 = known["sha256"]
+        else:
+            sha256 = file_sha256(pdf_path)
+
+        files[pdf_path.name] = {
+            "path": str(pdf_path),
+            "sha256": sha256,
+            "size": stat.st_size,
+            "mtime_ns": stat.st_mtime_ns,
+        }
+
+    return files
+
+
+def load_manifest(path: Path) -> Optional[Dict[str, Any]]:
+    """Charge le manifeste d'ingestion (None si absent ou illisible)"""
+    if not path.exists():
+        return None
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            manifest = json.load(f)
+        if manifest.get("version") != MANIFEST_VERSION:
+            logger.info("ℹ️ Version de manifeste différente, reconstruction complète")
+            return None
+        return manifest
+    except Exception as e:
+        logger.warning(f"⚠️ Manifeste illisible ({path}): {e}")
+        return None
+
+
+def save_manifest(path: Path, manifest: Dict[str, Any]):
+    """Écrit le manifeste de façon atomique"""
+    manifest["version"] = MANIFEST_VERSION
+    tmp_path = path.with_suffix(path.suffix + ".tmp")
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, ensure_ascii=False, indent=2)
+    os.replace(tmp_path, path)
+
+
+def diff_manifest(previous: Optional[Dict[str, Any]], current: Dict[str, Dict[str, Any]]) -> Tuple[List[str], List[str]]:
+    """Retourne (fichiers nouveaux ou modifiés, fichiers supprimés)"""
+    known = (previous or {}).get("files", {})
+    changed = [name for name, info in current.items() if known.get(name, {}).get("sha256") != info["sha256"]]
+    removed = [name for name in known if name not in current]
+    return changed, removed
+
+
+def _count_pages(pdf_path: str) -> int:
+    with open(pdf_path, 'rb') as f:
+        return len(PyPDF2.PdfReader(f).pages)
+
+
+def _extract_page_range(pdf_path: str, start: int, end: int) -> Tuple[str, List[Tuple[int, str]]]:
+    """
+    Tâche worker : extrait le texte des pages [start, end) d'un PDF.
+    Les numéros de page retournés commencent à 1.
+    """
+    pages = []
+    with open(pdf_path, 'rb') as f:
+        reader = PyPDF2.PdfReader(f)
+        for page_index in range(start, min(end, len(reader.pages))):
+            text = reader.pages[page_index].extract_text() or ""
+            if text.strip():
+                pages.append((page_index + 1, text))
+    return pdf_path, pages
+
+
+def extract_pdfs(pdf_paths: List[Path], workers: Optional[int] = None,
+                 pages_per_task: int = 8) -> Tuple[Dict[str, List[Tuple[int, str]]], Set[str]]:
+    """
+    Extrait le texte de plusieurs PDF en parallèle (une tâche par plage de pages).
+
+    Returns:
+        (pages par nom de fichier, noms des fichiers en échec)
+    """
+    workers = workers or os.cpu_count() or 1
+    pages_per_task = max(1, pages_per_task)
+
+    tasks = []
+    failed = set()
+    for pdf_path in pdf_paths:
+        try:
+            page_count = _count_pages(str(pdf_path))
+        except Exception as e:
+            logger.error(f"❌ PDF illisible {pdf_path.name}: {e}")
+            failed.add(pdf_path.name)
+            continue
+        for start in range(0, page_count, pages_per_task):
+            tasks.append((str(pdf_path), start, start + pages_per_task))
+
+    extracted: Dict[str, List[Tuple[int, str]]] = {
+        pdf_path.name: [] for pdf_path in pdf_paths if pdf_path.name not in failed
+    }
+
+    def _collect(pdf_path: str, pages: List[Tuple[int, str]]):
+        extracted[Path(pdf_path).name].extend(pages)
+
+    if workers <= 1 or len(tasks) <= 1:
+        for task in tasks:
+            try:
+                _collect(*_extract_page_range(*task))
+            except Exception as e:
+                logger.error(f"❌ Extraction échouée {Path(task[0]).name} p.{task[1] + 1}-{task[2]}: {e}")
+                failed.add(Path(task[0]).name)
+    else:
+        logger.info(f"⚙️ Extraction parallèle: {len(tasks)} tâches sur {min(workers, len(tasks))} processus")
+        with ProcessPoolExecutor(max_workers=min(workers, len(tasks))) as executor:
+            futures = {executor.submit(_extract_page_range, *task): task for task in tasks}
+            for future in as_completed(futures):
+                task = futures[future]
+                try:
+                    _collect(*future.result())
+                except Exception as e:
+                    logger.error(f"❌ Extraction échouée {Path(task[0]).name} p.{task[1] + 1}-{task[2]}: {e}")
+                    failed.add(Path(task[0]).name)
+
+    for name in failed:
+        extracted.pop(name, None)
+    for pages in extracted.values():
+        pages.sort(key=lambda page: page[0])
+
+    return extracted, failed
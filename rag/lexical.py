@@ -0,0 +1,190 @@
+# basketcoach-mcp/rag/lexical.py
+#!/usr/bin/env python3
+"""
+Index inversé BM25 pour la recherche lexicale dans les guidelines
+Postings stockés en tableaux compacts (CSR) ouverts en memory-map
+"""
+
+import os
+import re
+import json
+import unicodedata
+from pathlib import Path
+from typing import Dict, List, Any, Optional, Tuple
+
+import numpy as np
+import sys
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from utils.logger import get_logger
+
+logger = get_logger("rag.lexical")
+
+FRENCH_STOPWORDS = {
+    "a", "au", "aux", "avec", "ce", "ces", "cet", "cette", "comme", "comment", "dans", "de", "des", "du",
+    "elle", "elles", "en", "est", "et", "etre", "eux", "il", "ils", "je", "la", "le", "les", "leur", "leurs",
+    "lui", "mais", "me", "meme", "mes", "moi", "mon", "ne", "nos", "notre", "nous", "on", "ou", "par", "pas",
+    "plus", "pour", "qu", "que", "quel", "quelle", "quelles", "quels", "qui", "sa", "sans", "se", "ses",
+    "son", "sont", "sur", "ta", "te", "tes", "toi", "ton", "tu", "un", "une", "vos", "votre", "vous",
+    "faire", "faut", "quand", "apres", "avant", "tres", "entre", "chez", "ont", "peut", "doit",
+}
+
+_TOKEN_PATTERN = re.compile(r"[a-z0-9]+(?:-[a-z0-9]+)*")
+
+
+def _strip_accents(text: str) -> str:
+    return "".join(c for c in unicodedata.normalize("NFKD", text) if not unicodedata.combining(c))
+
+
+def _stem(token: str) -> str:
+    """Racinisation légère : pluriels en -s / -x"""
+    if len(token) > 4 and token[-1] in "sx" and token[-2] != "s":
+        return token[:-1]
+    return token
+
+
+def tokenize(text: str) -> List[str]:
+    """
+    Tokenisation française : minuscules, sans accents, mots vides retirés.
+    Les mots composés sont indexés entiers et par parties ("contre-attaque" → contre-attaque, contre, attaque).
+    """
+    tokens = []
+    for match in _TOKEN_PATTERN.findall(_strip_accents(text.lower())):
+        parts = match.split("-")
+        if len(parts) > 1:
+            tokens.append(_stem(match))
+        for part in parts:
+            if len(part) > 1 and part not in FRENCH_STOPWORDS:
+                tokens.append(_stem(part))
+    return tokens
+
+
+class BM25Index:
+    """Index inversé BM25 (Okapi) sur les extraits, ids alignés sur l'index FAISS"""
+
+    def __init__(self, vocabulary: Dict[str, int], offsets: np.ndarray, doc_ids: np.ndarray,
+                 term_freqs: np.ndarray, doc_lengths: np.ndarray, k1: float = 1.2, b: float = 0.75):
+        self.vocabulary = vocabulary
+        self.offsets = offsets
+        self.doc_ids = doc_ids
+        self.term_freqs = term_freqs
+        self.doc_lengths = doc_lengths
+        self.k1 = k1
+        self.b = b
+        self.n_docs = len(doc_lengths)
+        self.avg_doc_length = float(np.mean(doc_lengths)) if self.n_docs else 0.0
+
+        doc_freqs = np.diff(offsets).astype(np.float64)
+        self.idf = np.log(1 + (self.n_docs - doc_freqs + 0.5) / (doc_freqs + 0.5))
+
+    @classmethod
+    def build(cls, texts: List[str], k1: float = 1.2, b: float = 0.75) -> "BM25Index":
+        """Construit l'index à partir des contenus (dans l'ordre des ids)"""
+        postings: Dict[str, Dict[int, int]] = {}
+        doc_lengths = np.zeros(len(texts), dtype=np.int32)
+
+        for doc_id, text in enumerate(texts):
+            tokens = tokenize(text)
+            doc_lengths[doc_id] = len(tokens)
+            for token in tokens:
+                term_postings = postings.setdefault(token, {})
+                term_postings[doc_id] = term_postings.get(doc_id, 0) + 1
+
+        terms = sorted(postings)
+        offsets = np.zeros(len(terms) + 1, dtype=np.int64)
+        for i, term in enumerate(terms):
+            offsets[i + 1] = offsets[i] + len(postings[term])
+
+        doc_ids = np.empty(offsets[-1], dtype=np.int32)
+        term_freqs = np.empty(offsets[-1], dtype=np.float32)
+        for i, term in enumerate(terms):
+            items = sorted(postings[term].items())
+            doc_ids[offsets[i]:offsets[i + 1]] = [doc_id for doc_id, _ in items]
+            term_freqs[offsets[i]:offsets[i + 1]] = [tf for _, tf in items]
+
+        return cls({term: i for i, term in enumerate(terms)}, offsets, doc_ids, term_freqs, doc_lengths, k1, b)
+
+    def save(self, path: Path):
+        """Écrit l'index dans un répertoire (tableaux .npy + vocabulaire JSON)"""
+        path = Path(path)
+        path.mkdir(parents=True, exist_ok=True)
+        for name, array in (("offsets", self.offsets), ("doc_ids", self.doc_ids),
+                            ("term_freqs", self.term_freqs), ("doc_lengths", self.doc_lengths)):
+            tmp_path = path / f"{name}.npy.tmp"
+            with open(tmp_path, 'wb') as f:
+                np.save(f, array)
+            os.replace(tmp_path, path / f"{name}.npy")
+
+        tmp_path = path / "vocabulary.json.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump({"k1": self.k1, "b": self.b, "terms": sorted(self.vocabulary, key=self.vocabulary.get)}, f)
+        os.replace(tmp_path, path / "vocabulary.json")
+
+    @classmethod
+    def load(cls, path: Path) -> "BM25Index":
+        """Ouvre un index sauvegardé (postings en memory-map)"""
+        path = Path(path)
+        with open(path / "vocabulary.json", 'r', encoding='utf-8') as f:
+            meta = json.load(f)
+        return cls(
+            {term: i for i, term in enumerate(meta["terms"])},
+            np.load(path / "offsets.npy", mmap_mode='r'),
+            np.load(path / "doc_ids.npy", mmap_mode='r'),
+            np.load(path / "term_freqs.npy", mmap_mode='r'),
+            np.load(path / "doc_lengths.npy", mmap_mode='r'),
+            meta.get("k1", 1.2),
+            meta.get("b", 0.75),
+        )
+
+    @staticmethod
+    def exists(path: Path) -> bool:
+        return (Path(path) / "vocabulary.json").exists()
+
+    def search(self, query: str, top_k: int = 10,
+               allowed: Optional[np.ndarray] = None) -> Tuple[np.ndarray, np.ndarray, Dict[str, Any]]:
+        """
+        Recherche BM25.
+
+        Args:
+            allowed: masque booléen optionnel des ids autorisés
+
+        Returns:
+            (ids, scores, infos) — infos contient les termes de la requête et leur couverture par le meilleur extrait
+        """
+        query_terms = list(dict.fromkeys(tokenize(query)))
+        known_terms = [term for term in query_terms if term in self.vocabulary]
+        info = {"query_terms": len(query_terms), "matched_terms": len(known_terms), "top_coverage": 0.0}
+
+        if not known_terms or self.n_docs == 0:
+            return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.float32), info
+
+        scores = np.zeros(self.n_docs, dtype=np.float32)
+        matched = np.zeros(self.n_docs, dtype=np.int16)
+        for term in known_terms:
+            term_id = self.vocabulary[term]
+            start, end = int(self.offsets[term_id]), int(self.offsets[term_id + 1])
+            docs = np.asarray(self.doc_ids[start:end])
+            tf = np.asarray(self.term_freqs[start:end])
+            if allowed is not None:
+                keep = allowed[docs]
+                docs, tf = docs[keep], tf[keep]
+            norm = self.k1 * (1 - self.b + self.b * np.asarray(self.doc_lengths)[docs] / max(self.avg_doc_length, 1e-9))
+            scores[docs] += self.idf[term_id] * tf * (self.k1 + 1) / (tf + norm)
+            matched[docs] += 1
+
+        candidates = np.flatnonzero(scores > 0)
+        if len(candidates) > top_k:
+            candidates = candidates[np.argpartition(-scores[candidates], top_k - 1)[:top_k]]
+        order = candidates[np.argsort(-scores[candidates], kind="stable")]
+
+        if len(order):
+            info["top_coverage"] = float(matched[order[0]]) / max(len(query_terms), 1)
+        return order.astype(np.int64), scores[order], info
+
+
+def reciprocal_rank_fusion(rankings: List[List[int]], k: int = 60) -> List[Tuple[int, float]]:
+    """Fusion RRF : score(d) = Σ 1 / (k + rang(d)), rangs à partir de 1"""
+    fused: Dict[int, float] = {}
+    for ranking in rankings:
+        for rank, doc_id in enumerate(ranking, 1):
+            fused[doc_id] = fused.get(doc_id, 0.0) + 1.0 / (k + rank)
+    return sorted(fused.items(), key=lambda item: item[1], reverse=True)
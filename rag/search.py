@@ -4,47 +4,64 @@
 Interface de recherche pour le système RAG
 Intégration simplifiée avec le serveur MCP
 """
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Tuple, Optional
 import logging
 import sys
 import os
+import time
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 from rag.embed import rag_system, initialize_rag
+from rag.service import service_mode, connect_service
 from utils.logger import get_logger
+from utils.config import get_config
 
 # CORRECTION : Gestion plus robuste du reranker
+RERANKER_MODEL = 'cross-encoder/ms-marco-MiniLM-L-6-v2'
+logger = get_logger("rag.search")
+reranker = None
 try:
-    from sentence_transformers import CrossEncoder
-    RERANKER_MODEL = 'cross-encoder/ms-marco-MiniLM-L-6-v2'
-    reranker = CrossEncoder(RERANKER_MODEL)
+    # Mode client : predict() délégué au service partagé (un seul CrossEncoder pour tous les processus)
+    if service_mode() == "client":
+        reranker = connect_service("reranker", RERANKER_MODEL)
+        if reranker is None and not get_config().get("rag.service.fallback_local", True):
+            raise RuntimeError("service injoignable et repli local désactivé")
+    if reranker is None:
+        from sentence_transformers import CrossEncoder
+        reranker = CrossEncoder(RERANKER_MODEL)
     RERANKER_AVAILABLE = True
-    logger = get_logger("rag.search")
     logger.info("✅ Reranker chargé avec succès")
 except Exception as e:
-    logger = get_logger("rag.search")
     logger.warning(f"⚠️ Reranker non disponible: {e}")
     RERANKER_AVAILABLE = False
     reranker = None
 
-def search_guidelines(query: str, max_results: int = 3, categories: List[str] = None) -> Dict[str, Any]:
+# Reranking adaptatif : budget de candidats, troncature en tokens, lots triés par longueur
+_config = get_config()
+RERANK_CANDIDATES = int(_config.get("rag.rerank.candidates", 12))
+RERANK_MAX_TOKENS = int(_config.get("rag.rerank.max_tokens", 256))
+RERANK_BATCH_SIZE = int(_config.get("rag.rerank.batch_size", 16))
+RERANK_SKIP_MARGIN = float(_config.get("rag.rerank.skip_margin", 0.15))
+RERANK_LEXICAL_SKIP_MARGIN = float(_config.get("rag.rerank.lexical_skip_margin", 0.15))
+
+def search_guidelines(query: str, max_results: int = 3, categories: List[str] = None,
+                      sources: List[str] = None) -> Dict[str, Any]:
     """
     Recherche des guidelines avec filtrage et Re-ranking - VERSION CORRIGÉE
+    
+    Le filtrage par catégorie / source est appliqué dans les index : seuls les extraits retenus sont parcourus.
     """
     try:
         if not rag_system.is_initialized:
             initialize_rag()
        
-        # 1. Recherche initiale
-        all_results_raw = rag_system.search(query, top_k=max_results * 5, similarity_threshold=0.0)
-       
-        # Filtrage par catégorie si spécifié
-        if categories:
-            results_to_rerank = [
-                result for result in all_results_raw
-                if result["category"] in categories
-            ]
-        else:
-            results_to_rerank = all_results_raw
+        # 1. Recherche initiale (filtrée dans l'index), candidats pour le reranking
+        candidate_budget = max(max_results, RERANK_CANDIDATES) if RERANKER_AVAILABLE else max_results
+        timings = {"encode_ms": 0.0, "search_ms": 0.0}
+        all_results_raw = rag_system.search(
+            query, top_k=candidate_budget, similarity_threshold=0.0, categories=categories, sources=sources,
+            timings=timings
+        )
+        results_to_rerank = all_results_raw
         
         # Si pas de résultats, retourner vide
         if not results_to_rerank:
@@ -57,31 +74,41 @@ def search_guidelines(query: str, max_results: int = 3, categories: List[str] =
                     "reranked_from": 0,
                     "categories_found": [],
                     "average_similarity": 0,
+                    "rerank": {"applied": False, "reason": "aucun résultat", "time_ms": 0.0},
+                    "timings": dict(timings, rerank_ms=0.0),
                 },
                 "suggestions": ["Aucun résultat trouvé. Essayez d'autres termes de recherche."]
             }
         
-        # 2. RE-RANKING (si disponible)
+        # 2. RE-RANKING adaptatif (si disponible et utile)
+        # (sans reranking, l'ordre de la recherche initiale - fusion hybride comprise - est conservé)
+        rerank_info = {"applied": False, "reason": "reranker indisponible", "time_ms": 0.0}
+        final_results = results_to_rerank[:max_results]
+        
         if RERANKER_AVAILABLE and reranker is not None:
-            try:
-                contents = [r['content'] for r in results_to_rerank]
-                pairs = [[query, content] for content in contents]
-                new_scores = reranker.predict(pairs)
-                
-                for i, result in enumerate(results_to_rerank):
-                    result['rerank_score'] = float(new_scores[i])
-                
-                # Tri par score de reranking
-                reranked_results = sorted(results_to_rerank, key=lambda x: x['rerank_score'], reverse=True)
-                final_results = reranked_results[:max_results]
-                
-            except Exception as rerank_error:
-                logger.warning(f"⚠️ Erreur reranking, utilisation des résultats initiaux: {rerank_error}")
-                # En cas d'erreur, utiliser les résultats initiaux triés par similarité
-                final_results = sorted(results_to_rerank, key=lambda x: x['similarity_score'], reverse=True)[:max_results]
-        else:
-            # Sans reranker, utiliser les résultats initiaux
-            final_results = sorted(results_to_rerank, key=lambda x: x['similarity_score'], reverse=True)[:max_results]
+            skip_reason = _skip_rerank_reason(results_to_rerank)
+            if skip_reason:
+                rerank_info["reason"] = skip_reason
+            else:
+                try:
+                    start = time.perf_counter()
+                    scores, batches = _rerank_scores(query, results_to_rerank)
+                    for result, score in zip(results_to_rerank, scores):
+                        result['rerank_score'] = score
+                    
+                    # Tri par score de reranking
+                    reranked_results = sorted(results_to_rerank, key=lambda x: x['rerank_score'], reverse=True)
+                    final_results = reranked_results[:max_results]
+                    rerank_info = {
+                        "applied": True,
+                        "candidates": len(results_to_rerank),
+                        "batches": batches,
+                        "time_ms": round((time.perf_counter() - start) * 1000, 2),
+                    }
+                    
+                except Exception as rerank_error:
+                    logger.warning(f"⚠️ Erreur reranking, utilisation des résultats initiaux: {rerank_error}")
+                    rerank_info["reason"] = f"erreur: {rerank_error}"
         
         # 3. Préparation de l'analyse
         analysis = {
@@ -91,6 +118,12 @@ def search_guidelines(query: str, max_results: int = 3, categories: List[str] =
             "reranked_from": len(results_to_rerank),
             "categories_found": list(set(r["category"] for r in final_results)),
             "average_similarity": sum(r.get('similarity_score', 0) for r in final_results) / len(final_results) if final_results else 0,
+            "rerank": rerank_info,
+            "timings": {
+                "encode_ms": round(timings["encode_ms"], 3),
+                "search_ms": round(timings["search_ms"], 3),
+                "rerank_ms": rerank_info["time_ms"],
+            },
         }
         
         return {
@@ -109,6 +142,75 @@ def search_guidelines(query: str, max_results: int = 3, categories: List[str] =
         }
 
 
+def _first_stage_margin(results: List[Dict[str, Any]]) -> Optional[float]:
+    """
+    Écart de score entre les deux premiers candidats, dans l'ordre rendu par la recherche initiale
+    
+    Seulement pour un classement fait sur similarity_score (dense : similarité cosinus,
+    lexical : score BM25 normalisé par le meilleur) ; None pour la fusion hybride,
+    dont l'ordre RRF ne suit pas les similarités
+    """
+    if len(results) < 2 or results[0].get('retrieval') not in ("dense", "lexical"):
+        return None
+    return results[0].get('similarity_score', 0.0) - results[1].get('similarity_score', 0.0)
+
+
+def _skip_rerank_reason(results: List[Dict[str, Any]]) -> Optional[str]:
+    """
+    Raison de ne pas reranker les candidats (None : reranking utile)
+    - dense : premier candidat devant le deuxième d'au moins skip_margin (similarité cosinus),
+    - lexical : écart BM25 relatif d'au moins lexical_skip_margin (toujours vrai sur le chemin rapide),
+    - hybride : jamais d'après un écart, les candidats fusionnés sont toujours rerankés.
+    """
+    if len(results) <= 1:
+        return "un seul candidat"
+    margin = _first_stage_margin(results)
+    if margin is None:
+        return None
+    if results[0]['retrieval'] == "dense" and margin >= RERANK_SKIP_MARGIN:
+        return f"écart de similarité net ({margin:.3f})"
+    if results[0]['retrieval'] == "lexical" and margin >= RERANK_LEXICAL_SKIP_MARGIN:
+        return f"meilleur extrait BM25 net ({margin:.3f})"
+    return None
+
+
+def _truncate_for_rerank(text: str, max_tokens: int = RERANK_MAX_TOKENS) -> str:
+    """
+    Tronque un extrait à max_tokens tokens du tokenizer du reranker
+    (approximation par mots si le tokenizer ne fournit pas les offsets)
+    """
+    tokenizer = getattr(reranker, "tokenizer", None)
+    if tokenizer is not None and getattr(tokenizer, "is_fast", False):
+        encoding = tokenizer(text, add_special_tokens=False, return_offsets_mapping=True)
+        offsets = encoding["offset_mapping"]
+        return text if len(offsets) <= max_tokens else text[:offsets[max_tokens - 1][1]]
+    
+    words = text.split()
+    max_words = int(max_tokens * 0.75)
+    return text if len(words) <= max_words else " ".join(words[:max_words])
+
+
+def _rerank_scores(query: str, results: List[Dict[str, Any]]) -> Tuple[List[float], int]:
+    """
+    Scores CrossEncoder des candidats, calculés par lots de longueurs voisines (moins de padding)
+    
+    Returns:
+        (scores dans l'ordre des résultats, nombre de lots)
+    """
+    passages = [_truncate_for_rerank(r['content']) for r in results]
+    order = sorted(range(len(passages)), key=lambda i: len(passages[i]))
+    
+    scores = [0.0] * len(passages)
+    batches = 0
+    for start in range(0, len(order), RERANK_BATCH_SIZE):
+        batch = order[start:start + RERANK_BATCH_SIZE]
+        batch_scores = reranker.predict([[query, passages[i]] for i in batch], batch_size=len(batch))
+        for i, score in zip(batch, batch_scores):
+            scores[i] = float(score)
+        batches += 1
+    return scores, batches
+
+
 def get_guideline_categories() -> List[str]:
     """
     Retourne la liste des catégories disponibles
@@ -117,7 +219,7 @@ def get_guideline_categories() -> List[str]:
         if not rag_system.is_initialized:
             initialize_rag()
         
-        categories = list(set(guideline["category"] for guideline in rag_system.guidelines_data))
+        categories = list(rag_system.category_counts())
         
         # S'assurer que les catégories de base existent
         base_categories = ["blessure", "prévention", "nutrition", "récupération", "entraînement"]
@@ -173,12 +275,7 @@ def get_guideline_category_counts() -> Dict[str, int]:
         if not rag_system.is_initialized:
             initialize_rag()
         
-        category_counts = {}
-        for guideline in rag_system.guidelines_data:
-            category = guideline.get("category", "non catégorisé")
-            category_counts[category] = category_counts.get(category, 0) + 1
-        
-        return category_counts
+        return rag_system.category_counts()
     
     except Exception as e:
         logger.error(f"❌ Erreur comptage catégories: {e}")
@@ -0,0 +1,289 @@
+# basketcoach-mcp/rag/service.py
+#!/usr/bin/env python3
+"""
+Service local d'embedding et de reranking partagé entre processus
+Un seul exemplaire des modèles en mémoire (app Streamlit, serveur MCP stdio, API HTTP),
+requêtes concurrentes regroupées en lots
+"""
+
+import os
+import time
+import base64
+import asyncio
+from contextlib import asynccontextmanager
+from typing import Dict, List, Any, Optional, Callable
+
+import numpy as np
+import requests
+import sys
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from utils.logger import get_logger
+from utils.config import get_config
+
+logger = get_logger("rag.service")
+
+DEFAULT_URL = "http://127.0.0.1:8765"
+EMBEDDING_MODEL = "BAAI/bge-large-en-v1.5"
+RERANKER_MODEL = "cross-encoder/ms-marco-MiniLM-L-6-v2"
+
+
+def encode_array(array: np.ndarray) -> Dict[str, Any]:
+    """Tableau float32 → JSON compact (base64)"""
+    array = np.ascontiguousarray(array, dtype=np.float32)
+    return {"shape": list(array.shape), "data": base64.b64encode(array.tobytes()).decode("ascii")}
+
+
+def decode_array(payload: Dict[str, Any]) -> np.ndarray:
+    return np.frombuffer(base64.b64decode(payload["data"]), dtype=np.float32).reshape(payload["shape"])
+
+
+# =============================================================================
+# REGROUPEMENT DES REQUÊTES
+# =============================================================================
+
+class MicroBatcher:
+    """
+    Regroupe les éléments reçus de requêtes concurrentes : un lot part dès qu'il atteint max_batch
+    éléments ou que le plus ancien attend depuis max_wait_ms. Le calcul s'exécute hors boucle asyncio.
+    """
+
+    def __init__(self, compute: Callable[[List[Any]], List[Any]], max_batch: int = 64, max_wait_ms: float = 5.0):
+        self.compute = compute
+        self.max_batch = max_batch
+        self.max_wait = max_wait_ms / 1000
+        self.queue: Optional[asyncio.Queue] = None
+        self._worker_task: Optional[asyncio.Task] = None
+        self.stats = {"requests": 0, "items": 0, "batches": 0}
+
+    async def submit(self, items: List[Any]) -> List[Any]:
+        """Soumet les éléments d'une requête et attend leurs résultats"""
+        loop = asyncio.get_running_loop()
+        if self._worker_task is None or self._worker_task.done():
+            self.queue = asyncio.Queue()
+            self._worker_task = loop.create_task(self._worker(), name="micro-batcher")
+        futures = [loop.create_future() for _ in items]
+        for item, future in zip(items, futures):
+            self.queue.put_nowait((item, future))
+        self.stats["requests"] += 1
+        return list(await asyncio.gather(*futures))
+
+    async def aclose(self):
+        """Arrête le regroupement : tâche de lots annulée, requêtes en attente annulées"""
+        task, self._worker_task = self._worker_task, None
+        if task is not None and not task.done():
+            task.cancel()
+            await asyncio.gather(task, return_exceptions=True)
+        while self.queue is not None and not self.queue.empty():
+            _, future = self.queue.get_nowait()
+            future.cancel()
+        self.queue = None
+
+    async def _worker(self):
+        loop = asyncio.get_running_loop()
+        batch = []
+        try:
+            while True:
+                batch = [await self.queue.get()]
+                await self._run_batch(loop, batch)
+                batch = []
+        except asyncio.CancelledError:
+            for _, future in batch:
+                future.cancel()
+            raise
+
+    async def _run_batch(self, loop: asyncio.AbstractEventLoop, batch: List[Any]):
+        """Complète le lot jusqu'à max_batch éléments ou max_wait, puis le calcule hors boucle"""
+        deadline = loop.time() + self.max_wait
+        while len(batch) < self.max_batch:
+            timeout = deadline - loop.time()
+            if timeout <= 0:
+                break
+            try:
+                batch.append(await asyncio.wait_for(self.queue.get(), timeout))
+            except asyncio.TimeoutError:
+                break
+
+        items = [item for item, _ in batch]
+        try:
+            results = await loop.run_in_executor(None, self.compute, items)
+            for (_, future), result in zip(batch, results):
+                if not future.done():
+                    future.set_result(result)
+        except Exception as e:
+            logger.error(f"❌ Erreur calcul du lot ({len(items)} éléments): {e}")
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(e)
+        self.stats["items"] += len(items)
+        self.stats["batches"] += 1
+
+
+# =============================================================================
+# SERVEUR
+# =============================================================================
+
+def create_app(embedding_model: str = EMBEDDING_MODEL, reranker_model: Optional[str] = RERANKER_MODEL,
+               max_batch: int = 64, max_wait_ms: float = 5.0):
+    """Application FastAPI exposant /encode, /predict et /health"""
+    from fastapi import FastAPI, HTTPException
+    from sentence_transformers import SentenceTransformer, CrossEncoder
+
+    logger.info(f"🚀 Chargement des modèles du service: {embedding_model}, {reranker_model}")
+    encoder = SentenceTransformer(embedding_model)
+    reranker = CrossEncoder(reranker_model) if reranker_model else None
+    started_at = time.time()
+
+    encode_batcher = MicroBatcher(
+        lambda texts: list(np.asarray(encoder.encode(texts, batch_size=max_batch), dtype=np.float32)),
+        max_batch, max_wait_ms
+    )
+    predict_batcher = MicroBatcher(
+        lambda pairs: [float(score) for score in reranker.predict(pairs, batch_size=max_batch)],
+        max_batch, max_wait_ms
+    )
+
+    @asynccontextmanager
+    async def lifespan(app):
+        yield
+        # arrêt du service : tâches de regroupement annulées
+        await encode_batcher.aclose()
+        await predict_batcher.aclose()
+
+    app = FastAPI(title="BasketCoach Embedding Service", lifespan=lifespan)
+
+    @app.post("/encode")
+    async def encode(payload: Dict[str, Any]):
+        texts = payload.get("texts") or []
+        if not texts:
+            return {"vectors": encode_array(np.empty((0, encoder.get_sentence_embedding_dimension())))}
+        vectors = await encode_batcher.submit(list(texts))
+        return {"vectors": encode_array(np.vstack(vectors))}
+
+    @app.post("/predict")
+    async def predict(payload: Dict[str, Any]):
+        if reranker is None:
+            raise HTTPException(status_code=503, detail="Reranker non chargé")
+        pairs = [tuple(pair) for pair in payload.get("pairs") or []]
+        scores = await predict_batcher.submit(pairs) if pairs else []
+        return {"scores": scores}
+
+    @app.get("/health")
+    async def health():
+        return {
+            "status": "healthy",
+            "embedding_model": embedding_model,
+            "dimension": encoder.get_sentence_embedding_dimension(),
+            "reranker_model": reranker_model,
+            "uptime_seconds": round(time.time() - started_at, 1),
+            "encode": encode_batcher.stats,
+            "predict": predict_batcher.stats,
+        }
+
+    return app
+
+
+# =============================================================================
+# CLIENT
+# =============================================================================
+
+class ServiceClient:
+    """Appels HTTP au service (session réutilisée, connexions keep-alive)"""
+
+    def __init__(self, url: Optional[str] = None, timeout: float = 60.0):
+        self.url = (url or get_config().get("rag.service.url", DEFAULT_URL)).rstrip("/")
+        self.timeout = timeout
+        self.session = requests.Session()
+
+    def health(self) -> Dict[str, Any]:
+        response = self.session.get(f"{self.url}/health", timeout=5)
+        response.raise_for_status()
+        return response.json()
+
+    def post(self, endpoint: str, payload: Dict[str, Any]) -> Dict[str, Any]:
+        response = self.session.post(f"{self.url}{endpoint}", json=payload, timeout=self.timeout)
+        response.raise_for_status()
+        return response.json()
+
+
+class RemoteEmbedder:
+    """Substitut de SentenceTransformer déléguant encode() au service"""
+
+    def __init__(self, client: ServiceClient, dimension: int):
+        self.client = client
+        self._dimension = dimension
+
+    def get_sentence_embedding_dimension(self) -> int:
+        return self._dimension
+
+    def encode(self, sentences, show_progress_bar: bool = False, batch_size: int = 256, **kwargs) -> np.ndarray:
+        if isinstance(sentences, str):
+            return self.encode([sentences])[0]
+        sentences = list(sentences)
+        chunks = [
+            decode_array(self.client.post("/encode", {"texts": sentences[i:i + batch_size]})["vectors"])
+            for i in range(0, len(sentences), batch_size)
+        ]
+        return np.vstack(chunks) if chunks else np.empty((0, self._dimension), dtype=np.float32)
+
+
+class RemoteReranker:
+    """Substitut de CrossEncoder déléguant predict() au service"""
+
+    tokenizer = None  # troncature approximée par mots côté appelant
+
+    def __init__(self, client: ServiceClient):
+        self.client = client
+
+    def predict(self, pairs, batch_size: int = 32, **kwargs) -> np.ndarray:
+        pairs = [list(pair) for pair in pairs]
+        return np.asarray(self.client.post("/predict", {"pairs": pairs})["scores"], dtype=np.float32)
+
+
+def service_mode() -> str:
+    """local (modèles chargés dans le processus) | client (délégués au service partagé)"""
+    return get_config().get("rag.service.mode", "local")
+
+
+def connect_service(kind: str, model_name: Optional[str] = None):
+    """
+    Client distant du service ("embedder" ou "reranker"), None si le service ne répond pas
+    ou sert un autre modèle (l'appelant se replie alors sur un modèle local)
+    """
+    try:
+        client = ServiceClient()
+        health = client.health()
+        served = health["embedding_model"] if kind == "embedder" else health.get("reranker_model")
+        if model_name and served != model_name:
+            logger.warning(f"⚠️ Le service sert {served} au lieu de {model_name}, chargement local du modèle")
+            return None
+        remote = RemoteEmbedder(client, int(health["dimension"])) if kind == "embedder" else RemoteReranker(client)
+        logger.info(f"✅ {kind} délégué au service partagé {client.url}")
+        return remote
+    except Exception as e:
+        logger.warning(f"⚠️ Service d'embedding injoignable ({e}), chargement local du modèle")
+        return None
+
+
+def main():
+    import argparse
+    import uvicorn
+
+    config = get_config()
+    default_url = config.get("rag.service.url", DEFAULT_URL)
+    default_port = int(default_url.rsplit(":", 1)[-1].strip("/")) if default_url.count(":") == 2 else 8765
+
+    parser = argparse.ArgumentParser(description="Service local d'embedding / reranking partagé")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=default_port)
+    parser.add_argument("--embedding-model", default=EMBEDDING_MODEL)
+    parser.add_argument("--reranker-model", default=RERANKER_MODEL)
+    parser.add_argument("--max-batch", type=int, default=int(config.get("rag.service.max_batch", 64)))
+    parser.add_argument("--max-wait-ms", type=float, default=float(config.get("rag.service.max_wait_ms", 5)))
+    args = parser.parse_args()
+
+    app = create_app(args.embedding_model, args.reranker_model, args.max_batch, args.max_wait_ms)
+    uvicorn.run(app, host=args.host, port=args.port, log_level="info")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,255 @@
+# basketcoach-mcp/rag/store.py
+#!/usr/bin/env python3
+"""
+Stockage memory-mappé des extraits de guidelines
+Textes dans un blob unique indexé par offsets, métadonnées en tableaux compacts
+"""
+
+import os
+import json
+import mmap
+import shutil
+import time
+import unicodedata
+from pathlib import Path
+from typing import Dict, List, Any, Iterator, Optional
+
+import numpy as np
+import faiss
+import sys
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from utils.logger import get_logger
+
+logger = get_logger("rag.store")
+
+ORIGINS = ["pdf", "default", "custom"]
+NO_PAGE = -1
+# Générations plus anciennes que la précédente conservées ce délai (lecteurs ayant lu CURRENT juste avant la bascule)
+KEEP_GENERATION_SECONDS = 300
+
+
+def read_index_mmap(index_path: Path):
+    """
+    Ouvre un index FAISS en lecture seule memory-mappée (pages partagées entre processus).
+    Repli sur une lecture classique si le type d'index ne supporte pas le mmap.
+    Les index de codes binaires sont reconnus à leur en-tête.
+    """
+    read = faiss.read_index_binary if is_binary_index_file(index_path) else faiss.read_index
+    mmap_ifc = getattr(faiss, "IO_FLAG_MMAP_IFC", 0)
+    for flags in (
+        mmap_ifc | faiss.IO_FLAG_MMAP | faiss.IO_FLAG_READ_ONLY,
+        mmap_ifc | faiss.IO_FLAG_READ_ONLY,
+    ):
+        try:
+            return read(str(index_path), flags)
+        except Exception as e:
+            logger.debug(f"Lecture mmap impossible ({flags}) pour {index_path}: {e}")
+    return read(str(index_path))
+
+
+def is_binary_index_file(index_path: Path) -> bool:
+    """Les index binaires FAISS sont sérialisés avec un fourcc commençant par "IB" (IBxF, IBwF, IBHf...)"""
+    with open(index_path, 'rb') as f:
+        return f.read(2) == b"IB"
+
+
+def write_index_atomic(index, index_path: Path):
+    """Écrit un index FAISS sans tronquer le fichier éventuellement mappé par un lecteur"""
+    tmp_path = Path(str(index_path) + ".tmp")
+    if isinstance(index, faiss.IndexBinary):
+        faiss.write_index_binary(index, str(tmp_path))
+    else:
+        faiss.write_index(index, str(tmp_path))
+    os.replace(tmp_path, index_path)
+
+
+def save_array_atomic(array_path: Path, array: np.ndarray):
+    """Écrit un tableau .npy sans tronquer le fichier éventuellement mappé par un lecteur"""
+    tmp_path = Path(str(array_path) + ".tmp")
+    with open(tmp_path, 'wb') as f:
+        np.save(f, array)
+    os.replace(tmp_path, array_path)
+
+
+class GuidelineStore:
+    """
+    Vue en lecture seule sur les extraits, se comporte comme une liste de dicts.
+
+    Organisation sur disque (une génération par écriture, pointée par CURRENT) :
+        texts.bin        contenus UTF-8 concaténés
+        offsets.npy      int64 (n + 1) : début de chaque contenu dans texts.bin
+        source_ids.npy   int32 : index dans la table des sources
+        category_ids.npy int32 : index dans la table des catégories
+        pages.npy        int32 : numéro de page (-1 si absent)
+        origins.npy      int8  : index dans ORIGINS
+        tables.json      tables de chaînes + métadonnées libres (extraits personnalisés)
+    """
+
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        generation = (self.path / "CURRENT").read_text(encoding="utf-8").strip()
+        self.generation_path = self.path / generation
+
+        with open(self.generation_path / "tables.json", 'r', encoding='utf-8') as f:
+            tables = json.load(f)
+        self.sources: List[str] = tables["sources"]
+        self.categories: List[str] = tables["categories"]
+        self._metadata: Dict[str, Dict] = tables.get("metadata", {})
+
+        self.offsets = np.load(self.generation_path / "offsets.npy", mmap_mode='r')
+        self.source_ids = np.load(self.generation_path / "source_ids.npy", mmap_mode='r')
+        self.category_ids = np.load(self.generation_path / "category_ids.npy", mmap_mode='r')
+        self.pages = np.load(self.generation_path / "pages.npy", mmap_mode='r')
+        self.origins = np.load(self.generation_path / "origins.npy", mmap_mode='r')
+
+        texts_path = self.generation_path / "texts.bin"
+        self._texts: Any = b""
+        if texts_path.stat().st_size > 0:
+            with open(texts_path, 'rb') as f:
+                self._texts = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+    @staticmethod
+    def exists(path: Path) -> bool:
+        """Indique si un store complet est présent"""
+        current = Path(path) / "CURRENT"
+        if not current.exists():
+            return False
+        return (Path(path) / current.read_text(encoding="utf-8").strip() / "tables.json").exists()
+
+    @classmethod
+    def write(cls, path: Path, guidelines: List[Dict[str, Any]],
+              keep_seconds: float = KEEP_GENERATION_SECONDS) -> "GuidelineStore":
+        """
+        Écrit une nouvelle génération du store puis bascule CURRENT de façon atomique.
+        Les processus ayant déjà ouvert l'ancienne génération continuent de la lire ; la génération précédente
+        est conservée (un lecteur peut avoir lu CURRENT sans encore ouvrir ses fichiers), les plus anciennes
+        sont supprimées au-delà de keep_seconds.
+        """
+        path = Path(path)
+        path.mkdir(parents=True, exist_ok=True)
+        current = path / "CURRENT"
+        previous = current.read_text(encoding="utf-8").strip() if current.exists() else None
+        generation = f"gen-{time.time_ns()}"
+        generation_path = path / generation
+        generation_path.mkdir()
+
+        sources: Dict[str, int] = {}
+        categories: Dict[str, int] = {}
+        metadata: Dict[str, Dict] = {}
+        n = len(guidelines)
+        offsets = np.zeros(n + 1, dtype=np.int64)
+        source_ids = np.empty(n, dtype=np.int32)
+        category_ids = np.empty(n, dtype=np.int32)
+        pages = np.empty(n, dtype=np.int32)
+        origins = np.empty(n, dtype=np.int8)
+
+        with open(generation_path / "texts.bin", 'wb') as texts:
+            position = 0
+            for i, guideline in enumerate(guidelines):
+                encoded = guideline["content"].encode("utf-8")
+                texts.write(encoded)
+                position += len(encoded)
+                offsets[i + 1] = position
+
+                source_ids[i] = sources.setdefault(guideline["source"], len(sources))
+                category_ids[i] = categories.setdefault(guideline["category"], len(categories))
+                page = str(guideline.get("page", ""))
+                pages[i] = int(page) if page.isdigit() else NO_PAGE
+                origin = guideline.get("origin") or ("pdf" if guideline["source"].lower().endswith(".pdf") else "custom")
+                origins[i] = ORIGINS.index(origin) if origin in ORIGINS else ORIGINS.index("custom")
+                if guideline.get("metadata"):
+                    metadata[str(i)] = guideline["metadata"]
+
+        np.save(generation_path / "offsets.npy", offsets)
+        np.save(generation_path / "source_ids.npy", source_ids)
+        np.save(generation_path / "category_ids.npy", category_ids)
+        np.save(generation_path / "pages.npy", pages)
+        np.save(generation_path / "origins.npy", origins)
+        with open(generation_path / "tables.json", 'w', encoding='utf-8') as f:
+            json.dump({
+                "sources": list(sources),
+                "categories": list(categories),
+                "metadata": metadata,
+            }, f, ensure_ascii=False)
+
+        current_tmp = path / "CURRENT.tmp"
+        current_tmp.write_text(generation, encoding="utf-8")
+        os.replace(current_tmp, current)
+
+        # Nettoyage des générations antérieures à la précédente, écrites depuis plus de keep_seconds
+        now = time.time()
+        for old in path.glob("gen-*"):
+            if old.name in (generation, previous):
+                continue
+            try:
+                written_at = int(old.name[len("gen-"):]) / 1e9
+            except ValueError:
+                written_at = old.stat().st_mtime
+            if now - written_at >= keep_seconds:
+                shutil.rmtree(old, ignore_errors=True)
+
+        logger.info(f"💾 Store écrit: {n} extraits, {offsets[-1] / 1e6:.1f} Mo de texte")
+        return cls(path)
+
+    def __len__(self) -> int:
+        return len(self.offsets) - 1
+
+    def content(self, i: int) -> str:
+        """Contenu d'un extrait (décodé depuis le blob mmap)"""
+        return self._texts[int(self.offsets[i]):int(self.offsets[i + 1])].decode("utf-8")
+
+    def category(self, i: int) -> str:
+        return self.categories[self.category_ids[i]]
+
+    def source(self, i: int) -> str:
+        return self.sources[self.source_ids[i]]
+
+    def __getitem__(self, i):
+        if isinstance(i, slice):
+            return [self[j] for j in range(*i.indices(len(self)))]
+        if i < 0:
+            i += len(self)
+        if not 0 <= i < len(self):
+            raise IndexError(i)
+
+        guideline = {
+            "content": self.content(i),
+            "source": self.source(i),
+            "category": self.category(i),
+            "origin": ORIGINS[self.origins[i]],
+        }
+        if self.pages[i] != NO_PAGE:
+            guideline["page"] = str(int(self.pages[i]))
+        metadata = self._metadata.get(str(i))
+        if metadata is not None:
+            guideline["metadata"] = metadata
+        return guideline
+
+    def __iter__(self) -> Iterator[Dict[str, Any]]:
+        for i in range(len(self)):
+            yield self[i]
+
+    def category_counts(self) -> Dict[str, int]:
+        """Nombre d'extraits par catégorie (sans décoder les textes)"""
+        counts = np.bincount(np.asarray(self.category_ids), minlength=len(self.categories))
+        return {category: int(count) for category, count in zip(self.categories, counts) if count}
+
+    def filter_ids(self, categories: Optional[List[str]] = None,
+                   sources: Optional[List[str]] = None) -> np.ndarray:
+        """
+        Ids des extraits appartenant aux catégories / sources demandées (comparaison sur les codes entiers,
+        noms normalisés NFC)
+        """
+        mask = np.ones(len(self), dtype=bool)
+        for names, table, codes in ((categories, self.categories, self.category_ids),
+                                    (sources, self.sources, self.source_ids)):
+            if names is None:
+                continue
+            wanted = {unicodedata.normalize("NFC", name) for name in names}
+            wanted_codes = [code for code, name in enumerate(table) if unicodedata.normalize("NFC", name) in wanted]
+            mask &= np.isin(np.asarray(codes), wanted_codes)
+        return np.flatnonzero(mask)
+
+    def close(self):
+        if isinstance(self._texts, mmap.mmap):
+            self._texts.close()
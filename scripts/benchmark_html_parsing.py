@@ -0,0 +1,165 @@
+# basketcoach-mcp/scripts/benchmark_html_parsing.py
+#!/usr/bin/env python3
+"""
+Benchmark de l'analyse HTML des scrapers sur les pages enregistrées (tests/fixtures/html)
+
+Compare, page par page, l'extraction d'origine (arbre BeautifulSoup complet construit par html.parser),
+une analyse BeautifulSoup limitée par SoupStrainer et l'analyse ciblée lxml/XPath de utils.html_parsers :
+temps médian et p95 par page, accélération, et identité des résultats extraits.
+"""
+
+import sys
+import json
+import time
+import argparse
+import statistics
+from pathlib import Path
+from datetime import datetime
+from typing import Dict, List, Any, Callable
+
+from bs4 import BeautifulSoup, SoupStrainer
+
+# Ajout du chemin racine pour les imports
+sys.path.append(str(Path(__file__).parent.parent))
+
+from utils.logger import get_logger
+from utils.html_parsers import parse_nba_standings, parse_news_articles
+
+logger = get_logger("scripts.benchmark_html_parsing")
+
+FIXTURES_DIR = Path(__file__).parent.parent / "tests" / "fixtures" / "html"
+PLAYER_NAME = "Marine Johannes"
+
+# page enregistrée → (type, URL d'origine)
+PAGES = {
+    "bbref_nba_standings.html": ("standings", "https://www.basketball-reference.com/leagues/NBA_2026_standings.html"),
+    "basketlfb_search.html": ("news", "https://basketlfb.com/?s=Marine+Johannes"),
+    "ffbb_search.html": ("news", "https://www.ffbb.com/search?search=Marine+Johannes"),
+    "eurosport_search.html": ("news", "https://www.eurosport.fr/search/Marine%20Johannes/"),
+}
+
+
+# --------------------------------------------------------------------------- extraction d'origine (référence)
+
+def _standings_from_soup(soup) -> List[Dict[str, str]]:
+    table = soup.find('table', id='confs_standings_E') or soup.find('table', id='divs_standings_E')
+    if not table:
+        raise ValueError("Structure page changée")
+    ranking = []
+    for row in table.find_all('tr')[1:31]:
+        cells = row.find_all(['th', 'td'])
+        if len(cells) > 3:
+            ranking.append({"team": cells[0].get_text(strip=True), "wins": cells[1].get_text(strip=True),
+                            "losses": cells[2].get_text(strip=True)})
+    return ranking
+
+
+def standings_bs4_full(content: bytes) -> List[Dict[str, str]]:
+    return _standings_from_soup(BeautifulSoup(content, 'html.parser'))
+
+
+def standings_bs4_strainer(content: bytes) -> List[Dict[str, str]]:
+    strainer = SoupStrainer('table', id=['confs_standings_E', 'divs_standings_E'])
+    return _standings_from_soup(BeautifulSoup(content, 'html.parser', parse_only=strainer))
+
+
+def news_bs4_full(content: bytes, url: str, player_name: str) -> List[Dict]:
+    soup = BeautifulSoup(content, 'html.parser')
+    articles = []
+    articles.extend(soup.find_all('article'))
+    articles.extend(soup.find_all('div', class_=['article', 'news-item', 'post', 'actualite']))
+    articles.extend(soup.find_all('a', class_=['news-link', 'article-link']))
+
+    news_items = []
+    for article in articles[:5]:
+        title, link, description = None, None, None
+        title_elem = article.find(['h1', 'h2', 'h3', 'h4', 'h5'])
+        if title_elem:
+            title = title_elem.get_text(strip=True)
+        link_elem = article.find('a', href=True) if article.name != 'a' else article
+        if link_elem and link_elem.get('href'):
+            link = link_elem['href']
+            if link and not link.startswith(('http', '//')):
+                link = ('/'.join(url.split('/')[:3]) + link) if link.startswith('/') else url + link
+        desc_elem = article.find(['p', 'div'], class_=['excerpt', 'description', 'summary'])
+        if desc_elem:
+            description = desc_elem.get_text(strip=True)[:200] + "..."
+        if title and link and any(keyword.lower() in title.lower() for keyword in [player_name.split()[0], 'basket', 'LFB']):
+            news_items.append({
+                "title": title, "link": link, "source": url.split('/')[2],
+                "date": datetime.now().strftime("%Y-%m-%d"),
+                "description": description or f"Article concernant {player_name} trouvé sur {url.split('/')[2]}",
+                "scraped": True
+            })
+    return news_items
+
+
+# --------------------------------------------------------------------------- mesure
+
+def _time(parse: Callable[[], Any], repeat: int) -> Dict[str, float]:
+    durations = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        parse()
+        durations.append((time.perf_counter() - start) * 1000)
+    durations.sort()
+    return {
+        "median_ms": round(statistics.median(durations), 2),
+        "p95_ms": round(durations[min(len(durations) - 1, int(0.95 * len(durations)))], 2),
+    }
+
+
+def run_benchmark(fixtures_dir: Path, repeat: int) -> Dict[str, Any]:
+    results = {}
+    for name, (kind, url) in PAGES.items():
+        path = fixtures_dir / name
+        if not path.exists():
+            logger.warning(f"⚠️ Page absente: {path}")
+            continue
+        content = path.read_bytes()
+        if kind == "standings":
+            variants = {
+                "bs4_html_parser": lambda: standings_bs4_full(content),
+                "bs4_soupstrainer": lambda: standings_bs4_strainer(content),
+                "lxml_xpath": lambda: parse_nba_standings(content),
+            }
+        else:
+            variants = {
+                "bs4_html_parser": lambda: news_bs4_full(content, url, PLAYER_NAME),
+                "lxml_xpath": lambda: parse_news_articles(content, url, PLAYER_NAME),
+            }
+
+        outputs = {label: parse() for label, parse in variants.items()}
+        reference = outputs["bs4_html_parser"]
+        page = {
+            "kind": kind,
+            "size_kb": round(len(content) / 1024, 1),
+            "items": len(reference),
+            "identical": {label: output == reference for label, output in outputs.items() if label != "bs4_html_parser"},
+            "timings": {label: _time(parse, repeat) for label, parse in variants.items()},
+        }
+        before = page["timings"]["bs4_html_parser"]["median_ms"]
+        page["speedup"] = {label: round(before / t["median_ms"], 1)
+                           for label, t in page["timings"].items() if label != "bs4_html_parser" and t["median_ms"]}
+        results[name] = page
+        logger.info(f"⏱️ {name}: {before} ms → {page['timings']['lxml_xpath']['median_ms']} ms (lxml)")
+    return {"repeat": repeat, "pages": results}
+
+
+def main():
+    """Temps d'analyse par page : BeautifulSoup d'origine, SoupStrainer, lxml/XPath"""
+    parser = argparse.ArgumentParser(description="Benchmark de l'analyse HTML des scrapers")
+    parser.add_argument("--fixtures", default=str(FIXTURES_DIR), help="Répertoire des pages enregistrées")
+    parser.add_argument("--repeat", type=int, default=20, help="Analyses par page et par méthode")
+    parser.add_argument("--output", help="Fichier JSON des résultats")
+    args = parser.parse_args()
+
+    report = run_benchmark(Path(args.fixtures), args.repeat)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+    print(json.dumps(report, ensure_ascii=False, indent=2))
+
+
+if __name__ == "__main__":
+    main()
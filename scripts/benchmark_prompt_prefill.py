@@ -0,0 +1,122 @@
+# basketcoach-mcp/scripts/benchmark_prompt_prefill.py
+#!/usr/bin/env python3
+"""
+Benchmark du préremplissage (prefill) des prompts de rapport de coaching
+
+Pour les matchs récents, compare le prompt historique (extraits RAG complets, sans déduplication ni budget)
+et le prompt construit par utils.prompt_builder : tokens estimés, puis, si Ollama répond,
+prompt_eval_count / prompt_eval_duration mesurés par Ollama (génération limitée à 1 token).
+Chaque prompt est préfixé d'un identifiant unique pour que le cache de préfixe d'Ollama ne fausse pas la mesure.
+"""
+
+import sys
+import json
+import time
+import uuid
+import asyncio
+import argparse
+import statistics
+from pathlib import Path
+from typing import Dict, List, Any, Optional
+
+import requests
+
+# Ajout du chemin racine pour les imports
+sys.path.append(str(Path(__file__).parent.parent))
+
+from utils.config import get_config
+from utils.logger import get_logger
+from utils.ollama_client import _payload
+from utils.prompt_builder import PromptBuilder, get_prompt_builder
+
+logger = get_logger("scripts.benchmark_prompt_prefill")
+
+
+def measure_prefill(prompt: str, model: str, base_url: str) -> Optional[Dict[str, Any]]:
+    """prompt_eval_count et durées (ms) d'Ollama pour un prompt, None si Ollama ne répond pas"""
+    payload = _payload(model, f"[benchmark {uuid.uuid4().hex}]\n{prompt}", stream=False, options={"num_predict": 1})
+    try:
+        start = time.perf_counter()
+        resp = requests.post(f"{base_url}/api/generate", json=payload, timeout=600)
+        resp.raise_for_status()
+        result = resp.json()
+    except (requests.RequestException, ValueError) as e:
+        logger.warning(f"⚠️ Mesure Ollama impossible: {e}")
+        return None
+    return {
+        "prompt_eval_count": result.get("prompt_eval_count"),
+        "prompt_eval_ms": round(result.get("prompt_eval_duration", 0) / 1e6, 1),
+        "load_ms": round(result.get("load_duration", 0) / 1e6, 1),
+        "wall_ms": round((time.perf_counter() - start) * 1000, 1),
+    }
+
+
+def _summary(rows: List[Dict[str, Any]], key: str) -> Optional[float]:
+    values = [row[key] for row in rows if row.get(key) is not None]
+    return round(statistics.mean(values), 1) if values else None
+
+
+async def run_benchmark(limit: int, measure: bool) -> Dict[str, Any]:
+    import basketcoach_mcp_server as server
+    sys.path.append(str(Path(__file__).parent))
+    from pregenerate_reports import recent_match_ids
+
+    config = get_config()
+    base_url = config.get("llm.ollama.base_url", "http://localhost:11434").rstrip("/")
+    after_builder = get_prompt_builder()
+    # Avant : tous les extraits retournés, complets, sans déduplication ni budget
+    before_builder = PromptBuilder(max_prompt_tokens=None, max_context_tokens=None, max_chunks=after_builder.max_chunks,
+                                   dedupe=False, counter=after_builder.counter)
+
+    if measure:
+        # Chargement du modèle hors mesure (keep_alive le garde ensuite en mémoire)
+        measure_prefill("Bonjour", server.COACHING_REPORT_MODEL, base_url)
+
+    rows = {"before": [], "after": []}
+    for match_id in recent_match_ids(server.df, limit):
+        for label, builder in (("before", before_builder), ("after", after_builder)):
+            built = await server.build_coaching_report_prompt(match_id, builder=builder)
+            if "error" in built:
+                logger.warning(f"⚠️ {match_id}: {built['error']}")
+                break
+            row = {
+                "match_id": match_id,
+                "estimated_tokens": built["prompt_info"]["prompt_tokens"],
+                "context_tokens": built["prompt_info"]["context"]["tokens"],
+                "chunks": built["prompt_info"]["context"]["kept"],
+            }
+            if measure:
+                row.update(measure_prefill(built["prompt"], server.COACHING_REPORT_MODEL, base_url) or {})
+            rows[label].append(row)
+
+    report = {"matches": len(rows["after"]), "budget": after_builder.signature(), "runs": rows}
+    for label in ("before", "after"):
+        report[label] = {key: _summary(rows[label], key) for key in
+                         ("estimated_tokens", "context_tokens", "prompt_eval_count", "prompt_eval_ms", "load_ms")}
+    before_ms, after_ms = report["before"]["prompt_eval_ms"], report["after"]["prompt_eval_ms"]
+    if before_ms and after_ms:
+        report["prefill_reduction_pct"] = round(100 * (1 - after_ms / before_ms), 1)
+    before_tokens, after_tokens = report["before"]["estimated_tokens"], report["after"]["estimated_tokens"]
+    if before_tokens and after_tokens:
+        report["token_reduction_pct"] = round(100 * (1 - after_tokens / before_tokens), 1)
+    return report
+
+
+def main():
+    """Compare le préremplissage des prompts de rapport avant / après budget de tokens"""
+    parser = argparse.ArgumentParser(description="Benchmark du préremplissage des prompts de rapport")
+    parser.add_argument("--limit", type=int, default=10, help="Nombre de matchs récents")
+    parser.add_argument("--no-ollama", action="store_true", help="Tokens estimés uniquement, sans appel à Ollama")
+    parser.add_argument("--output", help="Fichier JSON des résultats détaillés")
+    args = parser.parse_args()
+
+    report = asyncio.run(run_benchmark(args.limit, measure=not args.no_ollama))
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+    summary = {k: v for k, v in report.items() if k != "runs"}
+    print(json.dumps(summary, ensure_ascii=False, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,439 @@
+# basketcoach-mcp/scripts/benchmark_rag.py
+#!/usr/bin/env python3
+"""
+Benchmarks du système RAG
+
+  index  : rappel@k et latence des index IVF / HNSW face à l'index plat (recherche exacte),
+           sur les vecteurs du corpus (optionnellement répliqués pour simuler une bibliothèque plus large)
+  quantization : taille, latence et rappel@k des codes int8 / binaires (avec re-scoring float32)
+                 face à l'index float32 actuel
+  hybrid : latence et qualité (rappel@k, MRR) des recherches dense / BM25 / hybride
+           sur le jeu de requêtes françaises annotées (rag/benchmark/queries_fr.json)
+  eval   : évaluation du pipeline complet (rag.search.search_guidelines) : latences p50/p95/p99
+           encode / search / rerank, rappel@k et MRR ; sauvegarde d'une référence JSON et
+           détection des régressions (hors ligne, modèles lus dans le cache local)
+"""
+
+import sys
+import json
+import time
+import os
+import argparse
+import unicodedata
+from pathlib import Path
+from typing import Dict, List, Any
+
+import numpy as np
+import faiss
+
+# Ajout du chemin racine pour les imports
+sys.path.append(str(Path(__file__).parent.parent))
+
+from rag.indexing import build_index, get_index_params, default_nlist, quantized_search
+from utils.logger import get_logger
+
+logger = get_logger("scripts.benchmark_rag")
+
+VECTORS_PATH = Path("rag/embeddings/guidelines_vectors.npy")
+INDEX_PATH = Path("rag/embeddings/guidelines.index")
+QUERIES_PATH = Path("rag/benchmark/queries_fr.json")
+BASELINE_PATH = Path("rag/benchmark/baseline.json")
+
+
+# =============================================================================
+# OUTILS
+# =============================================================================
+
+def load_corpus_vectors() -> np.ndarray:
+    """Vecteurs normalisés du corpus (fichier de vecteurs, sinon reconstruits depuis l'index plat)"""
+    if VECTORS_PATH.exists():
+        return np.ascontiguousarray(np.load(VECTORS_PATH), dtype=np.float32)
+    index = faiss.read_index(str(INDEX_PATH))
+    return index.reconstruct_n(0, index.ntotal)
+
+
+def _normalized(vectors: np.ndarray) -> np.ndarray:
+    vectors = np.ascontiguousarray(vectors, dtype=np.float32)
+    faiss.normalize_L2(vectors)
+    return vectors
+
+
+def scale_corpus(vectors: np.ndarray, factor: int, noise: float, seed: int = 0) -> np.ndarray:
+    """Réplique le corpus avec du bruit gaussien pour simuler un corpus `factor` fois plus grand"""
+    if factor <= 1:
+        return vectors
+    rng = np.random.default_rng(seed)
+    copies = [vectors] + [vectors + rng.normal(0, noise, vectors.shape).astype(np.float32) for _ in range(factor - 1)]
+    return _normalized(np.vstack(copies))
+
+
+def make_queries(vectors: np.ndarray, n_queries: int, noise: float, seed: int = 1) -> np.ndarray:
+    """Requêtes synthétiques : extraits du corpus perturbés (proches d'une vraie question sur le document)"""
+    rng = np.random.default_rng(seed)
+    rows = rng.choice(len(vectors), n_queries, replace=n_queries > len(vectors))
+    return _normalized(vectors[rows] + rng.normal(0, noise, (n_queries, vectors.shape[1])).astype(np.float32))
+
+
+def percentiles(values_ms: List[float]) -> Dict[str, float]:
+    """p50 / p95 / p99 d'une série de latences (ms)"""
+    if not values_ms:
+        return {"p50": 0.0, "p95": 0.0, "p99": 0.0}
+    values = np.asarray(values_ms)
+    return {f"p{q}": round(float(np.percentile(values, q)), 3) for q in (50, 95, 99)}
+
+
+def timed_search(index, queries: np.ndarray, k: int):
+    """Recherche requête par requête (cas interactif) : (ids, latences en ms)"""
+    ids = np.empty((len(queries), k), dtype=np.int64)
+    latencies = []
+    for i, query in enumerate(queries):
+        start = time.perf_counter()
+        _, found = index.search(query[None, :], k)
+        latencies.append((time.perf_counter() - start) * 1000)
+        ids[i] = found[0]
+    return ids, latencies
+
+
+def recall_at_k(truth: np.ndarray, found: np.ndarray, k: int) -> float:
+    """Part des k plus proches voisins exacts retrouvés"""
+    hits = sum(len(set(t[:k]) & set(f[:k])) for t, f in zip(truth, found))
+    return hits / (len(truth) * k)
+
+
+def load_labelled_queries(path: Path = QUERIES_PATH) -> List[Dict[str, Any]]:
+    """Requêtes annotées : [{query, type, relevant_sources}]"""
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def _nfc(name: str) -> str:
+    """Noms de fichiers comparés en forme NFC (les noms lus sur disque peuvent être décomposés)"""
+    return unicodedata.normalize("NFC", name)
+
+
+def source_recall(results: List[Dict[str, Any]], relevant: List[str], k: int) -> float:
+    """Part des documents pertinents représentés dans les k premiers résultats"""
+    found = {_nfc(result["source"]) for result in results[:k]}
+    return len(found & {_nfc(source) for source in relevant}) / len(relevant)
+
+
+def reciprocal_rank(results: List[Dict[str, Any]], relevant: List[str], k: int) -> float:
+    """1 / rang du premier résultat issu d'un document pertinent (0 si absent des k premiers)"""
+    relevant = {_nfc(source) for source in relevant}
+    for rank, result in enumerate(results[:k], 1):
+        if _nfc(result["source"]) in relevant:
+            return 1.0 / rank
+    return 0.0
+
+
+def index_size_bytes(index) -> int:
+    if isinstance(index, faiss.IndexBinary):
+        return int(faiss.serialize_index_binary(index).nbytes)
+    return int(faiss.serialize_index(index).nbytes)
+
+
+def print_table(rows: List[Dict[str, Any]], columns: List[str]):
+    widths = {c: max(len(c), *(len(str(r.get(c, ""))) for r in rows)) for c in columns}
+    print(" | ".join(c.ljust(widths[c]) for c in columns))
+    print("-+-".join("-" * widths[c] for c in columns))
+    for row in rows:
+        print(" | ".join(str(row.get(c, "")).ljust(widths[c]) for c in columns))
+
+
+# =============================================================================
+# BENCHMARK INDEX
+# =============================================================================
+
+def benchmark_index(args) -> Dict[str, Any]:
+    """Rappel@k vs latence : IVF (nprobe) et HNSW (efSearch) contre l'index plat"""
+    corpus = scale_corpus(load_corpus_vectors(), args.scale, args.noise)
+    queries = make_queries(corpus, args.queries, args.noise)
+    params = get_index_params()
+    k = args.k
+    logger.info(f"📐 Corpus: {corpus.shape[0]} vecteurs de dimension {corpus.shape[1]}, {len(queries)} requêtes")
+
+    rows = []
+
+    start = time.perf_counter()
+    flat = build_index(corpus, "flat", params)
+    build_ms = (time.perf_counter() - start) * 1000
+    truth, latencies = timed_search(flat, queries, k)
+    rows.append({"index": "flat", "param": "-", "build_ms": round(build_ms, 1), "size_mb": round(index_size_bytes(flat) / 1e6, 2),
+                 f"recall@{k}": 1.0, **percentiles(latencies)})
+
+    nlist = int(params.get("ivf_nlist") or default_nlist(len(corpus)))
+    if len(corpus) >= 39:
+        start = time.perf_counter()
+        ivf = build_index(corpus, "ivf", dict(params, ivf_nlist=nlist))
+        build_ms = (time.perf_counter() - start) * 1000
+        size_mb = round(index_size_bytes(ivf) / 1e6, 2)
+        for nprobe in sorted({1, 4, 16, 64, nlist} & set(range(1, nlist + 1))):
+            ivf.nprobe = nprobe
+            found, latencies = timed_search(ivf, queries, k)
+            rows.append({"index": f"ivf{nlist}", "param": f"nprobe={nprobe}", "build_ms": round(build_ms, 1), "size_mb": size_mb,
+                         f"recall@{k}": round(recall_at_k(truth, found, k), 4), **percentiles(latencies)})
+
+    start = time.perf_counter()
+    hnsw = build_index(corpus, "hnsw", params)
+    build_ms = (time.perf_counter() - start) * 1000
+    size_mb = round(index_size_bytes(hnsw) / 1e6, 2)
+    for ef_search in (16, 32, 64, 128, 256):
+        hnsw.hnsw.efSearch = ef_search
+        found, latencies = timed_search(hnsw, queries, k)
+        rows.append({"index": f"hnsw{params['hnsw_m']}", "param": f"efSearch={ef_search}", "build_ms": round(build_ms, 1), "size_mb": size_mb,
+                     f"recall@{k}": round(recall_at_k(truth, found, k), 4), **percentiles(latencies)})
+
+    print_table(rows, ["index", "param", "build_ms", "size_mb", f"recall@{k}", "p50", "p95", "p99"])
+    return {"benchmark": "index", "n_vectors": int(corpus.shape[0]), "dimension": int(corpus.shape[1]),
+            "queries": len(queries), "k": k, "results": rows}
+
+
+# =============================================================================
+# BENCHMARK QUANTIFICATION
+# =============================================================================
+
+def benchmark_quantization(args) -> Dict[str, Any]:
+    """Codes int8 / binaires + re-scoring pleine précision contre l'index float32"""
+    corpus = scale_corpus(load_corpus_vectors(), args.scale, args.noise)
+    queries = make_queries(corpus, args.queries, args.noise)
+    k = args.k
+    n_vectors, dimension = corpus.shape
+    vectors_mb = round(corpus.nbytes / 1e6, 2)
+    logger.info(f"📐 Corpus: {n_vectors} vecteurs de dimension {dimension}, {len(queries)} requêtes, index {args.index_type}")
+
+    truth, _ = timed_search(build_index(corpus, "flat", get_index_params({"quantization": "none"})), queries, k)
+
+    rows = []
+    for quantization in ("none", "int8", "binary"):
+        params = get_index_params({"quantization": quantization})
+        start = time.perf_counter()
+        index = build_index(corpus, args.index_type, params)
+        build_ms = (time.perf_counter() - start) * 1000
+        size_bytes = index_size_bytes(index)
+
+        for factor in ([None] if quantization == "none" else args.rescore_factors):
+            found = np.empty((len(queries), k), dtype=np.int64)
+            latencies = []
+            for i, query in enumerate(queries):
+                start = time.perf_counter()
+                if factor is None:
+                    _, ids = index.search(query[None, :], k)
+                else:
+                    _, ids = quantized_search(index, corpus, query[None, :], k, factor)
+                latencies.append((time.perf_counter() - start) * 1000)
+                found[i] = -1
+                found[i, :ids.shape[1]] = ids[0]
+            rows.append({
+                "codes": quantization, "rescore": factor or "-", "build_ms": round(build_ms, 1),
+                "size_mb": round(size_bytes / 1e6, 3), "bytes/vect": round(size_bytes / n_vectors, 1),
+                # Vecteurs float32 lus en memory-map pour le re-scoring : seules les lignes candidates sont chargées
+                "rescore_kb/req": round((factor or 0) * k * dimension * 4 / 1e3, 1),
+                f"recall@{k}": round(recall_at_k(truth, found, k), 4), **percentiles(latencies),
+            })
+
+    print_table(rows, ["codes", "rescore", "build_ms", "size_mb", "bytes/vect", "rescore_kb/req", f"recall@{k}", "p50", "p95", "p99"])
+    return {"benchmark": "quantization", "index_type": args.index_type, "n_vectors": int(n_vectors),
+            "dimension": int(dimension), "vectors_mb": vectors_mb, "queries": len(queries), "k": k, "results": rows}
+
+
+# =============================================================================
+# BENCHMARK HYBRIDE
+# =============================================================================
+
+def benchmark_hybrid(args) -> Dict[str, Any]:
+    """Latence et qualité des modes dense / lexical / hybride sur les requêtes annotées"""
+    from rag.embed import rag_system
+
+    rag_system.initialize()
+    queries = load_labelled_queries(Path(args.queries_file))
+    sources = {_nfc(g["source"]) for g in rag_system.guidelines_data}
+    queries = [q for q in queries if {_nfc(source) for source in q["relevant_sources"]} & sources]
+    k = args.k
+    logger.info(f"📐 {len(rag_system.guidelines_data)} extraits, {len(queries)} requêtes annotées")
+
+    # Préchauffage (chargement paresseux du modèle et des tableaux memory-mappés)
+    for mode in args.modes:
+        rag_system.search(queries[0]["query"], top_k=k, mode=mode)
+
+    rows = []
+    for mode in args.modes:
+        for query_type in [None] + sorted({q["type"] for q in queries}):
+            subset = [q for q in queries if query_type is None or q["type"] == query_type]
+            latencies, recalls, reciprocal_ranks, fast_path = [], [], [], 0
+            for _ in range(args.repeat):
+                for q in subset:
+                    start = time.perf_counter()
+                    results = rag_system.search(q["query"], top_k=k, mode=mode)
+                    latencies.append((time.perf_counter() - start) * 1000)
+                    recalls.append(source_recall(results, q["relevant_sources"], k))
+                    reciprocal_ranks.append(reciprocal_rank(results, q["relevant_sources"], k))
+                    fast_path += bool(results) and results[0].get("retrieval") == "lexical"
+            rows.append({"mode": mode, "requêtes": query_type or "toutes", "n": len(subset),
+                         f"recall@{k}": round(float(np.mean(recalls)), 4), "mrr": round(float(np.mean(reciprocal_ranks)), 4),
+                         "bm25_seul": round(fast_path / len(latencies), 2), **percentiles(latencies)})
+
+    print_table(rows, ["mode", "requêtes", "n", f"recall@{k}", "mrr", "bm25_seul", "p50", "p95", "p99"])
+    return {"benchmark": "hybrid", "n_chunks": len(rag_system.guidelines_data), "queries": len(queries),
+            "k": k, "results": rows}
+
+
+# =============================================================================
+# ÉVALUATION DU PIPELINE
+# =============================================================================
+
+STAGES = ("encode_ms", "search_ms", "rerank_ms", "total_ms")
+
+
+def evaluate_pipeline(args) -> Dict[str, Any]:
+    """Latences par étape, rappel@k et MRR de search_guidelines sur les requêtes annotées"""
+    # Aucun accès réseau : les modèles doivent être présents dans le cache Hugging Face local
+    os.environ.setdefault("HF_HUB_OFFLINE", "1")
+    os.environ.setdefault("TRANSFORMERS_OFFLINE", "1")
+    from rag.search import search_guidelines
+
+    queries = load_labelled_queries(Path(args.queries_file))
+    k = args.k
+    search_guidelines(queries[0]["query"], max_results=k)  # préchauffage
+
+    latencies = {stage: [] for stage in STAGES}
+    recalls, reciprocal_ranks, per_query = [], [], []
+    for q in queries:
+        for repeat in range(args.repeat):
+            start = time.perf_counter()
+            response = search_guidelines(q["query"], max_results=k)
+            total_ms = (time.perf_counter() - start) * 1000
+            timings = response.get("analysis", {}).get("timings", {})
+            for stage in STAGES[:-1]:
+                latencies[stage].append(float(timings.get(stage, 0.0)))
+            latencies["total_ms"].append(total_ms)
+
+        results = response.get("search_results", [])
+        recall = source_recall(results, q["relevant_sources"], k)
+        rr = reciprocal_rank(results, q["relevant_sources"], k)
+        recalls.append(recall)
+        reciprocal_ranks.append(rr)
+        per_query.append({"query": q["query"], "type": q["type"], f"recall@{k}": round(recall, 4), "rr": round(rr, 4),
+                          "reranked": response.get("analysis", {}).get("rerank", {}).get("applied", False)})
+
+    report = {
+        "benchmark": "eval",
+        "k": k,
+        "queries": len(queries),
+        "quality": {f"recall@{k}": round(float(np.mean(recalls)), 4), "mrr": round(float(np.mean(reciprocal_ranks)), 4)},
+        "latency_ms": {stage: percentiles(values) for stage, values in latencies.items()},
+        "per_query": per_query,
+    }
+
+    print(f"Qualité : recall@{k} = {report['quality'][f'recall@{k}']}, MRR = {report['quality']['mrr']}")
+    print_table([{"étape": stage, **report["latency_ms"][stage]} for stage in STAGES], ["étape", "p50", "p95", "p99"])
+
+    if args.compare:
+        regressions = compare_to_baseline(report, Path(args.compare), args.quality_tolerance, args.latency_tolerance)
+        report["regressions"] = regressions
+        for regression in regressions:
+            print(f"❌ Régression : {regression}")
+        if not regressions:
+            print(f"✅ Aucune régression par rapport à {args.compare}")
+
+    if args.save_baseline:
+        with open(args.save_baseline, 'w', encoding='utf-8') as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+        logger.info(f"💾 Référence écrite dans {args.save_baseline}")
+
+    return report
+
+
+def compare_to_baseline(report: Dict[str, Any], baseline_path: Path,
+                        quality_tolerance: float, latency_tolerance: float) -> List[str]:
+    """
+    Régressions par rapport à une référence : baisse de qualité au-delà de quality_tolerance (absolue),
+    p95 d'une étape au-delà de latency_tolerance × la référence (et d'au moins 1 ms)
+    """
+    with open(baseline_path, 'r', encoding='utf-8') as f:
+        baseline = json.load(f)
+
+    regressions = []
+    if baseline.get("k") != report["k"]:
+        regressions.append(f"k différent de la référence ({baseline.get('k')} vs {report['k']})")
+        return regressions
+
+    for metric, value in report["quality"].items():
+        reference = baseline.get("quality", {}).get(metric)
+        if reference is not None and value < reference - quality_tolerance:
+            regressions.append(f"{metric} {reference} → {value}")
+
+    for stage, values in report["latency_ms"].items():
+        reference = baseline.get("latency_ms", {}).get(stage, {}).get("p95")
+        if reference is not None and values["p95"] > max(reference * latency_tolerance, reference + 1.0):
+            regressions.append(f"p95 {stage} {reference} → {values['p95']} ms")
+    return regressions
+
+
+# =============================================================================
+# POINT D'ENTRÉE
+# =============================================================================
+
+def positive_int(value: str) -> int:
+    """Entier ≥ 1 (nombre de passes) pour argparse"""
+    number = int(value)
+    if number < 1:
+        raise argparse.ArgumentTypeError(f"doit être ≥ 1 (reçu {value})")
+    return number
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmarks du système RAG")
+    parser.add_argument("--output", help="Fichier JSON où écrire les résultats")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    index_parser = subparsers.add_parser("index", help="Rappel@k vs latence des index ANN face à l'index plat")
+    index_parser.add_argument("--k", type=int, default=10)
+    index_parser.add_argument("--queries", type=int, default=200)
+    index_parser.add_argument("--scale", type=int, default=1,
+                              help="Facteur de réplication du corpus (simulation d'une bibliothèque plus large)")
+    index_parser.add_argument("--noise", type=float, default=0.02,
+                              help="Écart-type du bruit appliqué aux copies et aux requêtes")
+    index_parser.set_defaults(func=benchmark_index)
+
+    quant_parser = subparsers.add_parser("quantization", help="Codes int8 / binaires avec re-scoring face à l'index float32")
+    quant_parser.add_argument("--k", type=int, default=10)
+    quant_parser.add_argument("--queries", type=int, default=200)
+    quant_parser.add_argument("--scale", type=int, default=1)
+    quant_parser.add_argument("--noise", type=float, default=0.02)
+    quant_parser.add_argument("--index-type", default="flat", choices=["flat", "ivf", "hnsw"])
+    quant_parser.add_argument("--rescore-factors", type=int, nargs="+", default=[1, 2, 4, 8, 16])
+    quant_parser.set_defaults(func=benchmark_quantization)
+
+    hybrid_parser = subparsers.add_parser("hybrid", help="Recherche dense vs BM25 vs hybride sur les requêtes annotées")
+    hybrid_parser.add_argument("--k", type=int, default=5)
+    hybrid_parser.add_argument("--queries-file", default=str(QUERIES_PATH))
+    hybrid_parser.add_argument("--modes", nargs="+", default=["dense", "lexical", "hybrid"],
+                               choices=["dense", "lexical", "hybrid"])
+    hybrid_parser.add_argument("--repeat", type=positive_int, default=3, help="Passes sur le jeu de requêtes (stabilise les percentiles)")
+    hybrid_parser.set_defaults(func=benchmark_hybrid)
+
+    eval_parser = subparsers.add_parser("eval", help="Évaluation du pipeline de recherche et comparaison à une référence")
+    eval_parser.add_argument("--k", type=int, default=3, help="Nombre de résultats demandés (max_results)")
+    eval_parser.add_argument("--queries-file", default=str(QUERIES_PATH))
+    eval_parser.add_argument("--repeat", type=positive_int, default=3, help="Passes par requête (au moins 1)")
+    eval_parser.add_argument("--save-baseline", nargs="?", const=str(BASELINE_PATH),
+                             help=f"Enregistre les résultats comme référence (défaut {BASELINE_PATH})")
+    eval_parser.add_argument("--compare", nargs="?", const=str(BASELINE_PATH),
+                             help=f"Compare à une référence (défaut {BASELINE_PATH}), code retour 1 en cas de régression")
+    eval_parser.add_argument("--quality-tolerance", type=float, default=0.02)
+    eval_parser.add_argument("--latency-tolerance", type=float, default=1.5)
+    eval_parser.set_defaults(func=evaluate_pipeline)
+
+    args = parser.parse_args()
+    report = args.func(args)
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+        logger.info(f"💾 Résultats écrits dans {args.output}")
+
+    if report.get("regressions"):
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,32 @@
+# basketcoach-mcp/scripts/build_rag_index.py
+#!/usr/bin/env python3
+"""
+Construction / mise à jour incrémentale de l'index RAG des guidelines
+"""
+
+import sys
+import json
+import argparse
+from pathlib import Path
+
+# Ajout du chemin racine pour les imports
+sys.path.append(str(Path(__file__).parent.parent))
+
+from rag.embed import rag_system
+from utils.logger import get_logger
+
+logger = get_logger("scripts.build_rag_index")
+
+def main():
+    """Synchronise l'index avec rag/guidelines/"""
+    parser = argparse.ArgumentParser(description="Mise à jour de l'index RAG des guidelines")
+    parser.add_argument("--force", action="store_true",
+                       help="Ignorer le manifeste et ré-extraire tous les PDF")
+    args = parser.parse_args()
+
+    logger.info("📚 Synchronisation des guidelines...")
+    stats = rag_system.sync_guidelines(force=args.force)
+    print(json.dumps(stats, ensure_ascii=False, indent=2))
+
+if __name__ == "__main__":
+    main()
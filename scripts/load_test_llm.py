@@ -0,0 +1,215 @@
+# basketcoach-mcp/scripts/load_test_llm.py
+#!/usr/bin/env python3
+"""
+Test de charge du chemin LLM : ask_coach_ai et generate_coaching_report appelés en parallèle
+contre Ollama ou le stand-in local (scripts/ollama_standin.py, démarré automatiquement avec --standin)
+
+Rapporte débit (requêtes/s, tokens/s), latences p50/p95/p99/max, temps jusqu'au premier token,
+taux d'échec et métriques de l'ordonnanceur LLM. Les caches (sémantique, rapports) sont désactivés
+par défaut pour que chaque requête atteigne le LLM.
+"""
+
+import sys
+import json
+import time
+import socket
+import asyncio
+import argparse
+import subprocess
+from pathlib import Path
+from typing import Dict, Any, List, Optional
+
+# Ajout du chemin racine pour les imports
+sys.path.append(str(Path(__file__).parent.parent))
+
+import requests
+
+from utils.config import get_config
+from utils.logger import get_logger
+
+logger = get_logger("scripts.load_test_llm")
+
+QUESTIONS = [
+    "Comment défendre sur un pick-and-roll haut ?",
+    "Quel échauffement avant un match à 20h ?",
+    "Comment améliorer le repli défensif après un tir raté ?",
+    "Quelle rotation adopter avec deux meneuses fatiguées ?",
+    "Comment attaquer une zone 2-3 ?",
+    "Quels exercices pour le rebond offensif ?",
+]
+
+
+def _percentile(values: List[float], pct: float) -> Optional[float]:
+    if not values:
+        return None
+    ordered = sorted(values)
+    return round(ordered[min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))], 1)
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def start_standin(args) -> subprocess.Popen:
+    """Démarre le stand-in Ollama et attend qu'il réponde"""
+    port = args.standin_port or _free_port()
+    command = [
+        sys.executable, str(Path(__file__).parent / "ollama_standin.py"), "--port", str(port),
+        "--load-ms", str(args.load_ms), "--prefill-tokens-per-s", str(args.prefill_tokens_per_s),
+        "--tokens-per-s", str(args.tokens_per_s), "--max-tokens", str(args.max_tokens),
+        "--parallel", str(args.parallel), "--time-scale", str(args.time_scale),
+        "--error-rate", str(args.error_rate), "--drop-rate", str(args.drop_rate), "--seed", "42",
+    ]
+    process = subprocess.Popen(command)
+    base_url = f"http://127.0.0.1:{port}"
+    for _ in range(100):
+        try:
+            if requests.get(f"{base_url}/api/tags", timeout=1).status_code == 200:
+                args.base_url = base_url
+                logger.info(f"✅ Stand-in Ollama prêt sur {base_url}")
+                return process
+        except requests.RequestException:
+            pass
+        if process.poll() is not None:
+            break
+        time.sleep(0.1)
+    process.terminate()
+    raise RuntimeError("Le stand-in Ollama n'a pas démarré")
+
+
+def configure(args):
+    """Oriente le client Ollama vers la cible et désactive les caches (avant l'import du serveur)"""
+    config = get_config()
+    config.set("llm.ollama.base_url", args.base_url)
+    if args.llm_workers:
+        config.set("llm.scheduler.workers", args.llm_workers)
+    if not args.with_caches:
+        config.set("llm.semantic_cache.enabled", False)
+        config.set("llm.report_cache.enabled", False)
+
+
+async def run_load(tool: str, total: int, concurrency: int, shared_prompts: bool) -> Dict[str, Any]:
+    import basketcoach_mcp_server as server
+    from utils.ollama_client import ollama_status
+
+    sys.path.append(str(Path(__file__).parent))
+    from pregenerate_reports import recent_match_ids
+    match_ids = recent_match_ids(server.df, 20) or ["inconnu"]
+
+    def request_for(i: int):
+        kind = tool if tool != "mixed" else ("report" if i % 4 == 0 else "ask")
+        if kind == "report":
+            return kind, server.generate_coaching_report(match_ids[i % len(match_ids)])
+        question = QUESTIONS[i % len(QUESTIONS)]
+        if not shared_prompts:
+            question = f"{question} (variante {i})"  # prompts distincts : pas de regroupement single-flight
+        return kind, server.ask_coach_ai(question, bypass_cache=True)
+
+    semaphore = asyncio.Semaphore(concurrency)
+    samples: List[Dict[str, Any]] = []
+
+    async def one(i: int):
+        async with semaphore:
+            kind, call = request_for(i)
+            start = time.perf_counter()
+            try:
+                result = json.loads(await call)
+                text = result.get("answer") or result.get("report") or ""
+                generation = result.get("generation", {})
+                ok = "error" not in result and not text.startswith("[IA locale") and not generation.get("interrupted")
+                if ok:
+                    error = None
+                else:
+                    error = result.get("error") or ("flux interrompu" if generation.get("interrupted") else text[:80])
+            except Exception as e:
+                generation, ok, error = {}, False, str(e)
+            samples.append({
+                "kind": kind, "ok": ok, "error": error,
+                "latency_ms": (time.perf_counter() - start) * 1000,
+                "ttft_ms": generation.get("ttft_ms"), "queue_ms": generation.get("queue_ms"),
+                "tokens": generation.get("tokens") or 0, "shared": generation.get("shared", False),
+            })
+
+    start = time.perf_counter()
+    await asyncio.gather(*(one(i) for i in range(total)))
+    wall_s = time.perf_counter() - start
+
+    def summarize(rows: List[Dict[str, Any]]) -> Dict[str, Any]:
+        ok_rows = [r for r in rows if r["ok"]]
+        latencies = [r["latency_ms"] for r in ok_rows]
+        ttfts = [r["ttft_ms"] for r in ok_rows if r["ttft_ms"] is not None]
+        queues = [r["queue_ms"] for r in ok_rows if r["queue_ms"] is not None]
+        return {
+            "requests": len(rows),
+            "ok": len(ok_rows),
+            "failed": len(rows) - len(ok_rows),
+            "shared": sum(1 for r in rows if r["shared"]),
+            "throughput_rps": round(len(ok_rows) / wall_s, 3) if wall_s else None,
+            "tokens_per_s": round(sum(r["tokens"] for r in ok_rows) / wall_s, 1) if wall_s else None,
+            "latency_ms": {p: _percentile(latencies, q) for p, q in (("p50", 50), ("p95", 95), ("p99", 99), ("max", 100))},
+            "ttft_ms": {p: _percentile(ttfts, q) for p, q in (("p50", 50), ("p95", 95), ("max", 100))},
+            "queue_ms": {p: _percentile(queues, q) for p, q in (("p50", 50), ("p95", 95), ("max", 100))},
+        }
+
+    report = {
+        "tool": tool,
+        "concurrency": concurrency,
+        "wall_s": round(wall_s, 2),
+        "overall": summarize(samples),
+        "by_tool": {kind: summarize([s for s in samples if s["kind"] == kind]) for kind in sorted({s["kind"] for s in samples})},
+        "errors": sorted({s["error"] for s in samples if s["error"]})[:10],
+        "scheduler": ollama_status()["scheduler"],
+    }
+    return report
+
+
+def main():
+    """Test de charge ask_coach_ai / generate_coaching_report"""
+    config = get_config()
+    parser = argparse.ArgumentParser(description="Test de charge du chemin LLM")
+    parser.add_argument("--tool", choices=["ask", "report", "mixed"], default="mixed")
+    parser.add_argument("--requests", type=int, default=40)
+    parser.add_argument("--concurrency", type=int, default=8, help="Requêtes simultanées côté clients")
+    parser.add_argument("--base-url", default=config.get("llm.ollama.base_url", "http://localhost:11434"))
+    parser.add_argument("--llm-workers", type=int, default=None, help="llm.scheduler.workers pour ce test")
+    parser.add_argument("--shared-prompts", action="store_true",
+                        help="Questions identiques répétées (mesure du regroupement single-flight)")
+    parser.add_argument("--with-caches", action="store_true", help="Garder les caches sémantique et rapports")
+    parser.add_argument("--output", help="Fichier JSON du rapport")
+
+    standin = parser.add_argument_group("stand-in Ollama")
+    standin.add_argument("--standin", action="store_true", help="Démarrer le stand-in local et le cibler")
+    standin.add_argument("--standin-port", type=int, default=None)
+    standin.add_argument("--load-ms", type=float, default=2000)
+    standin.add_argument("--prefill-tokens-per-s", type=float, default=200)
+    standin.add_argument("--tokens-per-s", type=float, default=20)
+    standin.add_argument("--max-tokens", type=int, default=256)
+    standin.add_argument("--parallel", type=int, default=1)
+    standin.add_argument("--time-scale", type=float, default=1.0)
+    standin.add_argument("--error-rate", type=float, default=0.0)
+    standin.add_argument("--drop-rate", type=float, default=0.0)
+    args = parser.parse_args()
+
+    process = start_standin(args) if args.standin else None
+    try:
+        configure(args)
+        report = asyncio.run(run_load(args.tool, args.requests, args.concurrency, args.shared_prompts))
+        report["target"] = args.base_url
+        if process is not None:
+            report["standin"] = requests.get(f"{args.base_url}/standin/stats", timeout=5).json()
+    finally:
+        if process is not None:
+            process.terminate()
+            process.wait(timeout=10)
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+    print(json.dumps(report, ensure_ascii=False, indent=2))
+    sys.exit(1 if report["overall"]["failed"] else 0)
+
+
+if __name__ == "__main__":
+    main()
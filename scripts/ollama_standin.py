@@ -0,0 +1,253 @@
+# basketcoach-mcp/scripts/ollama_standin.py
+#!/usr/bin/env python3
+"""
+Serveur Ollama de substitution pour les tests de charge du chemin LLM (CI, portables sans GPU)
+
+Implémente /api/tags, /api/generate et /api/chat (réponses en flux NDJSON ou JSON unique) avec des temps
+simulés réalistes : chargement du modèle (keep_alive respecté), préremplissage proportionnel à la longueur
+du prompt, débit de génération en tokens/s, nombre de générations parallèles borné (OLLAMA_NUM_PARALLEL).
+Injection de pannes : erreurs HTTP 500, requêtes bloquées, flux coupés, modèle absent.
+"""
+
+import sys
+import json
+import math
+import time
+import random
+import asyncio
+import argparse
+import hashlib
+from pathlib import Path
+from datetime import datetime, timezone
+from typing import Dict, Any, Optional, AsyncIterator
+
+# Ajout du chemin racine pour les imports
+sys.path.append(str(Path(__file__).parent.parent))
+
+from utils.logger import get_logger
+
+logger = get_logger("scripts.ollama_standin")
+
+DEFAULT_SETTINGS = {
+    "models": ["llama3.1:8b"],
+    "load_ms": 2000.0,              # chargement du modèle en mémoire (premier appel, keep_alive expiré)
+    "prefill_tokens_per_s": 200.0,  # évaluation du prompt
+    "tokens_per_s": 20.0,           # génération
+    "max_tokens": 256,              # tokens générés au plus (num_predict plus petit prioritaire)
+    "chars_per_token": 3.5,
+    "parallel": 1,                  # générations simultanées, les suivantes attendent
+    "time_scale": 1.0,              # multiplie toutes les durées simulées (0.1 = 10x plus rapide)
+    "error_rate": 0.0,              # proportion de réponses HTTP 500
+    "stall_rate": 0.0,              # proportion de requêtes bloquées stall_s secondes avant de répondre
+    "stall_s": 600.0,
+    "drop_rate": 0.0,               # proportion de flux coupés à mi-génération
+    "missing_model": False,         # aucun modèle installé (/api/tags vide, 404 sur génération)
+    "seed": None,
+}
+
+_VOCABULARY = (
+    "défense", "rebond", "transition", "pick-and-roll", "rotation", "intensité", "communication", "spacing",
+    "contre-attaque", "écran", "lecture", "rythme", "adresse", "pression", "repli", "aide", "tir", "passe",
+    "leadership", "récupération", "placement", "agressivité", "zone", "individuelle", "banc", "minutes",
+    "l'équipe", "doit", "travailler", "la", "le", "sur", "en", "et", "avec", "pour", "chaque", "possession",
+)
+
+
+def _parse_keep_alive(value: Any, default_s: float = 300.0) -> Optional[float]:
+    """Durée de maintien en mémoire en secondes (None = indéfiniment), format Ollama : 30m, 90s, 1h, -1, 0"""
+    if value is None:
+        return default_s
+    if isinstance(value, (int, float)):
+        return None if value < 0 else float(value)
+    text = str(value).strip()
+    units = {"ms": 0.001, "s": 1, "m": 60, "h": 3600}
+    for unit in ("ms", "s", "m", "h"):
+        if text.endswith(unit) and text[:-len(unit)].lstrip("-").replace(".", "", 1).isdigit():
+            seconds = float(text[:-len(unit)]) * units[unit]
+            return None if seconds < 0 else seconds
+    try:
+        seconds = float(text)
+        return None if seconds < 0 else seconds
+    except ValueError:
+        return default_s
+
+
+def _words(prompt: str, count: int):
+    """Texte déterministe pour un prompt donné (un mot par token)"""
+    rng = random.Random(hashlib.sha256(prompt.encode("utf-8")).hexdigest())
+    return [rng.choice(_VOCABULARY) for _ in range(count)]
+
+
+def create_app(settings: Optional[Dict[str, Any]] = None):
+    """Application FastAPI compatible avec le sous-ensemble de l'API Ollama utilisé par le projet"""
+    from fastapi import FastAPI
+    from fastapi.responses import JSONResponse, StreamingResponse
+
+    settings = {**DEFAULT_SETTINGS, **(settings or {})}
+    rng = random.Random(settings["seed"])
+    scale = float(settings["time_scale"])
+    slots = asyncio.Semaphore(int(settings["parallel"]))
+    loaded: Dict[str, Optional[float]] = {}   # modèle → fin du keep_alive (None = indéfiniment)
+    stats = {"requests": 0, "in_flight": 0, "max_in_flight": 0, "queued": 0, "max_queued": 0,
+             "loads": 0, "errors_injected": 0, "stalls_injected": 0, "drops_injected": 0,
+             "prompt_tokens": 0, "eval_tokens": 0}
+
+    app = FastAPI(title="Ollama stand-in (BasketCoach)")
+
+    def installed() -> list:
+        return [] if settings["missing_model"] else list(settings["models"])
+
+    def ensure_loaded(model: str, keep_alive: Any) -> float:
+        """Durée de chargement simulée (0 si le modèle est encore en mémoire), met à jour le keep_alive"""
+        now = time.monotonic()
+        expires = loaded.get(model, 0.0)
+        cold = model not in loaded or (expires is not None and expires < now)
+        keep = _parse_keep_alive(keep_alive)
+        loaded[model] = None if keep is None else now + keep
+        if cold:
+            stats["loads"] += 1
+            return settings["load_ms"] / 1000 * scale
+        return 0.0
+
+    def chunk(model: str, text: str, chat: bool, done: bool, **extra) -> Dict[str, Any]:
+        body = {"model": model, "created_at": datetime.now(timezone.utc).isoformat(), "done": done}
+        if chat:
+            body["message"] = {"role": "assistant", "content": text}
+        else:
+            body["response"] = text
+        body.update(extra)
+        return body
+
+    async def handle(payload: Dict[str, Any], chat: bool):
+        stats["requests"] += 1
+        model = payload.get("model") or settings["models"][0]
+        if model not in installed():
+            return JSONResponse({"error": f"model '{model}' not found, try pulling it first"}, status_code=404)
+
+        if chat:
+            prompt = "\n".join(str(m.get("content", "")) for m in payload.get("messages", []))
+        else:
+            prompt = str(payload.get("prompt", ""))
+        options = payload.get("options") or {}
+        prompt_tokens = max(1, math.ceil(len(prompt) / settings["chars_per_token"]))
+        eval_tokens = int(min(settings["max_tokens"], options.get("num_predict") or settings["max_tokens"]))
+        if eval_tokens < 0:
+            eval_tokens = int(settings["max_tokens"])
+        stream = payload.get("stream", True)
+
+        roll = rng.random()
+        if roll < settings["error_rate"]:
+            stats["errors_injected"] += 1
+            return JSONResponse({"error": "panne simulée par le stand-in"}, status_code=500)
+        if roll < settings["error_rate"] + settings["stall_rate"]:
+            stats["stalls_injected"] += 1
+            await asyncio.sleep(settings["stall_s"])
+        drop = rng.random() < settings["drop_rate"]
+
+        async def run() -> AsyncIterator[Dict[str, Any]]:
+            # file d'attente des générations : au plus `parallel` en cours, comme OLLAMA_NUM_PARALLEL
+            stats["queued"] += 1
+            stats["max_queued"] = max(stats["max_queued"], stats["queued"])
+            try:
+                await slots.acquire()
+            finally:
+                stats["queued"] -= 1
+            stats["in_flight"] += 1
+            stats["max_in_flight"] = max(stats["max_in_flight"], stats["in_flight"])
+            start = time.perf_counter()
+            try:
+                load_s = ensure_loaded(model, payload.get("keep_alive"))
+                await asyncio.sleep(load_s)
+                prefill_s = prompt_tokens / settings["prefill_tokens_per_s"] * scale
+                await asyncio.sleep(prefill_s)
+                token_s = scale / settings["tokens_per_s"]
+                words = _words(prompt, eval_tokens)
+                for i, word in enumerate(words):
+                    if drop and i >= len(words) // 2:
+                        stats["drops_injected"] += 1
+                        raise ConnectionResetError("flux coupé par le stand-in")
+                    await asyncio.sleep(token_s)
+                    yield chunk(model, word + " ", chat, done=False)
+                stats["prompt_tokens"] += prompt_tokens
+                stats["eval_tokens"] += eval_tokens
+                yield chunk(
+                    model, "", chat, done=True, done_reason="length" if eval_tokens >= settings["max_tokens"] else "stop",
+                    total_duration=int((time.perf_counter() - start) * 1e9), load_duration=int(load_s * 1e9),
+                    prompt_eval_count=prompt_tokens, prompt_eval_duration=int(prefill_s * 1e9),
+                    eval_count=eval_tokens, eval_duration=int(eval_tokens * token_s * 1e9),
+                )
+            finally:
+                stats["in_flight"] -= 1
+                slots.release()
+
+        if stream:
+            async def ndjson():
+                async for part in run():
+                    yield json.dumps(part, ensure_ascii=False) + "\n"
+            return StreamingResponse(ndjson(), media_type="application/x-ndjson")
+
+        parts, final = [], {}
+        try:
+            async for part in run():
+                if part["done"]:
+                    final = part
+                else:
+                    parts.append(part["message"]["content"] if chat else part["response"])
+        except ConnectionResetError:
+            return JSONResponse({"error": "génération interrompue (simulation)"}, status_code=500)
+        text = "".join(parts)
+        final.pop("message" if chat else "response", None)
+        return chunk(model, text, chat, done=True, **{k: v for k, v in final.items() if k not in ("model", "created_at", "done")})
+
+    @app.get("/api/tags")
+    async def tags():
+        return {"models": [{"name": name, "model": name, "size": 0, "details": {"family": "standin"}}
+                           for name in installed()]}
+
+    @app.get("/api/version")
+    async def version():
+        return {"version": "0.0.0-standin"}
+
+    @app.post("/api/generate")
+    async def generate(payload: Dict[str, Any]):
+        return await handle(payload, chat=False)
+
+    @app.post("/api/chat")
+    async def chat(payload: Dict[str, Any]):
+        return await handle(payload, chat=True)
+
+    @app.get("/standin/stats")
+    async def standin_stats():
+        return {**stats, "loaded": sorted(loaded), "settings": settings}
+
+    return app
+
+
+def main():
+    import uvicorn
+
+    parser = argparse.ArgumentParser(description="Serveur Ollama de substitution (tests de charge)")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=11435)
+    parser.add_argument("--model", action="append", dest="models", help="Modèle installé (répétable)")
+    parser.add_argument("--load-ms", type=float, default=DEFAULT_SETTINGS["load_ms"])
+    parser.add_argument("--prefill-tokens-per-s", type=float, default=DEFAULT_SETTINGS["prefill_tokens_per_s"])
+    parser.add_argument("--tokens-per-s", type=float, default=DEFAULT_SETTINGS["tokens_per_s"])
+    parser.add_argument("--max-tokens", type=int, default=DEFAULT_SETTINGS["max_tokens"])
+    parser.add_argument("--parallel", type=int, default=DEFAULT_SETTINGS["parallel"])
+    parser.add_argument("--time-scale", type=float, default=DEFAULT_SETTINGS["time_scale"])
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--stall-rate", type=float, default=0.0)
+    parser.add_argument("--stall-s", type=float, default=DEFAULT_SETTINGS["stall_s"])
+    parser.add_argument("--drop-rate", type=float, default=0.0)
+    parser.add_argument("--missing-model", action="store_true")
+    parser.add_argument("--seed", type=int, default=None)
+    args = parser.parse_args()
+
+    settings = {k: v for k, v in vars(args).items() if k not in ("host", "port") and v is not None}
+    logger.info(f"🚀 Stand-in Ollama sur http://{args.host}:{args.port} ({settings})")
+    uvicorn.run(create_app(settings), host=args.host, port=args.port, log_level="warning")
+
+
+if __name__ == "__main__":
+    main()
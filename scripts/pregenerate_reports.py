@@ -0,0 +1,208 @@
+# basketcoach-mcp/scripts/pregenerate_reports.py
+#!/usr/bin/env python3
+"""
+Pré-génération nocturne des rapports de coaching
+Génère les rapports des matchs récents absents du cache (nouveaux matchs, données ou modèles modifiés)
+avec une concurrence bornée et une reprise possible après interruption
+
+Processus distinct des serveurs : la file à priorités de l'ordonnanceur LLM ne classe que ses propres requêtes.
+Face aux serveurs, seuls jouent les créneaux de la machine (llm.scheduler.host_slots) : requêtes BACKGROUND limitées
+aux créneaux de fond, concurrence plafonnée à OLLAMA_NUM_PARALLEL. Avec workers = 1, une question posée pendant
+la pré-génération attend la fin du rapport en cours.
+"""
+
+import os
+import sys
+import json
+import time
+import asyncio
+import hashlib
+import argparse
+from pathlib import Path
+from typing import Dict, Any, List, Optional
+
+# Ajout du chemin racine pour les imports
+sys.path.append(str(Path(__file__).parent.parent))
+
+import pandas as pd
+
+from utils.config import get_config
+from utils.logger import get_logger
+
+logger = get_logger("scripts.pregenerate_reports")
+
+
+def ollama_parallelism() -> int:
+    """Générations simultanées acceptées par Ollama (OLLAMA_NUM_PARALLEL, sinon llm.scheduler.workers)"""
+    value = os.environ.get("OLLAMA_NUM_PARALLEL") or get_config().get("llm.scheduler.workers", 1)
+    try:
+        return max(1, int(value))
+    except ValueError:
+        return 1
+
+
+def recent_match_ids(df: pd.DataFrame, limit: Optional[int] = None) -> List[str]:
+    """Identifiants des matchs, du plus récent au plus ancien (date, puis saison et numéro de l'identifiant)"""
+    if df.empty:
+        return []
+    dates = pd.to_datetime(df['date'], errors='coerce') if 'date' in df.columns else pd.Series(pd.NaT, index=df.index)
+    matches = dates.groupby(df['match_id']).max().to_frame('date')
+    # data_<numéro>_<saison> : tri de repli quand la date est absente
+    parts = matches.index.to_series().str.extract(r'_(\d+)_(\d{4})$')
+    matches['season'] = pd.to_numeric(parts[1], errors='coerce')
+    matches['number'] = pd.to_numeric(parts[0], errors='coerce')
+    ordered = matches.sort_values(['date', 'season', 'number'], ascending=False, na_position='last').index.tolist()
+    return ordered[:limit] if limit else ordered
+
+
+class Checkpoint:
+    """
+    Avancement de la pré-génération (fichier JSON réécrit après chaque match) :
+    reprise après interruption sans retenter les matchs en échec tant que le prompt et les modèles sont inchangés
+    """
+
+    def __init__(self, path: Path, run_key: str, reset: bool = False):
+        self.path = Path(path)
+        self.state = {"run_key": run_key, "done": [], "failed": {}, "started_at": time.time()}
+        if not reset and self.path.exists():
+            try:
+                with open(self.path, 'r', encoding='utf-8') as f:
+                    saved = json.load(f)
+                if saved.get("run_key") == run_key:
+                    self.state = saved
+                    logger.info(f"🔁 Reprise : {len(saved['done'])} rapports faits, {len(saved['failed'])} en échec")
+            except (OSError, ValueError) as e:
+                logger.warning(f"⚠️ Checkpoint illisible, nouveau départ: {e}")
+
+    def pending(self, match_ids: List[str], retry_failed: bool = False) -> List[str]:
+        skip = set(self.state["done"]) | (set() if retry_failed else set(self.state["failed"]))
+        return [match_id for match_id in match_ids if match_id not in skip]
+
+    def mark(self, match_id: str, error: Optional[str] = None):
+        if error:
+            self.state["failed"][match_id] = error
+        else:
+            self.state["failed"].pop(match_id, None)
+            if match_id not in self.state["done"]:
+                self.state["done"].append(match_id)
+        self.save()
+
+    def save(self):
+        self.state["updated_at"] = time.time()
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.path.with_suffix(".tmp")
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(self.state, f, ensure_ascii=False, indent=2)
+        tmp_path.replace(self.path)
+
+
+async def pregenerate_reports(limit: Optional[int] = None, concurrency: Optional[int] = None,
+                              match_ids: Optional[List[str]] = None, reset: bool = False,
+                              retry_failed: bool = False, dry_run: bool = False) -> Dict[str, Any]:
+    """
+    Génère les rapports absents du cache, au plus min(concurrency, OLLAMA_NUM_PARALLEL) à la fois,
+    en requêtes BACKGROUND (créneaux de fond de la machine, voir l'en-tête du module).
+
+    Returns:
+        statistiques {candidates, cached, generated, failed, skipped, duration_s}
+    """
+    import basketcoach_mcp_server as server
+    from utils.report_cache import get_report_cache
+    from utils.llm_scheduler import llm_priority, BACKGROUND
+
+    config = get_config()
+    report_cache = get_report_cache()
+    if report_cache is None:
+        logger.warning("⚠️ Cache des rapports désactivé (llm.report_cache.enabled) : rien à pré-générer")
+        return {"candidates": 0, "cached": 0, "generated": 0, "failed": 0, "skipped": 0, "duration_s": 0}
+
+    limit = limit if limit is not None else config.get("llm.pregenerate.max_matches", 50)
+    concurrency = max(1, int(concurrency or config.get("llm.pregenerate.concurrency", 1)))
+    parallelism = ollama_parallelism()
+    if concurrency > parallelism:
+        logger.warning(f"⚠️ Concurrence {concurrency} ramenée à {parallelism} (OLLAMA_NUM_PARALLEL) : "
+                       f"les rapports en trop attendraient dans la file d'Ollama")
+        concurrency = parallelism
+    candidates = [str(m) for m in match_ids] if match_ids else recent_match_ids(server.df, limit)
+
+    # Clé de campagne : un changement de prompt, de modèle LLM, de modèle d'impact ou de guidelines repart de zéro
+    shared_versions = {k: v for k, v in server.coaching_report_versions("").items() if k != "data"}
+    run_key = hashlib.sha256(json.dumps(shared_versions, sort_keys=True).encode("utf-8")).hexdigest()[:16]
+    checkpoint = Checkpoint(Path(config.get("llm.pregenerate.checkpoint", "data/cache/pregenerate_checkpoint.json")),
+                            run_key, reset=reset)
+
+    pending = checkpoint.pending(candidates, retry_failed=retry_failed)
+    stats = {"candidates": len(candidates), "cached": 0, "generated": 0, "failed": 0,
+             "skipped": len(candidates) - len(pending)}
+    todo = []
+    for match_id in pending:
+        if report_cache.get(match_id, server.coaching_report_versions(match_id)):
+            stats["cached"] += 1
+        else:
+            todo.append(match_id)
+    logger.info(f"📋 {len(candidates)} matchs récents : {stats['cached']} en cache, {len(todo)} à générer "
+                f"(concurrence {concurrency})")
+    if dry_run:
+        return {**stats, "to_generate": todo}
+
+    start = time.perf_counter()
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def generate(match_id: str):
+        async with semaphore:
+            llm_priority.set(BACKGROUND)
+            t0 = time.perf_counter()
+            try:
+                result = json.loads(await server.generate_coaching_report(match_id))
+                report = result.get("report", "")
+                if "error" in result:
+                    error = result["error"]
+                elif report.startswith("[IA locale") or result.get("generation", {}).get("interrupted"):
+                    # non mis en cache : le match sera retenté au prochain passage
+                    logger.warning(f"⚠️ Rapport {match_id} non généré: {report[:80]}")
+                    stats["failed"] += 1
+                    return
+                else:
+                    error = None
+            except Exception as e:
+                error = str(e)
+
+            checkpoint.mark(match_id, error)
+            if error:
+                stats["failed"] += 1
+                logger.error(f"❌ Rapport {match_id}: {error}")
+            else:
+                stats["generated"] += 1
+                logger.info(f"✅ Rapport {match_id} pré-généré en {time.perf_counter() - t0:.1f}s "
+                            f"({stats['generated']}/{len(todo)})")
+
+    await asyncio.gather(*(generate(match_id) for match_id in todo))
+    stats["duration_s"] = round(time.perf_counter() - start, 1)
+    logger.info(f"🏁 Pré-génération terminée : {stats}")
+    return stats
+
+
+def main():
+    """Pré-génère les rapports des matchs récents absents du cache"""
+    parser = argparse.ArgumentParser(description="Pré-génération des rapports de coaching")
+    parser.add_argument("--limit", type=int, default=None,
+                       help="Nombre de matchs récents à couvrir (défaut : llm.pregenerate.max_matches)")
+    parser.add_argument("--concurrency", type=int, default=None,
+                       help="Rapports générés simultanément (défaut : llm.pregenerate.concurrency, "
+                            "plafonné à OLLAMA_NUM_PARALLEL)")
+    parser.add_argument("--match", action="append", dest="match_ids",
+                       help="Match à générer (répétable) au lieu des matchs récents")
+    parser.add_argument("--reset", action="store_true", help="Ignorer le checkpoint existant")
+    parser.add_argument("--retry-failed", action="store_true", help="Retenter les matchs en échec")
+    parser.add_argument("--dry-run", action="store_true", help="Lister les rapports à générer sans les générer")
+    args = parser.parse_args()
+
+    stats = asyncio.run(pregenerate_reports(
+        limit=args.limit, concurrency=args.concurrency, match_ids=args.match_ids,
+        reset=args.reset, retry_failed=args.retry_failed, dry_run=args.dry_run
+    ))
+    print(json.dumps(stats, ensure_ascii=False, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,17 @@
+#!/usr/bin/env python3
+"""
+Lancement du service local d'embedding / reranking partagé
+(les processus configurés avec rag.service.mode: client ou RAG_SERVICE_MODE=client s'y connectent)
+"""
+import sys
+from pathlib import Path
+
+# Ajout du chemin racine pour les imports
+sys.path.append(str(Path(__file__).parent.parent))
+
+from rag.service import main
+
+if __name__ == "__main__":
+    print("🚀 BASKETCOACH – SERVICE D'EMBEDDING PARTAGÉ")
+    print("🧠 Un seul exemplaire des modèles (bge-large + CrossEncoder) pour tous les processus")
+    main()
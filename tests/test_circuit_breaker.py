@@ -0,0 +1,41 @@
+# tests/test_circuit_breaker.py
+"""
+Tests du disjoncteur utilisé par le client Ollama
+"""
+import sys
+import os
+import time
+
+import pytest
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.circuit_breaker import CircuitBreaker, CircuitOpenError
+
+
+def test_opens_after_threshold_and_fails_fast():
+    breaker = CircuitBreaker("test", failure_threshold=2, recovery_timeout=60)
+    breaker.record_failure("refus")
+    assert breaker.allow()
+    breaker.record_failure("refus")
+
+    assert breaker.status()["state"] == "open"
+    assert not breaker.allow()
+    with pytest.raises(CircuitOpenError):
+        breaker.check()
+
+
+def test_half_open_allows_a_single_trial():
+    breaker = CircuitBreaker("test", failure_threshold=1, recovery_timeout=0.05)
+    breaker.record_failure("refus")
+    time.sleep(0.06)
+
+    assert breaker.allow()
+    assert not breaker.allow()
+    breaker.record_failure("toujours en panne")
+    assert breaker.status()["state"] == "open"
+
+    time.sleep(0.06)
+    assert breaker.allow()
+    breaker.record_success()
+    assert breaker.status()["state"] == "closed" and breaker.allow()
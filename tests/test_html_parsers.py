@@ -0,0 +1,46 @@
+# tests/test_html_parsers.py
+"""
+Tests de l'analyse ciblée (lxml/XPath) des pages enregistrées dans tests/fixtures/html
+"""
+import sys
+import os
+
+import pytest
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.html_parsers import parse_nba_standings, parse_news_articles
+
+FIXTURES = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures", "html")
+
+
+def _page(name: str) -> bytes:
+    with open(os.path.join(FIXTURES, name), "rb") as f:
+        return f.read()
+
+
+def test_nba_standings_reads_eastern_conference_table():
+    ranking = parse_nba_standings(_page("bbref_nba_standings.html"))
+
+    assert len(ranking) == 15
+    # texte des cellules comme get_text(strip=True) : lien, astérisque de qualification et tête de série
+    assert ranking[0]["team"] == "Boston Celtics*(1)"
+    assert all(row["wins"].isdigit() and row["losses"].isdigit() for row in ranking)
+    assert int(ranking[0]["wins"]) + int(ranking[0]["losses"]) == 82
+
+    with pytest.raises(ValueError):
+        parse_nba_standings(b"<html><body><table id='autre'></table></body></html>")
+
+
+def test_news_articles_from_search_pages():
+    lfb = parse_news_articles(_page("basketlfb_search.html"), "https://basketlfb.com/?s=Marine+Johannes", "Marine Johannes")
+    assert len(lfb) == 5
+    assert lfb[0]["link"].startswith("https://basketlfb.com/2026/10/1/")
+    assert lfb[0]["source"] == "basketlfb.com" and lfb[0]["description"].endswith("...")
+
+    ffbb = parse_news_articles(_page("ffbb_search.html"), "https://www.ffbb.com/search?search=Marine+Johannes", "Marine Johannes")
+    # liens relatifs rendus absolus, titres sans mot-clé écartés
+    assert ffbb and all(item["link"].startswith("https://www.ffbb.com/actualites/") for item in ffbb)
+    assert all(any(k in item["title"].lower() for k in ("marine", "basket", "lfb")) for item in ffbb)
+
+    assert parse_news_articles(b"", "https://www.eurosport.fr/search/x/", "Marine Johannes") == []
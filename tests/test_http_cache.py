@@ -0,0 +1,113 @@
+# tests/test_http_cache.py
+"""
+Tests des requêtes conditionnelles (ETag / Last-Modified) et du cache HTTP sur disque
+"""
+import sys
+import os
+import asyncio
+import threading
+
+import httpx
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.http_cache import HTTPCache
+from utils.web_fetcher import WebFetcher
+
+PAGE = b"<html>" + b"classement " * 2000 + b"</html>"
+
+
+class Origin:
+    """Serveur qui répond 304 quand le validateur envoyé correspond"""
+
+    def __init__(self):
+        self.etag = '"v1"'
+        self.received = []
+
+    def handler(self, request: httpx.Request) -> httpx.Response:
+        self.received.append(dict(request.headers))
+        if request.url.path == "/sans-validateur":
+            return httpx.Response(200, content=PAGE)
+        if request.headers.get("if-none-match") == self.etag:
+            return httpx.Response(304, headers={"ETag": self.etag})
+        return httpx.Response(200, content=PAGE + self.etag.encode(),
+                              headers={"ETag": self.etag, "Last-Modified": "Mon, 19 Oct 2026 08:00:00 GMT"})
+
+
+def test_conditional_get_reuses_body_on_304(tmp_path):
+    origin = Origin()
+    cache = HTTPCache(tmp_path)
+
+    async def run():
+        fetcher = WebFetcher(transport=httpx.MockTransport(origin.handler), http_cache=cache)
+        try:
+            first = await fetcher.fetch("http://bbref.example/standings")
+            second = await fetcher.fetch("http://bbref.example/standings")
+            origin.etag = '"v2"'
+            third = await fetcher.fetch("http://bbref.example/standings")
+            unvalidated = [await fetcher.fetch("http://bbref.example/sans-validateur") for _ in range(2)]
+        finally:
+            await fetcher.aclose()
+        return first, second, third, unvalidated
+
+    first, second, third, unvalidated = asyncio.run(run())
+
+    assert first.ok and not first.not_modified
+    assert "if-none-match" not in origin.received[0]
+    assert origin.received[1]["if-none-match"] == '"v1"'
+    assert origin.received[1]["if-modified-since"] == "Mon, 19 Oct 2026 08:00:00 GMT"
+    assert second.ok and second.not_modified and second.content == first.content
+    assert second.bytes_saved == len(first.content)
+    # page modifiée : nouveau corps, nouveau validateur enregistré
+    assert third.ok and not third.not_modified and third.content.endswith(b'"v2"')
+    # sans ETag ni Last-Modified : rien à revalider, jamais conditionnel
+    assert all(r.ok and not r.not_modified for r in unvalidated)
+    assert "if-none-match" not in origin.received[-1]
+
+    info = cache.info()
+    assert info["not_modified"] == 1 and info["conditional"] == 2 and info["bytes_saved"] == len(first.content)
+    assert info["entries"] == 1
+
+
+def test_cache_io_off_event_loop(tmp_path):
+    origin = Origin()
+    threads = []
+
+    class ThreadRecordingCache(HTTPCache):
+        def conditional_headers(self, url):
+            threads.append(threading.get_ident())
+            return super().conditional_headers(url)
+
+        def store(self, url, headers, body, wire_size=None):
+            threads.append(threading.get_ident())
+            return super().store(url, headers, body, wire_size)
+
+    async def run():
+        fetcher = WebFetcher(transport=httpx.MockTransport(origin.handler), http_cache=ThreadRecordingCache(tmp_path))
+        try:
+            await fetcher.fetch("http://bbref.example/standings")
+        finally:
+            await fetcher.aclose()
+        return threading.get_ident()
+
+    loop_thread = asyncio.run(run())
+    assert len(threads) == 2 and loop_thread not in threads
+
+
+def test_eviction_only_over_limit(tmp_path, monkeypatch):
+    cache = HTTPCache(tmp_path, max_entries=10)
+    evictions = []
+    evict = cache._evict
+    monkeypatch.setattr(cache, "_evict", lambda: evictions.append(1) or evict())
+    headers = {"etag": '"v1"'}
+
+    for i in range(10):
+        cache.store(f"http://bbref.example/{i}", headers, PAGE)
+    cache.store("http://bbref.example/0", headers, PAGE)  # mise à jour : pas de nouvelle entrée
+    assert evictions == []
+
+    cache.store("http://bbref.example/10", headers, PAGE)
+    # au-delà de la limite : retour à 90 % de max_entries, pas de nouveau parcours à l'entrée suivante
+    assert evictions == [1] and cache.info()["entries"] == 9
+    cache.store("http://bbref.example/11", headers, PAGE)
+    assert evictions == [1] and cache.info()["entries"] == 10
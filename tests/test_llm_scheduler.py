@@ -0,0 +1,120 @@
+# tests/test_llm_scheduler.py
+"""
+Tests de l'ordonnanceur des appels au LLM local
+"""
+import sys
+import os
+import time
+import asyncio
+import multiprocessing
+
+import pytest
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.llm_scheduler import LLMScheduler, HostSlots, LLMDeadlineExceeded, INTERACTIVE, BACKGROUND
+
+
+def test_interactive_requests_overtake_queued_background_work():
+    scheduler = LLMScheduler(workers=1)
+    order = []
+
+    async def job(name, priority, delay=0.0):
+        await asyncio.sleep(delay)
+        async with scheduler.aslot(priority):
+            order.append(name)
+            await asyncio.sleep(0.02)
+
+    async def main():
+        await asyncio.gather(
+            job("batch-1", BACKGROUND), job("batch-2", BACKGROUND, 0.005),
+            job("batch-3", BACKGROUND, 0.005), job("question", INTERACTIVE, 0.01),
+        )
+
+    asyncio.run(main())
+    assert order == ["batch-1", "question", "batch-2", "batch-3"]
+    metrics = scheduler.metrics()
+    assert metrics["completed"] == 4 and metrics["queue_depth"] == 0
+    assert metrics["max_queue_depth"] >= 3 and metrics["wait"][BACKGROUND]["samples"] == 3
+
+
+def test_deadline_expires_while_queued():
+    scheduler = LLMScheduler(workers=1)
+    ticket = scheduler.acquire(INTERACTIVE)
+
+    with pytest.raises(LLMDeadlineExceeded):
+        scheduler.acquire(INTERACTIVE, deadline=0.05)
+
+    scheduler.release(ticket)
+    assert scheduler.metrics()["expired"] == 1
+    with scheduler.slot(BACKGROUND, deadline=0.05):
+        assert scheduler.metrics()["running"][BACKGROUND] == 1
+
+
+def test_host_slots_bound_schedulers_together(tmp_path):
+    # deux ordonnanceurs sur les mêmes fichiers verrous : comme deux processus de la machine
+    first = LLMScheduler(workers=1, host_slots=HostSlots(tmp_path, 1, 1))
+    second = LLMScheduler(workers=1, host_slots=HostSlots(tmp_path, 1, 1))
+    ticket = first.acquire(INTERACTIVE)
+
+    with pytest.raises(LLMDeadlineExceeded):
+        second.acquire(INTERACTIVE, deadline=0.1)
+    metrics = second.metrics()
+    assert metrics["expired"] == 1 and metrics["completed"] == 0 and metrics["running"][INTERACTIVE] == 0
+
+    first.release(ticket)
+    with second.slot(INTERACTIVE, deadline=0.1):
+        assert second.metrics()["running"][INTERACTIVE] == 1
+
+
+def test_host_slots_keep_interactive_slot(tmp_path):
+    batch = LLMScheduler(workers=2, host_slots=HostSlots(tmp_path, 2, 1))
+    other = LLMScheduler(workers=2, host_slots=HostSlots(tmp_path, 2, 1))
+
+    with batch.slot(BACKGROUND):
+        with pytest.raises(LLMDeadlineExceeded):
+            other.acquire(BACKGROUND, deadline=0.1)
+        with other.slot(INTERACTIVE, deadline=0.1):
+            pass
+
+
+def _hold_slot(directory, ready, seconds):
+    scheduler = LLMScheduler(workers=1, host_slots=HostSlots(directory, 1, 1))
+    with scheduler.slot(BACKGROUND):
+        ready.set()
+        time.sleep(seconds)
+
+
+def test_host_slot_held_by_another_process(tmp_path):
+    ready = multiprocessing.Event()
+    process = multiprocessing.Process(target=_hold_slot, args=(str(tmp_path), ready, 0.5))
+    process.start()
+    try:
+        assert ready.wait(10)
+        scheduler = LLMScheduler(workers=1, host_slots=HostSlots(tmp_path, 1, 1))
+
+        async def wait_for_slot():
+            start = time.monotonic()
+            async with scheduler.aslot(INTERACTIVE, deadline=10):
+                return time.monotonic() - start
+
+        assert asyncio.run(wait_for_slot()) >= 0.2
+    finally:
+        process.join(10)
+
+
+def test_sync_generation_stops_at_ticket_deadline(monkeypatch):
+    import requests
+    import utils.ollama_client as ollama_client
+    timeouts, left = [], iter([10.0, 4.0, 1.5])
+
+    def slow_post(url, json=None, timeout=None, headers=None):
+        timeouts.append(timeout)
+        raise requests.exceptions.ReadTimeout("lecture trop longue")
+
+    monkeypatch.setattr(ollama_client.requests, "post", slow_post)
+    text = ollama_client._post_with_retries("p", "llama3.1:8b", 5, "http://ollama-deadline", lambda: next(left))
+
+    # requêtes bornées par le temps restant, pas de backoff (2 s) au-delà de l'échéance
+    assert timeouts == [10.0, 4.0]
+    assert text == "[IA locale : échéance de la requête dépassée]"
@@ -0,0 +1,125 @@
+# tests/test_ollama_async_client.py
+"""
+Tests du client Ollama asynchrone poolé (backoff, annulation, client par boucle, messages de repli)
+Aucun accès réseau : Ollama simulé par httpx.MockTransport, disponibilité du modèle fixée dans le cache
+"""
+import sys
+import os
+import gc
+import time
+import asyncio
+import itertools
+import weakref
+
+import httpx
+import pytest
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import utils.ollama_client as ollama_client
+from utils.ollama_client import AsyncOllamaClient, get_async_ollama_client, get_readiness
+
+_urls = itertools.count()
+
+
+def _client(handler, models=("llama3.1:8b",), reachable=True) -> AsyncOllamaClient:
+    """Client sur une URL propre au test (disjoncteur neuf), modèles disponibles sans appel à /api/tags"""
+    base_url = f"http://ollama-test-{next(_urls)}"
+    readiness = get_readiness(base_url)
+    readiness.models, readiness.reachable, readiness.checked_at = set(models), reachable, time.monotonic()
+    return AsyncOllamaClient(base_url=base_url, transport=httpx.MockTransport(handler))
+
+
+@pytest.fixture
+def sleeps(monkeypatch):
+    """Backoff enregistré au lieu d'être attendu"""
+    delays = []
+    real_sleep = asyncio.sleep
+
+    async def fake_sleep(delay, *args, **kwargs):
+        delays.append(delay)
+        await real_sleep(0)
+
+    monkeypatch.setattr(ollama_client.asyncio, "sleep", fake_sleep)
+    return delays
+
+
+def test_backoff_then_success(sleeps):
+    paths = []
+
+    def handler(request):
+        paths.append(request.url.path)
+        if len(paths) <= 2:
+            return httpx.Response(500, text="surcharge")
+        return httpx.Response(200, json={"response": "Zone 2-3"})
+
+    text = asyncio.run(_client(handler).generate("Quelle défense ?"))
+
+    assert text == "Zone 2-3"
+    assert paths == ["/api/generate", "/api/chat", "/api/generate"]
+    assert sleeps == [2]
+
+
+def test_breaker_stops_retries(sleeps):
+    calls = []
+
+    def handler(request):
+        calls.append(request.url.path)
+        return httpx.Response(500)
+
+    text = asyncio.run(_client(handler).generate("Quelle défense ?", max_retries=10))
+
+    # seuil du disjoncteur (3 tentatives) atteint avant max_retries
+    assert text.startswith("[IA locale indisponible : Ollama en échec")
+    assert len(calls) == 6 and sleeps == [2, 4]
+
+
+def test_cancellation_abandons_request():
+    started, cancelled = asyncio.Event(), []
+
+    async def handler(request):
+        started.set()
+        try:
+            await asyncio.Event().wait()
+        except asyncio.CancelledError:
+            cancelled.append(request.url.path)
+            raise
+
+    async def run():
+        task = asyncio.create_task(_client(handler).generate("Quelle défense ?"))
+        await asyncio.wait_for(started.wait(), 5)
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+
+    asyncio.run(run())
+    assert cancelled == ["/api/generate"]
+
+
+def test_one_client_per_event_loop():
+    async def clients():
+        return get_async_ollama_client(), get_async_ollama_client()
+
+    first, same = asyncio.run(clients())
+    other, _ = asyncio.run(clients())
+    assert first is same and first is not other
+
+    # boucle terminée et libérée : son client disparaît du registre
+    ref = weakref.ref(first)
+    del first, same, other
+    gc.collect()
+    assert ref() is None
+
+
+def test_fallback_messages(sleeps):
+    def refuse(request):
+        return httpx.Response(500)
+
+    unreachable = _client(refuse, reachable=False)
+    missing = _client(refuse, models=("mistral:7b",))
+    exhausted = _client(refuse)
+
+    assert asyncio.run(unreachable.generate("p")) == "[IA locale non disponible : Ollama injoignable]"
+    assert asyncio.run(missing.generate("p", max_wait_model_ready=0)) == \
+        "[IA locale non prête : modèle llama3.1:8b indisponible]"
+    assert asyncio.run(exhausted.generate("p", max_retries=2)) == "[IA locale non disponible après tentatives]"
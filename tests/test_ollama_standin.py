@@ -0,0 +1,54 @@
+# tests/test_ollama_standin.py
+"""
+Tests du serveur Ollama de substitution utilisé pour les tests de charge
+"""
+import sys
+import os
+import json
+import asyncio
+import importlib.util
+
+import httpx
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(ROOT)
+
+_spec = importlib.util.spec_from_file_location("ollama_standin", os.path.join(ROOT, "scripts", "ollama_standin.py"))
+ollama_standin = importlib.util.module_from_spec(_spec)
+_spec.loader.exec_module(ollama_standin)
+
+
+def _request(app, method, path, **kwargs):
+    async def call():
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://standin") as client:
+            return await client.request(method, path, **kwargs)
+    return asyncio.run(call())
+
+
+def test_streaming_generate_reports_ollama_statistics():
+    app = ollama_standin.create_app({"time_scale": 0.001, "max_tokens": 8})
+    payload = {"model": "llama3.1:8b", "prompt": "x" * 350, "stream": True, "keep_alive": "30m"}
+
+    response = _request(app, "POST", "/api/generate", json=payload)
+    chunks = [json.loads(line) for line in response.text.splitlines() if line.strip()]
+
+    assert response.status_code == 200
+    assert len([c for c in chunks if c["response"]]) == 8
+    final = chunks[-1]
+    assert final["done"] and final["eval_count"] == 8 and final["prompt_eval_count"] == 100
+
+
+def test_chat_and_failure_injection():
+    app = ollama_standin.create_app({"time_scale": 0.001, "max_tokens": 4})
+    chat = _request(app, "POST", "/api/chat", json={
+        "model": "llama3.1:8b", "stream": False, "messages": [{"role": "user", "content": "Bonjour"}]
+    }).json()
+    assert chat["done"] and len(chat["message"]["content"].split()) == 4
+
+    failing = ollama_standin.create_app({"error_rate": 1.0})
+    assert _request(failing, "POST", "/api/generate", json={"model": "llama3.1:8b", "prompt": "p"}).status_code == 500
+
+    missing = ollama_standin.create_app({"missing_model": True})
+    assert _request(missing, "GET", "/api/tags").json() == {"models": []}
+    assert _request(missing, "POST", "/api/generate", json={"model": "llama3.1:8b", "prompt": "p"}).status_code == 404
@@ -0,0 +1,227 @@
+# tests/test_ollama_streaming.py
+"""
+Tests de la génération en flux (NDJSON d'Ollama, statistiques, coupure, relais des tokens, annulation)
+Aucun accès réseau : Ollama simulé par httpx.MockTransport ou par le serveur de substitution (scripts/ollama_standin.py)
+"""
+import sys
+import os
+import json
+import time
+import asyncio
+import itertools
+import importlib.util
+
+import httpx
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(ROOT)
+
+import utils.ollama_client as ollama_client
+from utils.ollama_client import AsyncOllamaClient, get_readiness, token_sink
+
+_spec = importlib.util.spec_from_file_location("ollama_standin", os.path.join(ROOT, "scripts", "ollama_standin.py"))
+ollama_standin = importlib.util.module_from_spec(_spec)
+_spec.loader.exec_module(ollama_standin)
+
+_urls = itertools.count()
+
+
+def _client(transport: httpx.AsyncBaseTransport) -> AsyncOllamaClient:
+    """Client sur une URL propre au test (disjoncteur neuf), modèle disponible sans appel à /api/tags"""
+    base_url = f"http://ollama-stream-{next(_urls)}"
+    readiness = get_readiness(base_url)
+    readiness.models, readiness.reachable, readiness.checked_at = {"llama3.1:8b"}, True, time.monotonic()
+    return AsyncOllamaClient(base_url=base_url, transport=transport)
+
+
+def _ndjson(*chunks) -> bytes:
+    return b"".join(json.dumps(chunk).encode() + b"\n" for chunk in chunks)
+
+
+FINAL = {"response": "", "done": True, "eval_count": 3, "eval_duration": 300_000_000,
+         "prompt_eval_count": 42, "prompt_eval_duration": 12_000_000}
+
+
+@pytest.fixture
+def sleeps(monkeypatch):
+    """Backoff enregistré au lieu d'être attendu"""
+    delays = []
+    real_sleep = asyncio.sleep
+
+    async def fake_sleep(delay, *args, **kwargs):
+        delays.append(delay)
+        await real_sleep(0)
+
+    monkeypatch.setattr(ollama_client.asyncio, "sleep", fake_sleep)
+    return delays
+
+
+def test_ndjson_stream_and_statistics():
+    body = _ndjson({"response": "Zone ", "done": False}, {"response": "2-3 ", "done": False},
+                   {"response": "serrée", "done": False}, FINAL)
+    # lignes vides entre les objets ignorées
+    body = body.replace(b"\n", b"\n\n", 1)
+    client = _client(httpx.MockTransport(lambda request: httpx.Response(200, content=body)))
+    tokens = []
+
+    text, stats = asyncio.run(client.generate_stream("Quelle défense ?", on_token=tokens.append))
+
+    assert text == "Zone 2-3 serrée" and tokens == ["Zone ", "2-3 ", "serrée"]
+    assert stats["streamed"] and not stats["interrupted"] and not stats["shared"]
+    assert stats["tokens"] == 3 and stats["tokens_per_s"] == 10.0
+    assert stats["prompt_eval_ms"] == 12.0 and stats["prompt_tokens"] == 42
+    assert 0 <= stats["ttft_ms"] <= stats["total_ms"]
+
+
+def test_cut_after_first_token_returns_partial_text_without_retry(sleeps):
+    requests = []
+
+    async def cut_stream():
+        yield _ndjson({"response": "Repli ", "done": False}, {"response": "défensif ", "done": False})
+        raise httpx.RemoteProtocolError("peer closed connection without sending complete message body")
+
+    def handler(request):
+        requests.append(request)
+        return httpx.Response(200, content=cut_stream())
+
+    text, stats = asyncio.run(_client(httpx.MockTransport(handler)).generate_stream("Quelle défense ?"))
+
+    assert text == "Repli défensif " and stats["interrupted"]
+    assert len(requests) == 1 and sleeps == []
+
+
+def test_stream_dropped_by_standin_is_interrupted():
+    app = ollama_standin.create_app({"time_scale": 0.001, "max_tokens": 8, "drop_rate": 1.0})
+    client = _client(httpx.ASGITransport(app=app, raise_app_exceptions=False))
+
+    text, stats = asyncio.run(client.generate_stream("Quelle défense ?"))
+
+    assert len(text.split()) == 4 and stats["interrupted"]
+
+
+def test_failure_before_first_token_is_retried(sleeps):
+    attempts = []
+
+    def handler(request):
+        attempts.append(request)
+        if len(attempts) == 1:
+            raise httpx.ConnectError("connexion refusée")
+        return httpx.Response(200, content=_ndjson({"response": "Presse", "done": False}, FINAL))
+
+    text, stats = asyncio.run(_client(httpx.MockTransport(handler)).generate_stream("Quelle défense ?"))
+
+    assert text == "Presse" and not stats["interrupted"]
+    assert len(attempts) == 2 and sleeps == [2]
+
+
+def test_token_sink_receives_fragments():
+    body = _ndjson({"response": "a", "done": False}, {"response": "b", "done": False}, FINAL)
+    client = _client(httpx.MockTransport(lambda request: httpx.Response(200, content=body)))
+    relayed, callback = [], []
+
+    async def on_token(text):
+        callback.append(text)
+
+    async def run():
+        reset = token_sink.set(relayed.append)
+        try:
+            # la tâche hérite du destinataire fixé par l'appelant
+            return await asyncio.create_task(client.generate_stream("p", on_token=on_token))
+        finally:
+            token_sink.reset(reset)
+
+    text, _ = asyncio.run(run())
+    assert text == "ab" and relayed == ["a", "b"] and callback == ["a", "b"]
+
+
+def test_sse_stream_relays_tokens_then_result():
+    import basketcoach_mcp_server as server
+
+    async def tool(answer):
+        token_sink.get()("Zone ")
+        await asyncio.sleep(0)
+        token_sink.get()("2-3")
+        return json.dumps({"answer": answer})
+
+    async def run():
+        return [event async for event in server._sse_tool_stream(tool, "Zone 2-3")]
+
+    events = asyncio.run(run())
+    assert events == ['event: token\ndata: {"text": "Zone "}\n\n', 'event: token\ndata: {"text": "2-3"}\n\n',
+                      'event: result\ndata: {"answer": "Zone 2-3"}\n\n']
+
+
+def test_sse_client_disconnect_cancels_generation():
+    import basketcoach_mcp_server as server
+    cancelled = asyncio.Event()
+
+    async def tool():
+        token_sink.get()("Zone ")
+        try:
+            await asyncio.Event().wait()
+        except asyncio.CancelledError:
+            cancelled.set()
+            raise
+
+    async def run():
+        events = server._sse_tool_stream(tool)
+        first = await events.__anext__()
+        await events.aclose()  # déconnexion du client : le serveur ferme le générateur
+        await asyncio.wait_for(cancelled.wait(), 5)
+        return first
+
+    assert asyncio.run(run()) == 'event: token\ndata: {"text": "Zone "}\n\n'
+
+
+class _RecordingCache:
+    def __init__(self):
+        self.stored = []
+
+    def lookup(self, question, **version):
+        return None
+
+    def store(self, question, answer, metadata=None, **version):
+        self.stored.append(answer)
+
+
+def test_interrupted_answer_not_cached(monkeypatch):
+    import basketcoach_mcp_server as server
+    import utils.semantic_cache as semantic_cache
+    cache = _RecordingCache()
+    monkeypatch.setattr(semantic_cache, "get_answer_cache", lambda: cache)
+
+    async def partial(prompt, ctx, model=None):
+        return "Repli déf", {"interrupted": True}
+
+    async def complete(prompt, ctx, model=None):
+        return "Repli défensif immédiat", {"interrupted": False}
+
+    monkeypatch.setattr(server, "_generate_streamed", partial)
+    assert json.loads(asyncio.run(server.ask_coach_ai("Quelle défense ?")))["answer"] == "Repli déf"
+    assert cache.stored == []
+
+    monkeypatch.setattr(server, "_generate_streamed", complete)
+    asyncio.run(server.ask_coach_ai("Quelle défense ?"))
+    assert cache.stored == ["Repli défensif immédiat"]
+
+
+def test_tool_stream_result_and_close_cancels_call():
+    import queue
+    import concurrent.futures
+    from mcp_direct_client import ToolStream, _STREAM_END
+
+    future, fragments = concurrent.futures.Future(), queue.Queue()
+    for fragment in ("Zone ", "2-3", _STREAM_END):
+        fragments.put(fragment)
+    future.set_result(json.dumps({"answer": "Zone 2-3"}))
+    stream = ToolStream(future, fragments, timeout=1)
+    assert list(stream) == ["Zone ", "2-3"] and stream.result == {"answer": "Zone 2-3"}
+
+    # Streamlit interrompt l'affichage : l'appel en cours est annulé
+    future, fragments = concurrent.futures.Future(), queue.Queue()
+    fragments.put("Zone ")
+    iterator = iter(ToolStream(future, fragments, timeout=1))
+    assert next(iterator) == "Zone "
+    iterator.close()
+    assert future.cancelled()
@@ -0,0 +1,62 @@
+# tests/test_prompt_builder.py
+"""
+Tests du constructeur de prompts sous budget de tokens
+"""
+import sys
+import os
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.prompt_builder import PromptBuilder, TokenCounter
+
+SENTENCES = [f"Phrase numéro {i} sur la récupération après un match de basket." for i in range(40)]
+
+
+def _result(sentences, score, source="guide.pdf"):
+    return {"content": " ".join(sentences), "source": source, "category": "récupération", "rerank_score": score}
+
+
+def test_context_is_deduplicated_and_ordered_by_rerank_score():
+    builder = PromptBuilder(max_prompt_tokens=None, max_context_tokens=None)
+    results = [
+        _result(SENTENCES[5:10], 0.2, "second.pdf"),
+        _result(SENTENCES[0:6], 0.9, "premier.pdf"),   # chevauche le suivant d'une phrase
+        _result(SENTENCES[0:6], 0.5, "doublon.pdf"),
+    ]
+
+    context, stats = builder.build_context(results)
+
+    assert context.index("premier.pdf") < context.index("second.pdf")
+    assert "doublon.pdf" not in context
+    assert context.count(SENTENCES[5]) == 1
+    assert stats["duplicates"] == 1 and stats["overlap_trimmed"] == 1 and stats["kept"] == 2
+
+
+def test_prompt_respects_token_budget():
+    counter = TokenCounter(chars_per_token=4.0)
+    builder = PromptBuilder(max_prompt_tokens=400, max_context_tokens=300, counter=counter)
+    template = "Match {match_id}\n{guidelines_context}\nRédige le rapport."
+    results = [_result(SENTENCES[i:i + 15], 1.0 - i / 100, f"doc{i}.pdf") for i in (0, 15, 30)]
+
+    prompt, info = builder.build(template, {"match_id": "m1"}, results, query="récupération match")
+
+    assert info["prompt_tokens"] <= 400
+    assert info["context"]["tokens"] <= 300
+    assert info["context"]["trimmed"] >= 1
+    assert prompt.startswith("Match m1") and "Rédige le rapport." in prompt
+
+
+def test_calibration_ignores_cached_prefixes():
+    counter = TokenCounter(chars_per_token=3.5)
+    counter.calibrate("x" * 1000, 270)
+    assert counter.chars_per_token == 3.704
+    counter.calibrate("x" * 1000, 20)  # préfixe réutilisé par Ollama : seuls 20 tokens évalués
+    assert counter.chars_per_token == 3.704
+    # préfixe partiellement en cache : ratio plausible (5.0) mais hors de la bande ±10 %, ignoré
+    counter.calibrate("x" * 1000, 200)
+    assert counter.chars_per_token == 3.704
+
+    # même une suite d'échantillons en bord de bande ne dépasse pas 3.85 caractères par token
+    for _ in range(50):
+        counter.calibrate("x" * 1000, 260)
+    assert 3.8 < counter.chars_per_token <= counter.max_ratio == 3.85
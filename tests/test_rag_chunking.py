@@ -0,0 +1,52 @@
+# tests/test_rag_chunking.py
+"""
+Tests du découpage par phrases et de l'élimination des quasi-doublons
+"""
+
+import sys
+import os
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from rag.chunking import split_sentences, chunk_sentences, simhash, deduplicate
+
+PARAGRAPH = (
+    "La cheville est l'articulation la plus touchée au basket. Les entorses surviennent surtout à la réception "
+    "d'un saut, sur le pied d'un adversaire. Le renforcement des muscles fibulaires et le travail proprioceptif "
+    "réduisent nettement le risque de récidive. Un strapping ou une orthèse est conseillé pendant la reprise."
+)
+
+
+def test_split_sentences():
+    assert split_sentences("Premier point.\nDeuxième\npoint ! 3 joueurs.") == ["Premier point.", "Deuxième point !", "3 joueurs."]
+
+
+def test_chunks_keep_whole_sentences_with_overlap():
+    sentences = [f"Phrase numéro {i} du texte." for i in range(10)]
+    chunks = chunk_sentences(sentences, chunk_size=15, overlap=5)
+    assert all(len(chunk.split()) <= 15 for chunk in chunks)
+    assert all(chunk.endswith(".") for chunk in chunks)
+    assert chunks[1].startswith(sentences[2])  # dernière phrase du 1er extrait reprise en recouvrement
+
+
+def test_long_sentence_is_split():
+    chunks = chunk_sentences([" ".join(["mot"] * 25)], chunk_size=10, overlap=2)
+    assert all(len(chunk.split()) <= 10 for chunk in chunks)
+
+
+def test_simhash_near_duplicates():
+    assert simhash(PARAGRAPH) == simhash(PARAGRAPH.replace("\n", " ").upper())
+    other = "La contre-attaque exploite les couloirs latéraux dès la récupération du ballon par le rebondeur."
+    assert bin(simhash(PARAGRAPH) ^ simhash(other)).count("1") > 3
+
+
+def test_deduplicate_keeps_custom_guidelines():
+    kept = [{"content": PARAGRAPH, "source": "a.pdf", "origin": "pdf"}]
+    candidates = [
+        {"content": PARAGRAPH, "source": "b.pdf", "origin": "pdf"},
+        {"content": PARAGRAPH, "source": "Utilisateur", "origin": "custom"},
+    ]
+    unique, stats = deduplicate(kept, candidates)
+    assert [g["source"] for g in unique] == ["Utilisateur"]
+    assert stats["duplicates"] == 1
+    assert stats["absorbed_by"] == {"b.pdf": ["a.pdf"]}
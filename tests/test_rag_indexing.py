@@ -0,0 +1,63 @@
+# tests/test_rag_indexing.py
+"""
+Tests de la sélection et de la construction des index FAISS
+"""
+
+import sys
+import os
+
+import numpy as np
+import faiss
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from rag.indexing import select_index_type, build_index, describe_index, get_index_params, quantized_search
+from rag.store import read_index_mmap, write_index_atomic
+
+
+def _vectors(n=500, d=32):
+    vectors = np.random.default_rng(0).normal(size=(n, d)).astype(np.float32)
+    faiss.normalize_L2(vectors)
+    return vectors
+
+
+def test_auto_selection_by_corpus_size():
+    params = get_index_params({"type": "auto", "flat_max_vectors": 100, "hnsw_max_vectors": 1000})
+    assert select_index_type(50, params) == "flat"
+    assert select_index_type(500, params) == "hnsw"
+    assert select_index_type(5000, params) == "ivf"
+
+
+def test_forced_type():
+    assert select_index_type(10, get_index_params({"type": "hnsw"})) == "hnsw"
+
+
+def test_ann_indexes_find_exact_match():
+    vectors = _vectors()
+    params = get_index_params({"ivf_nprobe": 64})
+    for index_type in ("flat", "ivf", "hnsw"):
+        index = build_index(vectors, index_type, params)
+        assert describe_index(index)["type"] == index_type
+        _, ids = index.search(vectors[:5], 1)
+        assert list(ids[:, 0]) == [0, 1, 2, 3, 4]
+
+
+def test_ivf_falls_back_to_flat_on_tiny_corpus():
+    index = build_index(_vectors(n=10), "ivf")
+    assert describe_index(index)["type"] == "flat"
+
+
+def test_quantized_codes_with_rescoring(tmp_path):
+    vectors = _vectors()
+    for quantization in ("int8", "binary"):
+        for index_type in ("flat", "hnsw"):
+            index = build_index(vectors, index_type, get_index_params({"quantization": quantization}))
+            assert describe_index(index) == dict(describe_index(index), type=index_type, quantization=quantization)
+
+            scores, ids = quantized_search(index, vectors, vectors[3:4], 5, rescore_factor=4)
+            assert ids[0, 0] == 3
+            assert abs(scores[0, 0] - 1.0) < 1e-5
+
+        write_index_atomic(index, tmp_path / f"{quantization}.index")
+        reloaded = read_index_mmap(tmp_path / f"{quantization}.index")
+        assert describe_index(reloaded)["quantization"] == quantization
@@ -0,0 +1,48 @@
+# tests/test_rag_ingest.py
+"""
+Tests du manifeste d'ingestion incrémentale des guidelines
+"""
+
+import sys
+import os
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from rag.ingest import scan_pdf_files, diff_manifest, load_manifest, save_manifest, file_sha256
+
+
+def test_scan_and_diff_detects_changes(tmp_path):
+    (tmp_path / "a.pdf").write_bytes(b"%PDF-1.4 a")
+    (tmp_path / "b.pdf").write_bytes(b"%PDF-1.4 b")
+
+    files = scan_pdf_files(tmp_path)
+    assert set(files) == {"a.pdf", "b.pdf"}
+    assert files["a.pdf"]["sha256"] == file_sha256(tmp_path / "a.pdf")
+
+    manifest = {"files": {name: dict(info) for name, info in files.items()}}
+    assert diff_manifest(manifest, scan_pdf_files(tmp_path, manifest["files"])) == ([], [])
+
+    (tmp_path / "a.pdf").write_bytes(b"%PDF-1.4 a modifie")
+    (tmp_path / "b.pdf").unlink()
+    (tmp_path / "c.pdf").write_bytes(b"%PDF-1.4 c")
+
+    changed, removed = diff_manifest(manifest, scan_pdf_files(tmp_path, manifest["files"]))
+    assert sorted(changed) == ["a.pdf", "c.pdf"]
+    assert removed == ["b.pdf"]
+
+
+def test_no_manifest_means_full_ingestion(tmp_path):
+    (tmp_path / "a.pdf").write_bytes(b"%PDF-1.4 a")
+    changed, removed = diff_manifest(None, scan_pdf_files(tmp_path))
+    assert changed == ["a.pdf"]
+    assert removed == []
+
+
+def test_manifest_roundtrip(tmp_path):
+    path = tmp_path / "manifest.json"
+    assert load_manifest(path) is None
+
+    save_manifest(path, {"signature": {"model": "m"}, "files": {"a.pdf": {"sha256": "x"}}})
+    manifest = load_manifest(path)
+    assert manifest["files"]["a.pdf"]["sha256"] == "x"
+    assert manifest["signature"] == {"model": "m"}
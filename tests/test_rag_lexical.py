@@ -0,0 +1,54 @@
+# tests/test_rag_lexical.py
+"""
+Tests de l'index BM25 et de la fusion RRF
+"""
+
+import sys
+import os
+
+import numpy as np
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from rag.lexical import tokenize, BM25Index, reciprocal_rank_fusion
+
+TEXTS = [
+    "Protocole RICE pour les entorses de la cheville",
+    "La contre-attaque exploite les couloirs latéraux après le rebond",
+    "Défense tout terrain : trappe sur le porteur de balle",
+    "Étirements et échauffement avant l'entraînement",
+]
+
+
+def test_tokenize_french():
+    assert tokenize("Les Étirements de la cheville") == ["etirement", "cheville"]
+    assert tokenize("contre-attaque") == ["contre-attaque", "contre", "attaque"]
+
+
+def test_search_ranks_matching_chunk_first():
+    index = BM25Index.build(TEXTS)
+    ids, scores, info = index.search("entorse cheville", top_k=3)
+    assert ids[0] == 0
+    assert len(ids) == 1 and scores[0] > 0
+    assert info["top_coverage"] == 1.0
+
+
+def test_allowed_mask_and_unknown_terms():
+    index = BM25Index.build(TEXTS)
+    allowed = np.array([False, True, True, True])
+    ids, _, _ = index.search("cheville", allowed=allowed)
+    assert len(ids) == 0
+    ids, _, info = index.search("zzz inconnu")
+    assert len(ids) == 0 and info["matched_terms"] == 0
+
+
+def test_save_and_load(tmp_path):
+    BM25Index.build(TEXTS).save(tmp_path / "bm25")
+    loaded = BM25Index.load(tmp_path / "bm25")
+    assert BM25Index.exists(tmp_path / "bm25")
+    assert loaded.search("trappe balle")[0][0] == 2
+
+
+def test_reciprocal_rank_fusion():
+    fused = reciprocal_rank_fusion([[1, 2, 3], [3, 1]], k=60)
+    assert [doc_id for doc_id, _ in fused] == [1, 3, 2]
@@ -0,0 +1,137 @@
+# tests/test_rag_rerank.py
+"""
+Tests du reranking adaptatif (troncature, lots triés par longueur, décision de reranker)
+CrossEncoder remplacé par un reranker factice : aucun modèle chargé
+"""
+
+import re
+import sys
+import os
+
+import pytest
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import rag.search as search
+
+
+class FastTokenizer:
+    """Tokenizer « rapide » factice : un token par mot, offsets de caractères"""
+    is_fast = True
+
+    def __call__(self, text, add_special_tokens=False, return_offsets_mapping=False):
+        return {"offset_mapping": [m.span() for m in re.finditer(r"\S+", text)]}
+
+
+class StubReranker:
+    """Score = longueur du passage (ou exception), lots reçus enregistrés"""
+
+    def __init__(self, tokenizer=None, error=None):
+        self.tokenizer = tokenizer
+        self.error = error
+        self.batches = []
+
+    def predict(self, pairs, batch_size=32):
+        if self.error:
+            raise self.error
+        self.batches.append([passage for _, passage in pairs])
+        return [float(len(passage)) for _, passage in pairs]
+
+
+def _result(content, score, retrieval="dense"):
+    return {"content": content, "source": "test", "category": "test",
+            "similarity_score": score, "retrieval": retrieval}
+
+
+@pytest.fixture
+def stub(monkeypatch):
+    def install(results, reranker=None):
+        reranker = reranker or StubReranker()
+        monkeypatch.setattr(search, "reranker", reranker)
+        monkeypatch.setattr(search, "RERANKER_AVAILABLE", True)
+        monkeypatch.setattr(search.rag_system, "is_initialized", True)
+        monkeypatch.setattr(search.rag_system, "search", lambda *args, **kwargs: [dict(r) for r in results])
+        return reranker
+    return install
+
+
+def test_truncate_with_fast_tokenizer(monkeypatch):
+    monkeypatch.setattr(search, "reranker", StubReranker(tokenizer=FastTokenizer()))
+    text = "un deux trois quatre cinq six"
+    assert search._truncate_for_rerank(text, max_tokens=4) == "un deux trois quatre"
+    assert search._truncate_for_rerank(text, max_tokens=6) == text
+
+
+def test_truncate_word_fallback(monkeypatch):
+    monkeypatch.setattr(search, "reranker", StubReranker())
+    text = " ".join(f"mot{i}" for i in range(10))
+    # 8 tokens ≈ 6 mots
+    assert search._truncate_for_rerank(text, max_tokens=8) == " ".join(f"mot{i}" for i in range(6))
+    assert search._truncate_for_rerank("court", max_tokens=8) == "court"
+
+
+def test_batches_sorted_by_length_scores_mapped_back(monkeypatch):
+    reranker = StubReranker()
+    monkeypatch.setattr(search, "reranker", reranker)
+    monkeypatch.setattr(search, "RERANK_BATCH_SIZE", 2)
+    contents = ["cccccc", "a", "eeeeeeeeee", "bbb", "dddddddd"]
+
+    scores, batches = search._rerank_scores("question", [_result(c, 0.5) for c in contents])
+
+    assert batches == 3
+    assert [len(p) for batch in reranker.batches for p in batch] == [1, 3, 6, 8, 10]
+    assert scores == [float(len(c)) for c in contents]
+
+
+def test_reranking_reorders_close_dense_candidates(stub):
+    stub([_result("court", 0.80), _result("passage plus long", 0.78)])
+    response = search.search_guidelines("question", max_results=2)
+    assert response["analysis"]["rerank"]["applied"] is True
+    assert [r["content"] for r in response["search_results"]] == ["passage plus long", "court"]
+
+
+def test_dense_margin_in_returned_order_skips(stub):
+    reranker = stub([_result("a", 0.90), _result("b", 0.60), _result("c", 0.95)])
+    response = search.search_guidelines("question", max_results=3)
+    assert response["analysis"]["rerank"]["reason"].startswith("écart de similarité net (0.300)")
+    assert reranker.batches == []
+
+
+def test_lexical_policy(stub):
+    stub([_result("a", 1.0, "lexical"), _result("b", 0.5, "lexical")])
+    response = search.search_guidelines("cheville", max_results=2)
+    assert response["analysis"]["rerank"]["reason"].startswith("meilleur extrait BM25 net")
+
+    stub([_result("a", 1.0, "lexical"), _result("bb", 0.95, "lexical")])
+    assert search.search_guidelines("cheville", max_results=2)["analysis"]["rerank"]["applied"] is True
+
+
+def test_hybrid_results_always_reranked(stub):
+    # similarités très écartées, mais ordre RRF : aucun raccourci par écart
+    reranker = stub([_result("a", 0.20, "hybrid"), _result("bbb", 0.90, "hybrid")])
+    response = search.search_guidelines("question", max_results=2)
+    assert response["analysis"]["rerank"]["applied"] is True
+    assert len(reranker.batches) == 1
+
+
+def test_single_candidate_and_no_result(stub):
+    stub([_result("a", 0.5)])
+    assert search.search_guidelines("question")["analysis"]["rerank"]["reason"] == "un seul candidat"
+
+    stub([])
+    assert search.search_guidelines("question")["analysis"]["rerank"]["reason"] == "aucun résultat"
+
+
+def test_reranker_unavailable_keeps_first_stage_order(stub, monkeypatch):
+    stub([_result("a", 0.5), _result("b", 0.49)])
+    monkeypatch.setattr(search, "RERANKER_AVAILABLE", False)
+    response = search.search_guidelines("question", max_results=2)
+    assert response["analysis"]["rerank"]["reason"] == "reranker indisponible"
+    assert [r["content"] for r in response["search_results"]] == ["a", "b"]
+
+
+def test_reranker_error_falls_back(stub):
+    stub([_result("a", 0.5), _result("b", 0.49)], StubReranker(error=RuntimeError("modèle absent")))
+    response = search.search_guidelines("question", max_results=2)
+    assert response["analysis"]["rerank"] == {"applied": False, "reason": "erreur: modèle absent", "time_ms": 0.0}
+    assert [r["content"] for r in response["search_results"]] == ["a", "b"]
@@ -0,0 +1,66 @@
+# tests/test_rag_service.py
+"""
+Tests du service d'embedding partagé (regroupement des requêtes, sérialisation)
+"""
+import sys
+import os
+import asyncio
+import threading
+
+import numpy as np
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from rag.service import MicroBatcher, encode_array, decode_array
+
+
+def test_array_roundtrip():
+    array = np.random.default_rng(0).random((3, 8), dtype=np.float32)
+    assert np.array_equal(decode_array(encode_array(array)), array)
+
+
+def test_concurrent_requests_are_batched():
+    calls = []
+
+    def compute(items):
+        calls.append(len(items))
+        return [item * 2 for item in items]
+
+    async def run():
+        batcher = MicroBatcher(compute, max_batch=64, max_wait_ms=20)
+        return await asyncio.gather(*(batcher.submit([i, i + 100]) for i in range(5)))
+
+    results = asyncio.run(run())
+    assert results == [[2 * i, 2 * (i + 100)] for i in range(5)]
+    assert sum(calls) == 10 and len(calls) < 5
+
+
+def test_worker_task_kept_and_cancelled_on_close():
+    release = threading.Event()
+
+    def compute(items):
+        if "lent" in items:
+            release.wait(5)
+        return items
+
+    async def run():
+        batcher = MicroBatcher(compute, max_batch=1, max_wait_ms=0)
+        assert await batcher.submit(["a"]) == ["a"]
+        worker = batcher._worker_task
+        assert worker is not None and not worker.done()
+
+        # lot en cours de calcul et requête encore dans la file : toutes deux annulées à l'arrêt
+        in_flight = asyncio.ensure_future(batcher.submit(["lent"]))
+        queued = asyncio.ensure_future(batcher.submit(["b"]))
+        await asyncio.sleep(0.05)
+        await batcher.aclose()
+        release.set()
+        assert worker.cancelled() and batcher._worker_task is None
+        results = await asyncio.gather(in_flight, queued, return_exceptions=True)
+        assert all(isinstance(result, asyncio.CancelledError) for result in results)
+
+        # nouvelle soumission après l'arrêt : la tâche est relancée
+        assert await batcher.submit(["c"]) == ["c"]
+        await batcher.aclose()
+
+    asyncio.run(run())
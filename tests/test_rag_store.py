@@ -0,0 +1,75 @@
+# tests/test_rag_store.py
+"""
+Tests du store memory-mappé des guidelines
+"""
+
+import sys
+import os
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from rag.store import GuidelineStore
+
+GUIDELINES = [
+    {"content": "Protocole RICE pour entorse de cheville", "source": "a.pdf", "category": "blessure", "page": "3", "origin": "pdf"},
+    {"content": "Contre-attaque : courir les couloirs", "source": "b.pdf", "category": "tactique", "page": "1", "origin": "pdf"},
+    {"content": "Hydratation réguliére", "source": "Utilisateur", "category": "nutrition", "origin": "custom",
+     "metadata": {"auteur": "coach"}},
+]
+
+
+def test_roundtrip(tmp_path):
+    store = GuidelineStore.write(tmp_path / "store", GUIDELINES)
+
+    assert len(store) == 3
+    assert list(store) == [
+        GUIDELINES[0],
+        GUIDELINES[1],
+        {"content": "Hydratation réguliére", "source": "Utilisateur", "category": "nutrition",
+         "origin": "custom", "metadata": {"auteur": "coach"}},
+    ]
+    assert store[-1]["content"] == "Hydratation réguliére"
+    assert store.category_counts() == {"blessure": 1, "tactique": 1, "nutrition": 1}
+
+
+def test_reopen_and_new_generation(tmp_path):
+    path = tmp_path / "store"
+    GuidelineStore.write(path, GUIDELINES)
+    assert GuidelineStore.exists(path)
+
+    GuidelineStore.write(path, GUIDELINES[:1])
+    reopened = GuidelineStore(path)
+    assert len(reopened) == 1
+    # génération précédente conservée pour les lecteurs en cours d'ouverture
+    assert len(list(path.glob("gen-*"))) == 2
+
+
+def test_previous_generation_survives_rewrite(tmp_path):
+    path = tmp_path / "store"
+    old_store = GuidelineStore.write(path, GUIDELINES)
+    # lecteur ayant lu CURRENT juste avant la bascule : il ouvre ensuite les fichiers de l'ancienne génération
+    old_generation = old_store.generation_path
+
+    GuidelineStore.write(path, GUIDELINES[:1], keep_seconds=0)
+    assert old_store[1]["content"] == GUIDELINES[1]["content"]
+    assert (old_generation / "tables.json").exists() and (old_generation / "texts.bin").exists()
+    assert len(GuidelineStore(path)) == 1
+
+    # une génération de plus : seules la courante et la précédente restent (keep_seconds écoulé)
+    newest = GuidelineStore.write(path, GUIDELINES[:2], keep_seconds=0)
+    assert not old_generation.exists()
+    assert len(list(path.glob("gen-*"))) == 2 and len(newest) == 2
+
+
+def test_empty_store(tmp_path):
+    store = GuidelineStore.write(tmp_path / "store", [])
+    assert len(store) == 0
+    assert store.category_counts() == {}
+
+
+def test_filter_ids(tmp_path):
+    store = GuidelineStore.write(tmp_path / "store", GUIDELINES)
+    assert list(store.filter_ids(categories=["blessure", "nutrition"])) == [0, 2]
+    assert list(store.filter_ids(sources=["b.pdf"])) == [1]
+    assert list(store.filter_ids(categories=["blessure"], sources=["b.pdf"])) == []
+    assert list(store.filter_ids(categories=["inconnue"])) == []
@@ -0,0 +1,72 @@
+# tests/test_refresh_scheduler.py
+"""
+Tests du rafraîchissement en arrière-plan des instantanés de données externes
+"""
+import sys
+import os
+import asyncio
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.scrape_cache import ScrapeCache
+from utils.refresh_scheduler import RefreshScheduler
+
+
+class Source:
+    def __init__(self):
+        self.calls = 0
+        self.down = False
+
+    async def fetch(self):
+        self.calls += 1
+        if self.down:
+            raise ConnectionError("source en panne")
+        return {"version": self.calls}
+
+
+def test_periodic_refresh_and_snapshot_reads(tmp_path):
+    async def run():
+        cache = ScrapeCache(tmp_path, ttl_seconds=60)
+        scheduler = RefreshScheduler(cache, retry_seconds=0.05)
+        source = Source()
+        scheduler.add("nba", {"nba_ranking": source.fetch}, interval=0.1, jitter=0.2)
+
+        async with scheduler.serving():
+            value, snapshot = await scheduler.read("nba_ranking", source.fetch)
+            assert value == {"version": 1}
+            assert snapshot["status"] == "snapshot" and snapshot["refreshed_by"] == "scheduler"
+            assert snapshot["age_seconds"] < 1
+
+            await asyncio.sleep(0.35)
+            assert source.calls >= 3
+            # source en panne : l'instantané précédent reste servi, l'échec est visible
+            source.down = True
+            await asyncio.sleep(0.2)
+            value, _ = await scheduler.read("nba_ranking", source.fetch)
+            assert value["version"] >= 3
+            assert scheduler.status()["jobs"]["nba"]["last_error"]
+        assert not scheduler.running
+
+        # clé non planifiée : politique du cache web
+        value, snapshot = await scheduler.read("autre", Source().fetch)
+        assert value == {"version": 1} and snapshot["refreshed_by"] == "on_demand"
+
+    asyncio.run(run())
+
+
+def test_fresh_disk_snapshot_delays_first_refresh(tmp_path):
+    ScrapeCache(tmp_path).put("news:lfb", ["article"])
+
+    async def run():
+        scheduler = RefreshScheduler(ScrapeCache(tmp_path), retry_seconds=0.05)
+        source = Source()
+        scheduler.add("news", {"news:lfb": source.fetch}, interval=60, jitter=0.1)
+        async with scheduler.serving():
+            value, snapshot = await scheduler.read("news:lfb", source.fetch)
+            await asyncio.sleep(0.1)
+            next_run_in = scheduler.status()["jobs"]["news"]["next_run_in"]
+        return value, snapshot, source.calls, next_run_in
+
+    value, snapshot, calls, next_run_in = asyncio.run(run())
+    assert value == ["article"] and snapshot["status"] == "snapshot"
+    assert calls == 0 and next_run_in > 40
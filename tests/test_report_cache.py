@@ -0,0 +1,42 @@
+# tests/test_report_cache.py
+"""
+Tests du cache persistant des rapports de coaching
+"""
+import sys
+import os
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pandas as pd
+
+from utils.report_cache import ReportCache, match_fingerprint
+
+VERSIONS = {"data": "1-1", "impact_model": "1.0.0:1-1", "guidelines": "1-1", "prompt": "abc", "llm": "llama3.1:8b"}
+
+
+def test_hit_requires_same_versions(tmp_path):
+    cache = ReportCache(tmp_path)
+    cache.put("match_1", VERSIONS, {"report": "Rapport"})
+
+    assert cache.get("match_1", VERSIONS)["payload"]["report"] == "Rapport"
+    assert cache.get("match_1", {**VERSIONS, "data": "2-2"}) is None
+    assert cache.get("match_1", {**VERSIONS, "prompt": "def"}) is None
+    assert cache.get("match_2", VERSIONS) is None
+
+
+def test_new_version_replaces_previous_report(tmp_path):
+    cache = ReportCache(tmp_path)
+    cache.put("match_1", VERSIONS, {"report": "v1"})
+    cache.put("match_1", {**VERSIONS, "llm": "mistral"}, {"report": "v2"})
+
+    assert cache.get("match_1", VERSIONS) is None
+    assert cache.info()["reports"] == 1
+    assert cache.invalidate("match_1") == 1
+
+
+def test_match_fingerprint_only_changes_with_match_rows():
+    rows = pd.DataFrame({"match_id": ["m1", "m1"], "player_name": ["A", "B"], "points": [10, 12]})
+
+    assert match_fingerprint(rows) == match_fingerprint(rows.copy())
+    assert match_fingerprint(rows) != match_fingerprint(rows.assign(points=[10, 14]))
+    assert match_fingerprint(rows.iloc[0:0]) == "absent"
@@ -0,0 +1,74 @@
+# tests/test_scrape_cache.py
+"""
+Tests du cache des sources scrapées (frais, périmé + rafraîchissement, dernière version connue, disque)
+"""
+import sys
+import os
+import asyncio
+
+import pytest
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.scrape_cache import ScrapeCache
+
+
+class Source:
+    def __init__(self):
+        self.calls = 0
+        self.down = False
+
+    async def fetch(self):
+        self.calls += 1
+        await asyncio.sleep(0.01)
+        if self.down:
+            raise ConnectionError("source en panne")
+        return {"version": self.calls}
+
+
+def _age(cache, key, seconds):
+    cache.lookup(key).fetched_at -= seconds
+
+
+def test_fresh_then_stale_while_revalidate(tmp_path):
+    async def run():
+        cache = ScrapeCache(tmp_path, ttl_seconds=60, max_stale_seconds=3600)
+        source = Source()
+
+        value, info = await cache.get_or_fetch("nba", source.fetch)
+        assert value == {"version": 1} and info["status"] == "miss"
+        value, info = await cache.get_or_fetch("nba", source.fetch)
+        assert value == {"version": 1} and info["status"] == "fresh" and source.calls == 1
+
+        _age(cache, "nba", 120)
+        # périmé : servi tout de suite, un seul rafraîchissement en arrière-plan
+        value, info = await cache.get_or_fetch("nba", source.fetch)
+        value_again, _ = await cache.get_or_fetch("nba", source.fetch)
+        assert value == value_again == {"version": 1} and info["status"] == "stale"
+        await asyncio.sleep(0.05)
+        assert source.calls == 2
+        value, info = await cache.get_or_fetch("nba", source.fetch)
+        assert value == {"version": 2} and info["status"] == "fresh"
+
+    asyncio.run(run())
+
+
+def test_last_known_good_and_disk_tier(tmp_path):
+    async def run():
+        source = Source()
+        await ScrapeCache(tmp_path, ttl_seconds=60).get_or_fetch("news", source.fetch)
+
+        # nouvelle instance (redémarrage) : relue depuis le disque
+        cache = ScrapeCache(tmp_path, ttl_seconds=60, max_stale_seconds=600)
+        value, info = await cache.get_or_fetch("news", source.fetch)
+        assert value == {"version": 1} and info["status"] == "fresh" and cache.stats["disk_reads"] == 1
+
+        _age(cache, "news", 3600)
+        source.down = True
+        value, info = await cache.get_or_fetch("news", source.fetch)
+        assert value == {"version": 1} and info["status"] == "last_known_good"
+
+        with pytest.raises(ConnectionError):
+            await cache.get_or_fetch("inconnue", source.fetch)
+
+    asyncio.run(run())
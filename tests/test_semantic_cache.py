@@ -0,0 +1,78 @@
+# tests/test_semantic_cache.py
+"""
+Tests du cache sémantique des réponses LLM
+"""
+
+import sys
+import os
+import time
+import zlib
+
+import numpy as np
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.semantic_cache import SemanticCache, normalize_question
+
+
+def _embed(question: str) -> np.ndarray:
+    """Sac de mots haché : deux questions partageant leurs mots sont proches"""
+    vector = np.zeros(256, dtype=np.float32)
+    for word in normalize_question(question).split():
+        vector[zlib.crc32(word.encode()) % 256] += 1
+    return vector
+
+
+def _cache(tmp_path, **kwargs):
+    return SemanticCache(tmp_path / "cache", _embed, **{"similarity_threshold": 0.8, **kwargs})
+
+
+def test_exact_and_similar_questions(tmp_path):
+    cache = _cache(tmp_path)
+    cache.store("Comment défendre sur une transition rapide ?", "Repli immédiat", {"model": "llama3.1:8b"})
+
+    exact = cache.lookup("comment DEFENDRE sur une transition rapide")
+    assert exact["answer"] == "Repli immédiat" and exact["similarity"] == 1.0
+    assert exact["metadata"] == {"model": "llama3.1:8b"}
+
+    similar = cache.lookup("Comment défendre sur une transition très rapide ?")
+    assert similar["answer"] == "Repli immédiat" and similar["similarity"] < 1.0
+
+    assert cache.lookup("Quel échauffement avant un match ?") is None
+
+
+def test_ttl_and_lru_eviction(tmp_path):
+    cache = _cache(tmp_path, ttl_seconds=60, max_entries=2)
+    cache.store("question un", "a")
+    cache.store("question deux", "b")
+    cache.lookup("question un")
+    cache.store("question trois", "c")
+    assert [entry["answer"] for entry in cache.entries] == ["a", "c"]
+
+    cache.entries[0]["created_at"] = time.time() - 120
+    assert cache.lookup("question un") is None
+    assert len(cache.entries) == 1
+
+
+def test_persistence(tmp_path):
+    _cache(tmp_path).store("Quelle zone press choisir ?", "1-2-1-1")
+    assert _cache(tmp_path).lookup("quelle zone press choisir")["answer"] == "1-2-1-1"
+
+
+def test_entries_scoped_to_model_and_prompt(tmp_path):
+    cache = _cache(tmp_path)
+    cache.store("Comment défendre sur une transition rapide ?", "Repli immédiat",
+                model="llama3.1:8b", prompt_hash="aaaa")
+
+    assert cache.lookup("comment defendre sur une transition rapide", model="llama3.1:8b", prompt_hash="aaaa")
+    assert cache.lookup("Comment défendre sur une transition très rapide ?", model="llama3.1:8b", prompt_hash="aaaa")
+    # autre modèle, autre prompt ou appel sans version : absent du cache
+    assert cache.lookup("comment defendre sur une transition rapide", model="mistral:7b", prompt_hash="aaaa") is None
+    assert cache.lookup("Comment défendre sur une transition très rapide ?", model="llama3.1:8b", prompt_hash="bbbb") is None
+    assert cache.lookup("comment defendre sur une transition rapide") is None
+
+    # nouvelle réponse pour la même question avec le nouveau modèle : remplace l'ancienne
+    cache.store("Comment défendre sur une transition rapide ?", "Repli et stop ball",
+                model="mistral:7b", prompt_hash="aaaa")
+    assert len(cache.entries) == 1
+    assert cache.lookup("comment defendre sur une transition rapide", model="mistral:7b", prompt_hash="aaaa")["answer"] == "Repli et stop ball"
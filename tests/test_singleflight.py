@@ -0,0 +1,63 @@
+# tests/test_singleflight.py
+"""
+Tests du regroupement des appels identiques en cours (single-flight)
+"""
+import sys
+import os
+import asyncio
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.singleflight import AsyncSingleFlight
+
+
+def test_concurrent_calls_share_one_computation_and_replay_items():
+    flights = AsyncSingleFlight()
+    calls = []
+
+    async def compute(publish):
+        calls.append(1)
+        for token in ("a", "b", "c"):
+            await publish(token)
+            await asyncio.sleep(0.01)
+        return "abc"
+
+    async def main():
+        early, late = [], []
+
+        async def join_late():
+            await asyncio.sleep(0.015)
+            return await flights.do("k", compute, subscriber=late.append)
+
+        results = await asyncio.gather(flights.do("k", compute, subscriber=early.append), join_late())
+        return results, early, late
+
+    results, early, late = asyncio.run(main())
+    assert len(calls) == 1
+    assert results == [("abc", False), ("abc", True)]
+    assert early == late == ["a", "b", "c"]
+    assert flights.in_flight() == 0
+
+
+def test_computation_survives_until_last_waiter_is_cancelled():
+    flights = AsyncSingleFlight()
+    cancelled = []
+
+    async def compute(publish):
+        try:
+            await asyncio.sleep(0.05)
+            return "ok"
+        except asyncio.CancelledError:
+            cancelled.append(1)
+            raise
+
+    async def main():
+        first = asyncio.create_task(flights.do("k", compute))
+        second = asyncio.create_task(flights.do("k", compute))
+        await asyncio.sleep(0.01)
+        first.cancel()
+        result = await second
+        return result
+
+    assert asyncio.run(main()) == ("ok", True)
+    assert not cancelled
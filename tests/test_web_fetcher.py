@@ -0,0 +1,45 @@
+# tests/test_web_fetcher.py
+"""
+Tests de la récupération web parallèle sous échéance globale
+"""
+import sys
+import os
+import time
+import asyncio
+
+import httpx
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.web_fetcher import WebFetcher
+
+
+async def _handler(request: httpx.Request) -> httpx.Response:
+    if request.url.host == "lent.example":
+        await asyncio.sleep(5)
+    if request.url.host == "panne.example":
+        return httpx.Response(503)
+    await asyncio.sleep(0.1)
+    return httpx.Response(200, content=f"<html>{request.url.host}</html>".encode())
+
+
+def test_fetch_all_returns_partial_results_at_deadline():
+    urls = ["http://rapide1.example/", "http://lent.example/", "http://panne.example/", "http://rapide2.example/"]
+
+    async def run():
+        fetcher = WebFetcher(timeout=30, deadline=0.5, transport=httpx.MockTransport(_handler))
+        start = time.perf_counter()
+        try:
+            results, late = await fetcher.fetch_all(urls)
+        finally:
+            await fetcher.aclose()
+        return results, late, time.perf_counter() - start
+
+    results, late, elapsed = asyncio.run(run())
+
+    # requêtes simultanées : ~0.1s pour les sources rapides, l'échéance borne l'attente du lent
+    assert elapsed < 1.5
+    assert late == ["http://lent.example/"]
+    assert list(results) == ["http://rapide1.example/", "http://panne.example/", "http://rapide2.example/"]
+    assert results["http://rapide1.example/"].ok and b"rapide1" in results["http://rapide1.example/"].content
+    assert not results["http://panne.example/"].ok and results["http://panne.example/"].error == "HTTP 503"
@@ -0,0 +1,102 @@
+# basketcoach-mcp/utils/circuit_breaker.py
+#!/usr/bin/env python3
+"""
+Disjoncteur (circuit breaker) pour les dépendances externes
+Après plusieurs échecs consécutifs, les appels échouent immédiatement pendant un délai de récupération
+"""
+
+import os
+import time
+import threading
+from typing import Dict, Any, Optional
+
+import sys
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from utils.logger import get_logger
+
+logger = get_logger("utils.circuit_breaker")
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+
+class CircuitOpenError(Exception):
+    """Appel refusé : le disjoncteur est ouvert"""
+
+    def __init__(self, name: str, retry_in: float, last_error: Optional[str] = None):
+        self.name = name
+        self.retry_in = retry_in
+        self.last_error = last_error
+        super().__init__(f"{name} indisponible (nouvelle tentative dans {retry_in:.0f}s): {last_error}")
+
+
+class CircuitBreaker:
+    """
+    - fermé : les appels passent, les échecs consécutifs sont comptés,
+    - ouvert (failure_threshold échecs) : les appels sont refusés pendant recovery_timeout secondes,
+    - semi-ouvert : un seul appel d'essai ; succès → fermé, échec → ouvert à nouveau.
+    """
+
+    def __init__(self, name: str, failure_threshold: int = 3, recovery_timeout: float = 30.0):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.recovery_timeout = recovery_timeout
+        self.state = CLOSED
+        self.failures = 0
+        self.opened_at = 0.0
+        self.last_error: Optional[str] = None
+        self._trial_in_flight = False
+        self._lock = threading.Lock()
+
+    def allow(self) -> bool:
+        """True si un appel peut être tenté (en semi-ouvert : un seul appel d'essai à la fois)"""
+        with self._lock:
+            if self.state == CLOSED:
+                return True
+            if self.state == OPEN and time.monotonic() - self.opened_at >= self.recovery_timeout:
+                self.state = HALF_OPEN
+                self._trial_in_flight = False
+            if self.state == HALF_OPEN and not self._trial_in_flight:
+                self._trial_in_flight = True
+                return True
+            return False
+
+    def check(self):
+        """Lève CircuitOpenError si l'appel doit échouer immédiatement"""
+        if not self.allow():
+            raise CircuitOpenError(self.name, self.retry_in(), self.last_error)
+
+    def record_success(self):
+        with self._lock:
+            if self.state != CLOSED:
+                logger.info(f"✅ {self.name}: service rétabli, disjoncteur refermé")
+            self.state = CLOSED
+            self.failures = 0
+            self._trial_in_flight = False
+
+    def record_failure(self, error: Optional[str] = None):
+        with self._lock:
+            self.failures += 1
+            self.last_error = error or self.last_error
+            self._trial_in_flight = False
+            if self.state == HALF_OPEN or self.failures >= self.failure_threshold:
+                if self.state != OPEN:
+                    logger.warning(f"⚠️ {self.name}: {self.failures} échecs, disjoncteur ouvert "
+                                   f"pour {self.recovery_timeout:.0f}s ({self.last_error})")
+                self.state = OPEN
+                self.opened_at = time.monotonic()
+
+    def retry_in(self) -> float:
+        if self.state != OPEN:
+            return 0.0
+        return max(0.0, self.recovery_timeout - (time.monotonic() - self.opened_at))
+
+    def status(self) -> Dict[str, Any]:
+        return {
+            "name": self.name,
+            "state": self.state,
+            "failures": self.failures,
+            "retry_in_s": round(self.retry_in(), 1),
+            "last_error": self.last_error,
+        }
@@ -150,7 +150,10 @@ class Config:
             "MCP_SERVER_HOST": ["mcp", "server", "host"],
             "MCP_SERVER_PORT": ["mcp", "server", "port"],
             "MLFLOW_TRACKING_URI": ["mlflow", "tracking_uri"],
-            "LOG_LEVEL": ["logging", "level"]
+            "LOG_LEVEL": ["logging", "level"],
+            "RAG_SERVICE_MODE": ["rag", "service", "mode"],
+            "RAG_SERVICE_URL": ["rag", "service", "url"],
+            "OLLAMA_BASE_URL": ["llm", "ollama", "base_url"]
         }
         
         for env_var, config_path in env_mappings.items():
@@ -0,0 +1,126 @@
+# basketcoach-mcp/utils/html_parsers.py
+#!/usr/bin/env python3
+"""
+Analyse ciblée des pages scrapées (classement basketball-reference, recherches d'actualités)
+lxml (arbre C) et requêtes XPath sur les seuls éléments utiles, au lieu d'un arbre BeautifulSoup complet
+construit par html.parser ; mêmes règles d'extraction que les versions BeautifulSoup d'origine
+"""
+
+import os
+from datetime import datetime
+from typing import Dict, List, Optional
+
+import lxml.html
+from lxml import etree
+
+import sys
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from utils.logger import get_logger
+
+logger = get_logger("utils.html_parsers")
+
+NEWS_CONTAINER_CLASSES = ['article', 'news-item', 'post', 'actualite']
+NEWS_LINK_CLASSES = ['news-link', 'article-link']
+NEWS_DESCRIPTION_CLASSES = ['excerpt', 'description', 'summary']
+
+
+def _has_class(classes: List[str]) -> str:
+    """Prédicat XPath : l'attribut class contient l'un des jetons (équivalent de class_=[...] de BeautifulSoup)"""
+    return " or ".join(f"contains(concat(' ', normalize-space(@class), ' '), ' {name} ')" for name in classes)
+
+
+_TEXTS = etree.XPath(".//text()[not(parent::script or parent::style)]")
+
+
+def _text(element) -> str:
+    """Équivalent de get_text(strip=True) : fragments de texte nettoyés puis concaténés (hors commentaires et scripts)"""
+    return "".join(fragment.strip() for fragment in _TEXTS(element))
+
+
+def _document(content: bytes):
+    """Arbre lxml de la page (encodage détecté depuis les octets, comme BeautifulSoup), None si vide"""
+    try:
+        return lxml.html.document_fromstring(content)
+    except (etree.ParserError, ValueError):
+        return None
+
+
+# Requêtes compilées une fois
+_STANDINGS_TABLE = etree.XPath("//table[@id=$table_id]")
+_ROWS = etree.XPath(".//tr")
+_CELLS = etree.XPath(".//th | .//td")
+_NEWS_ARTICLES = etree.XPath("//article")
+_NEWS_DIVS = etree.XPath(f"//div[{_has_class(NEWS_CONTAINER_CLASSES)}]")
+_NEWS_LINKS = etree.XPath(f"//a[{_has_class(NEWS_LINK_CLASSES)}]")
+_TITLE = etree.XPath("(.//*[self::h1 or self::h2 or self::h3 or self::h4 or self::h5])[1]")
+_HREF = etree.XPath("(.//a[@href])[1]")
+_DESCRIPTION = etree.XPath(f"(.//*[(self::p or self::div) and ({_has_class(NEWS_DESCRIPTION_CLASSES)})])[1]")
+
+
+def parse_nba_standings(content: bytes, limit: int = 30) -> List[Dict[str, str]]:
+    """
+    Classement de la conférence Est (table confs_standings_E, sinon divs_standings_E)
+
+    Raises:
+        ValueError: si la structure de la page a changé (table absente)
+    """
+    document = _document(content)
+    tables = []
+    if document is not None:
+        tables = _STANDINGS_TABLE(document, table_id="confs_standings_E") or \
+                 _STANDINGS_TABLE(document, table_id="divs_standings_E")
+    if not tables:
+        raise ValueError("Structure page changée")
+
+    ranking = []
+    for row in _ROWS(tables[0])[1:limit + 1]:
+        cells = _CELLS(row)
+        if len(cells) > 3:
+            ranking.append({"team": _text(cells[0]), "wins": _text(cells[1]), "losses": _text(cells[2])})
+    return ranking
+
+
+def _absolute_link(link: str, url: str) -> str:
+    if link and not link.startswith(('http', '//')):
+        if link.startswith('/'):
+            return '/'.join(url.split('/')[:3]) + link
+        return url + link
+    return link
+
+
+def parse_news_articles(content: bytes, url: str, player_name: str, limit: int = 5) -> List[Dict]:
+    """Articles d'une page de recherche (`limit` au plus examinés) dont le titre concerne le joueur ou le basket"""
+    document = _document(content)
+    if document is None:
+        return []
+
+    # Même ordre que l'extraction d'origine : <article>, puis <div> d'article, puis liens d'article
+    candidates = (_NEWS_ARTICLES(document) + _NEWS_DIVS(document) + _NEWS_LINKS(document))[:limit]
+    keywords = [player_name.split()[0] if player_name.split() else player_name, 'basket', 'LFB']
+    domain = url.split('/')[2]
+
+    news_items = []
+    for article in candidates:
+        title_elements = _TITLE(article)
+        title = _text(title_elements[0]) if title_elements else None
+
+        link: Optional[str] = None
+        link_elements = [article] if article.tag == 'a' else _HREF(article)
+        if link_elements and link_elements[0].get('href'):
+            link = _absolute_link(link_elements[0].get('href'), url)
+
+        description = None
+        description_elements = _DESCRIPTION(article)
+        if description_elements:
+            description = _text(description_elements[0])[:200] + "..."
+
+        if title and link and any(keyword.lower() in title.lower() for keyword in keywords):
+            news_items.append({
+                "title": title,
+                "link": link,
+                "source": domain,
+                "date": datetime.now().strftime("%Y-%m-%d"),
+                "description": description or f"Article concernant {player_name} trouvé sur {domain}",
+                "scraped": True
+            })
+    return news_items
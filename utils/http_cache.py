@@ -0,0 +1,170 @@
+# basketcoach-mcp/utils/http_cache.py
+#!/usr/bin/env python3
+"""
+Cache HTTP sur disque des pages externes (classement basketball-reference, recherches d'actualités)
+Les validateurs ETag / Last-Modified sont conservés avec le corps : les requêtes suivantes sont conditionnelles
+et une réponse 304 réutilise le corps en cache sans le retélécharger
+"""
+
+import os
+import json
+import time
+import hashlib
+import threading
+from pathlib import Path
+from typing import Dict, Any, Optional, Mapping, Tuple
+
+import sys
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from utils.logger import get_logger
+from utils.config import get_config
+
+logger = get_logger("utils.http_cache")
+
+
+class HTTPCache:
+    """
+    Par URL, deux fichiers dans `path` : <clé>.json (validateurs, date, taille) et <clé>.body (corps brut).
+    Seules les réponses 200 portant un ETag ou un Last-Modified sont conservées (rien à revalider sinon),
+    sauf Cache-Control: no-store. Au-delà de max_entries, les entrées les moins récemment validées sont retirées
+    (jusqu'à 90 % de max_entries, pour ne pas reparcourir le répertoire à chaque nouvelle entrée).
+    Accès disque synchrones : depuis une boucle d'événements, appeler via asyncio.to_thread (voir WebFetcher.fetch).
+    """
+
+    def __init__(self, path: Path, max_entries: int = 500):
+        self.path = Path(path)
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        # nombre d'entrées, compté au premier store (approximatif si d'autres processus partagent le répertoire)
+        self._entries: Optional[int] = None
+        self.stats = {"requests": 0, "conditional": 0, "not_modified": 0, "stored": 0,
+                      "bytes_downloaded": 0, "bytes_saved": 0}
+
+    def _key(self, url: str) -> str:
+        return hashlib.sha256(url.encode("utf-8")).hexdigest()[:24]
+
+    def _meta_file(self, url: str) -> Path:
+        return self.path / f"{self._key(url)}.json"
+
+    def _body_file(self, url: str) -> Path:
+        return self.path / f"{self._key(url)}.body"
+
+    def _meta(self, url: str) -> Optional[Dict[str, Any]]:
+        try:
+            with open(self._meta_file(url), 'r', encoding='utf-8') as f:
+                meta = json.load(f)
+        except (OSError, ValueError):
+            return None
+        return meta if meta.get("url") == url else None
+
+    def conditional_headers(self, url: str) -> Dict[str, str]:
+        """En-têtes If-None-Match / If-Modified-Since de la version en cache (vide si aucune)"""
+        meta = self._meta(url)
+        if meta is None or not self._body_file(url).exists():
+            return {}
+        headers = {}
+        if meta.get("etag"):
+            headers["If-None-Match"] = meta["etag"]
+        if meta.get("last_modified"):
+            headers["If-Modified-Since"] = meta["last_modified"]
+        return headers
+
+    def not_modified(self, url: str, headers: Optional[Mapping[str, str]] = None) -> Optional[Tuple[bytes, int]]:
+        """Corps en cache et octets économisés après une réponse 304 (validateurs rafraîchis), None s'il a disparu"""
+        meta = self._meta(url)
+        try:
+            body = self._body_file(url).read_bytes()
+        except OSError:
+            return None
+        if meta is None:
+            return None
+        headers = headers or {}
+        meta["etag"] = headers.get("etag") or meta.get("etag")
+        meta["last_modified"] = headers.get("last-modified") or meta.get("last_modified")
+        meta["validated_at"] = time.time()
+        # octets qui auraient transité sans revalidation (taille compressée de la dernière réponse complète)
+        saved = int(meta.get("wire_size") or len(body))
+        with self._lock:
+            self._write_meta(url, meta)
+            self.stats["not_modified"] += 1
+            self.stats["bytes_saved"] += saved
+        return body, saved
+
+    def store(self, url: str, headers: Mapping[str, str], body: bytes, wire_size: Optional[int] = None):
+        """Conserve une réponse 200 revalidable (corps puis métadonnées, écritures atomiques)"""
+        if "no-store" in headers.get("cache-control", "").lower():
+            return
+        etag, last_modified = headers.get("etag"), headers.get("last-modified")
+        if not etag and not last_modified:
+            return
+        now = time.time()
+        meta = {"url": url, "etag": etag, "last_modified": last_modified, "size": len(body),
+                "wire_size": wire_size or len(body),
+                "content_type": headers.get("content-type"), "fetched_at": now, "validated_at": now}
+        with self._lock:
+            try:
+                self.path.mkdir(parents=True, exist_ok=True)
+                if self._entries is None:
+                    self._entries = len(list(self.path.glob("*.json")))
+                new_entry = not self._meta_file(url).exists()
+                tmp_body = self._body_file(url).with_suffix(".body.tmp")
+                tmp_body.write_bytes(body)
+                os.replace(tmp_body, self._body_file(url))
+                self._write_meta(url, meta)
+                self.stats["stored"] += 1
+                self._entries += int(new_entry)
+                if self._entries > self.max_entries:
+                    self._evict()
+            except OSError as e:
+                logger.warning(f"⚠️ Mise en cache HTTP impossible pour {url}: {e}")
+
+    def _write_meta(self, url: str, meta: Dict[str, Any]):
+        try:
+            tmp_meta = self._meta_file(url).with_suffix(".json.tmp")
+            with open(tmp_meta, 'w', encoding='utf-8') as f:
+                json.dump(meta, f, ensure_ascii=False)
+            os.replace(tmp_meta, self._meta_file(url))
+        except OSError as e:
+            logger.warning(f"⚠️ Métadonnées du cache HTTP non écrites pour {url}: {e}")
+
+    def _evict(self):
+        metas = sorted(self.path.glob("*.json"), key=lambda file: file.stat().st_mtime)
+        keep = int(self.max_entries * 0.9)
+        for file in metas[:max(0, len(metas) - keep)]:
+            file.unlink(missing_ok=True)
+            file.with_suffix(".body").unlink(missing_ok=True)
+        self._entries = min(len(metas), keep)
+
+    def record(self, conditional: bool, downloaded: int):
+        self.stats["requests"] += 1
+        self.stats["conditional"] += int(conditional)
+        self.stats["bytes_downloaded"] += downloaded
+
+    def info(self) -> Dict[str, Any]:
+        total = self.stats["bytes_downloaded"] + self.stats["bytes_saved"]
+        return {
+            "path": str(self.path),
+            "entries": len(list(self.path.glob("*.json"))),
+            **self.stats,
+            "bandwidth_saved_pct": round(100 * self.stats["bytes_saved"] / total, 1) if total else 0.0,
+        }
+
+
+_http_cache: Optional[HTTPCache] = None
+_http_cache_lock = threading.Lock()
+
+
+def get_http_cache() -> Optional[HTTPCache]:
+    """Cache HTTP partagé des scrapers (None si désactivé dans web_sources.http_cache.enabled)"""
+    global _http_cache
+    config = get_config()
+    if not config.get("web_sources.http_cache.enabled", True):
+        return None
+
+    with _http_cache_lock:
+        if _http_cache is None:
+            _http_cache = HTTPCache(
+                Path(config.get("web_sources.http_cache.path", "data/cache/http")),
+                max_entries=int(config.get("web_sources.http_cache.max_entries", 500)),
+            )
+        return _http_cache
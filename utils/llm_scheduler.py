@@ -0,0 +1,356 @@
+# basketcoach-mcp/utils/llm_scheduler.py
+#!/usr/bin/env python3
+"""
+Ordonnanceur des appels au LLM local (Ollama)
+Nombre de générations simultanées borné, priorité aux questions interactives sur les traitements de fond,
+délais maximum par requête et métriques de file d'attente.
+La file et les priorités sont propres au processus ; le nombre de générations simultanées est en plus borné
+pour toute la machine (app Streamlit, serveur MCP, API HTTP, scripts) par des verrous de fichiers partagés.
+"""
+
+import os
+import time
+import heapq
+import asyncio
+import itertools
+import threading
+from collections import deque
+from contextlib import contextmanager, asynccontextmanager
+from contextvars import ContextVar
+from pathlib import Path
+from typing import Dict, Any, Optional, List, IO
+
+try:
+    import fcntl
+except ImportError:  # Windows : créneaux limités au processus
+    fcntl = None
+
+import sys
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from utils.logger import get_logger
+from utils.config import get_config
+
+logger = get_logger("utils.llm_scheduler")
+
+INTERACTIVE = "interactive"
+BACKGROUND = "background"
+_RANK = {INTERACTIVE: 0, BACKGROUND: 1}
+
+# Priorité des générations lancées dans le contexte courant (rapports pré-générés, lots : BACKGROUND)
+llm_priority: ContextVar[str] = ContextVar("llm_priority", default=INTERACTIVE)
+
+
+class LLMSchedulerError(Exception):
+    """Génération refusée par l'ordonnanceur"""
+
+
+class LLMQueueFull(LLMSchedulerError):
+    """File d'attente pleine"""
+
+
+class LLMDeadlineExceeded(LLMSchedulerError):
+    """Aucun créneau libéré avant le délai maximum de la requête"""
+
+
+class _Ticket:
+    """Requête en attente ou en cours : priorité, ordre d'arrivée, échéance, réveil de l'appelant"""
+
+    def __init__(self, priority: str, seq: int, deadline: Optional[float], wake):
+        self.priority = priority
+        self.seq = seq
+        self.deadline = deadline
+        self.wake = wake
+        self.enqueued_at = time.monotonic()
+        self.granted = False
+        self.cancelled = False
+        self.host_slot: Optional[IO] = None
+
+    def __lt__(self, other: "_Ticket") -> bool:
+        return (_RANK[self.priority], self.seq) < (_RANK[other.priority], other.seq)
+
+    def remaining(self) -> Optional[float]:
+        """Secondes restantes avant l'échéance (None = sans échéance)"""
+        if self.deadline is None:
+            return None
+        return max(0.0, self.deadline - time.monotonic())
+
+
+class HostSlots:
+    """
+    Créneaux de génération partagés par tous les processus de la machine : un fichier verrou par créneau
+    (flock exclusif non bloquant), libéré par le système si le processus qui le détient s'arrête.
+    Les requêtes BACKGROUND n'utilisent que les `background_slots` premiers créneaux : les autres restent
+    réservés aux questions interactives, quel que soit le processus qui les pose.
+    """
+
+    def __init__(self, directory: Path, count: int, background_slots: int, poll_interval: float = 0.05):
+        self.directory = Path(directory)
+        self.count = max(1, int(count))
+        self.background_slots = max(1, min(int(background_slots), self.count))
+        self.poll_interval = poll_interval
+        self.directory.mkdir(parents=True, exist_ok=True)
+
+    def try_acquire(self, priority: str) -> Optional[IO]:
+        """Fichier verrouillé d'un créneau libre, None si tous sont occupés"""
+        for index in range(self.background_slots if priority == BACKGROUND else self.count):
+            handle = open(self.directory / f"slot-{index}.lock", "a")
+            try:
+                fcntl.flock(handle, fcntl.LOCK_EX | fcntl.LOCK_NB)
+                return handle
+            except BlockingIOError:
+                handle.close()
+        return None
+
+    def acquire(self, priority: str, remaining: Optional[float]) -> Optional[IO]:
+        """Attend un créneau au plus `remaining` secondes (None : sans limite) ; None à l'échéance"""
+        until = None if remaining is None else time.monotonic() + remaining
+        while True:
+            handle = self.try_acquire(priority)
+            if handle is not None or (until is not None and time.monotonic() >= until):
+                return handle
+            time.sleep(self.poll_interval)
+
+    async def acquire_async(self, priority: str, remaining: Optional[float]) -> Optional[IO]:
+        until = None if remaining is None else time.monotonic() + remaining
+        while True:
+            handle = self.try_acquire(priority)
+            if handle is not None or (until is not None and time.monotonic() >= until):
+                return handle
+            await asyncio.sleep(self.poll_interval)
+
+    @staticmethod
+    def release(handle: IO):
+        try:
+            fcntl.flock(handle, fcntl.LOCK_UN)
+        finally:
+            handle.close()
+
+    def info(self) -> Dict[str, Any]:
+        return {"slots": self.count, "background_slots": self.background_slots, "directory": str(self.directory)}
+
+
+class LLMScheduler:
+    """
+    - au plus `workers` générations en cours, les autres attendent dans une file à priorités,
+    - une requête INTERACTIVE passe toujours devant les requêtes BACKGROUND en attente,
+    - au plus `background_slots` créneaux occupés par des requêtes BACKGROUND : un créneau reste libre
+      pour les questions interactives dès que workers > 1,
+    - une requête qui n'obtient pas de créneau avant son échéance échoue (LLMDeadlineExceeded),
+    - la file est bornée à `max_queue` requêtes (LLMQueueFull),
+    - avec host_slots, un créneau du processus n'est accordé qu'avec un créneau de la machine (HostSlots) :
+      plusieurs processus ne dépassent pas ensemble le parallélisme d'Ollama. Entre processus, l'ordre
+      d'attribution n'est pas garanti ; seule la réservation des créneaux interactifs s'applique.
+
+    Utilisable depuis des threads (slot) comme depuis n'importe quelle boucle asyncio (aslot).
+    """
+
+    def __init__(self, workers: int = 1, background_slots: Optional[int] = None, max_queue: int = 64,
+                 deadlines: Optional[Dict[str, Optional[float]]] = None, host_slots: Optional[HostSlots] = None):
+        self.workers = max(1, int(workers))
+        self.background_slots = max(1, int(background_slots or max(1, self.workers - 1)))
+        self.max_queue = int(max_queue)
+        self.deadlines = deadlines or {}
+        self.host_slots = host_slots
+        self._queue: List[_Ticket] = []
+        self._running = {INTERACTIVE: 0, BACKGROUND: 0}
+        self._seq = itertools.count()
+        self._lock = threading.Lock()
+        self._waits = {INTERACTIVE: deque(maxlen=200), BACKGROUND: deque(maxlen=200)}
+        self.stats = {"completed": 0, "expired": 0, "rejected": 0, "cancelled": 0, "max_queue_depth": 0}
+
+    # ------------------------------------------------------------------ file d'attente
+
+    def _enqueue(self, priority: Optional[str], deadline: Optional[float], wake) -> _Ticket:
+        priority = priority or llm_priority.get()
+        if priority not in _RANK:
+            raise ValueError(f"Priorité inconnue: {priority}")
+        if deadline is None:
+            deadline = self.deadlines.get(priority)
+        ticket = _Ticket(priority, next(self._seq), time.monotonic() + deadline if deadline else None, wake)
+        with self._lock:
+            if len(self._queue) >= self.max_queue:
+                self.stats["rejected"] += 1
+                raise LLMQueueFull(f"{len(self._queue)} générations déjà en attente")
+            heapq.heappush(self._queue, ticket)
+            self.stats["max_queue_depth"] = max(self.stats["max_queue_depth"], len(self._queue))
+            self._dispatch()
+        return ticket
+
+    def _dispatch(self):
+        """Attribue les créneaux libres (appelé sous verrou)"""
+        deferred = []
+        while self._queue and sum(self._running.values()) < self.workers:
+            ticket = heapq.heappop(self._queue)
+            if ticket.cancelled:
+                continue
+            if ticket.priority == BACKGROUND and self._running[BACKGROUND] >= self.background_slots:
+                deferred.append(ticket)
+                continue
+            ticket.granted = True
+            self._running[ticket.priority] += 1
+            self._waits[ticket.priority].append(time.monotonic() - ticket.enqueued_at)
+            ticket.wake()
+        for ticket in deferred:
+            heapq.heappush(self._queue, ticket)
+
+    def _abandon(self, ticket: _Ticket, expired: bool) -> bool:
+        """Retire une requête en attente ; False si un créneau lui a été attribué entre-temps"""
+        with self._lock:
+            if ticket.granted:
+                return False
+            ticket.cancelled = True
+            self._queue = [t for t in self._queue if t is not ticket]
+            heapq.heapify(self._queue)
+            self.stats["expired" if expired else "cancelled"] += 1
+            return True
+
+    def release(self, ticket: _Ticket, completed: bool = True):
+        if ticket.host_slot is not None:
+            HostSlots.release(ticket.host_slot)
+            ticket.host_slot = None
+        with self._lock:
+            if not ticket.granted:
+                return
+            ticket.granted = False
+            self._running[ticket.priority] -= 1
+            self.stats["completed"] += completed
+            self._dispatch()
+
+    def _expired(self, ticket: _Ticket) -> LLMDeadlineExceeded:
+        waited = time.monotonic() - ticket.enqueued_at
+        logger.warning(f"⚠️ LLM: requête {ticket.priority} sans créneau après {waited:.1f}s (échéance dépassée)")
+        return LLMDeadlineExceeded(f"aucun créneau LLM libéré en {waited:.1f}s")
+
+    def _host_expired(self, ticket: _Ticket) -> LLMDeadlineExceeded:
+        with self._lock:
+            self.stats["expired"] += 1
+        waited = time.monotonic() - ticket.enqueued_at
+        logger.warning(f"⚠️ LLM: requête {ticket.priority} sans créneau machine après {waited:.1f}s (autres processus)")
+        return LLMDeadlineExceeded(f"aucun créneau LLM libéré par les autres processus en {waited:.1f}s")
+
+    # ------------------------------------------------------------------ acquisition
+
+    def acquire(self, priority: Optional[str] = None, deadline: Optional[float] = None) -> _Ticket:
+        """Attend un créneau (thread courant bloqué) ; deadline en secondes, sinon celle de la priorité"""
+        event = threading.Event()
+        ticket = self._enqueue(priority, deadline, event.set)
+        if not event.wait(ticket.remaining()) and self._abandon(ticket, expired=True):
+            raise self._expired(ticket)
+        if self.host_slots is not None:
+            ticket.host_slot = self.host_slots.acquire(ticket.priority, ticket.remaining())
+            if ticket.host_slot is None:
+                self.release(ticket, completed=False)
+                raise self._host_expired(ticket)
+        return ticket
+
+    async def acquire_async(self, priority: Optional[str] = None, deadline: Optional[float] = None) -> _Ticket:
+        """Attend un créneau sans bloquer la boucle d'événements ; l'annulation retire la requête de la file"""
+        loop = asyncio.get_running_loop()
+        granted = loop.create_future()
+
+        def wake():
+            loop.call_soon_threadsafe(lambda: granted.done() or granted.set_result(True))
+
+        ticket = self._enqueue(priority, deadline, wake)
+        try:
+            await asyncio.wait_for(asyncio.shield(granted), ticket.remaining())
+        except asyncio.TimeoutError:
+            if self._abandon(ticket, expired=True):
+                raise self._expired(ticket)
+        except asyncio.CancelledError:
+            if not self._abandon(ticket, expired=False):
+                self.release(ticket)
+            raise
+        if self.host_slots is not None:
+            try:
+                ticket.host_slot = await self.host_slots.acquire_async(ticket.priority, ticket.remaining())
+            except BaseException:
+                self.release(ticket, completed=False)
+                raise
+            if ticket.host_slot is None:
+                self.release(ticket, completed=False)
+                raise self._host_expired(ticket)
+        return ticket
+
+    @contextmanager
+    def slot(self, priority: Optional[str] = None, deadline: Optional[float] = None):
+        ticket = self.acquire(priority, deadline)
+        try:
+            yield ticket
+        finally:
+            self.release(ticket)
+
+    @asynccontextmanager
+    async def aslot(self, priority: Optional[str] = None, deadline: Optional[float] = None):
+        ticket = await self.acquire_async(priority, deadline)
+        try:
+            yield ticket
+        finally:
+            self.release(ticket)
+
+    # ------------------------------------------------------------------ métriques
+
+    def metrics(self) -> Dict[str, Any]:
+        """Créneaux occupés, profondeur de file et temps d'attente (ms) par priorité"""
+        with self._lock:
+            queued = {INTERACTIVE: 0, BACKGROUND: 0}
+            for ticket in self._queue:
+                if not ticket.cancelled:
+                    queued[ticket.priority] += 1
+            waits = {}
+            for priority, samples in self._waits.items():
+                ordered = sorted(samples)
+                waits[priority] = {
+                    "samples": len(ordered),
+                    "p50_ms": round(ordered[len(ordered) // 2] * 1000, 1) if ordered else None,
+                    "p95_ms": round(ordered[int(len(ordered) * 0.95)] * 1000, 1) if ordered else None,
+                    "max_ms": round(ordered[-1] * 1000, 1) if ordered else None,
+                }
+            return {
+                "workers": self.workers,
+                "background_slots": self.background_slots,
+                "running": dict(self._running),
+                "queued": queued,
+                "queue_depth": sum(queued.values()),
+                "wait": waits,
+                "host_slots": self.host_slots.info() if self.host_slots is not None else None,
+                **self.stats,
+            }
+
+
+_scheduler: Optional[LLMScheduler] = None
+_scheduler_lock = threading.Lock()
+
+
+def get_llm_scheduler() -> LLMScheduler:
+    """
+    Ordonnanceur partagé par tous les appels Ollama du processus (config llm.scheduler),
+    créneaux de la machine partagés avec les autres processus si llm.scheduler.host_slots est vrai
+    """
+    global _scheduler
+    with _scheduler_lock:
+        if _scheduler is None:
+            config = get_config()
+            workers = int(config.get("llm.scheduler.workers", 1))
+            background_slots = config.get("llm.scheduler.background_slots")
+            host_slots = None
+            if config.get("llm.scheduler.host_slots", True):
+                if fcntl is None:
+                    logger.warning("⚠️ Verrous de fichiers indisponibles : créneaux LLM limités au processus")
+                else:
+                    host_slots = HostSlots(
+                        Path(config.get("llm.scheduler.lock_dir", "data/cache/llm_slots")), workers,
+                        int(background_slots or max(1, workers - 1)),
+                    )
+            _scheduler = LLMScheduler(
+                workers=workers,
+                background_slots=background_slots,
+                max_queue=int(config.get("llm.scheduler.max_queue", 64)),
+                deadlines={
+                    INTERACTIVE: config.get("llm.scheduler.deadlines.interactive"),
+                    BACKGROUND: config.get("llm.scheduler.deadlines.background"),
+                },
+                host_slots=host_slots,
+            )
+            logger.info(f"✅ Ordonnanceur LLM: {_scheduler.workers} génération(s) simultanée(s)")
+        return _scheduler
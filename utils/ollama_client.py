@@ -2,10 +2,195 @@
 import requests
 import logging
 import time
-from typing import Optional
+import json
+import asyncio
+import inspect
+import weakref
+import threading
+from contextvars import ContextVar
+from typing import Optional, Dict, Any, Callable, Tuple, AsyncIterator, Awaitable
+
+import httpx
+
+from utils.config import get_config
+from utils.circuit_breaker import CircuitBreaker, CLOSED, HALF_OPEN
+from utils.singleflight import AsyncSingleFlight, SingleFlight
+from utils.llm_scheduler import get_llm_scheduler, llm_priority, LLMSchedulerError, LLMDeadlineExceeded
 
 logger = logging.getLogger("ollama")
 
+DEFAULT_BASE_URL = "http://localhost:11434"
+DEFAULT_MODEL = "llama3.1:8b"
+DEFAULT_OPTIONS = {
+    "temperature": 0.3,
+    "num_predict": 1024,
+    "top_k": 40,
+    "top_p": 0.9
+}
+
+# Destinataire des tokens de la génération en cours (flux SSE, interface Streamlit) : fixé par l'appelant
+# autour de l'appel d'un outil, hérité par les tâches qu'il crée. None = pas de diffusion.
+token_sink: ContextVar[Optional[Callable[[str], Any]]] = ContextVar("ollama_token_sink", default=None)
+
+def _payload(model: str, prompt: str, stream: bool, options: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+    """
+    Corps d'une requête /api/generate : options par défaut, fenêtre de contexte fixe (llm.ollama.num_ctx,
+    une valeur différente d'une requête à l'autre recharge le modèle) et keep_alive pour garder le modèle en mémoire
+    """
+    config = get_config()
+    request_options = dict(DEFAULT_OPTIONS)
+    num_ctx = config.get("llm.ollama.num_ctx")
+    if num_ctx:
+        request_options["num_ctx"] = int(num_ctx)
+    request_options.update(options or {})
+    payload = {"model": model, "prompt": prompt, "stream": stream, "options": request_options}
+    keep_alive = config.get("llm.ollama.keep_alive", "30m")
+    if keep_alive is not None:
+        payload["keep_alive"] = keep_alive
+    return payload
+
+def _extract_text(result: Any) -> str:
+    """Texte généré, quelle que soit la forme de la réponse JSON (/api/generate, /api/chat, ...)"""
+    if isinstance(result, dict):
+        return result.get("response") or result.get("result") or result.get("message", {}).get("content") or result.get("output") or str(result)
+    return str(result)
+
+class ModelReadiness:
+    """
+    Disponibilité des modèles Ollama (/api/tags) mise en cache :
+    - la dernière réponse est servie pendant ttl secondes sans appel réseau,
+    - au-delà, la valeur périmée est servie et rafraîchie en arrière-plan (thread) ;
+      seule la toute première vérification attend la réponse d'Ollama.
+    """
+
+    def __init__(self, base_url: str, ttl: float = 30.0, timeout: float = 5.0):
+        self.base_url = base_url
+        self.ttl = ttl
+        self.timeout = timeout
+        self.models: set = set()
+        self.reachable = False
+        self.error: Optional[str] = None
+        self.checked_at = 0.0
+        self._refreshing = False
+        self._lock = threading.Lock()
+
+    @property
+    def is_cold(self) -> bool:
+        return self.checked_at == 0.0
+
+    def refresh(self):
+        """Interroge /api/tags (bloquant, délai court)"""
+        try:
+            resp = requests.get(f"{self.base_url}/api/tags", timeout=self.timeout)
+            resp.raise_for_status()
+            models = set()
+            for entry in resp.json().get("models", []):
+                models.update(name for name in (entry.get("name"), entry.get("model")) if name)
+            self.models, self.reachable, self.error = models, True, None
+        except Exception as e:
+            self.reachable, self.error = False, f"{type(e).__name__}: {e}"
+        finally:
+            self.checked_at = time.monotonic()
+            self._refreshing = False
+
+    def _refresh_in_background(self):
+        with self._lock:
+            if self._refreshing:
+                return
+            self._refreshing = True
+        threading.Thread(target=self.refresh, name="ollama-readiness", daemon=True).start()
+
+    def status(self, model: str) -> str:
+        """ready | missing (Ollama répond, modèle absent) | unreachable"""
+        if self.is_cold:
+            self.refresh()
+        elif time.monotonic() - self.checked_at > self.ttl:
+            self._refresh_in_background()
+        if not self.reachable:
+            return "unreachable"
+        if model in self.models or f"{model}:latest" in self.models:
+            return "ready"
+        return "missing"
+
+    def info(self) -> Dict[str, Any]:
+        return {
+            "reachable": self.reachable,
+            "models": sorted(self.models),
+            "age_s": None if self.is_cold else round(time.monotonic() - self.checked_at, 1),
+            "error": self.error,
+        }
+
+
+_readiness: Dict[str, ModelReadiness] = {}
+_breakers: Dict[str, CircuitBreaker] = {}
+_registry_lock = threading.Lock()
+
+def get_readiness(base_url: str) -> ModelReadiness:
+    with _registry_lock:
+        if base_url not in _readiness:
+            config = get_config()
+            _readiness[base_url] = ModelReadiness(base_url, ttl=float(config.get("llm.ollama.readiness_ttl", 30)))
+        return _readiness[base_url]
+
+def get_breaker(base_url: str) -> CircuitBreaker:
+    with _registry_lock:
+        if base_url not in _breakers:
+            config = get_config()
+            _breakers[base_url] = CircuitBreaker(
+                f"Ollama ({base_url})",
+                failure_threshold=int(config.get("llm.ollama.circuit.failure_threshold", 3)),
+                recovery_timeout=float(config.get("llm.ollama.circuit.recovery_timeout", 30)),
+            )
+        return _breakers[base_url]
+
+def ollama_status(base_url: Optional[str] = None) -> Dict[str, Any]:
+    """État d'Ollama vu par le client : disponibilité des modèles (cache) et disjoncteur"""
+    base_url = (base_url or get_config().get("llm.ollama.base_url", DEFAULT_BASE_URL)).rstrip("/")
+    return {
+        "base_url": base_url,
+        "readiness": get_readiness(base_url).info(),
+        "circuit": get_breaker(base_url).status(),
+        "scheduler": get_llm_scheduler().metrics(),
+        "single_flight": {
+            "sync": dict(_sync_flights.stats),
+            "async": {k: sum(client.flights.stats[k] for client in list(_async_clients.values())) for k in ("leaders", "shared")},
+        },
+    }
+
+def _unavailable_reason(base_url: str, model: str) -> Optional[str]:
+    """
+    Message "[IA locale ...]" si la génération doit échouer immédiatement
+    (disjoncteur ouvert, Ollama injoignable, modèle absent), None sinon
+    """
+    breaker = get_breaker(base_url)
+    if not breaker.allow():
+        return f"[IA locale indisponible : Ollama en échec, nouvelle tentative dans {breaker.retry_in():.0f}s]"
+    readiness = get_readiness(base_url)
+    status = readiness.status(model)
+    if status == "unreachable" and breaker.state == HALF_OPEN:
+        # Appel d'essai : vérification fraîche plutôt que l'état "injoignable" en cache
+        readiness.refresh()
+        status = readiness.status(model)
+    if status == "unreachable":
+        breaker.record_failure(readiness.error)
+        return "[IA locale non disponible : Ollama injoignable]"
+    if status == "missing":
+        breaker.record_success()  # Ollama répond : seul le modèle manque
+        return f"[IA locale non prête : modèle {model} indisponible]"
+    return None
+
+def _wait_until_available(base_url: str, model: str, max_wait: int, poll_interval: int = 5) -> Optional[str]:
+    """Attente bornée d'un modèle absent (utile au premier démarrage) ; échec immédiat si Ollama est en panne"""
+    reason = _unavailable_reason(base_url, model)
+    waited = 0
+    while reason and "non prête" in reason and waited < max_wait:
+        logger.info(f"Ollama: modèle '{model}' non disponible, attente {waited}s...")
+        time.sleep(poll_interval)
+        waited += poll_interval
+        get_readiness(base_url).refresh()
+        reason = _unavailable_reason(base_url, model)
+    return reason
+
 def check_ollama_health(base_url: str = "http://localhost:11434") -> bool:
     """Vérifie si Ollama est accessible (endpoint /api/tags)."""
     try:
@@ -14,68 +199,102 @@ def check_ollama_health(base_url: str = "http://localhost:11434") -> bool:
     except Exception:
         return False
 
-def generate_with_ollama(prompt: str, model: str = "llama3.1:8b", max_retries: int = 5, base_url: str = "http://localhost:11434", max_wait_model_ready: int = 600) -> str:
+def _flight_key(mode: str, model: str, prompt: str, options: Optional[Dict[str, Any]]) -> Tuple[str, str, str, str]:
+    """Clé single-flight : deux requêtes de même (modèle, prompt, options) produisent la même génération"""
+    return mode, model, prompt, json.dumps({**DEFAULT_OPTIONS, **(options or {})}, sort_keys=True)
+
+# Générations synchrones identiques en cours (threads) : une seule requête Ollama
+_sync_flights = SingleFlight()
+
+def _scheduler_refusal(error: LLMSchedulerError) -> str:
+    """Message "[IA locale ...]" d'une génération refusée par l'ordonnanceur"""
+    logger.error(f"Ollama: génération refusée par l'ordonnanceur ({error})")
+    if isinstance(error, LLMDeadlineExceeded):
+        return f"[IA locale surchargée : {error}]"
+    return f"[IA locale surchargée : {error}, réessayez plus tard]"
+
+def generate_with_ollama(prompt: str, model: str = "llama3.1:8b", max_retries: int = 5, base_url: str = "http://localhost:11434",
+                         max_wait_model_ready: Optional[int] = None, priority: Optional[str] = None,
+                         deadline: Optional[float] = None) -> str:
+    """
+    Génération robuste avec Ollama (les appels concurrents identiques partagent une seule génération).
+    La génération attend un créneau de l'ordonnanceur LLM (priority : "interactive" ou "background",
+    deadline : attente maximale en secondes, sinon celle configurée pour la priorité).
+    """
+    key = (base_url.rstrip("/"),) + _flight_key("generate", model, prompt, None)
+    priority = priority or llm_priority.get()
+    text, shared = _sync_flights.do(
+        key, lambda: _generate_with_ollama(prompt, model, max_retries, base_url, max_wait_model_ready, priority, deadline)
+    )
+    if shared:
+        logger.info("Ollama: génération identique en cours, résultat partagé")
+    return text
+
+def _generate_with_ollama(prompt: str, model: str, max_retries: int, base_url: str, max_wait_model_ready: Optional[int],
+                         priority: str, deadline: Optional[float]) -> str:
     """
     Génération robuste avec Ollama :
-    - attend que le service et le modèle soient disponibles,
+    - disponibilité du modèle lue dans un cache rafraîchi en arrière-plan (attente bornée par max_wait_model_ready),
+    - échec immédiat tant que le disjoncteur est ouvert (Ollama en panne),
     - essaye /api/generate puis /api/chat,
     - backoff exponentiel entre tentatives,
     - gère plusieurs formes de réponse JSON.
     """
-    def model_ready() -> bool:
-        try:
-            resp = requests.get(f"{base_url}/api/tags", timeout=5)
-            if resp.status_code != 200:
-                return False
-            data = resp.json()
-            return model in str(data)
-        except Exception:
-            return False
+    base_url = base_url.rstrip("/")
+    if max_wait_model_ready is None:
+        max_wait_model_ready = int(get_config().get("llm.ollama.max_wait_model_ready", 0))
+    reason = _wait_until_available(base_url, model, max_wait_model_ready)
+    if reason:
+        logger.error(f"Ollama: {reason}")
+        return reason
+    try:
+        with get_llm_scheduler().slot(priority, deadline) as ticket:
+            return _post_with_retries(prompt, model, max_retries, base_url, ticket.remaining)
+    except LLMSchedulerError as e:
+        return _scheduler_refusal(e)
 
-    # Attente pour disponibilité du modèle (utile au premier démarrage)
-    waited = 0
-    poll_interval = 5
-    while not model_ready() and waited < max_wait_model_ready:
-        logger.info(f"Ollama: modèle '{model}' non disponible, attente {waited}s...")
-        time.sleep(poll_interval)
-        waited += poll_interval
+def _deadline_exceeded() -> str:
+    logger.error("Ollama: échéance de la requête dépassée pendant la génération")
+    return "[IA locale : échéance de la requête dépassée]"
 
-    if not model_ready():
-        logger.error(f"Ollama: modèle '{model}' introuvable après {max_wait_model_ready}s.")
-        return "[IA locale non prête : modèle indisponible]"
-
-    payload = {
-        "model": model,
-        "prompt": prompt,
-        "stream": False,
-        "options": {
-            "temperature": 0.3,
-            "num_predict": 1024,
-            "top_k": 40,
-            "top_p": 0.9
-        }
-    }
+def _post_with_retries(prompt: str, model: str, max_retries: int, base_url: str,
+                       remaining: Callable[[], Optional[float]] = lambda: None) -> str:
+    """
+    Tentatives synchrones bornées par l'échéance du créneau (remaining : secondes restantes, None = sans échéance) :
+    chaque requête attend au plus le temps restant, plus de nouvelle tentative ni de backoff une fois celui-ci écoulé.
+    """
+    breaker = get_breaker(base_url)
+    config = get_config()
+    first_timeout = float(config.get("llm.ollama.first_timeout", 300))
+    retry_timeout = float(config.get("llm.ollama.retry_timeout", 120))
+
+    payload = _payload(model, prompt, stream=False)
 
     url_candidates = [f"{base_url}/api/generate", f"{base_url}/api/chat"]
     for attempt in range(1, max_retries + 1):
         for url in url_candidates:
+            # laisser plus de temps au premier appel lourd, sans dépasser l'échéance
+            timeout = first_timeout if attempt == 1 else retry_timeout
+            left = remaining()
+            if left is not None:
+                if left <= 0:
+                    return _deadline_exceeded()
+                timeout = min(timeout, left)
             try:
-                timeout = 300 if attempt == 1 else 120  # laisser plus de temps au premier appel lourd
                 resp = requests.post(url, json=payload, timeout=timeout, headers={"Content-Type": "application/json"})
                 # gérer cas de status non-OK
                 if resp.status_code in (200, 201):
+                    breaker.record_success()
                     try:
                         result = resp.json()
                     except Exception:
                         return resp.text or "[Réponse non JSON]"
-                    # différents formats possibles
-                    if isinstance(result, dict):
-                        return result.get("response") or result.get("result") or result.get("message", {}).get("content") or result.get("output") or str(result)
-                    return str(result)
+                    return _extract_text(result)
                 elif resp.status_code == 202:
                     logger.info(f"Ollama: génération démarée (202) sur {url}, tentative {attempt}")
                     # courte attente pour génération asynchrone
-                    time.sleep(5 * attempt)
+                    left = remaining()
+                    time.sleep(5 * attempt if left is None else min(5 * attempt, left))
                     continue
                 else:
                     logger.warning(f"Ollama {url} responded {resp.status_code}: {resp.text[:200]}")
@@ -83,10 +302,359 @@ def generate_with_ollama(prompt: str, model: str = "llama3.1:8b", max_retries: i
                 logger.warning(f"Ollama read timeout on {url} (attempt {attempt}): {e}")
             except Exception as e:
                 logger.debug(f"Ollama exception on {url} (attempt {attempt}): {e}")
+        breaker.record_failure(f"tentative {attempt} échouée")
+        if not breaker.allow():
+            logger.error("Ollama: disjoncteur ouvert, abandon des tentatives")
+            return f"[IA locale indisponible : Ollama en échec, nouvelle tentative dans {breaker.retry_in():.0f}s]"
         # backoff
         sleep_for = min(60, 2 ** attempt)
+        left = remaining()
+        if left is not None and left <= sleep_for:
+            return _deadline_exceeded()
         logger.warning(f"Ollama tentative {attempt} échouée, backoff {sleep_for}s")
         time.sleep(sleep_for)
 
     logger.error("Ollama: échec après plusieurs tentatives")
-    return "[IA locale non disponible après tentatives]"
\ No newline at end of file
+    return "[IA locale non disponible après tentatives]"
+
+
+class AsyncOllamaClient:
+    """
+    Client Ollama asynchrone pour les outils MCP :
+    - connexions persistantes (pool httpx.AsyncClient, keep-alive) au lieu d'une connexion par appel,
+    - attente du modèle et backoff avec asyncio.sleep : la boucle d'événements reste disponible pour les autres sessions,
+    - annulation : une tâche annulée abandonne sa requête HTTP (Ollama interrompt alors la génération).
+
+    Un client est lié à la boucle d'événements qui l'utilise (voir get_async_ollama_client).
+    """
+
+    def __init__(self, base_url: Optional[str] = None, max_connections: Optional[int] = None,
+                 keepalive_expiry: Optional[float] = None, connect_timeout: Optional[float] = None,
+                 transport: Optional[httpx.AsyncBaseTransport] = None):
+        config = get_config()
+        self.base_url = (base_url or config.get("llm.ollama.base_url", DEFAULT_BASE_URL)).rstrip("/")
+        self.model = config.get("llm.ollama.model", DEFAULT_MODEL)
+        self.max_retries = int(config.get("llm.ollama.max_retries", 5))
+        self.max_wait_model_ready = int(config.get("llm.ollama.max_wait_model_ready", 0))
+        self.first_timeout = float(config.get("llm.ollama.first_timeout", 300))
+        self.retry_timeout = float(config.get("llm.ollama.retry_timeout", 120))
+        self.connect_timeout = float(connect_timeout or config.get("llm.ollama.connect_timeout", 5))
+        self.max_connections = int(max_connections or config.get("llm.ollama.max_connections", 8))
+        self.keepalive_expiry = float(keepalive_expiry or config.get("llm.ollama.keepalive_expiry", 60))
+        self.transport = transport
+        self._client: Optional[httpx.AsyncClient] = None
+        # Générations identiques en cours : une seule requête Ollama, résultat (et tokens) partagés
+        self.flights = AsyncSingleFlight()
+
+    @property
+    def client(self) -> httpx.AsyncClient:
+        if self._client is None or self._client.is_closed:
+            self._client = httpx.AsyncClient(
+                base_url=self.base_url,
+                limits=httpx.Limits(
+                    max_connections=self.max_connections,
+                    max_keepalive_connections=self.max_connections,
+                    keepalive_expiry=self.keepalive_expiry
+                ),
+                timeout=httpx.Timeout(self.retry_timeout, connect=self.connect_timeout),
+                headers={"Content-Type": "application/json"},
+                transport=self.transport,
+            )
+        return self._client
+
+    async def aclose(self):
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+    async def health(self) -> bool:
+        """Ollama accessible (endpoint /api/tags)"""
+        try:
+            response = await self.client.get("/api/tags", timeout=5)
+            return response.status_code == 200
+        except httpx.HTTPError:
+            return False
+
+    @property
+    def breaker(self) -> CircuitBreaker:
+        return get_breaker(self.base_url)
+
+    async def unavailable_reason(self, model: str, max_wait: Optional[int] = None) -> Optional[str]:
+        """
+        Message "[IA locale ...]" si la génération doit échouer immédiatement, None sinon.
+        La disponibilité vient du cache (aucun appel réseau tant qu'il est frais) ;
+        un modèle absent est attendu au plus max_wait secondes, sans bloquer la boucle.
+        """
+        max_wait = self.max_wait_model_ready if max_wait is None else max_wait
+        readiness = get_readiness(self.base_url)
+        if readiness.is_cold or self.breaker.state != CLOSED:
+            # vérification réseau possible (premier appel, appel d'essai) : hors boucle d'événements
+            reason = await asyncio.to_thread(_unavailable_reason, self.base_url, model)
+        else:
+            reason = _unavailable_reason(self.base_url, model)
+        waited = 0
+        poll_interval = 5
+        while reason and "non prête" in reason and waited < max_wait:
+            logger.info(f"Ollama: modèle '{model}' non disponible, attente {waited}s...")
+            await asyncio.sleep(poll_interval)
+            waited += poll_interval
+            await asyncio.to_thread(readiness.refresh)
+            reason = _unavailable_reason(self.base_url, model)
+        if reason:
+            logger.error(f"Ollama: {reason}")
+        return reason
+
+    def _record_attempt_failure(self, attempt: int) -> Optional[str]:
+        """Compte une tentative échouée ; message d'abandon si le disjoncteur vient de s'ouvrir"""
+        self.breaker.record_failure(f"tentative {attempt} échouée")
+        if not self.breaker.allow():
+            logger.error("Ollama: disjoncteur ouvert, abandon des tentatives")
+            return f"[IA locale indisponible : Ollama en échec, nouvelle tentative dans {self.breaker.retry_in():.0f}s]"
+        return None
+
+    async def generate(self, prompt: str, model: Optional[str] = None, options: Optional[Dict[str, Any]] = None,
+                       max_retries: Optional[int] = None, max_wait_model_ready: Optional[int] = None,
+                       priority: Optional[str] = None, deadline: Optional[float] = None) -> str:
+        """
+        Génération avec Ollama (même comportement que generate_with_ollama, sans bloquer la boucle) :
+        /api/generate puis /api/chat, backoff exponentiel entre tentatives.
+        Les appels concurrents de même (modèle, prompt, options) attendent une seule génération partagée.
+        La génération passe par l'ordonnanceur LLM (priority, deadline : échéance de l'attente et de la génération).
+        asyncio.CancelledError est propagée : la requête en cours est abandonnée (avec le dernier appelant).
+        """
+        model = model or self.model
+        priority = priority or llm_priority.get()
+        text, shared = await self.flights.do(
+            _flight_key("generate", model, prompt, options),
+            lambda publish: self._generate(prompt, model, options, max_retries, max_wait_model_ready, priority, deadline)
+        )
+        if shared:
+            logger.info("Ollama: génération identique en cours, résultat partagé")
+        return text
+
+    async def _generate(self, prompt: str, model: str, options: Optional[Dict[str, Any]],
+                        max_retries: Optional[int], max_wait_model_ready: Optional[int],
+                        priority: str, deadline: Optional[float]) -> str:
+        reason = await self.unavailable_reason(model, max_wait_model_ready)
+        if reason:
+            return reason
+
+        try:
+            async with get_llm_scheduler().aslot(priority, deadline) as ticket:
+                async with asyncio.timeout(ticket.remaining()):
+                    return await self._post_with_retries(prompt, model, options, max_retries)
+        except LLMSchedulerError as e:
+            return _scheduler_refusal(e)
+        except TimeoutError:
+            return _deadline_exceeded()
+
+    async def _post_with_retries(self, prompt: str, model: str, options: Optional[Dict[str, Any]],
+                                 max_retries: Optional[int]) -> str:
+        max_retries = self.max_retries if max_retries is None else max_retries
+        payload = _payload(model, prompt, stream=False, options=options)
+
+        try:
+            for attempt in range(1, max_retries + 1):
+                for path in ("/api/generate", "/api/chat"):
+                    # plus de temps au premier appel (chargement du modèle en mémoire)
+                    read_timeout = self.first_timeout if attempt == 1 else self.retry_timeout
+                    try:
+                        resp = await self.client.post(
+                            path, json=payload, timeout=httpx.Timeout(read_timeout, connect=self.connect_timeout)
+                        )
+                        if resp.status_code in (200, 201):
+                            self.breaker.record_success()
+                            try:
+                                return _extract_text(resp.json())
+                            except ValueError:
+                                return resp.text or "[Réponse non JSON]"
+                        elif resp.status_code == 202:
+                            logger.info(f"Ollama: génération démarrée (202) sur {path}, tentative {attempt}")
+                            await asyncio.sleep(5 * attempt)
+                            continue
+                        else:
+                            logger.warning(f"Ollama {path} responded {resp.status_code}: {resp.text[:200]}")
+                    except httpx.ReadTimeout as e:
+                        logger.warning(f"Ollama read timeout on {path} (attempt {attempt}): {e}")
+                    except httpx.HTTPError as e:
+                        logger.debug(f"Ollama exception on {path} (attempt {attempt}): {e}")
+                abort = self._record_attempt_failure(attempt)
+                if abort:
+                    return abort
+                sleep_for = min(60, 2 ** attempt)
+                logger.warning(f"Ollama tentative {attempt} échouée, backoff {sleep_for}s")
+                await asyncio.sleep(sleep_for)
+        except asyncio.CancelledError:
+            logger.info("Ollama: génération annulée, requête abandonnée")
+            raise
+
+        logger.error("Ollama: échec après plusieurs tentatives")
+        return "[IA locale non disponible après tentatives]"
+
+    async def stream(self, prompt: str, model: Optional[str] = None, options: Optional[Dict[str, Any]] = None,
+                     read_timeout: Optional[float] = None) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Flux NDJSON de /api/generate ("stream": true) : un objet JSON par fragment de texte,
+        le dernier porte "done": true et les statistiques d'Ollama (eval_count, durées en ns).
+        """
+        payload = _payload(model or self.model, prompt, stream=True, options=options)
+        # Le délai de lecture s'applique entre deux fragments (le premier inclut le chargement du modèle)
+        timeout = httpx.Timeout(read_timeout or self.first_timeout, connect=self.connect_timeout)
+        async with self.client.stream("POST", "/api/generate", json=payload, timeout=timeout) as resp:
+            if resp.status_code != 200:
+                body = (await resp.aread()).decode("utf-8", "replace")
+                raise httpx.HTTPStatusError(f"Ollama responded {resp.status_code}: {body[:200]}",
+                                            request=resp.request, response=resp)
+            async for line in resp.aiter_lines():
+                if not line.strip():
+                    continue
+                chunk = json.loads(line)
+                if chunk.get("error"):
+                    raise RuntimeError(f"Ollama: {chunk['error']}")
+                yield chunk
+                if chunk.get("done"):
+                    break
+
+    async def generate_stream(self, prompt: str, model: Optional[str] = None, options: Optional[Dict[str, Any]] = None,
+                              on_token: Optional[Callable[[str], Any]] = None, max_retries: Optional[int] = None,
+                              max_wait_model_ready: Optional[int] = None, priority: Optional[str] = None,
+                              deadline: Optional[float] = None) -> Tuple[str, Dict[str, Any]]:
+        """
+        Génération en flux : chaque fragment est transmis à on_token et au token_sink courant
+        (callbacks synchrones ou asynchrones) dès sa réception.
+        Un appel identique (modèle, prompt, options) déjà en cours est rejoint : les fragments déjà produits
+        sont rejoués puis les suivants diffusés à chaque appelant.
+        La génération passe par l'ordonnanceur LLM (priority, deadline : échéance de l'attente et de la génération ;
+        à l'échéance, le texte déjà produit est renvoyé avec interrupted=True).
+
+        Returns:
+            (texte complet, statistiques {ttft_ms, total_ms, tokens, tokens_per_s, prompt_eval_ms, prompt_tokens,
+            interrupted, shared})
+            Une coupure après le premier fragment renvoie le texte partiel (interrupted=True) sans nouvelle tentative.
+        """
+        model = model or self.model
+        priority = priority or llm_priority.get()
+        callbacks = [callback for callback in (on_token, token_sink.get()) if callback is not None]
+
+        async def subscriber(text: str):
+            for callback in callbacks:
+                result = callback(text)
+                if inspect.isawaitable(result):
+                    await result
+
+        (text, stats), shared = await self.flights.do(
+            _flight_key("stream", model, prompt, options),
+            lambda publish: self._generate_stream(prompt, model, options, publish, max_retries, max_wait_model_ready,
+                                                  priority, deadline),
+            subscriber=subscriber if callbacks else None
+        )
+        if shared:
+            logger.info("Ollama: génération identique en cours, flux partagé")
+        return text, {**stats, "shared": shared}
+
+    async def _generate_stream(self, prompt: str, model: str, options: Optional[Dict[str, Any]],
+                               publish: Callable[[str], Awaitable[None]], max_retries: Optional[int],
+                               max_wait_model_ready: Optional[int], priority: str,
+                               deadline: Optional[float]) -> Tuple[str, Dict[str, Any]]:
+        reason = await self.unavailable_reason(model, max_wait_model_ready)
+        if reason:
+            return reason, {"streamed": False, "ollama": ollama_status(self.base_url)}
+
+        progress: Dict[str, Any] = {}
+        try:
+            async with get_llm_scheduler().aslot(priority, deadline) as ticket:
+                queue_ms = round((time.monotonic() - ticket.enqueued_at) * 1000, 1)
+                async with asyncio.timeout(ticket.remaining()):
+                    text, stats = await self._stream_with_retries(prompt, model, options, publish, max_retries, progress)
+                return text, {**stats, "queue_ms": queue_ms}
+        except LLMSchedulerError as e:
+            return _scheduler_refusal(e), {"streamed": False, "ollama": ollama_status(self.base_url)}
+        except TimeoutError:
+            logger.error("Ollama: échéance de la requête dépassée pendant la génération")
+            if progress.get("parts"):
+                return "".join(progress["parts"]), _stream_stats(progress["start"], progress["first_token_at"],
+                                                                 len(progress["parts"]), {}, interrupted=True)
+            return "[IA locale : échéance de la requête dépassée]", {"streamed": False, "ollama": ollama_status(self.base_url)}
+
+    async def _stream_with_retries(self, prompt: str, model: str, options: Optional[Dict[str, Any]],
+                                   publish: Callable[[str], Awaitable[None]], max_retries: Optional[int],
+                                   progress: Dict[str, Any]) -> Tuple[str, Dict[str, Any]]:
+        """Tentatives de génération en flux ; `progress` expose le texte partiel de la tentative en cours"""
+        max_retries = self.max_retries if max_retries is None else max_retries
+        try:
+            for attempt in range(1, max_retries + 1):
+                read_timeout = self.first_timeout if attempt == 1 else self.retry_timeout
+                start = time.perf_counter()
+                first_token_at = None
+                parts = []
+                progress.update(start=start, first_token_at=None, parts=parts)
+                final: Dict[str, Any] = {}
+                try:
+                    async for chunk in self.stream(prompt, model, options, read_timeout):
+                        text = chunk.get("response") or chunk.get("message", {}).get("content") or ""
+                        if text:
+                            if first_token_at is None:
+                                first_token_at = progress["first_token_at"] = time.perf_counter()
+                            parts.append(text)
+                            await publish(text)
+                        if chunk.get("done"):
+                            final = chunk
+                    self.breaker.record_success()
+                    return "".join(parts), _stream_stats(start, first_token_at, len(parts), final, interrupted=not final)
+                except (httpx.HTTPError, RuntimeError, ValueError) as e:
+                    if parts:
+                        logger.warning(f"Ollama: flux interrompu après {len(parts)} fragments: {e}")
+                        return "".join(parts), _stream_stats(start, first_token_at, len(parts), final, interrupted=True)
+                    logger.warning(f"Ollama stream exception (attempt {attempt}): {e}")
+                abort = self._record_attempt_failure(attempt)
+                if abort:
+                    return abort, {"streamed": False, "ollama": ollama_status(self.base_url)}
+                sleep_for = min(60, 2 ** attempt)
+                logger.warning(f"Ollama tentative {attempt} échouée, backoff {sleep_for}s")
+                await asyncio.sleep(sleep_for)
+        except asyncio.CancelledError:
+            logger.info("Ollama: génération annulée, flux abandonné")
+            raise
+
+        logger.error("Ollama: échec après plusieurs tentatives")
+        return "[IA locale non disponible après tentatives]", {"streamed": False, "ollama": ollama_status(self.base_url)}
+
+
+def _stream_stats(start: float, first_token_at: Optional[float], fragments: int,
+                  final: Dict[str, Any], interrupted: bool) -> Dict[str, Any]:
+    """Temps jusqu'au premier token, temps total et débit d'une génération en flux"""
+    total = time.perf_counter() - start
+    tokens = int(final.get("eval_count") or fragments)
+    eval_seconds = final.get("eval_duration", 0) / 1e9 or (total - ((first_token_at or start) - start))
+    return {
+        "streamed": True,
+        "ttft_ms": round(((first_token_at or time.perf_counter()) - start) * 1000, 1),
+        "total_ms": round(total * 1000, 1),
+        "tokens": tokens,
+        "tokens_per_s": round(tokens / eval_seconds, 1) if eval_seconds > 0 else None,
+        "prompt_eval_ms": round(final["prompt_eval_duration"] / 1e6, 1) if final.get("prompt_eval_duration") else None,
+        "prompt_tokens": final.get("prompt_eval_count"),
+        "interrupted": interrupted,
+    }
+
+
+# Un client (et son pool de connexions) par boucle d'événements : les connexions httpx
+# ne peuvent pas être partagées entre boucles
+_async_clients: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, AsyncOllamaClient]" = weakref.WeakKeyDictionary()
+
+def get_async_ollama_client() -> AsyncOllamaClient:
+    """Client Ollama asynchrone partagé de la boucle d'événements courante"""
+    loop = asyncio.get_running_loop()
+    client = _async_clients.get(loop)
+    if client is None:
+        client = _async_clients[loop] = AsyncOllamaClient()
+    return client
+
+async def agenerate_with_ollama(prompt: str, model: Optional[str] = None, **kwargs) -> str:
+    """Équivalent asynchrone de generate_with_ollama (client poolé de la boucle courante)"""
+    return await get_async_ollama_client().generate(prompt, model=model, **kwargs)
+
+async def astream_with_ollama(prompt: str, model: Optional[str] = None,
+                              on_token: Optional[Callable[[str], Any]] = None, **kwargs) -> Tuple[str, Dict[str, Any]]:
+    """Génération en flux (client poolé de la boucle courante) : (texte, statistiques ttft/total)"""
+    return await get_async_ollama_client().generate_stream(prompt, model=model, on_token=on_token, **kwargs)
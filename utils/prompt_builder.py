@@ -0,0 +1,226 @@
+# basketcoach-mcp/utils/prompt_builder.py
+#!/usr/bin/env python3
+"""
+Construction des prompts LLM sous budget de tokens
+Le préremplissage (prefill) d'Ollama sur CPU croît avec la longueur du prompt : le contexte RAG est
+dédupliqué, trié par pertinence puis tronqué ou résumé pour tenir dans le budget configuré
+"""
+
+import os
+import math
+import threading
+from typing import Dict, Any, List, Optional, Tuple
+
+import sys
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from utils.logger import get_logger
+from utils.config import get_config
+from rag.chunking import split_sentences
+from rag.lexical import tokenize
+
+logger = get_logger("utils.prompt_builder")
+
+CONTEXT_HEADER = "\n\n--- CONTEXTE GUIDELINES RAG ---\n"
+
+
+class TokenCounter:
+    """
+    Estimation du nombre de tokens du LLM (pas de tokenizer Ollama accessible côté client) :
+    nombre de caractères / caractères par token, ratio recalibré sur les prompt_eval_count renvoyés par Ollama.
+    Avec keep_alive, prompt_eval_count ne compte que les tokens hors du préfixe en cache : un échantillon peut
+    surestimer le ratio, d'où un recalibrage limité à ±band autour de l'estimation initiale.
+    """
+
+    def __init__(self, chars_per_token: float = 3.5, band: float = 0.1):
+        self.chars_per_token = chars_per_token
+        self.min_ratio = round(chars_per_token * (1 - band), 3)
+        self.max_ratio = round(chars_per_token * (1 + band), 3)
+        self.samples = 0
+        self._lock = threading.Lock()
+
+    def count(self, text: str) -> int:
+        return math.ceil(len(text) / self.chars_per_token) if text else 0
+
+    def calibrate(self, prompt: str, prompt_eval_count: Optional[int]):
+        """Ajuste le ratio sur un prompt évalué (échantillon hors de la bande ignoré : préfixe réutilisé par Ollama)"""
+        if not prompt_eval_count or len(prompt) < 200:
+            return
+        observed = len(prompt) / prompt_eval_count
+        if not self.min_ratio <= observed <= self.max_ratio:
+            return
+        with self._lock:
+            self.samples += 1
+            weight = max(0.1, 1.0 / self.samples)
+            self.chars_per_token = round((1 - weight) * self.chars_per_token + weight * observed, 3)
+
+
+def _normalize(sentence: str) -> str:
+    return " ".join(sentence.lower().split())
+
+
+def _score(result: Dict[str, Any]) -> float:
+    """Pertinence d'un extrait : score du reranker, sinon similarité de la recherche initiale"""
+    score = result.get("rerank_score", result.get("similarity_score"))
+    return float(score) if isinstance(score, (int, float)) else 0.0
+
+
+class PromptBuilder:
+    """
+    - compte les tokens du prompt (TokenCounter),
+    - déduplique les extraits RAG (phrases déjà présentes, chevauchement entre extraits voisins),
+    - retient les extraits par score de reranking décroissant dans le budget de contexte,
+    - résume (extraction des phrases les plus proches de la requête) un extrait qui dépasse le budget restant.
+    """
+
+    def __init__(self, max_prompt_tokens: Optional[int] = 1800, max_context_tokens: Optional[int] = 700,
+                 max_chunks: int = 3, min_chunk_tokens: int = 60, dedupe: bool = True,
+                 counter: Optional[TokenCounter] = None):
+        self.max_prompt_tokens = max_prompt_tokens
+        self.max_context_tokens = max_context_tokens
+        self.max_chunks = max_chunks
+        self.min_chunk_tokens = min_chunk_tokens
+        self.dedupe = dedupe
+        self.counter = counter or TokenCounter()
+
+    def signature(self) -> str:
+        """Paramètres qui changent le prompt produit (versionnement des rapports en cache)"""
+        return f"budget={self.max_prompt_tokens}/{self.max_context_tokens};chunks={self.max_chunks};dedupe={self.dedupe}"
+
+    # ------------------------------------------------------------------ contexte RAG
+
+    def _dedupe(self, results: List[Dict[str, Any]]) -> Tuple[List[Tuple[Dict[str, Any], List[str]]], Dict[str, int]]:
+        """Phrases nouvelles de chaque extrait, dans l'ordre de pertinence"""
+        seen = set()
+        kept, stats = [], {"duplicates": 0, "overlap_trimmed": 0}
+        for result in results:
+            sentences = split_sentences(result.get("content", ""))
+            if self.dedupe:
+                fresh = [s for s in sentences if _normalize(s) not in seen]
+                if not fresh:
+                    stats["duplicates"] += 1
+                    continue
+                if len(fresh) < len(sentences):
+                    stats["overlap_trimmed"] += 1
+                seen.update(_normalize(s) for s in fresh)
+                sentences = fresh
+            kept.append((result, sentences))
+        return kept, stats
+
+    def _summarize(self, sentences: List[str], query_terms: set, max_tokens: int) -> str:
+        """Résumé extractif : phrases partageant le plus de termes avec la requête, dans l'ordre du texte"""
+        ranked = sorted(
+            range(len(sentences)),
+            key=lambda i: (-len(query_terms.intersection(tokenize(sentences[i]))), i)
+        )
+        chosen, used = [], 0
+        for i in ranked:
+            cost = self.counter.count(sentences[i]) + 1
+            if used + cost > max_tokens:
+                continue
+            chosen.append(i)
+            used += cost
+        if not chosen:
+            # première phrase tronquée à la limite
+            return sentences[0][:int(max_tokens * self.counter.chars_per_token)].rsplit(" ", 1)[0] + " […]"
+        return " ".join(sentences[i] for i in sorted(chosen)) + " […]"
+
+    def build_context(self, results: List[Dict[str, Any]], query: str = "",
+                      max_tokens: Optional[int] = None) -> Tuple[str, Dict[str, Any]]:
+        """
+        Bloc de contexte des guidelines tenant dans max_tokens tokens (None = sans limite)
+
+        Returns:
+            (texte du contexte, statistiques {candidates, kept, trimmed, dropped, duplicates, overlap_trimmed, tokens})
+        """
+        ordered = sorted(results or [], key=_score, reverse=True)
+        candidates, stats = self._dedupe(ordered)
+        stats.update(candidates=len(results or []), kept=0, trimmed=0, dropped=0, tokens=0)
+        if not candidates:
+            return "", stats
+
+        query_terms = set(tokenize(query))
+        stats["dropped"] = max(0, len(candidates) - self.max_chunks)
+        candidates = candidates[:self.max_chunks]
+        # Part du budget restant proportionnelle au rang (1, 1/2, 1/3...) : les extraits les mieux classés
+        # sont les moins tronqués, le budget non consommé revient aux suivants
+        weights = [1.0 / (rank + 1) for rank in range(len(candidates))]
+        remaining = None if max_tokens is None else max_tokens - self.counter.count(CONTEXT_HEADER)
+        blocks = []
+        for rank, (result, sentences) in enumerate(candidates):
+            header = (
+                f"Guideline {len(blocks) + 1} (Source: {result.get('source', 'N/A')}, "
+                f"Catégorie: {result.get('category', 'N/A')}, Pertinence: {_score(result):.2f}):\n"
+            )
+            content = " ".join(sentences)
+            cost = self.counter.count(header + content + "\n---\n")
+            share = None if remaining is None else int(remaining * weights[rank] / sum(weights[rank:]))
+            if share is not None and cost > share:
+                available = share - self.counter.count(header + "\n---\n")
+                if available < self.min_chunk_tokens:
+                    stats["dropped"] += 1
+                    continue
+                content = self._summarize(sentences, query_terms, available - self.counter.count(" […]"))
+                cost = self.counter.count(header + content + "\n---\n")
+                stats["trimmed"] += 1
+            blocks.append(f"{header}{content}\n---\n")
+            stats["kept"] += 1
+            if remaining is not None:
+                remaining -= cost
+
+        context = CONTEXT_HEADER + "".join(blocks) if blocks else ""
+        stats["tokens"] = self.counter.count(context)
+        return context, stats
+
+    # ------------------------------------------------------------------ prompt complet
+
+    def build(self, template: str, fields: Dict[str, Any], rag_results: Optional[List[Dict[str, Any]]] = None,
+              query: str = "", context_field: str = "guidelines_context") -> Tuple[str, Dict[str, Any]]:
+        """
+        Prompt final : gabarit rempli, contexte RAG limité au budget restant
+        (max_prompt_tokens - partie fixe du prompt, plafonné à max_context_tokens)
+
+        Returns:
+            (prompt, statistiques {prompt_tokens, base_tokens, context_budget, context})
+        """
+        base_tokens = self.counter.count(template.format(**fields, **{context_field: ""}))
+        budgets = []
+        if self.max_prompt_tokens is not None:
+            budgets.append(self.max_prompt_tokens - base_tokens)
+        if self.max_context_tokens is not None:
+            budgets.append(self.max_context_tokens)
+        context_budget = max(0, min(budgets)) if budgets else None
+
+        context, context_stats = self.build_context(rag_results or [], query, context_budget)
+        prompt = template.format(**fields, **{context_field: context})
+        info = {
+            "prompt_tokens": self.counter.count(prompt),
+            "base_tokens": base_tokens,
+            "context_budget": context_budget,
+            "context": context_stats,
+        }
+        if self.max_prompt_tokens is not None and info["prompt_tokens"] > self.max_prompt_tokens:
+            logger.warning(f"⚠️ Prompt de {info['prompt_tokens']} tokens (budget {self.max_prompt_tokens}) : "
+                           f"la partie fixe dépasse à elle seule le budget")
+        return prompt, info
+
+
+_prompt_builder: Optional[PromptBuilder] = None
+_prompt_builder_lock = threading.Lock()
+
+
+def get_prompt_builder() -> PromptBuilder:
+    """Constructeur de prompts partagé (config llm.prompt)"""
+    global _prompt_builder
+    with _prompt_builder_lock:
+        if _prompt_builder is None:
+            config = get_config()
+            _prompt_builder = PromptBuilder(
+                max_prompt_tokens=config.get("llm.prompt.max_prompt_tokens", 1800),
+                max_context_tokens=config.get("llm.prompt.max_context_tokens", 700),
+                max_chunks=int(config.get("llm.prompt.max_chunks", 3)),
+                min_chunk_tokens=int(config.get("llm.prompt.min_chunk_tokens", 60)),
+                dedupe=bool(config.get("llm.prompt.dedupe", True)),
+                counter=TokenCounter(float(config.get("llm.prompt.chars_per_token", 3.5)),
+                                     float(config.get("llm.prompt.calibration_band", 0.1))),
+            )
+        return _prompt_builder
@@ -0,0 +1,235 @@
+# basketcoach-mcp/utils/refresh_scheduler.py
+#!/usr/bin/env python3
+"""
+Rafraîchissement en arrière-plan des données externes (classement NBA, actualités des joueuses suivies)
+Tâches périodiques (intervalle ± gigue) dans la boucle du serveur MCP : elles écrivent des instantanés dans
+le cache web, les outils lisent ces instantanés sans attendre le scraping et en exposent l'âge
+"""
+
+import os
+import time
+import random
+import asyncio
+import threading
+from contextlib import asynccontextmanager
+from dataclasses import dataclass, field
+from typing import Dict, Any, Optional, Callable, Awaitable, Tuple
+
+import sys
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from utils.logger import get_logger
+from utils.config import get_config
+from utils.scrape_cache import ScrapeCache, get_scrape_cache
+
+logger = get_logger("utils.refresh_scheduler")
+
+
+@dataclass
+class RefreshJob:
+    """Groupe d'instantanés rafraîchis ensemble : clé du cache web → fonction de récupération"""
+    name: str
+    fetchers: Dict[str, Callable[[], Awaitable[Any]]]
+    interval: float
+    jitter: float = 0.1
+    last_run: Optional[float] = None
+    last_success: Optional[float] = None
+    last_error: Optional[str] = None
+    next_run: Optional[float] = None
+    runs: int = 0
+    failures: int = 0
+    first_run: asyncio.Event = field(default_factory=asyncio.Event, repr=False)
+
+
+class RefreshScheduler:
+    """
+    - chaque tâche rafraîchit ses clés toutes les `interval` secondes, décalées d'une gigue aléatoire
+      (± jitter × intervalle) pour ne pas solliciter les sites ensemble,
+    - au démarrage, une clé dont l'instantané sur disque est encore frais n'est rafraîchie qu'à son échéance,
+    - en cas d'échec, nouvel essai après retry_seconds ; l'instantané précédent reste servi,
+    - au plus max_concurrency récupérations simultanées, toutes tâches confondues.
+    """
+
+    def __init__(self, cache: ScrapeCache, retry_seconds: float = 120, max_concurrency: int = 2):
+        self.cache = cache
+        self.retry_seconds = retry_seconds
+        self.max_concurrency = max_concurrency
+        self.jobs: Dict[str, RefreshJob] = {}
+        self._keys: Dict[str, RefreshJob] = {}
+        self._tasks: Dict[str, asyncio.Task] = {}
+        self._users = 0
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self._event_loop: Optional[asyncio.AbstractEventLoop] = None
+
+    def add(self, name: str, fetchers: Dict[str, Callable[[], Awaitable[Any]]], interval: float, jitter: float = 0.1):
+        """Déclare une tâche (remplace une tâche du même nom)"""
+        job = RefreshJob(name, dict(fetchers), float(interval), float(jitter))
+        self.jobs[name] = job
+        for key in job.fetchers:
+            self._keys[key] = job
+
+    @property
+    def running(self) -> bool:
+        return any(not task.done() for task in self._tasks.values())
+
+    def scheduled(self, key: str) -> Optional[RefreshJob]:
+        """Tâche qui tient à jour cette clé, si le planificateur tourne"""
+        return self._keys.get(key) if self.running else None
+
+    def _delay(self, job: RefreshJob, base: float) -> float:
+        return max(0.0, base + random.uniform(-job.jitter, job.jitter) * job.interval)
+
+    def _initial_delay(self, job: RefreshJob) -> float:
+        """Échéance du plus ancien instantané de la tâche (0 s'il en manque un)"""
+        remaining = []
+        for key in job.fetchers:
+            entry = self.cache.lookup(key)
+            if entry is None:
+                return 0.0
+            remaining.append(job.interval - entry.age)
+        delay = min(remaining)
+        if delay <= 0:
+            return random.uniform(0, job.jitter * job.interval)  # démarrage étalé
+        job.first_run.set()
+        return self._delay(job, delay)
+
+    async def refresh(self, job: RefreshJob) -> bool:
+        """Rafraîchit toutes les clés de la tâche ; True si toutes ont réussi"""
+        job.last_run = time.time()
+        job.runs += 1
+        errors = []
+
+        async def one(key: str, fetch: Callable[[], Awaitable[Any]]):
+            async with self._semaphore:
+                try:
+                    self.cache.put(key, await fetch())
+                except asyncio.CancelledError:
+                    raise
+                except Exception as e:
+                    errors.append(f"{key}: {e}")
+
+        await asyncio.gather(*(one(key, fetch) for key, fetch in job.fetchers.items()))
+        if errors:
+            job.failures += 1
+            job.last_error = "; ".join(errors)[:500]
+            logger.warning(f"⚠️ Rafraîchissement {job.name}: {len(errors)}/{len(job.fetchers)} échecs ({job.last_error})")
+        else:
+            job.last_success = time.time()
+            job.last_error = None
+            logger.info(f"🔄 {job.name} rafraîchi ({len(job.fetchers)} instantanés)")
+        job.first_run.set()
+        return not errors
+
+    async def _loop(self, job: RefreshJob):
+        delay = self._initial_delay(job)
+        while True:
+            job.next_run = time.time() + delay
+            await asyncio.sleep(delay)
+            try:
+                ok = await self.refresh(job)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:  # ne jamais arrêter la boucle de rafraîchissement
+                logger.error(f"❌ Tâche de rafraîchissement {job.name}: {e}")
+                ok = False
+            delay = self._delay(job, job.interval if ok else min(self.retry_seconds, job.interval))
+
+    def start(self):
+        """Lance les tâches dans la boucle d'événements courante (sans effet si elles tournent déjà)"""
+        if self.running:
+            return
+        self._semaphore = asyncio.Semaphore(self.max_concurrency)
+        loop = self._event_loop = asyncio.get_running_loop()
+        for name, job in self.jobs.items():
+            job.first_run = asyncio.Event()
+            self._tasks[name] = loop.create_task(self._loop(job), name=f"refresh:{name}")
+        logger.info(f"🕒 Rafraîchissement en arrière-plan : {len(self.jobs)} tâches")
+
+    async def stop(self):
+        tasks = list(self._tasks.values())
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        self._tasks.clear()
+
+    @asynccontextmanager
+    async def serving(self):
+        """Planificateur actif tant qu'au moins un serveur (MCP stdio/SSE, API HTTP) l'utilise"""
+        self._users += 1
+        self.start()
+        try:
+            yield self
+        finally:
+            self._users -= 1
+            if self._users == 0:
+                await self.stop()
+
+    async def read(self, key: str, fetch: Callable[[], Awaitable[Any]],
+                   wait_first: float = 10.0) -> Tuple[Any, Dict[str, Any]]:
+        """
+        Instantané d'une clé tenue à jour par le planificateur (attend au plus `wait_first` secondes le premier
+        rafraîchissement) ; clé non planifiée ou instantané absent : politique du cache web (get_or_fetch)
+
+        Returns:
+            (valeur, {"status", "age_seconds", "refreshed_at", "refreshed_by"})
+        """
+        job = self.scheduled(key)
+        if job is not None:
+            # attente du premier rafraîchissement possible seulement depuis la boucle du planificateur
+            if not job.first_run.is_set() and asyncio.get_running_loop() is self._event_loop:
+                try:
+                    await asyncio.wait_for(job.first_run.wait(), timeout=wait_first)
+                except asyncio.TimeoutError:
+                    pass
+            entry = self.cache.lookup(key)
+            if entry is not None:
+                return entry.value, {
+                    "status": "snapshot",
+                    "age_seconds": round(entry.age, 1),
+                    "refreshed_at": entry.fetched_at,
+                    "refreshed_by": "scheduler",
+                    "next_refresh_in": round(max(0.0, job.next_run - time.time()), 1) if job.next_run else None,
+                }
+
+        value, info = await self.cache.get_or_fetch(key, fetch)
+        entry = self.cache.lookup(key)
+        return value, {**info, "refreshed_at": entry.fetched_at if entry else None, "refreshed_by": "on_demand"}
+
+    def status(self) -> Dict[str, Any]:
+        now = time.time()
+        return {
+            "running": self.running,
+            "jobs": {
+                name: {
+                    "keys": len(job.fetchers),
+                    "interval": job.interval,
+                    "runs": job.runs,
+                    "failures": job.failures,
+                    "last_success_age": round(now - job.last_success, 1) if job.last_success else None,
+                    "next_run_in": round(max(0.0, job.next_run - now), 1) if job.next_run and self.running else None,
+                    "last_error": job.last_error,
+                }
+                for name, job in self.jobs.items()
+            },
+        }
+
+
+_refresh_scheduler: Optional[RefreshScheduler] = None
+_refresh_scheduler_lock = threading.Lock()
+
+
+def get_refresh_scheduler() -> Optional[RefreshScheduler]:
+    """Planificateur partagé (None si web_sources.refresh.enabled est faux ou le cache web désactivé)"""
+    global _refresh_scheduler
+    config = get_config()
+    cache = get_scrape_cache()
+    if not config.get("web_sources.refresh.enabled", True) or cache is None:
+        return None
+
+    with _refresh_scheduler_lock:
+        if _refresh_scheduler is None:
+            _refresh_scheduler = RefreshScheduler(
+                cache,
+                retry_seconds=float(config.get("web_sources.refresh.retry_seconds", 120)),
+                max_concurrency=int(config.get("web_sources.refresh.max_concurrency", 2)),
+            )
+        return _refresh_scheduler
@@ -0,0 +1,161 @@
+# basketcoach-mcp/utils/report_cache.py
+#!/usr/bin/env python3
+"""
+Cache persistant des rapports de coaching générés par le LLM
+Un rapport est réutilisé tant que le match, les données, le modèle ML, les guidelines,
+le prompt et le modèle LLM sont inchangés
+"""
+
+import os
+import re
+import json
+import time
+import hashlib
+import threading
+from pathlib import Path
+from typing import Dict, Any, Optional
+
+import sys
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from utils.logger import get_logger
+from utils.config import get_config
+
+logger = get_logger("utils.report_cache")
+
+MATCHES_FILE = "all_matches_merged.csv"
+IMPACT_MODEL_FILE = "player_impact_predictor.pkl"
+GUIDELINES_MANIFEST = Path("rag/database/manifest.json")
+
+
+def file_fingerprint(path: Path) -> str:
+    """Empreinte légère d'un fichier (taille + date de modification), "absent" s'il n'existe pas"""
+    try:
+        stat = Path(path).stat()
+        return f"{stat.st_size}-{stat.st_mtime_ns}"
+    except OSError:
+        return "absent"
+
+
+def prompt_hash(template: str) -> str:
+    return hashlib.sha256(template.encode("utf-8")).hexdigest()[:16]
+
+
+def match_fingerprint(rows) -> str:
+    """Empreinte du contenu des lignes d'un match (DataFrame) : inchangée tant que ses statistiques le sont"""
+    import pandas as pd
+    if rows is None or len(rows) == 0:
+        return "absent"
+    hashed = pd.util.hash_pandas_object(rows.reset_index(drop=True), index=False)
+    return hashlib.sha256(hashed.values.tobytes()).hexdigest()[:16]
+
+
+def report_versions(prompt_template: str, llm_model: str, data: Optional[str] = None) -> Dict[str, str]:
+    """
+    Versions dont dépend un rapport (hors identifiant du match) :
+    données du match (empreinte `data`, sinon instantané du fichier de matchs), modèle d'impact,
+    index des guidelines, gabarit du prompt, modèle LLM
+    """
+    config = get_config()
+    data_dir = Path(config.get("paths.data.processed", "data/processed/"))
+    model_dir = Path(config.get("paths.data.models", "ml/model/"))
+    return {
+        "data": data or file_fingerprint(data_dir / MATCHES_FILE),
+        "impact_model": f"{config.get('ml.model.version', '1.0.0')}:{file_fingerprint(model_dir / IMPACT_MODEL_FILE)}",
+        "guidelines": file_fingerprint(GUIDELINES_MANIFEST),
+        "prompt": prompt_hash(prompt_template),
+        "llm": llm_model,
+    }
+
+
+class ReportCache:
+    """
+    Un fichier JSON par (match, versions) dans `path`.
+    Enregistrer un rapport remplace les versions précédentes du même match.
+    """
+
+    def __init__(self, path: Path, ttl_seconds: Optional[int] = None):
+        self.path = Path(path)
+        self.ttl_seconds = ttl_seconds
+        self._lock = threading.Lock()
+        self.stats = {"hits": 0, "misses": 0, "writes": 0}
+
+    @staticmethod
+    def _slug(match_id: str) -> str:
+        return re.sub(r"[^A-Za-z0-9_.-]", "_", str(match_id))
+
+    @staticmethod
+    def key(match_id: str, versions: Dict[str, str]) -> str:
+        return hashlib.sha256(json.dumps({"match_id": str(match_id), **versions}, sort_keys=True).encode("utf-8")).hexdigest()
+
+    def _file(self, match_id: str, versions: Dict[str, str]) -> Path:
+        return self.path / f"{self._slug(match_id)}-{self.key(match_id, versions)[:20]}.json"
+
+    def get(self, match_id: str, versions: Dict[str, str]) -> Optional[Dict[str, Any]]:
+        """Rapport en cache pour ce match et ces versions, sinon None"""
+        file = self._file(match_id, versions)
+        try:
+            with open(file, 'r', encoding='utf-8') as f:
+                entry = json.load(f)
+        except (OSError, ValueError):
+            self.stats["misses"] += 1
+            return None
+
+        age = time.time() - entry.get("cached_at", 0)
+        if self.ttl_seconds and age > self.ttl_seconds:
+            self.stats["misses"] += 1
+            return None
+        self.stats["hits"] += 1
+        entry["age_seconds"] = round(age, 1)
+        return entry
+
+    def put(self, match_id: str, versions: Dict[str, str], payload: Dict[str, Any]):
+        """Enregistre un rapport (écriture atomique) et retire les versions obsolètes du même match"""
+        file = self._file(match_id, versions)
+        entry = {"match_id": str(match_id), "versions": versions, "cached_at": time.time(), "payload": payload}
+        with self._lock:
+            try:
+                self.path.mkdir(parents=True, exist_ok=True)
+                tmp_path = file.with_suffix(".json.tmp")
+                with open(tmp_path, 'w', encoding='utf-8') as f:
+                    json.dump(entry, f, ensure_ascii=False)
+                os.replace(tmp_path, file)
+                self.stats["writes"] += 1
+                for stale in self.path.glob(f"{self._slug(match_id)}-*.json"):
+                    if stale != file:
+                        stale.unlink(missing_ok=True)
+            except OSError as e:
+                logger.warning(f"⚠️ Mise en cache du rapport {match_id} impossible: {e}")
+
+    def invalidate(self, match_id: Optional[str] = None) -> int:
+        """Supprime les rapports d'un match (ou tous) ; renvoie le nombre de fichiers supprimés"""
+        pattern = f"{self._slug(match_id)}-*.json" if match_id else "*.json"
+        removed = 0
+        with self._lock:
+            for file in self.path.glob(pattern):
+                file.unlink(missing_ok=True)
+                removed += 1
+        return removed
+
+    def info(self) -> Dict[str, Any]:
+        return {"path": str(self.path), "reports": len(list(self.path.glob("*.json"))), **self.stats}
+
+
+_report_cache: Optional[ReportCache] = None
+_report_cache_lock = threading.Lock()
+
+
+def get_report_cache() -> Optional[ReportCache]:
+    """Cache des rapports de generate_coaching_report (None si désactivé dans llm.report_cache)"""
+    global _report_cache
+    config = get_config()
+    if not config.get("llm.report_cache.enabled", True):
+        return None
+
+    with _report_cache_lock:
+        if _report_cache is None:
+            ttl = config.get("llm.report_cache.ttl_seconds")
+            _report_cache = ReportCache(
+                Path(config.get("llm.report_cache.path", "data/cache/reports")),
+                ttl_seconds=int(ttl) if ttl else None,
+            )
+        return _report_cache
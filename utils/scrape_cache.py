@@ -0,0 +1,207 @@
+# basketcoach-mcp/utils/scrape_cache.py
+#!/usr/bin/env python3
+"""
+Cache des sources scrapées (classement NBA, actualités) : mémoire + disque
+Entrée fraîche (âge < web_sources.cache_duration) servie directement, entrée périmée servie immédiatement
+pendant un rafraîchissement en arrière-plan, dernière version connue servie quand la source est en panne
+"""
+
+import os
+import json
+import time
+import asyncio
+import hashlib
+import threading
+from pathlib import Path
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Dict, Any, Optional, Callable, Awaitable, Tuple
+
+import sys
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from utils.logger import get_logger
+from utils.config import get_config
+
+logger = get_logger("utils.scrape_cache")
+
+FRESH = "fresh"
+STALE = "stale"
+EXPIRED = "expired"
+
+
+@dataclass
+class CacheEntry:
+    key: str
+    value: Any
+    fetched_at: float
+
+    @property
+    def age(self) -> float:
+        return time.time() - self.fetched_at
+
+
+class ScrapeCache:
+    """
+    - fraîche (âge <= ttl) : servie telle quelle,
+    - périmée (ttl < âge <= max_stale) : servie immédiatement, rafraîchie en tâche de fond (une seule tâche par clé),
+    - expirée (âge > max_stale) ou absente : récupération bloquante ; en cas d'échec la dernière version connue,
+      quel que soit son âge, est servie (last_known_good).
+
+    Niveau mémoire LRU (memory_entries) devant un fichier JSON par clé dans `path` (survit aux redémarrages).
+    """
+
+    def __init__(self, path: Optional[Path], ttl_seconds: float = 3600, max_stale_seconds: float = 86400,
+                 memory_entries: int = 256):
+        self.path = Path(path) if path else None
+        self.ttl_seconds = ttl_seconds
+        self.max_stale_seconds = max(max_stale_seconds, ttl_seconds)
+        self.memory_entries = memory_entries
+        self._memory: "OrderedDict[str, CacheEntry]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._refreshing: Dict[str, asyncio.Task] = {}
+        self.stats = {"fresh": 0, "stale": 0, "misses": 0, "last_known_good": 0,
+                      "refreshes": 0, "refresh_errors": 0, "disk_reads": 0}
+
+    # ------------------------------------------------------------------ stockage
+
+    def _file(self, key: str) -> Path:
+        return self.path / f"{hashlib.sha256(key.encode('utf-8')).hexdigest()[:24]}.json"
+
+    def _remember(self, entry: CacheEntry):
+        with self._lock:
+            self._memory[entry.key] = entry
+            self._memory.move_to_end(entry.key)
+            while len(self._memory) > self.memory_entries:
+                self._memory.popitem(last=False)
+
+    def lookup(self, key: str) -> Optional[CacheEntry]:
+        """Entrée de la clé (mémoire, sinon disque), quel que soit son âge"""
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is not None:
+                self._memory.move_to_end(key)
+                return entry
+        if self.path is None:
+            return None
+        try:
+            with open(self._file(key), 'r', encoding='utf-8') as f:
+                saved = json.load(f)
+        except (OSError, ValueError):
+            return None
+        if saved.get("key") != key:
+            return None
+        self.stats["disk_reads"] += 1
+        entry = CacheEntry(key, saved.get("value"), float(saved.get("fetched_at", 0)))
+        self._remember(entry)
+        return entry
+
+    def put(self, key: str, value: Any) -> CacheEntry:
+        """Enregistre une version récupérée avec succès (mémoire + écriture atomique sur disque)"""
+        entry = CacheEntry(key, value, time.time())
+        self._remember(entry)
+        if self.path is not None:
+            file = self._file(key)
+            try:
+                self.path.mkdir(parents=True, exist_ok=True)
+                tmp_path = file.with_suffix(".json.tmp")
+                with open(tmp_path, 'w', encoding='utf-8') as f:
+                    json.dump({"key": key, "fetched_at": entry.fetched_at, "value": value}, f, ensure_ascii=False)
+                os.replace(tmp_path, file)
+            except (OSError, TypeError, ValueError) as e:
+                logger.warning(f"⚠️ Écriture du cache web impossible pour {key}: {e}")
+        return entry
+
+    def state(self, entry: Optional[CacheEntry]) -> str:
+        if entry is None:
+            return EXPIRED
+        age = entry.age
+        if age <= self.ttl_seconds:
+            return FRESH
+        return STALE if age <= self.max_stale_seconds else EXPIRED
+
+    # ------------------------------------------------------------------ rafraîchissement
+
+    def refresh_in_background(self, key: str, fetch: Callable[[], Awaitable[Any]]):
+        """Rafraîchit la clé sans attendre (ignoré si un rafraîchissement de la clé est déjà en cours)"""
+        running = self._refreshing.get(key)
+        if running is not None and not running.done():
+            return
+
+        async def refresh():
+            try:
+                self.put(key, await fetch())
+                self.stats["refreshes"] += 1
+                logger.debug(f"🔄 Cache web rafraîchi: {key}")
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                self.stats["refresh_errors"] += 1
+                logger.warning(f"⚠️ Rafraîchissement de {key} échoué, version en cache conservée: {e}")
+            finally:
+                self._refreshing.pop(key, None)
+
+        self._refreshing[key] = asyncio.get_running_loop().create_task(refresh())
+
+    def _info(self, status: str, entry: Optional[CacheEntry]) -> Dict[str, Any]:
+        self.stats["misses" if status == "miss" else status] += 1
+        return {"status": status, "age_seconds": round(entry.age, 1) if entry else 0.0}
+
+    async def get_or_fetch(self, key: str, fetch: Callable[[], Awaitable[Any]]) -> Tuple[Any, Dict[str, Any]]:
+        """
+        Valeur de la clé selon la politique du cache ; `fetch` lève une exception si la source est indisponible
+
+        Returns:
+            (valeur, {"status": fresh | stale | miss | last_known_good, "age_seconds"})
+        Raises:
+            l'exception de `fetch` si la source est en panne et qu'aucune version n'est connue
+        """
+        entry = self.lookup(key)
+        state = self.state(entry)
+        if state == FRESH:
+            return entry.value, self._info(FRESH, entry)
+        if state == STALE:
+            self.refresh_in_background(key, fetch)
+            return entry.value, self._info(STALE, entry)
+
+        try:
+            entry = self.put(key, await fetch())
+            return entry.value, self._info("miss", entry)
+        except Exception as e:
+            if entry is None:
+                raise
+            logger.warning(f"⚠️ Source indisponible pour {key}, dernière version connue servie "
+                           f"({entry.age / 3600:.1f} h): {e}")
+            return entry.value, self._info("last_known_good", entry)
+
+    def info(self) -> Dict[str, Any]:
+        return {
+            "path": str(self.path) if self.path else None,
+            "ttl_seconds": self.ttl_seconds,
+            "max_stale_seconds": self.max_stale_seconds,
+            "memory_entries": len(self._memory),
+            "refreshing": sum(1 for task in self._refreshing.values() if not task.done()),
+            **self.stats,
+        }
+
+
+_scrape_cache: Optional[ScrapeCache] = None
+_scrape_cache_lock = threading.Lock()
+
+
+def get_scrape_cache() -> Optional[ScrapeCache]:
+    """Cache partagé des sources web (None si désactivé dans web_sources.cache.enabled)"""
+    global _scrape_cache
+    config = get_config()
+    if not config.get("web_sources.cache.enabled", True):
+        return None
+
+    with _scrape_cache_lock:
+        if _scrape_cache is None:
+            path = config.get("web_sources.cache.path", "data/cache/web")
+            _scrape_cache = ScrapeCache(
+                Path(path) if path else None,
+                ttl_seconds=float(config.get("web_sources.cache_duration", 3600)),
+                max_stale_seconds=float(config.get("web_sources.cache.max_stale_seconds", 86400)),
+                memory_entries=int(config.get("web_sources.cache.memory_entries", 256)),
+            )
+        return _scrape_cache
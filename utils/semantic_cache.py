@@ -0,0 +1,249 @@
+# basketcoach-mcp/utils/semantic_cache.py
+#!/usr/bin/env python3
+"""
+Cache sémantique des réponses LLM
+Une question reformulée retrouve la réponse d'une question proche (similarité cosinus des embeddings)
+"""
+
+import os
+import re
+import json
+import time
+import hashlib
+import threading
+import unicodedata
+from pathlib import Path
+from typing import Dict, Any, Optional, Callable, List
+
+import numpy as np
+import sys
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from utils.logger import get_logger
+from utils.config import get_config
+
+logger = get_logger("utils.semantic_cache")
+
+
+def normalize_question(question: str) -> str:
+    """Forme canonique d'une question (casse, accents, ponctuation, espaces)"""
+    text = "".join(c for c in unicodedata.normalize("NFKD", question.lower()) if not unicodedata.combining(c))
+    return " ".join(re.findall(r"[a-z0-9]+", text))
+
+
+class SemanticCache:
+    """
+    Cache question → réponse avec recherche par similarité.
+
+    - entrées propres au modèle LLM et au gabarit de prompt (empreinte) qui les ont produites :
+      une réponse d'un autre modèle ou d'un autre prompt n'est jamais servie,
+    - correspondance exacte sur la question normalisée (sans calcul d'embedding),
+    - sinon plus proche voisin parmi les embeddings stockés (produit scalaire, vecteurs normalisés),
+    - expiration (TTL) et éviction LRU au-delà de max_entries,
+    - persistance sur disque (entries.json + vectors.npy) pour survivre aux redémarrages.
+    """
+
+    def __init__(self, path: Path, embed: Callable[[str], np.ndarray], similarity_threshold: float = 0.92,
+                 ttl_seconds: int = 7 * 24 * 3600, max_entries: int = 500):
+        self.path = Path(path)
+        self.embed = embed
+        self.similarity_threshold = similarity_threshold
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self.entries: List[Dict[str, Any]] = []
+        self.vectors: Optional[np.ndarray] = None
+        self.stats = {"hits": 0, "misses": 0, "exact_hits": 0}
+        self._load()
+
+    # ------------------------------------------------------------------
+    # API
+    # ------------------------------------------------------------------
+
+    def lookup(self, question: str, model: Optional[str] = None,
+               prompt_hash: Optional[str] = None) -> Optional[Dict[str, Any]]:
+        """
+        Réponse en cache pour une question (ou une question proche), produite par ce modèle et ce prompt.
+
+        Returns:
+            {answer, metadata, question, similarity, age_seconds, created_at} ou None
+        """
+        key = self._key(question)
+        with self._lock:
+            self._expire()
+            candidates = [i for i, entry in enumerate(self.entries) if self._same_version(entry, model, prompt_hash)]
+            for i in candidates:
+                if self.entries[i]["key"] == key:
+                    self.stats["exact_hits"] += 1
+                    return self._hit(self.entries[i], 1.0)
+            if not candidates:
+                self.stats["misses"] += 1
+                return None
+
+        # Embedding hors verrou (le plus coûteux), puis plus proche voisin parmi les entrées de même version
+        query = self._embed(question)
+        with self._lock:
+            candidates = [i for i, entry in enumerate(self.entries) if self._same_version(entry, model, prompt_hash)]
+            if not candidates or self.vectors.shape[1] != len(query):
+                self.stats["misses"] += 1
+                return None
+            scores = self.vectors[candidates] @ query
+            best = int(np.argmax(scores))
+            if float(scores[best]) < self.similarity_threshold:
+                self.stats["misses"] += 1
+                return None
+            return self._hit(self.entries[candidates[best]], float(scores[best]))
+
+    def store(self, question: str, answer: str, metadata: Optional[Dict[str, Any]] = None,
+              model: Optional[str] = None, prompt_hash: Optional[str] = None):
+        """Ajoute (ou remplace, quelle que soit sa version) la réponse d'une question"""
+        vector = self._embed(question)
+        key = self._key(question)
+        now = time.time()
+        with self._lock:
+            keep = [i for i, entry in enumerate(self.entries) if entry["key"] != key]
+            if self.vectors is not None and self.vectors.shape[1] != len(vector):
+                keep = []  # modèle d'embedding changé : anciennes entrées incomparables
+            self.entries = [self.entries[i] for i in keep]
+            vectors = self.vectors[keep] if self.vectors is not None and len(keep) else np.empty((0, len(vector)), np.float32)
+
+            self.entries.append({
+                "key": key,
+                "question": question,
+                "answer": answer,
+                "metadata": metadata or {},
+                "model": model,
+                "prompt_hash": prompt_hash,
+                "created_at": now,
+                "last_hit": now,
+                "hits": 0,
+            })
+            self.vectors = np.vstack([vectors, vector[None, :]]).astype(np.float32)
+
+            self._expire()
+            if len(self.entries) > self.max_entries:
+                # Éviction LRU : on garde les entrées utilisées le plus récemment
+                recent = sorted(range(len(self.entries)), key=lambda i: self.entries[i]["last_hit"])[-self.max_entries:]
+                recent.sort()
+                self.entries = [self.entries[i] for i in recent]
+                self.vectors = self.vectors[recent]
+            self._save()
+
+    def clear(self):
+        with self._lock:
+            self.entries = []
+            self.vectors = None
+            self._save()
+
+    def info(self) -> Dict[str, Any]:
+        return {
+            "entries": len(self.entries),
+            "max_entries": self.max_entries,
+            "ttl_seconds": self.ttl_seconds,
+            "similarity_threshold": self.similarity_threshold,
+            **self.stats,
+        }
+
+    # ------------------------------------------------------------------
+    # Interne
+    # ------------------------------------------------------------------
+
+    def _hit(self, entry: Dict[str, Any], similarity: float) -> Dict[str, Any]:
+        """Met à jour l'usage LRU d'une entrée et la formate (verrou détenu par l'appelant)"""
+        entry["last_hit"] = time.time()
+        entry["hits"] = entry.get("hits", 0) + 1
+        self.stats["hits"] += 1
+        return {
+            "answer": entry["answer"],
+            "metadata": entry.get("metadata", {}),
+            "question": entry["question"],
+            "similarity": round(similarity, 4),
+            "age_seconds": round(time.time() - entry["created_at"], 1),
+            "created_at": entry["created_at"],
+        }
+
+    @staticmethod
+    def _same_version(entry: Dict[str, Any], model: Optional[str], prompt_hash: Optional[str]) -> bool:
+        """Entrée produite par ce modèle et ce prompt (None pour une entrée ou un appel sans version)"""
+        return entry.get("model") == model and entry.get("prompt_hash") == prompt_hash
+
+    @staticmethod
+    def _key(question: str) -> str:
+        return hashlib.sha256(normalize_question(question).encode("utf-8")).hexdigest()
+
+    def _embed(self, question: str) -> np.ndarray:
+        vector = np.asarray(self.embed(question), dtype=np.float32).reshape(-1)
+        norm = np.linalg.norm(vector)
+        return vector / norm if norm else vector
+
+    def _expire(self):
+        """Retire les entrées plus anciennes que le TTL (verrou détenu par l'appelant)"""
+        if not self.ttl_seconds or not self.entries:
+            return
+        limit = time.time() - self.ttl_seconds
+        keep = [i for i, entry in enumerate(self.entries) if entry["created_at"] >= limit]
+        if len(keep) != len(self.entries):
+            self.entries = [self.entries[i] for i in keep]
+            self.vectors = self.vectors[keep] if self.vectors is not None else None
+
+    def _load(self):
+        entries_path = self.path / "entries.json"
+        vectors_path = self.path / "vectors.npy"
+        if not entries_path.exists() or not vectors_path.exists():
+            return
+        try:
+            with open(entries_path, 'r', encoding='utf-8') as f:
+                entries = json.load(f)
+            vectors = np.load(vectors_path)
+            if len(entries) == len(vectors):
+                self.entries, self.vectors = entries, vectors
+                self._expire()
+                logger.info(f"✅ Cache sémantique chargé: {len(self.entries)} réponses ({self.path})")
+        except Exception as e:
+            logger.warning(f"⚠️ Cache sémantique illisible, ignoré: {e}")
+
+    def _save(self):
+        """Écriture atomique (verrou détenu par l'appelant)"""
+        try:
+            self.path.mkdir(parents=True, exist_ok=True)
+            tmp_path = self.path / "vectors.npy.tmp"
+            with open(tmp_path, 'wb') as f:
+                np.save(f, self.vectors if self.vectors is not None else np.empty((0, 0), np.float32))
+            os.replace(tmp_path, self.path / "vectors.npy")
+
+            tmp_path = self.path / "entries.json.tmp"
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(self.entries, f, ensure_ascii=False)
+            os.replace(tmp_path, self.path / "entries.json")
+        except Exception as e:
+            logger.warning(f"⚠️ Sauvegarde du cache sémantique impossible: {e}")
+
+
+_answer_cache: Optional[SemanticCache] = None
+_answer_cache_lock = threading.Lock()
+
+
+def _embed_question(question: str) -> np.ndarray:
+    """Embedding avec le modèle du système RAG (déjà chargé par les outils de recherche)"""
+    from rag.embed import rag_system
+    if rag_system.model is None:
+        rag_system.initialize()
+    return rag_system.encode_query(question)[0]
+
+
+def get_answer_cache() -> Optional[SemanticCache]:
+    """Cache sémantique des réponses de ask_coach_ai (None si désactivé dans llm.semantic_cache)"""
+    global _answer_cache
+    config = get_config()
+    if not config.get("llm.semantic_cache.enabled", True):
+        return None
+
+    with _answer_cache_lock:
+        if _answer_cache is None:
+            _answer_cache = SemanticCache(
+                Path(config.get("llm.semantic_cache.path", "data/cache/semantic")) / "ask_coach_ai",
+                _embed_question,
+                similarity_threshold=float(config.get("llm.semantic_cache.similarity_threshold", 0.92)),
+                ttl_seconds=int(config.get("llm.semantic_cache.ttl_seconds", 7 * 24 * 3600)),
+                max_entries=int(config.get("llm.semantic_cache.max_entries", 500)),
+            )
+        return _answer_cache
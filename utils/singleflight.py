@@ -0,0 +1,152 @@
+# basketcoach-mcp/utils/singleflight.py
+#!/usr/bin/env python3
+"""
+Regroupement des appels identiques en cours (single-flight)
+Les appelants concurrents d'une même clé attendent un seul calcul partagé et en reçoivent tous le résultat
+"""
+
+import os
+import asyncio
+import inspect
+import threading
+import concurrent.futures
+from typing import Dict, Any, Callable, Hashable, List, Optional, Tuple, Awaitable
+
+import sys
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from utils.logger import get_logger
+
+logger = get_logger("utils.singleflight")
+
+
+class _Subscriber:
+    """Appelant abonné aux résultats intermédiaires : position de lecture propre, livraison dans l'ordre"""
+
+    def __init__(self, callback: Callable[[Any], Any]):
+        self.callback = callback
+        self.delivered = 0
+        self.lock = asyncio.Lock()
+
+
+class _Flight:
+    """Calcul partagé en cours : tâche, nombre d'appelants, éléments intermédiaires diffusés"""
+
+    def __init__(self):
+        self.task: Optional[asyncio.Task] = None
+        self.waiters = 0
+        self.items: List[Any] = []
+        self.subscribers: List[_Subscriber] = []
+
+    async def publish(self, item: Any):
+        """Diffuse un résultat intermédiaire (token...) à tous les appelants, y compris ceux arrivés plus tard"""
+        self.items.append(item)
+        for subscriber in list(self.subscribers):
+            await self.catch_up(subscriber)
+
+    async def catch_up(self, subscriber: _Subscriber):
+        """Livre à un abonné les éléments qu'il n'a pas encore reçus"""
+        async with subscriber.lock:
+            while subscriber.delivered < len(self.items):
+                item = self.items[subscriber.delivered]
+                subscriber.delivered += 1
+                await _deliver(subscriber.callback, item)
+
+
+async def _deliver(subscriber: Callable[[Any], Any], item: Any):
+    try:
+        result = subscriber(item)
+        if inspect.isawaitable(result):
+            await result
+    except Exception as e:
+        # un appelant défaillant ne doit pas interrompre le calcul partagé
+        logger.debug(f"Diffusion single-flight impossible: {e}")
+
+
+class AsyncSingleFlight:
+    """
+    Single-flight asyncio (une instance par boucle d'événements).
+
+    - le premier appelant d'une clé lance le calcul dans une tâche dédiée,
+    - les suivants attendent la même tâche et reçoivent les éléments déjà publiés puis les suivants,
+    - un appelant annulé ne fait qu'arrêter d'attendre ; le calcul n'est annulé qu'avec le dernier appelant.
+    """
+
+    def __init__(self):
+        self._flights: Dict[Hashable, _Flight] = {}
+        self.stats = {"leaders": 0, "shared": 0}
+
+    def in_flight(self) -> int:
+        return len(self._flights)
+
+    async def do(self, key: Hashable, fn: Callable[[Callable[[Any], Awaitable[None]]], Awaitable[Any]],
+                 subscriber: Optional[Callable[[Any], Any]] = None) -> Tuple[Any, bool]:
+        """
+        Args:
+            fn: fabrique du calcul, reçoit `publish` pour diffuser des résultats intermédiaires
+            subscriber: callback de cet appelant pour les résultats intermédiaires
+
+        Returns:
+            (résultat, shared) — shared=True si le calcul a été lancé par un autre appelant
+        """
+        flight = self._flights.get(key)
+        shared = flight is not None
+        if flight is None:
+            flight = self._flights[key] = _Flight()
+            flight.task = asyncio.create_task(fn(flight.publish))
+            flight.task.add_done_callback(lambda _: self._forget(key, flight))
+            self.stats["leaders"] += 1
+        else:
+            self.stats["shared"] += 1
+
+        subscription = _Subscriber(subscriber) if subscriber is not None else None
+        flight.waiters += 1
+        try:
+            if subscription is not None:
+                flight.subscribers.append(subscription)
+                await flight.catch_up(subscription)  # éléments publiés avant l'arrivée de cet appelant
+            return await asyncio.shield(flight.task), shared
+        except asyncio.CancelledError:
+            if flight.waiters <= 1 and not flight.task.done():
+                flight.task.cancel()
+            raise
+        finally:
+            flight.waiters -= 1
+            if subscription is not None and subscription in flight.subscribers:
+                flight.subscribers.remove(subscription)
+
+    def _forget(self, key: Hashable, flight: _Flight):
+        if self._flights.get(key) is flight:
+            del self._flights[key]
+
+
+class SingleFlight:
+    """Single-flight pour du code synchrone (threads) : les appelants concurrents attendent le même Future"""
+
+    def __init__(self):
+        self._flights: Dict[Hashable, concurrent.futures.Future] = {}
+        self._lock = threading.Lock()
+        self.stats = {"leaders": 0, "shared": 0}
+
+    def do(self, key: Hashable, fn: Callable[[], Any]) -> Tuple[Any, bool]:
+        with self._lock:
+            future = self._flights.get(key)
+            leader = future is None
+            if leader:
+                future = self._flights[key] = concurrent.futures.Future()
+                self.stats["leaders"] += 1
+            else:
+                self.stats["shared"] += 1
+
+        if not leader:
+            return future.result(), True
+
+        try:
+            result = fn()
+            future.set_result(result)
+            return result, False
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        finally:
+            with self._lock:
+                self._flights.pop(key, None)
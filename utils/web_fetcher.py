@@ -0,0 +1,175 @@
+# basketcoach-mcp/utils/web_fetcher.py
+#!/usr/bin/env python3
+"""
+Récupération asynchrone des pages web (actualités, classements)
+Client httpx poolé par boucle d'événements, requêtes simultanées sous une échéance globale :
+les sources qui répondent à temps sont rendues, les autres sont abandonnées
+"""
+
+import os
+import time
+import asyncio
+import weakref
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Tuple, Any, Awaitable
+
+import httpx
+
+import sys
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from utils.logger import get_logger
+from utils.config import get_config
+from utils.http_cache import HTTPCache, get_http_cache
+
+logger = get_logger("utils.web_fetcher")
+
+DEFAULT_HEADERS = {
+    "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36",
+    "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8",
+    "Accept-Language": "fr-FR,fr;q=0.8,en-US;q=0.5,en;q=0.3",
+    "DNT": "1",
+    "Upgrade-Insecure-Requests": "1",
+}
+
+
+@dataclass
+class FetchResult:
+    """Réponse d'une source (content vide et error renseigné en cas d'échec)"""
+    url: str
+    status_code: Optional[int] = None
+    content: bytes = b""
+    elapsed_ms: float = 0.0
+    error: Optional[str] = None
+    not_modified: bool = False      # 304 : corps repris du cache HTTP
+    bytes_saved: int = 0
+
+    @property
+    def ok(self) -> bool:
+        if self.not_modified:
+            return self.error is None
+        return self.error is None and self.status_code is not None and 200 <= self.status_code < 300
+
+
+class WebFetcher:
+    """
+    Pages web récupérées en parallèle :
+    - connexions persistantes (pool httpx.AsyncClient) réutilisées d'un appel d'outil à l'autre,
+    - délai par requête (timeout) et échéance globale (deadline) pour un lot de sources,
+    - résultats partiels : une source lente ou en panne ne retarde ni n'invalide les autres,
+    - requêtes conditionnelles (ETag / Last-Modified) si un cache HTTP est fourni : corps réutilisé sur 304.
+    """
+
+    def __init__(self, timeout: Optional[float] = None, connect_timeout: Optional[float] = None,
+                 deadline: Optional[float] = None, max_connections: Optional[int] = None,
+                 keepalive_expiry: Optional[float] = None, transport: Optional[httpx.AsyncBaseTransport] = None,
+                 http_cache: Optional[HTTPCache] = None):
+        config = get_config()
+        self.timeout = float(timeout or config.get("web_sources.fetch.timeout", 8))
+        self.connect_timeout = float(connect_timeout or config.get("web_sources.fetch.connect_timeout", 3))
+        self.deadline = float(deadline or config.get("web_sources.fetch.deadline", 10))
+        self.max_connections = int(max_connections or config.get("web_sources.fetch.max_connections", 10))
+        self.keepalive_expiry = float(keepalive_expiry or config.get("web_sources.fetch.keepalive_expiry", 30))
+        self.transport = transport
+        self.http_cache = http_cache
+        self._client: Optional[httpx.AsyncClient] = None
+
+    @property
+    def client(self) -> httpx.AsyncClient:
+        if self._client is None or self._client.is_closed:
+            self._client = httpx.AsyncClient(
+                limits=httpx.Limits(
+                    max_connections=self.max_connections,
+                    max_keepalive_connections=self.max_connections,
+                    keepalive_expiry=self.keepalive_expiry
+                ),
+                timeout=httpx.Timeout(self.timeout, connect=self.connect_timeout),
+                headers=DEFAULT_HEADERS,
+                follow_redirects=True,
+                transport=self.transport,
+            )
+        return self._client
+
+    async def aclose(self):
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+    async def fetch(self, url: str) -> FetchResult:
+        """GET d'une page, conditionnel si elle est dans le cache HTTP, sans lever d'exception (erreur dans le résultat)"""
+        start = time.perf_counter()
+        # accès disque du cache hors de la boucle d'événements
+        conditional = {}
+        if self.http_cache is not None:
+            conditional = await asyncio.to_thread(self.http_cache.conditional_headers, url)
+        try:
+            response = await self.client.get(url, headers=conditional)
+            elapsed_ms = round((time.perf_counter() - start) * 1000, 1)
+            if self.http_cache is not None:
+                self.http_cache.record(bool(conditional), response.num_bytes_downloaded)
+
+            if response.status_code == 304 and conditional:
+                cached = await asyncio.to_thread(self.http_cache.not_modified, url, response.headers)
+                if cached is not None:
+                    body, saved = cached
+                    logger.debug(f"♻️ {url} inchangée (304), {saved} octets économisés")
+                    return FetchResult(url, 304, body, elapsed_ms, not_modified=True, bytes_saved=saved)
+                # corps disparu entre-temps : requête complète
+                response = await self.client.get(url)
+
+            response.raise_for_status()
+            if self.http_cache is not None:
+                await asyncio.to_thread(self.http_cache.store, url, response.headers, response.content,
+                                        response.num_bytes_downloaded)
+            return FetchResult(url, response.status_code, response.content, elapsed_ms)
+        except httpx.HTTPStatusError as e:
+            return FetchResult(url, e.response.status_code, elapsed_ms=round((time.perf_counter() - start) * 1000, 1),
+                               error=f"HTTP {e.response.status_code}")
+        except httpx.HTTPError as e:
+            return FetchResult(url, elapsed_ms=round((time.perf_counter() - start) * 1000, 1),
+                               error=f"{type(e).__name__}: {e}" if str(e) else type(e).__name__)
+
+    async def fetch_all(self, urls: List[str], deadline: Optional[float] = None) -> Tuple[Dict[str, FetchResult], List[str]]:
+        """
+        Récupère les URLs simultanément, au plus `deadline` secondes au total
+
+        Returns:
+            (résultats des sources terminées, dans l'ordre de urls ; URLs abandonnées à l'échéance)
+        """
+        return await run_within_deadline({url: self.fetch(url) for url in urls},
+                                         self.deadline if deadline is None else deadline)
+
+
+async def run_within_deadline(calls: Dict[str, Awaitable[Any]], deadline: float) -> Tuple[Dict[str, Any], List[str]]:
+    """
+    Exécute les appels simultanément pendant au plus `deadline` secondes, annule ceux qui n'ont pas fini
+
+    Returns:
+        (résultat ou exception de chaque appel terminé, dans l'ordre de calls ; clés des appels abandonnés)
+    """
+    tasks = {key: asyncio.ensure_future(call) for key, call in calls.items()}
+    if not tasks:
+        return {}, []
+    done, pending = await asyncio.wait(tasks.values(), timeout=deadline)
+    for task in pending:
+        task.cancel()
+    if pending:
+        await asyncio.gather(*pending, return_exceptions=True)
+
+    results = {key: task.exception() or task.result() for key, task in tasks.items() if task in done}
+    late = [key for key, task in tasks.items() if task in pending]
+    if late:
+        logger.warning(f"⏱️ Échéance de {deadline:.0f}s atteinte, sources abandonnées: {late}")
+    return results, late
+
+
+# Un client (et son pool de connexions) par boucle d'événements, comme pour le client Ollama
+_fetchers: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, WebFetcher]" = weakref.WeakKeyDictionary()
+
+
+def get_web_fetcher() -> WebFetcher:
+    """Client web partagé de la boucle d'événements courante"""
+    loop = asyncio.get_running_loop()
+    fetcher = _fetchers.get(loop)
+    if fetcher is None:
+        fetcher = _fetchers[loop] = WebFetcher(http_cache=get_http_cache())
+    return fetcher